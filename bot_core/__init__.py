@@ -3,5 +3,24 @@ from .views import BotControlView
 from .logger import setup_logging
 from .database import DatabaseHandler
 from .events import EventHandler
+from .cache import ConfigCache
+from .stock import StockIndex
+from .scheduler import DeadlineScheduler
+from .jobs import JobQueue
+from .edits import EditScheduler
+from .fanout import FanOut
+from .command_sync import CommandSync
+from .leaderboard import Leaderboard, LeaderboardService
+from .wallet import Wallet
+from .cooldowns import CooldownStore
+from .cluster import Cluster, shard_for, split_shards
+from .gateway import GatewayProfile
+from .metrics import BotMetrics, MetricsRegistry
+from .watchdog import LoopWatchdog, SystemSampler
+from .mongo_pool import PoolProfile
+from .hll import HyperLogLog, DistinctCounters
+from .rollups import RollupStore
+from .batch_writer import BatchWriter
+from .invite_tracker import InviteTracker
 
-__all__ = ['CookieBot', 'BotControlView', 'setup_logging', 'DatabaseHandler', 'EventHandler']
\ No newline at end of file
+__all__ = ['CookieBot', 'BotControlView', 'setup_logging', 'DatabaseHandler', 'EventHandler', 'ConfigCache', 'StockIndex', 'DeadlineScheduler', 'JobQueue', 'EditScheduler', 'FanOut', 'CommandSync', 'Leaderboard', 'LeaderboardService', 'Wallet', 'CooldownStore', 'Cluster', 'shard_for', 'split_shards', 'GatewayProfile', 'BotMetrics', 'MetricsRegistry', 'LoopWatchdog', 'SystemSampler', 'PoolProfile', 'HyperLogLog', 'DistinctCounters', 'RollupStore', 'BatchWriter', 'InviteTracker']
\ No newline at end of file
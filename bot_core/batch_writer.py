@@ -0,0 +1,123 @@
+# bot_core/batch_writer.py
+# Bounded background queue that hands items to a bulk write function in batches
+
+import time
+import asyncio
+import logging
+from collections import deque
+from typing import Any, Awaitable, Callable, List
+
+logger = logging.getLogger('CookieBot')
+
+class BatchWriter:
+    """Collect items off the hot path and write them in batches from one task.
+
+    submit() never waits: when the queue is full the item is dropped and counted,
+    so a slow database can't stall command handling. A batch is written once
+    batch_size items are queued or max_delay seconds after the first one,
+    whichever comes first. Flush latency and queue depth are kept in stats().
+    """
+
+    def __init__(self, name: str, write: Callable[[List[Any]], Awaitable[None]],
+                 batch_size: int = 200, max_delay: float = 5.0, max_queue: int = 10000):
+        self.name = name
+        self.write = write
+        self.batch_size = batch_size
+        self.max_delay = max_delay
+        self.max_queue = max_queue
+        self._buffer = deque()
+        self._lock = asyncio.Lock()
+        self._has_items = asyncio.Event()
+        self._full = asyncio.Event()
+        self._task = None
+        self._closing = False
+
+        self.dropped = 0
+        self.failed = 0
+        self.written = 0
+        self.batches = 0
+        self.peak_depth = 0
+        self.last_latency = 0.0
+        self.avg_latency = 0.0
+        self.max_latency = 0.0
+        self.last_batch_size = 0
+
+    def submit(self, item: Any) -> bool:
+        if len(self._buffer) >= self.max_queue:
+            self.dropped += 1
+            if self.dropped == 1 or self.dropped % 1000 == 0:
+                logger.warning(f"{self.name}: queue full, {self.dropped} items dropped so far")
+            return False
+
+        self._buffer.append(item)
+        depth = len(self._buffer)
+        self.peak_depth = max(self.peak_depth, depth)
+        self._has_items.set()
+        if depth >= self.batch_size:
+            self._full.set()
+        return True
+
+    def stats(self) -> dict:
+        return {
+            "queue_depth": len(self._buffer),
+            "peak_depth": self.peak_depth,
+            "written": self.written,
+            "batches": self.batches,
+            "dropped": self.dropped,
+            "failed": self.failed,
+            "last_batch_size": self.last_batch_size,
+            "last_latency_ms": round(self.last_latency * 1000, 1),
+            "avg_latency_ms": round(self.avg_latency * 1000, 1),
+            "max_latency_ms": round(self.max_latency * 1000, 1)
+        }
+
+    async def flush(self):
+        """Write everything queued so far"""
+        async with self._lock:
+            while self._buffer:
+                batch = [self._buffer.popleft() for _ in range(min(self.batch_size, len(self._buffer)))]
+                if len(self._buffer) < self.batch_size:
+                    self._full.clear()
+                if not self._buffer:
+                    self._has_items.clear()
+
+                started = time.perf_counter()
+                try:
+                    await self.write(batch)
+                    self.written += len(batch)
+                except Exception as e:
+                    self.failed += len(batch)
+                    logger.error(f"{self.name}: failed to write {len(batch)} items: {e}")
+                elapsed = time.perf_counter() - started
+
+                self.batches += 1
+                self.last_batch_size = len(batch)
+                self.last_latency = elapsed
+                self.max_latency = max(self.max_latency, elapsed)
+                self.avg_latency = elapsed if self.batches == 1 else 0.9 * self.avg_latency + 0.1 * elapsed
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._closing = False
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the background task and write whatever is still queued"""
+        if self._task:
+            # Let a write in progress finish instead of cancelling it mid-batch
+            self._closing = True
+            self._has_items.set()
+            self._full.set()
+            await self._task
+            self._task = None
+        await self.flush()
+
+    async def _run(self):
+        while not self._closing:
+            await self._has_items.wait()
+            if not self._closing and len(self._buffer) < self.batch_size:
+                try:
+                    await asyncio.wait_for(self._full.wait(), self.max_delay)
+                except asyncio.TimeoutError:
+                    pass
+            await self.flush()
@@ -16,29 +16,46 @@ from .logger import setup_logging, webhook_handler
 from .views import BotControlView
 from .events import EventHandler
 from .database import DatabaseHandler
+from .cache import ConfigCache
+from .stock import StockIndex
+from .scheduler import DeadlineScheduler
+from .jobs import JobQueue
+from .edits import EditScheduler
+from .fanout import FanOut
+from .command_sync import CommandSync
+from .leaderboard import LeaderboardService
+from .wallet import Wallet
+from .cooldowns import CooldownStore
+from .cluster import Cluster
+from .gateway import GatewayProfile, cache_report
+from .metrics import BotMetrics
+from .watchdog import LoopWatchdog, SystemSampler
+from .mongo_pool import PoolProfile
 
 load_dotenv('setup/.env')
 warnings.filterwarnings("ignore", message="PyNaCl is not installed")
 
 logger = setup_logging()
 
-class CookieBot(commands.Bot):
-    def __init__(self):
-        intents = discord.Intents.default()
-        intents.message_content = True
-        intents.members = True
-        intents.guilds = True
-        intents.presences = True
+class CookieBot(commands.AutoShardedBot):
+    def __init__(self, cluster_id=0, cluster_count=1, shard_ids=None, shard_count=None, profile=None):
+        self.gateway_profile = GatewayProfile.get(profile)
+        # Each cluster serves its metrics on the next port up; METRICS_PORT=0 turns them off
+        metrics_port = int(os.getenv("METRICS_PORT", "9108"))
+        self.metrics = BotMetrics(os.getenv("METRICS_HOST", "127.0.0.1"), metrics_port + cluster_id if metrics_port else None)
         
         super().__init__(
             command_prefix="!",
-            intents=intents,
+            **self.gateway_profile.client_options(),
+            http_trace=self.metrics.discord_trace(),
             help_command=None,
             activity=discord.Activity(
                 type=discord.ActivityType.watching,
                 name="for /help | Cookie Bot 🍪"
             ),
             status=discord.Status.online,
+            shard_ids=shard_ids,
+            shard_count=shard_count,
             allowed_mentions=discord.AllowedMentions(
                 everyone=False,
                 roles=False,
@@ -56,11 +73,29 @@ class CookieBot(commands.Bot):
         self.active_claims = {}
         self.db_handler = DatabaseHandler(self)
         self.event_handler = EventHandler(self)
+        self.config_cache = ConfigCache(self)
+        self.stock_index = StockIndex(self)
+        self.scheduler = DeadlineScheduler()
+        self.jobs = JobQueue(self)
+        self.edits = EditScheduler(self)
+        self.fanout = FanOut()
+        self.leaderboards = LeaderboardService(self)
+        self.wallet = Wallet(self)
+        self.cooldowns = CooldownStore(self)
+        self.cluster = Cluster(self, cluster_id, cluster_count, shard_ids, shard_count)
+        dev_guild_id = os.getenv("DEV_GUILD_ID")
+        self.command_sync = CommandSync(self, int(dev_guild_id) if dev_guild_id else None)
+        self.watchdog = LoopWatchdog.from_env(self.metrics)
+        self.system = SystemSampler()
         self._connection_check_task = None
+        self._chunking = {}
         
     async def setup_hook(self):
         print("🚀 Initializing...")
         
+        self.watchdog.start()
+        self.system.start()
+        
         self.session = aiohttp.ClientSession()
         webhook_handler.session = self.session
         
@@ -80,16 +115,14 @@ class CookieBot(commands.Bot):
             logger.error("❌ BOT_TOKEN not found!")
             raise ValueError("BOT_TOKEN is required")
         
-        print(f"🔗 Connecting to MongoDB...")
+        self.mongo_pool = PoolProfile.get()
+        print(f"🔗 Connecting to MongoDB (pool profile {self.mongo_pool.describe()})...")
         
         # Initialize MongoDB with improved settings
         try:
             self.mongo_client = motor.motor_asyncio.AsyncIOMotorClient(
                 MONGODB_URI,
-                maxPoolSize=5,  # Reduced for Windows stability
-                minPoolSize=1,  # Minimal pool
-                maxIdleTimeMS=10000,  # Close idle connections faster
-                waitQueueTimeoutMS=2500,  # Shorter queue timeout
+                **self.mongo_pool.client_options(),
                 serverSelectionTimeoutMS=5000,
                 connectTimeoutMS=10000,
                 retryWrites=True,
@@ -99,7 +132,7 @@ class CookieBot(commands.Bot):
                 readPreference='primary',  # Use primary only
                 heartbeatFrequencyMS=10000,
                 socketTimeoutMS=20000,
-                maxConnecting=2  # Limit concurrent connection attempts
+                event_listeners=[self.metrics.mongo_listener, self.metrics.pool_listener]
                 # REMOVED socketKeepAlive - not valid for motor
             )
             
@@ -113,6 +146,8 @@ class CookieBot(commands.Bot):
             print("✅ MongoDB connected!")
             
             await self.db_handler.initialize_database()
+            await self.cooldowns.ensure_indexes()
+            self.config_cache.start()
             
         except asyncio.TimeoutError:
             logger.error("❌ MongoDB connection timeout!")
@@ -121,6 +156,11 @@ class CookieBot(commands.Bot):
             logger.error(f"❌ MongoDB connection failed: {e}")
             raise
         
+        self.scheduler.start()
+        
+        disabled = self.gateway_profile.disabled_features()
+        print(f"📡 Gateway profile: {self.gateway_profile.name}" + (f" (disabled: {', '.join(disabled)})" if disabled else ""))
+        
         print("📚 Loading cogs...")
         await self.load_cogs()
         
@@ -130,6 +170,14 @@ class CookieBot(commands.Bot):
         self.monitor_performance.start()
         self.cleanup_active_claims.start()
         self.update_website_status.start()
+        self.stock_index.start()
+        self.jobs.start()
+        self.leaderboards.start()
+        self.wallet.start()
+        self.cluster.start()
+        self.metrics.instrument_loops(self)
+        self.metrics.registry.collector(self._collect_metrics)
+        await self.metrics.start()
         self._connection_check_task = asyncio.create_task(self._monitor_db_connection())
         
         print("✅ Ready!")
@@ -176,14 +224,15 @@ class CookieBot(commands.Bot):
     @tasks.loop(minutes=5)
     async def update_presence(self):
         try:
-            if not self.is_ready() or not self.ws:
+            if not self.is_ready() or self.is_closed():
                 return
-                
+            
+            guilds, users = await self.cluster.totals()
             presences = [
-                {"type": discord.ActivityType.watching, "name": f"{len(self.guilds)} servers"},
+                {"type": discord.ActivityType.watching, "name": f"{guilds} servers"},
                 {"type": discord.ActivityType.playing, "name": "with cookies 🍪"},
                 {"type": discord.ActivityType.listening, "name": "/help"},
-                {"type": discord.ActivityType.watching, "name": f"{sum(g.member_count for g in self.guilds):,} users"},
+                {"type": discord.ActivityType.watching, "name": f"{users:,} users"},
                 {"type": discord.ActivityType.competing, "name": "cookie distribution"}
             ]
             
@@ -205,10 +254,6 @@ class CookieBot(commands.Bot):
     @tasks.loop(hours=1)
     async def cleanup_cache(self):
         try:
-            cookie_cog = self.get_cog("CookieCog")
-            if cookie_cog and hasattr(cookie_cog, 'cooldown_cache'):
-                cookie_cog.cooldown_cache.clear()
-                
             self.command_stats.clear()
             
             # Clean old analytics with safe operation
@@ -227,15 +272,16 @@ class CookieBot(commands.Bot):
             if not self.is_ready():
                 return
                 
-            # Clean up orphaned claims
-            for user_id in list(self.active_claims.keys()):
-                if not self.get_user(user_id):
+            # Clean up claims left behind by a failed interaction; users aren't all cached, so go by age
+            cutoff = datetime.now(timezone.utc) - timedelta(minutes=10)
+            for user_id, started in list(self.active_claims.items()):
+                if not isinstance(started, datetime) or started < cutoff:
                     del self.active_claims[user_id]
                     
             cookie_cog = self.get_cog("CookieCog")
             if cookie_cog and hasattr(cookie_cog, 'active_claims'):
-                for user_id in list(cookie_cog.active_claims.keys()):
-                    if not self.get_user(user_id):
+                for user_id, started in list(cookie_cog.active_claims.items()):
+                    if not isinstance(started, datetime) or started < cutoff:
                         del cookie_cog.active_claims[user_id]
                         
         except Exception as e:
@@ -271,8 +317,7 @@ class CookieBot(commands.Bot):
             if latency > 200:
                 print(f"⚠️ High latency: {latency}ms")
                 
-            cpu_percent = psutil.cpu_percent(interval=1)
-            memory = psutil.virtual_memory()
+            system = self.system.snapshot()
             
             # Use safe db operation
             await self.db_handler.safe_db_operation(
@@ -281,10 +326,14 @@ class CookieBot(commands.Bot):
                     "type": "performance",
                     "timestamp": datetime.now(timezone.utc),
                     "latency": latency,
-                    "cpu_percent": cpu_percent,
-                    "memory_percent": memory.percent,
+                    "cpu_percent": system["cpu_percent"],
+                    "memory_percent": system["memory_percent"],
+                    "loop_max_lag_ms": round(self.watchdog.max_lag * 1000),
+                    "loop_stalls": self.watchdog.stalls,
                     "guilds": len(self.guilds),
-                    "users": sum(g.member_count for g in self.guilds)
+                    "users": sum(g.member_count for g in self.guilds),
+                    "cluster_id": self.cluster.cluster_id,
+                    "cache": cache_report(self)
                 }
             )
             
@@ -388,7 +437,98 @@ class CookieBot(commands.Bot):
     async def on_application_command(self, interaction: discord.Interaction):
         await self.event_handler.on_application_command(interaction)
     
+    async def get_or_fetch_user(self, user_id: int):
+        """Cached user, or fetched from the API when the gateway profile doesn't cache them"""
+        user = self.get_user(user_id)
+        if user is None:
+            try:
+                user = await self.fetch_user(user_id)
+            except discord.HTTPException:
+                return None
+        return user
+    
+    async def get_or_fetch_member(self, guild, user_id: int):
+        member = guild.get_member(user_id)
+        if member is None:
+            try:
+                member = await guild.fetch_member(user_id)
+            except discord.HTTPException:
+                return None
+        return member
+    
+    async def ensure_chunked(self, guild):
+        """Load a guild's full member list, for commands that read role.members"""
+        if guild.chunked or not self.intents.members:
+            return
+        task = self._chunking.get(guild.id)
+        if task is None:
+            task = self._chunking[guild.id] = asyncio.create_task(guild.chunk(cache=True))
+            task.add_done_callback(lambda _: self._chunking.pop(guild.id, None))
+        await asyncio.shield(task)
+    
+    async def chunk_role_event_guilds(self):
+        """Chunk guilds whose role changes pay invite rewards or change cookie benefits.
+
+        For a member missing from the cache, discord.py caches them on
+        GUILD_MEMBER_UPDATE but dispatches no on_member_update. Without startup
+        chunking, a member who joined before this process started could get the
+        verified role unseen, and the inviter would never be paid.
+        """
+        if self.gateway_profile.chunk_at_startup or not self.intents.members:
+            return
+        chunked = 0
+        for guild in list(self.guilds):
+            if guild.chunked:
+                continue
+            server = await self.config_cache.get_server(guild.id)
+            if not server:
+                continue
+            # Same default verified role as the invite cog
+            tracks_invites = (server.get("settings", {}).get("invite_tracking", True)
+                              and guild.get_role(server.get("verified_role_id", 1349289354329198623)))
+            if not tracks_invites and not server.get("role_based"):
+                continue
+            try:
+                await self.ensure_chunked(guild)
+                chunked += 1
+            except Exception as e:
+                logger.warning(f"Could not chunk {guild.id}: {e}")
+        if chunked:
+            logger.info(f"Chunked {chunked} guilds with invite rewards or role benefits")
+    
+    async def add_cog(self, cog, **kwargs):
+        await super().add_cog(cog, **kwargs)
+        self.metrics.instrument_loops(cog)
+    
+    def _collect_metrics(self):
+        gauges = self.metrics.registry
+        gauges.gauge("cookiebot_guilds", "Guilds on this cluster").set(len(self.guilds))
+        gauges.gauge("cookiebot_users", "Members across this cluster's guilds").set(sum(g.member_count or 0 for g in self.guilds))
+        latency = gauges.gauge("cookiebot_shard_latency_seconds", "Gateway heartbeat latency", ["shard"])
+        for shard_id, shard in self.shards.items():
+            if math.isfinite(shard.latency):
+                latency.labels(shard_id).set(shard.latency)
+        process = psutil.Process()
+        gauges.gauge("cookiebot_process_resident_memory_bytes", "Resident memory").set(process.memory_info().rss)
+        cpu = process.cpu_times()
+        gauges.gauge("cookiebot_process_cpu_seconds", "CPU time used by the process").set(cpu.user + cpu.system)
+        gauges.gauge("cookiebot_info", "Cluster and gateway profile", ["cluster", "profile"]).labels(
+            self.cluster.cluster_id, self.gateway_profile.name
+        ).set(1)
+    
+    async def on_app_command_completion(self, interaction: discord.Interaction, command):
+        self.metrics.command_finished(command.qualified_name, "slash", interaction.created_at)
+    
+    async def on_command_completion(self, ctx):
+        # Hybrid commands run as slash commands are counted by on_app_command_completion
+        if not ctx.interaction:
+            self.metrics.command_finished(ctx.command.qualified_name, "prefix", ctx.message.created_at)
+    
     async def on_command_error(self, ctx, error):
+        if ctx.command:
+            kind = "slash" if ctx.interaction else "prefix"
+            started_at = ctx.interaction.created_at if ctx.interaction else ctx.message.created_at
+            self.metrics.command_finished(ctx.command.qualified_name, kind, started_at, "error")
         await self.event_handler.on_command_error(ctx, error)
     
     async def close(self):
@@ -398,11 +538,21 @@ class CookieBot(commands.Bot):
         if self._connection_check_task:
             self._connection_check_task.cancel()
         
+        await self.config_cache.stop()
+        await self.stock_index.stop()
+        await self.scheduler.stop()
+        await self.jobs.stop()
+        await self.edits.stop()
+        await self.leaderboards.stop()
+        await self.wallet.stop()
+        await self.cluster.stop()
+        await self.metrics.stop()
+        await self.watchdog.stop()
+        self.system.stop()
+        
         # Send shutdown message with safe db operation
         try:
-            config = await self.db_handler.safe_db_operation(
-                self.db.config.find_one, {"_id": "bot_config"}
-            )
+            config = await self.config_cache.get_config()
             if config and config.get("main_log_channel"):
                 channel = self.get_channel(config["main_log_channel"])
                 if channel:
@@ -421,10 +571,11 @@ class CookieBot(commands.Bot):
         if self.session and not self.session.closed:
             await self.session.close()
             
+        # Unloading the cogs flushes their batch writers, which still need the client
+        await super().close()
+        
         if self.mongo_client:
             self.mongo_client.close()
-            
-        await super().close()
         print("✅ Shutdown complete")
     
     def get_uptime(self):
@@ -0,0 +1,178 @@
+# bot_core/cache.py
+# Read-through cache for bot_config and server documents with change stream invalidation
+
+from datetime import datetime, timezone, timedelta
+import logging
+import asyncio
+from pymongo.errors import OperationFailure, PyMongoError
+
+logger = logging.getLogger('CookieBot')
+
+class ConfigCache:
+    """Shared in-memory copy of the bot_config and servers documents.
+
+    Cached documents are shared between callers and must be treated as read-only.
+    """
+
+    def __init__(self, bot, ttl: int = 300, poll_interval: int = 15):
+        self.bot = bot
+        self.ttl = ttl  # Safety net for writes that bypass both invalidation paths
+        self.poll_interval = poll_interval
+        self._config = None
+        self._config_loaded_at = None
+        self._servers = {}
+        self._pending = {}
+        self._watch_task = None
+        self._last_poll = None
+        self.mode = None
+        self.hits = 0
+        self.misses = 0
+
+    def _is_fresh(self, loaded_at) -> bool:
+        if loaded_at is None:
+            return False
+        return (datetime.now(timezone.utc) - loaded_at).total_seconds() < self.ttl
+
+    async def _load(self, key, loader):
+        """Run a loader once per key even when several callers miss at the same time"""
+        pending = self._pending.get(key)
+        if pending:
+            return await asyncio.shield(pending)
+
+        future = asyncio.ensure_future(loader())
+        self._pending[key] = future
+        try:
+            return await asyncio.shield(future)
+        finally:
+            self._pending.pop(key, None)
+
+    async def get_config(self) -> dict:
+        if self._config is not None and self._is_fresh(self._config_loaded_at):
+            self.hits += 1
+            return self._config
+
+        self.misses += 1
+        return await self._load("config", self._fetch_config)
+
+    async def _fetch_config(self):
+        config = await self.bot.db.config.find_one({"_id": "bot_config"})
+        self._config = config
+        self._config_loaded_at = datetime.now(timezone.utc) if config else None
+        return config
+
+    async def get_server(self, server_id: int) -> dict:
+        cached = self._servers.get(server_id)
+        if cached and self._is_fresh(cached[1]):
+            self.hits += 1
+            return cached[0]
+
+        self.misses += 1
+        return await self._load(("server", server_id), lambda: self._fetch_server(server_id))
+
+    async def _fetch_server(self, server_id: int):
+        server = await self.bot.db.servers.find_one({"server_id": server_id})
+        # Missing servers are cached too so unconfigured guilds don't hit Mongo on every command
+        self._servers[server_id] = (server, datetime.now(timezone.utc))
+        return server
+
+    def invalidate_config(self):
+        self._config = None
+        self._config_loaded_at = None
+
+    def invalidate_server(self, server_id: int):
+        self._servers.pop(server_id, None)
+
+    def clear(self):
+        self.invalidate_config()
+        self._servers.clear()
+
+    def start(self):
+        if self._watch_task is None or self._watch_task.done():
+            self._watch_task = asyncio.create_task(self._watch())
+
+    async def stop(self):
+        if self._watch_task:
+            self._watch_task.cancel()
+            try:
+                await self._watch_task
+            except asyncio.CancelledError:
+                pass
+            self._watch_task = None
+
+    async def _watch(self):
+        """Invalidate on change stream events, falling back to polling last_updated"""
+        while not self.bot.is_closed():
+            try:
+                self.mode = "change_stream"
+                await self._watch_change_stream()
+            except asyncio.CancelledError:
+                raise
+            except OperationFailure as e:
+                # Standalone servers don't support change streams (code 40573)
+                logger.warning(f"Config cache: change streams unavailable, polling instead ({e})")
+                self.mode = "polling"
+                await self._poll_updates()
+                return
+            except PyMongoError as e:
+                logger.warning(f"Config cache: change stream interrupted: {e}")
+            except Exception as e:
+                logger.error(f"Config cache watcher error: {e}")
+
+            # Events may have been missed while the stream was down
+            self.clear()
+            await asyncio.sleep(5)
+
+    async def _watch_change_stream(self):
+        pipeline = [{"$match": {"ns.coll": {"$in": ["config", "servers"]}}}]
+
+        async with self.bot.db.watch(pipeline, full_document="updateLookup") as stream:
+            # A stream may have been missed between the last load and now
+            self.clear()
+            async for change in stream:
+                self._apply_change(change)
+
+    def _apply_change(self, change: dict):
+        collection = change.get("ns", {}).get("coll")
+        document = change.get("fullDocument")
+
+        if collection == "config":
+            if change.get("documentKey", {}).get("_id") != "bot_config":
+                return
+            if document:
+                self._config = document
+                self._config_loaded_at = datetime.now(timezone.utc)
+            else:
+                self.invalidate_config()
+
+        elif collection == "servers":
+            if document and "server_id" in document:
+                self._servers[document["server_id"]] = (document, datetime.now(timezone.utc))
+            else:
+                # Deletes only carry the ObjectId, so drop everything
+                self._servers.clear()
+
+    async def _poll_updates(self):
+        self._last_poll = datetime.now(timezone.utc)
+
+        while not self.bot.is_closed():
+            await asyncio.sleep(self.poll_interval)
+
+            # Overlap the window slightly to tolerate clock skew between processes
+            since = self._last_poll - timedelta(seconds=self.poll_interval)
+            self._last_poll = datetime.now(timezone.utc)
+
+            try:
+                config = await self.bot.db.config.find_one(
+                    {"_id": "bot_config", "last_updated": {"$gt": since}},
+                    {"_id": 1}
+                )
+                if config:
+                    self.invalidate_config()
+
+                async for server in self.bot.db.servers.find(
+                    {"last_updated": {"$gt": since}},
+                    {"server_id": 1}
+                ):
+                    self.invalidate_server(server.get("server_id"))
+            except Exception as e:
+                logger.warning(f"Config cache poll failed: {e}")
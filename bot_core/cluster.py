@@ -0,0 +1,159 @@
+# bot_core/cluster.py
+# Shard ownership and health reporting for one bot process in a cluster
+
+import os
+import math
+import socket
+import asyncio
+import logging
+from datetime import datetime, timezone, timedelta
+from typing import List, Optional, Sequence
+
+import psutil
+
+logger = logging.getLogger('CookieBot')
+
+def shard_for(guild_id: int, shard_count: int) -> int:
+    """The shard Discord routes a guild's events to"""
+    return (guild_id >> 22) % shard_count
+
+def split_shards(shard_count: int, cluster_count: int) -> List[List[int]]:
+    """Contiguous, near-equal shard ranges, one per cluster"""
+    base, extra = divmod(shard_count, cluster_count)
+    ranges, start = [], 0
+    for cluster_id in range(cluster_count):
+        size = base + (1 if cluster_id < extra else 0)
+        ranges.append(list(range(start, start + size)))
+        start += size
+    return ranges
+
+class Cluster:
+    """Which shards this process runs, and its heartbeat in the clusters collection.
+
+    A guild's gateway events, and therefore its in-memory state (active claims,
+    bets, giveaways, invite caches), only ever live on the cluster owning its
+    shard. Discord delivers DMs and DM component clicks to shard 0, so
+    DM-facing work runs on the cluster that owns it. Work that must happen once
+    for the whole bot, such as syncing commands, runs on the primary cluster.
+    """
+
+    def __init__(self, bot, cluster_id: int = 0, cluster_count: int = 1,
+                 shard_ids: Optional[Sequence[int]] = None, shard_count: Optional[int] = None,
+                 report_interval: float = 30.0):
+        self.bot = bot
+        self.cluster_id = cluster_id
+        self.cluster_count = cluster_count
+        self.shard_ids = list(shard_ids) if shard_ids is not None else None
+        self.shard_count = shard_count
+        self.report_interval = report_interval
+        self.host = socket.gethostname()
+        self.started_at = datetime.now(timezone.utc)
+        self._process = psutil.Process(os.getpid())
+        self._task = None
+
+    @property
+    def clustered(self) -> bool:
+        return self.cluster_count > 1
+
+    @property
+    def primary(self) -> bool:
+        return self.cluster_id == 0
+
+    @property
+    def handles_dms(self) -> bool:
+        return self.shard_ids is None or 0 in self.shard_ids
+
+    def owns_guild(self, guild_id: Optional[int]) -> bool:
+        if self.shard_ids is None or guild_id is None:
+            return True
+        return shard_for(guild_id, self.shard_count) in self.shard_ids
+
+    @property
+    def collection(self):
+        return self.bot.db.clusters
+
+    def health(self) -> dict:
+        shards = []
+        for shard_id, shard in sorted(getattr(self.bot, "shards", {}).items()):
+            latency = shard.latency
+            shards.append({
+                "id": shard_id,
+                "latency_ms": round(latency * 1000) if math.isfinite(latency) else None,
+                "closed": shard.is_closed()
+            })
+        return {
+            "cluster_count": self.cluster_count,
+            "shard_ids": self.shard_ids if self.shard_ids is not None else [s["id"] for s in shards],
+            "shard_count": self.shard_count or self.bot.shard_count,
+            "host": self.host,
+            "pid": self._process.pid,
+            "ready": self.bot.is_ready(),
+            "gateway_profile": self.bot.gateway_profile.name,
+            "guilds": len(self.bot.guilds),
+            "users": sum(g.member_count or 0 for g in self.bot.guilds),
+            "shards": shards,
+            "memory_mb": round(self._process.memory_info().rss / 1024 / 1024, 1),
+            "started_at": self.started_at,
+            "updated_at": datetime.now(timezone.utc)
+        }
+
+    async def report(self):
+        await self.collection.replace_one({"_id": self.cluster_id}, self.health(), upsert=True)
+
+    async def summary(self) -> List[dict]:
+        """Latest heartbeat of every cluster; stale ones have stopped reporting"""
+        clusters = await self.collection.find({}).sort("_id", 1).to_list(None)
+        cutoff = datetime.now(timezone.utc) - timedelta(seconds=self.report_interval * 3)
+        for cluster in clusters:
+            updated_at = cluster.get("updated_at")
+            if updated_at and updated_at.tzinfo is None:
+                updated_at = updated_at.replace(tzinfo=timezone.utc)
+            cluster["stale"] = not updated_at or updated_at < cutoff
+        return clusters
+
+    async def totals(self):
+        """Guilds and users across every live cluster"""
+        guilds = len(self.bot.guilds)
+        users = sum(g.member_count or 0 for g in self.bot.guilds)
+        if not self.clustered:
+            return guilds, users
+        try:
+            for cluster in await self.summary():
+                if cluster["_id"] != self.cluster_id and not cluster["stale"]:
+                    guilds += cluster.get("guilds", 0)
+                    users += cluster.get("users", 0)
+        except Exception as e:
+            logger.warning(f"Cluster: could not read other clusters: {e}")
+        return guilds, users
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        try:
+            await self.collection.update_one({"_id": self.cluster_id}, {"$set": {"ready": False, "stopped_at": datetime.now(timezone.utc)}})
+        except Exception:
+            pass
+
+    async def _run(self):
+        if self.primary:
+            try:
+                # Forget clusters left over from a run with more of them
+                await self.collection.delete_many({"_id": {"$gte": self.cluster_count}})
+            except Exception as e:
+                logger.warning(f"Cluster: could not prune old heartbeats: {e}")
+
+        while True:
+            try:
+                await self.report()
+            except Exception as e:
+                logger.error(f"Cluster {self.cluster_id} heartbeat failed: {e}")
+            await asyncio.sleep(self.report_interval)
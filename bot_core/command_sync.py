@@ -0,0 +1,77 @@
+# bot_core/command_sync.py
+# Sync the application command tree only when it actually changed
+
+import json
+import hashlib
+import logging
+from datetime import datetime, timezone
+from typing import Optional, Tuple
+
+import discord
+
+logger = logging.getLogger('CookieBot')
+
+class CommandSync:
+    """Hash the serialized command tree and skip tree.sync() when Discord already has it.
+
+    The hash of the last successful sync is kept in the bot config under
+    command_sync.global, or command_sync.guilds.<id> for guild syncs. With
+    dev_guild_id set, startup syncs the global commands to that guild only,
+    which Discord applies instantly and rate-limits far less.
+    """
+
+    def __init__(self, bot, dev_guild_id: Optional[int] = None):
+        self.bot = bot
+        self.dev_guild = discord.Object(id=dev_guild_id) if dev_guild_id else None
+
+    def tree_hash(self, guild: Optional[discord.abc.Snowflake] = None) -> Tuple[str, int]:
+        commands = self.bot.tree.get_commands(guild=guild)
+        payload = sorted((command.to_dict() for command in commands), key=lambda c: (c.get("type", 1), c["name"]))
+        serialized = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+        return hashlib.sha256(serialized.encode()).hexdigest(), len(commands)
+
+    @staticmethod
+    def _field(guild: Optional[discord.abc.Snowflake]) -> str:
+        return f"command_sync.guilds.{guild.id}" if guild else "command_sync.global"
+
+    async def stored_hash(self, guild: Optional[discord.abc.Snowflake] = None) -> Optional[str]:
+        config = await self.bot.config_cache.get_config() or {}
+        state = config.get("command_sync", {})
+        state = state.get("guilds", {}).get(str(guild.id), {}) if guild else state.get("global", {})
+        return state.get("hash")
+
+    async def sync(self, guild: Optional[discord.abc.Snowflake] = None, force: bool = False) -> Tuple[bool, int]:
+        """Sync globally, or to one guild with the global commands copied in.
+
+        Returns (synced, command count); synced is False when the stored hash
+        matched and Discord was not called.
+        """
+        if guild:
+            self.bot.tree.copy_global_to(guild=guild)
+        current, count = self.tree_hash(guild)
+        if not force and current == await self.stored_hash(guild):
+            return False, count
+
+        synced = await self.bot.tree.sync(guild=guild)
+        await self.bot.db.config.update_one(
+            {"_id": "bot_config"},
+            {"$set": {self._field(guild): {
+                "hash": current,
+                "commands": len(synced),
+                "synced_at": datetime.now(timezone.utc)
+            }}}
+        )
+        self.bot.config_cache.invalidate_config()
+        return True, len(synced)
+
+    async def sync_on_startup(self):
+        try:
+            synced, count = await self.sync(self.dev_guild)
+            scope = f"dev guild {self.dev_guild.id}" if self.dev_guild else "globally"
+            if synced:
+                print(f"🔄 Synced {count} commands {scope}")
+            else:
+                print(f"✅ {count} commands unchanged {scope}, skipped sync")
+        except Exception as e:
+            logger.error(f"❌ Failed to sync commands: {e}")
+            print(f"❌ Failed to sync commands: {e}")
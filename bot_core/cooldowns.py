@@ -0,0 +1,164 @@
+# bot_core/cooldowns.py
+# Cooldowns and rate limits shared by every bot process
+
+import logging
+from collections import OrderedDict
+from datetime import datetime, timezone, timedelta
+from typing import Optional, Tuple
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+logger = logging.getLogger('CookieBot')
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+def _aware(value: Optional[datetime]) -> Optional[datetime]:
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+class CooldownStore:
+    """Cooldowns and windowed counters kept in the cooldowns collection.
+
+    Each key is one document whose expires_at carries a TTL index, so nothing
+    has to be cleaned up by hand and state survives restarts. acquire() and
+    hit() are single atomic updates, so two processes can never both get the
+    last slot. Keys known to be blocked are remembered in an LRU in front of
+    Mongo, which answers repeated attempts during a cooldown without a query.
+    """
+
+    def __init__(self, bot, cache_size: int = 10000):
+        self.bot = bot
+        self.cache_size = cache_size
+        self._blocked: "OrderedDict[str, datetime]" = OrderedDict()
+
+    @property
+    def collection(self):
+        return self.bot.db.cooldowns
+
+    async def ensure_indexes(self):
+        try:
+            await self.collection.create_index("expires_at", expireAfterSeconds=0)
+        except Exception as e:
+            logger.warning(f"Cooldowns: could not create indexes: {e}")
+
+    def _cached(self, key: str, now: datetime) -> Optional[datetime]:
+        until = self._blocked.get(key)
+        if until is None:
+            return None
+        if until <= now:
+            del self._blocked[key]
+            return None
+        self._blocked.move_to_end(key)
+        return until
+
+    def _block(self, key: str, until: datetime):
+        self._blocked[key] = until
+        self._blocked.move_to_end(key)
+        while len(self._blocked) > self.cache_size:
+            self._blocked.popitem(last=False)
+
+    async def acquire(self, key: str, seconds: float) -> Tuple[bool, Optional[datetime]]:
+        """Start a cooldown unless one is running; returns (acquired, running until)"""
+        now = datetime.now(timezone.utc)
+        until = self._cached(key, now)
+        if until:
+            return False, until
+
+        until = now + timedelta(seconds=seconds)
+        try:
+            # Matches only an expired document; a running cooldown makes the upsert collide
+            await self.collection.update_one(
+                {"_id": key, "expires_at": {"$lte": now}},
+                {"$set": {"expires_at": until}},
+                upsert=True
+            )
+        except DuplicateKeyError:
+            running = await self.remaining(key)
+            if running:
+                return False, running
+            return await self.acquire(key, seconds)
+
+        self._block(key, until)
+        return True, until
+
+    async def remaining(self, key: str) -> Optional[datetime]:
+        """When the cooldown on key ends, or None if it is not running"""
+        now = datetime.now(timezone.utc)
+        until = self._cached(key, now)
+        if until:
+            return until
+
+        document = await self.collection.find_one({"_id": key}, {"expires_at": 1, "count": 1, "hits": 1})
+        if not document or "count" in document or "hits" in document:
+            return None
+        until = _aware(document.get("expires_at"))
+        if until and until > now:
+            self._block(key, until)
+            return until
+        return None
+
+    async def reset(self, key: str):
+        self._blocked.pop(key, None)
+        await self.collection.delete_one({"_id": key})
+
+    async def hit(self, key: str, limit: int, window: float, sliding: bool = True) -> Tuple[bool, int, Optional[datetime]]:
+        """Count one use of key if fewer than limit happened in the window.
+
+        A sliding window counts uses in the last `window` seconds; a fixed one
+        starts at the first use and resets `window` seconds later. Returns
+        (allowed, uses in the window, when the next use frees up once full).
+        """
+        now = datetime.now(timezone.utc)
+        until = self._cached(key, now)
+        if until:
+            return False, limit, until
+
+        window_ms = int(window * 1000)
+        if sliding:
+            pipeline = [
+                {"$set": {"hits": {"$filter": {
+                    "input": {"$ifNull": ["$hits", []]},
+                    "cond": {"$gt": ["$$this", now - timedelta(seconds=window)]}
+                }}}},
+                {"$set": {"allowed": {"$lt": [{"$size": "$hits"}, limit]}}},
+                {"$set": {"hits": {"$cond": ["$allowed", {"$concatArrays": ["$hits", [now]]}, "$hits"]}}},
+                {"$set": {"expires_at": {"$add": [{"$max": "$hits"}, window_ms]}}}
+            ]
+        else:
+            pipeline = [
+                {"$set": {"fresh": {"$lte": [{"$ifNull": ["$expires_at", _EPOCH]}, now]}}},
+                {"$set": {"allowed": {"$or": ["$fresh", {"$lt": ["$count", limit]}]}}},
+                {"$set": {
+                    "count": {"$cond": ["$fresh", 1, {"$cond": ["$allowed", {"$add": ["$count", 1]}, "$count"]}]},
+                    "expires_at": {"$cond": ["$fresh", now + timedelta(seconds=window), "$expires_at"]}
+                }},
+                {"$unset": "fresh"}
+            ]
+
+        document = await self.collection.find_one_and_update(
+            {"_id": key}, pipeline, upsert=True, return_document=ReturnDocument.AFTER
+        )
+        count, resets_at = self._window(document, window, sliding)
+        if count >= limit and resets_at:
+            self._block(key, resets_at)
+        return document["allowed"], count, resets_at
+
+    async def count(self, key: str, window: float, sliding: bool = True) -> Tuple[int, Optional[datetime]]:
+        """Uses of key in the current window and when the oldest one expires"""
+        document = await self.collection.find_one({"_id": key})
+        return self._window(document, window, sliding)
+
+    @staticmethod
+    def _window(document: Optional[dict], window: float, sliding: bool) -> Tuple[int, Optional[datetime]]:
+        if not document:
+            return 0, None
+        now = datetime.now(timezone.utc)
+        if sliding:
+            start = now - timedelta(seconds=window)
+            hits = [hit for hit in map(_aware, document.get("hits", [])) if hit > start]
+            return len(hits), (min(hits) + timedelta(seconds=window) if hits else None)
+        expires_at = _aware(document.get("expires_at"))
+        if not expires_at or expires_at <= now:
+            return 0, None
+        return document.get("count", 0), expires_at
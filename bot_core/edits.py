@@ -0,0 +1,128 @@
+# bot_core/edits.py
+# Coalescing message edit scheduler with a per-channel rate limit
+
+import asyncio
+import logging
+from typing import Dict, Optional
+
+import discord
+
+logger = logging.getLogger('CookieBot')
+
+class _PendingEdit:
+    __slots__ = ("message", "fields", "futures")
+
+    def __init__(self, message, fields: dict):
+        self.message = message
+        self.fields = fields
+        self.futures = []
+
+class EditScheduler:
+    """Send message edits at most per_second times a second per channel.
+
+    Only the latest requested state of a message is kept: requesting an edit
+    while an older one for the same message is still waiting replaces it, and
+    the replaced state is counted as saved. Every future returned by edit()
+    resolves once the state that replaced it has been sent, with True on
+    success and False when the edit failed. Edits go straight to the Message or
+    PartialMessage they were requested on, so nothing has to be fetched.
+    """
+
+    def __init__(self, bot, per_second: float = 1.0):
+        self.bot = bot
+        self.interval = 1.0 / per_second
+        self._pending: Dict[int, Dict[int, _PendingEdit]] = {}
+        self._workers: Dict[int, asyncio.Task] = {}
+        self._closing = False
+
+        self.requested = 0
+        self.sent = 0
+        self.superseded = 0
+        self.failed = 0
+
+    def partial(self, channel_id: int, message_id: int) -> discord.PartialMessage:
+        """A message handle that can be edited without fetching it first"""
+        return self.bot.get_partial_messageable(channel_id).get_partial_message(message_id)
+
+    def edit(self, message, **fields) -> asyncio.Future:
+        """Queue message.edit(**fields), replacing any edit of it still waiting"""
+        future = asyncio.get_running_loop().create_future()
+        self.requested += 1
+        if self._closing:
+            future.set_result(False)
+            return future
+
+        channel_id = message.channel.id
+        queue = self._pending.setdefault(channel_id, {})
+        pending = queue.get(message.id)
+        if pending is None:
+            pending = queue[message.id] = _PendingEdit(message, fields)
+        else:
+            self.superseded += 1
+            pending.fields = fields
+            # Prefer a full Message over a partial handle
+            if isinstance(message, discord.Message):
+                pending.message = message
+        pending.futures.append(future)
+
+        if channel_id not in self._workers:
+            self._workers[channel_id] = asyncio.create_task(self._run(channel_id))
+        return future
+
+    def discard(self, message_id: int, channel_id: Optional[int] = None):
+        """Drop a waiting edit, e.g. for a message that was deleted"""
+        queues = [self._pending.get(channel_id, {})] if channel_id else list(self._pending.values())
+        for queue in queues:
+            pending = queue.pop(message_id, None)
+            if pending:
+                self.superseded += 1
+                self._resolve(pending, False)
+
+    @staticmethod
+    def _resolve(pending: _PendingEdit, result: bool):
+        for future in pending.futures:
+            if not future.done():
+                future.set_result(result)
+
+    def stats(self) -> dict:
+        return {
+            "requested": self.requested,
+            "sent": self.sent,
+            "saved": self.superseded,
+            "failed": self.failed,
+            "waiting": sum(len(queue) for queue in self._pending.values()),
+            "channels": len(self._workers)
+        }
+
+    async def _run(self, channel_id: int):
+        queue = self._pending[channel_id]
+        try:
+            while queue:
+                # Oldest waiting message first; a replaced state keeps its place
+                message_id = next(iter(queue))
+                pending = queue.pop(message_id)
+                try:
+                    await pending.message.edit(**pending.fields)
+                    self.sent += 1
+                    self._resolve(pending, True)
+                except discord.NotFound:
+                    self._resolve(pending, False)
+                except Exception as e:
+                    self.failed += 1
+                    logger.warning(f"Edit of message {message_id} failed: {e}")
+                    self._resolve(pending, False)
+                await asyncio.sleep(self.interval)
+        finally:
+            if not queue:
+                self._pending.pop(channel_id, None)
+            self._workers.pop(channel_id, None)
+
+    async def stop(self):
+        self._closing = True
+        for task in list(self._workers.values()):
+            task.cancel()
+        for queue in self._pending.values():
+            for pending in queue.values():
+                self._resolve(pending, False)
+        self._pending.clear()
+        self._workers.clear()
@@ -7,12 +7,16 @@ import logging
 import asyncio
 import os
 from .views import BotControlView
+from .gateway import cache_report
 
 logger = logging.getLogger('CookieBot')
 
 class EventHandler:
     def __init__(self, bot):
         self.bot = bot
+        self._ready_once = False
+        self._announcement_task = None
+        self._chunk_task = None
         
     def get_uptime(self):
         delta = datetime.now(timezone.utc) - self.bot.start_time
@@ -33,26 +37,78 @@ class EventHandler:
         return " ".join(parts)
         
     async def on_ready(self):
+        # A fresh session starts with an empty member cache, so this runs after every READY
+        if self._chunk_task is None or self._chunk_task.done():
+            self._chunk_task = asyncio.create_task(self.chunk_role_event_guilds())
+        
+        # READY fires again after every reconnect that can't resume; startup work runs once per process
+        if self._ready_once:
+            logger.info(f"Reconnected as {self.bot.user} ({len(self.bot.guilds)} servers)")
+            return
+        self._ready_once = True
+        
         print(f"✅ Logged in as {self.bot.user} (ID: {self.bot.user.id})")
         print(f"📊 {len(self.bot.guilds)} servers | {sum(g.member_count for g in self.bot.guilds):,} users")
-        
+        report = cache_report(self.bot)
+        logger.info(f"Gateway cache ({report['profile']}): {report['members_cached']:,} members, "
+                    f"{report['users_cached']:,} users, {report['messages_cached']:,} messages, {report['rss_mb']} MB RSS")
+        if self.bot.cluster.clustered:
+            print(f"🧩 Cluster {self.bot.cluster.cluster_id}/{self.bot.cluster.cluster_count} | shards {self.bot.cluster.shard_ids}")
+        
+        # The command tree is global, so one cluster syncs it for all of them
+        if self.bot.cluster.primary:
+            await self.bot.command_sync.sync_on_startup()
+        
+        # Announcements go out in the background so a large guild count can't hold up on_ready
+        self._announcement_task = asyncio.create_task(self.send_startup_announcements())
+    
+    async def chunk_role_event_guilds(self):
         try:
-            synced = await self.bot.tree.sync()
-            print(f"🔄 Synced {len(synced)} commands")
+            await self.bot.chunk_role_event_guilds()
         except Exception as e:
-            logger.error(f"❌ Failed to sync commands: {e}")
-            print(f"❌ Failed to sync commands")
-        
-        # Send announcement to announcement channels from database
+            logger.error(f"❌ Chunking guilds failed: {e}")
+    
+    async def send_startup_announcements(self):
         await asyncio.sleep(2)  # Small delay to ensure everything is loaded
+        try:
+            await self._send_startup_announcements()
+        except Exception as e:
+            logger.error(f"❌ Startup announcements failed: {e}")
+    
+    async def _send_startup_announcements(self):
+        # Announcement and log channels of every enabled server in one query
+        servers = await self.bot.db.servers.find(
+            {
+                "enabled": True,
+                "$or": [
+                    {"channels.announcement": {"$exists": True, "$ne": None}},
+                    {"channels.log": {"$exists": True, "$ne": None}}
+                ]
+            },
+            {"server_id": 1, "server_name": 1, "channels.announcement": 1, "channels.log": 1}
+        ).to_list(None)
+        
+        names = {}
+        announcement_targets = []
+        log_targets = []
+        for server_data in servers:
+            channels = server_data.get("channels", {})
+            server_id = server_data["server_id"]
+            if not self.bot.cluster.owns_guild(server_id):
+                continue
+            name = names[server_id] = server_data.get("server_name", "Unknown")
+            if channels.get("announcement"):
+                channel = self.bot.get_channel(channels["announcement"])
+                if channel:
+                    announcement_targets.append((server_id, channel))
+                else:
+                    print(f"❌ Announcement channel {channels['announcement']} not found for {name}")
+            if channels.get("log"):
+                channel = self.bot.get_channel(channels["log"])
+                if channel:
+                    log_targets.append((server_id, channel))
         
-        # Get all servers with announcement channels configured
-        servers_with_announcement = await self.bot.db.servers.find({
-            "channels.announcement": {"$exists": True, "$ne": None},
-            "enabled": True
-        }).to_list(None)
-        
-        if servers_with_announcement:
+        if announcement_targets:
             # Get comprehensive statistics
             total_users = await self.bot.db.users.count_documents({})
             total_cookies_claimed = await self.bot.db.statistics.find_one({"_id": "global_stats"})
@@ -62,162 +118,140 @@ class EventHandler:
             active_users_week = await self.bot.db.users.count_documents({
                 "last_active": {"$gte": datetime.now(timezone.utc) - timedelta(days=7)}
             })
-            
+
             # Get cookie stock information
             stock_info = {}
             total_stock = 0
-            config = await self.bot.db.config.find_one({"_id": "bot_config"})
+            config = await self.bot.config_cache.get_config()
             if config and config.get("default_cookies"):
                 for cookie_type, cookie_config in config["default_cookies"].items():
                     directory = cookie_config.get("directory")
                     if directory and os.path.exists(directory):
-                        files = [f for f in os.listdir(directory) if f.endswith('.txt')]
-                        count = len(files)
+                        count = self.bot.stock_index.count(directory)
                         stock_info[cookie_type] = count
                         total_stock += count
-            
+
             # Get top cookies
             top_cookies = []
             if total_cookies_claimed and total_cookies_claimed.get("total_claims"):
                 sorted_cookies = sorted(total_cookies_claimed["total_claims"].items(), 
                                       key=lambda x: x[1], reverse=True)[:5]
                 top_cookies = [(name.title(), count) for name, count in sorted_cookies]
-            
+
             # Get recent activity
             recent_claims = await self.bot.db.users.count_documents({
                 "last_claim.date": {"$gte": datetime.now(timezone.utc) - timedelta(hours=24)}
             })
-            
+
             # Get blacklist stats
             blacklisted_users = await self.bot.db.users.count_documents({"blacklisted": True})
             
-            # Send to each server's announcement channel
-            for server_data in servers_with_announcement:
-                announcement_channel_id = server_data["channels"]["announcement"]
-                announcement_channel = self.bot.get_channel(announcement_channel_id)
-                
-                if announcement_channel:
-                    try:
-                        announcement_embed = discord.Embed(
-                            title="🟢 Cookie Bot System Status",
-                            description="```diff\n+ SYSTEM ONLINE\n+ ALL SERVICES OPERATIONAL\n```",
-                            color=0x00ff00,
-                            timestamp=datetime.now(timezone.utc)
-                        )
-                        
-                        # Server & User Statistics
-                        announcement_embed.add_field(
-                            name="📊 Network Statistics",
-                            value=f"```yaml\n"
-                                  f"Servers      : {len(self.bot.guilds):,}\n"
-                                  f"Total Users  : {sum(g.member_count for g in self.bot.guilds):,}\n"
-                                  f"Registered   : {total_users:,}\n"
-                                  f"Active (24h) : {active_users_today:,}\n"
-                                  f"Active (7d)  : {active_users_week:,}\n"
-                                  f"Blacklisted  : {blacklisted_users:,}\n"
-                                  f"```",
-                            inline=True
-                        )
-                        
-                        # Cookie Statistics
-                        announcement_embed.add_field(
-                            name="🍪 Cookie Analytics",
-                            value=f"```yaml\n"
-                                  f"Total Claims : {total_cookies_claimed.get('all_time_claims', 0) if total_cookies_claimed else 0:,}\n"
-                                  f"Claims (24h) : {recent_claims:,}\n"
-                                  f"Total Stock  : {total_stock:,} files\n"
-                                  f"Cookie Types : {len(stock_info)}\n"
-                                  f"Avg Claims   : {(total_cookies_claimed.get('all_time_claims', 0) // max(total_users, 1)) if total_cookies_claimed else 0}/user\n"
-                                  f"```",
-                            inline=True
-                        )
-                        
-                        # Stock Overview
-                        stock_text = "```diff\n"
-                        for cookie, count in sorted(stock_info.items(), key=lambda x: x[1], reverse=True)[:8]:
-                            if count > 20:
-                                stock_text += f"+ {cookie.ljust(12)}: {count:>3} ✓\n"
-                            elif count > 10:
-                                stock_text += f"! {cookie.ljust(12)}: {count:>3} ⚠\n"
-                            elif count > 0:
-                                stock_text += f"- {cookie.ljust(12)}: {count:>3} ⚠\n"
-                            else:
-                                stock_text += f"- {cookie.ljust(12)}: OUT ✗\n"
-                        stock_text += "```"
-                        
-                        announcement_embed.add_field(
-                            name="📦 Cookie Stock Levels",
-                            value=stock_text,
-                            inline=False
-                        )
-                        
-                        # Top Cookies
-                        if top_cookies:
-                            top_text = "```yaml\n"
-                            for i, (name, count) in enumerate(top_cookies, 1):
-                                top_text += f"{i}. {name.ljust(12)}: {count:,} claims\n"
-                            top_text += "```"
-                            
-                            announcement_embed.add_field(
-                                name="🏆 Most Popular Cookies",
-                                value=top_text,
-                                inline=True
-                            )
-                        
-                        # System Performance
-                        announcement_embed.add_field(
-                            name="💻 System Performance",
-                            value=f"```yaml\n"
-                                  f"Latency  : {round(self.bot.latency * 1000)}ms\n"
-                                  f"RAM      : {psutil.virtual_memory().percent}%\n"
-                                  f"CPU      : {psutil.cpu_percent()}%\n"
-                                  f"Uptime   : {self.get_uptime()}\n"
-                                  f"Commands : {len(self.bot.commands)}\n"
-                                  f"```",
-                            inline=True
-                        )
-                        
-                        announcement_embed.set_thumbnail(url=self.bot.user.avatar.url)
-                        announcement_embed.set_footer(text="Cookie Bot v2.0 | Premium Edition | Auto-refresh available")
-                        
-                        # Create view with refresh button for announcement
-                        view = AnnouncementRefreshView(self.bot)
-                        
-                        sent_message = await announcement_channel.send(embed=announcement_embed, view=view)
-                        view.message = sent_message
-                    except discord.Forbidden:
-                        print(f"❌ No permission to send in {server_data.get('server_name', 'Unknown')} announcement channel")
-                    except Exception as e:
-                        print(f"❌ Failed to send announcement to {server_data.get('server_name', 'Unknown')}: {e}")
+            announcement_embed = discord.Embed(
+                title="🟢 Cookie Bot System Status",
+                description="```diff\n+ SYSTEM ONLINE\n+ ALL SERVICES OPERATIONAL\n```",
+                color=0x00ff00,
+                timestamp=datetime.now(timezone.utc)
+            )
+
+            # Server & User Statistics
+            announcement_embed.add_field(
+                name="📊 Network Statistics",
+                value=f"```yaml\n"
+                      f"Servers      : {len(self.bot.guilds):,}\n"
+                      f"Total Users  : {sum(g.member_count for g in self.bot.guilds):,}\n"
+                      f"Registered   : {total_users:,}\n"
+                      f"Active (24h) : {active_users_today:,}\n"
+                      f"Active (7d)  : {active_users_week:,}\n"
+                      f"Blacklisted  : {blacklisted_users:,}\n"
+                      f"```",
+                inline=True
+            )
+
+            # Cookie Statistics
+            announcement_embed.add_field(
+                name="🍪 Cookie Analytics",
+                value=f"```yaml\n"
+                      f"Total Claims : {total_cookies_claimed.get('all_time_claims', 0) if total_cookies_claimed else 0:,}\n"
+                      f"Claims (24h) : {recent_claims:,}\n"
+                      f"Total Stock  : {total_stock:,} files\n"
+                      f"Cookie Types : {len(stock_info)}\n"
+                      f"Avg Claims   : {(total_cookies_claimed.get('all_time_claims', 0) // max(total_users, 1)) if total_cookies_claimed else 0}/user\n"
+                      f"```",
+                inline=True
+            )
+
+            # Stock Overview
+            stock_text = "```diff\n"
+            for cookie, count in sorted(stock_info.items(), key=lambda x: x[1], reverse=True)[:8]:
+                if count > 20:
+                    stock_text += f"+ {cookie.ljust(12)}: {count:>3} ✓\n"
+                elif count > 10:
+                    stock_text += f"! {cookie.ljust(12)}: {count:>3} ⚠\n"
+                elif count > 0:
+                    stock_text += f"- {cookie.ljust(12)}: {count:>3} ⚠\n"
                 else:
-                    print(f"❌ Announcement channel {announcement_channel_id} not found for {server_data.get('server_name', 'Unknown')}")
-        
-        # Send simple message to log channels
-        servers_with_logs = await self.bot.db.servers.find({
-            "channels.log": {"$exists": True, "$ne": None},
-            "enabled": True
-        }).to_list(None)
-        
-        for server_data in servers_with_logs:
-            log_channel_id = server_data["channels"]["log"]
-            log_channel = self.bot.get_channel(log_channel_id)
+                    stock_text += f"- {cookie.ljust(12)}: OUT ✗\n"
+            stock_text += "```"
+
+            announcement_embed.add_field(
+                name="📦 Cookie Stock Levels",
+                value=stock_text,
+                inline=False
+            )
+
+            # Top Cookies
+            if top_cookies:
+                top_text = "```yaml\n"
+                for i, (name, count) in enumerate(top_cookies, 1):
+                    top_text += f"{i}. {name.ljust(12)}: {count:,} claims\n"
+                top_text += "```"
+
+                announcement_embed.add_field(
+                    name="🏆 Most Popular Cookies",
+                    value=top_text,
+                    inline=True
+                )
+
+            # System Performance
+            announcement_embed.add_field(
+                name="💻 System Performance",
+                value=f"```yaml\n"
+                      f"Latency  : {round(self.bot.latency * 1000)}ms\n"
+                      f"RAM      : {psutil.virtual_memory().percent}%\n"
+                      f"CPU      : {self.bot.system.snapshot()['cpu_percent']}%\n"
+                      f"Uptime   : {self.get_uptime()}\n"
+                      f"Commands : {len(self.bot.commands)}\n"
+                      f"```",
+                inline=True
+            )
+
+            announcement_embed.set_thumbnail(url=self.bot.user.avatar.url)
+            announcement_embed.set_footer(text="Cookie Bot v2.0 | Premium Edition | Auto-refresh available")
             
-            if log_channel:
-                try:
-                    # Simple embed for log channel - no buttons
-                    log_embed = discord.Embed(
-                        title="🟢 Bot Online",
-                        description=f"Cookie Bot started with **{sum(g.member_count for g in self.bot.guilds):,}** members across **{len(self.bot.guilds)}** servers",
-                        color=0x2ECC71,
-                        timestamp=datetime.now(timezone.utc)
-                    )
-                    
-                    await log_channel.send(embed=log_embed)
-                except Exception as e:
-                    print(f"❌ Failed to send to log channel: {e}")
+            async def send_announcement(channel):
+                # Create view with refresh button for announcement
+                view = AnnouncementRefreshView(self.bot)
+                view.message = await channel.send(embed=announcement_embed, view=view)
+            
+            result = await self.bot.fanout.run(announcement_targets, send_announcement)
+            for server_id, error in result.failed.items():
+                print(f"❌ Failed to send announcement to {names[server_id]}: {error}")
+            print(f"📢 Startup announcement sent to {result.sent}/{result.total} servers in {result.elapsed:.1f}s")
+        
+        if log_targets:
+            # Simple embed for log channel - no buttons
+            log_embed = discord.Embed(
+                title="🟢 Bot Online",
+                description=f"Cookie Bot started with **{sum(g.member_count for g in self.bot.guilds):,}** members across **{len(self.bot.guilds)}** servers",
+                color=0x2ECC71,
+                timestamp=datetime.now(timezone.utc)
+            )
+            result = await self.bot.fanout.run(log_targets, lambda channel: channel.send(embed=log_embed))
+            for server_id, error in result.failed.items():
+                print(f"❌ Failed to send to log channel of {names[server_id]}: {error}")
         
         # Also send to main log channel if configured
-        config = await self.bot.db.config.find_one({"_id": "bot_config"})
+        config = await self.bot.config_cache.get_config()
         if config and config.get("main_log_channel"):
             channel = self.bot.get_channel(config["main_log_channel"])
             if channel:
@@ -343,10 +377,12 @@ class EventHandler:
             "member_count": guild.member_count,
             "owner_id": guild.owner_id,
             "enabled": False,
-            "setup_complete": False
+            "setup_complete": False,
+            "last_updated": datetime.now(timezone.utc)
         })
+        self.bot.config_cache.invalidate_server(guild.id)
         
-        config = await self.bot.db.config.find_one({"_id": "bot_config"})
+        config = await self.bot.config_cache.get_config()
         if config and config.get("main_log_channel"):
             channel = self.bot.get_channel(config["main_log_channel"])
             if channel:
@@ -378,12 +414,14 @@ class EventHandler:
             {
                 "$set": {
                     "left_at": datetime.now(timezone.utc),
-                    "active": False
+                    "active": False,
+                    "last_updated": datetime.now(timezone.utc)
                 }
             }
         )
+        self.bot.config_cache.invalidate_server(guild.id)
         
-        config = await self.bot.db.config.find_one({"_id": "bot_config"})
+        config = await self.bot.config_cache.get_config()
         if config and config.get("main_log_channel"):
             channel = self.bot.get_channel(config["main_log_channel"])
             if channel:
@@ -398,7 +436,7 @@ class EventHandler:
                 log_embed.add_field(name="📊 Total Servers", value=f"**{len(self.bot.guilds)}**", inline=True)
                 log_embed.add_field(name="💔 Total Users Lost", value=f"**{guild.member_count:,}**", inline=True)
                 
-                server_data = await self.bot.db.servers.find_one({"server_id": guild.id})
+                server_data = await self.bot.config_cache.get_server(guild.id)
                 if server_data and server_data.get("joined_at"):
                     duration = datetime.now(timezone.utc) - server_data["joined_at"]
                     log_embed.add_field(
@@ -466,7 +504,7 @@ class EventHandler:
                 inline=False
             )
             
-            config = await self.bot.db.config.find_one({"_id": "bot_config"})
+            config = await self.bot.config_cache.get_config()
             if config and config.get("error_webhook"):
                 webhook = self.bot.error_webhooks.get("global")
                 if not webhook:
@@ -568,13 +606,12 @@ class AnnouncementRefreshView(discord.ui.View):
         # Get cookie stock information
         stock_info = {}
         total_stock = 0
-        config = await self.bot.db.config.find_one({"_id": "bot_config"})
+        config = await self.bot.config_cache.get_config()
         if config and config.get("default_cookies"):
             for cookie_type, cookie_config in config["default_cookies"].items():
                 directory = cookie_config.get("directory")
                 if directory and os.path.exists(directory):
-                    files = [f for f in os.listdir(directory) if f.endswith('.txt')]
-                    count = len(files)
+                    count = self.bot.stock_index.count(directory)
                     stock_info[cookie_type] = count
                     total_stock += count
         
@@ -666,7 +703,7 @@ class AnnouncementRefreshView(discord.ui.View):
             value=f"```yaml\n"
                   f"Latency  : {round(self.bot.latency * 1000)}ms\n"
                   f"RAM      : {psutil.virtual_memory().percent}%\n"
-                  f"CPU      : {psutil.cpu_percent()}%\n"
+                  f"CPU      : {self.bot.system.snapshot()['cpu_percent']}%\n"
                   f"Uptime   : {self.bot.get_uptime()}\n"
                   f"Commands : {len(self.bot.commands)}\n"
                   f"```",
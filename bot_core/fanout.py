@@ -0,0 +1,144 @@
+# bot_core/fanout.py
+# Concurrent, rate-limit aware delivery of one message to many channels
+
+import time
+import random
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, Optional, Tuple
+
+import discord
+
+logger = logging.getLogger('CookieBot')
+
+class FanOutResult:
+    """Outcome of a fan-out; failed maps each target key to the last error"""
+
+    __slots__ = ("total", "sent", "failed", "retries", "started", "finished")
+
+    def __init__(self, total: int):
+        self.total = total
+        self.sent = 0
+        self.failed: Dict[Hashable, str] = {}
+        self.retries = 0
+        self.started = time.monotonic()
+        self.finished = None
+
+    @property
+    def done(self) -> int:
+        return self.sent + len(self.failed)
+
+    @property
+    def elapsed(self) -> float:
+        return (self.finished or time.monotonic()) - self.started
+
+    @property
+    def success_rate(self) -> float:
+        return self.sent / self.done * 100 if self.done else 0.0
+
+class FanOut:
+    """Send to many channels at once without tripping Discord's rate limits.
+
+    At most `concurrency` sends are in flight and new ones start no faster than
+    per_second, which keeps a broadcast under the global request limit. A 429
+    pauses every worker for the Retry-After (or X-RateLimit-Reset-After) the
+    response asked for; 429s and 5xx errors are retried up to `attempts` times,
+    while Forbidden and NotFound fail the target straight away.
+    """
+
+    def __init__(self, concurrency: int = 8, per_second: float = 25.0, attempts: int = 3):
+        self.concurrency = concurrency
+        self.interval = 1.0 / per_second
+        self.attempts = attempts
+        self._next_start = 0.0
+        self._paused_until = 0.0
+        self._pace = asyncio.Lock()
+
+    async def _wait_turn(self):
+        async with self._pace:
+            loop = asyncio.get_running_loop()
+            wait = max(self._next_start, self._paused_until) - loop.time()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            self._next_start = loop.time() + self.interval
+
+    @staticmethod
+    def _retry_after(error: discord.HTTPException) -> float:
+        headers = getattr(error.response, "headers", None) or {}
+        for header in ("Retry-After", "X-RateLimit-Reset-After"):
+            try:
+                return float(headers[header])
+            except (KeyError, TypeError, ValueError):
+                continue
+        return 1.0
+
+    async def _deliver(self, key: Hashable, channel, send: Callable[[Any], Awaitable], result: FanOutResult):
+        for attempt in range(1, self.attempts + 1):
+            await self._wait_turn()
+            try:
+                await send(channel)
+                result.sent += 1
+                return
+            except (discord.Forbidden, discord.NotFound) as e:
+                result.failed[key] = f"{type(e).__name__}: {e.text or e.status}"
+                return
+            except discord.HTTPException as e:
+                if e.status == 429:
+                    delay = self._retry_after(e)
+                    loop = asyncio.get_running_loop()
+                    self._paused_until = max(self._paused_until, loop.time() + delay)
+                elif e.status >= 500:
+                    delay = 2 ** attempt + random.random()
+                else:
+                    result.failed[key] = f"HTTP {e.status}: {e.text}"
+                    return
+                error = f"HTTP {e.status}: {e.text}"
+            except (asyncio.TimeoutError, OSError) as e:
+                delay = 2 ** attempt + random.random()
+                error = f"{type(e).__name__}: {e}"
+            except Exception as e:
+                result.failed[key] = f"{type(e).__name__}: {e}"
+                return
+
+            if attempt < self.attempts:
+                result.retries += 1
+                await asyncio.sleep(delay)
+        result.failed[key] = error
+
+    async def run(self, targets: Iterable[Tuple[Hashable, Any]], send: Callable[[Any], Awaitable],
+                  progress: Optional[Callable[[FanOutResult], Awaitable]] = None,
+                  progress_interval: float = 2.0) -> FanOutResult:
+        """Call send(channel) for every (key, channel) target.
+
+        progress, when given, is awaited with the running result every
+        progress_interval seconds and once more when everything is done.
+        """
+        targets = list(targets)
+        result = FanOutResult(len(targets))
+        queue: asyncio.Queue = asyncio.Queue()
+        for target in targets:
+            queue.put_nowait(target)
+
+        async def worker():
+            while not queue.empty():
+                key, channel = queue.get_nowait()
+                await self._deliver(key, channel, send, result)
+
+        async def report():
+            while True:
+                await asyncio.sleep(progress_interval)
+                try:
+                    await progress(result)
+                except Exception as e:
+                    logger.debug(f"Fan-out progress callback failed: {e}")
+
+        reporter = asyncio.create_task(report()) if progress else None
+        try:
+            await asyncio.gather(*(worker() for _ in range(min(self.concurrency, len(targets)))))
+        finally:
+            result.finished = time.monotonic()
+            if reporter:
+                reporter.cancel()
+        if progress:
+            await progress(result)
+        return result
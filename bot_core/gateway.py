@@ -0,0 +1,123 @@
+# bot_core/gateway.py
+# Gateway profiles: which intents the bot asks for and what it keeps cached
+
+import os
+import logging
+from typing import Optional
+
+import discord
+import psutil
+
+logger = logging.getLogger('CookieBot')
+
+class GatewayProfile:
+    """Intents, member cache policy, chunking and message cache the bot connects with.
+
+    Every cached member, presence and message costs memory in each guild, and
+    presence updates are most of the gateway traffic of a large bot. Cookie
+    Bot never reads presences, needs members only around joins, leaves and
+    role changes, and needs message content only for feedback screenshots.
+    Guilds that skip chunking at startup can be chunked on demand with
+    CookieBot.ensure_chunked(); those with invite rewards or role benefits are
+    chunked in the background after READY.
+    """
+
+    def __init__(self, name: str, presences: bool, members: bool, message_content: bool,
+                 member_cache: str, chunk_at_startup: bool, max_messages: Optional[int],
+                 description: str = ""):
+        self.name = name
+        self.presences = presences
+        self.members = members
+        self.message_content = message_content
+        self.member_cache = member_cache
+        self.chunk_at_startup = chunk_at_startup
+        self.max_messages = max_messages
+        self.description = description
+
+    @classmethod
+    def get(cls, name: Optional[str] = None) -> "GatewayProfile":
+        """The named profile, GATEWAY_PROFILE from the environment, or lean"""
+        name = (name or os.getenv("GATEWAY_PROFILE") or "lean").lower()
+        if name not in PROFILES:
+            raise ValueError(f"Unknown gateway profile {name!r}; expected one of {', '.join(PROFILES)}")
+        return PROFILES[name]
+
+    def intents(self) -> discord.Intents:
+        intents = discord.Intents.default()
+        intents.guilds = True
+        intents.presences = self.presences
+        intents.members = self.members
+        intents.message_content = self.message_content
+        if self.member_cache != "all":
+            # Voice and typing events are never used
+            intents.voice_states = False
+            intents.typing = False
+        return intents
+
+    def member_cache_flags(self, intents: discord.Intents) -> discord.MemberCacheFlags:
+        if self.member_cache == "all":
+            return discord.MemberCacheFlags.from_intents(intents)
+        flags = discord.MemberCacheFlags.none()
+        # Members who join while the bot is online; earlier members only after a chunk,
+        # which CookieBot.chunk_role_event_guilds() requests where role changes matter
+        flags.joined = self.member_cache == "joined" and intents.members
+        return flags
+
+    def client_options(self) -> dict:
+        """Keyword arguments for the discord.py client"""
+        intents = self.intents()
+        return {
+            "intents": intents,
+            "member_cache_flags": self.member_cache_flags(intents),
+            "chunk_guilds_at_startup": self.chunk_at_startup and intents.members,
+            "max_messages": self.max_messages
+        }
+
+    def disabled_features(self) -> list:
+        features = []
+        if not self.members:
+            features += ["invite tracking", "verified invite rewards", "role change logs"]
+        if not self.message_content:
+            features.append("screenshot feedback")
+        return features
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "presences": self.presences,
+            "members": self.members,
+            "message_content": self.message_content,
+            "member_cache": self.member_cache,
+            "chunk_at_startup": self.chunk_at_startup,
+            "max_messages": self.max_messages
+        }
+
+PROFILES = {
+    "full": GatewayProfile(
+        "full", presences=True, members=True, message_content=True,
+        member_cache="all", chunk_at_startup=True, max_messages=1000,
+        description="Every member and presence cached; the original behaviour"
+    ),
+    "lean": GatewayProfile(
+        "lean", presences=False, members=True, message_content=True,
+        member_cache="joined", chunk_at_startup=False, max_messages=None,
+        description="No presences, members cached as they join, guilds chunked when role changes matter"
+    ),
+    "minimal": GatewayProfile(
+        "minimal", presences=False, members=False, message_content=False,
+        member_cache="none", chunk_at_startup=False, max_messages=None,
+        description="Slash commands and buttons only; no member or message content events"
+    )
+}
+
+def cache_report(bot) -> dict:
+    """What the client is holding in memory right now"""
+    return {
+        "profile": bot.gateway_profile.name,
+        "guilds": len(bot.guilds),
+        "chunked_guilds": sum(1 for g in bot.guilds if g.chunked),
+        "members_cached": sum(len(g.members) for g in bot.guilds),
+        "users_cached": len(bot.users),
+        "messages_cached": len(bot.cached_messages),
+        "rss_mb": round(psutil.Process().memory_info().rss / 1024 / 1024, 1)
+    }
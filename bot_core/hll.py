@@ -0,0 +1,218 @@
+# bot_core/hll.py
+# HyperLogLog distinct counters stored as compact binary documents
+
+import math
+import hashlib
+import logging
+from datetime import datetime, timezone, timedelta
+from typing import Dict, Iterable, Optional
+from bson import Binary
+from pymongo.errors import DuplicateKeyError
+
+logger = logging.getLogger('CookieBot')
+
+class HyperLogLog:
+    """Approximate distinct count in a fixed 2**precision bytes.
+
+    Adding a value and merging two sketches are both O(1) in the number of
+    values seen; with the default precision of 12 the standard error is ~1.6%.
+    """
+
+    __slots__ = ("precision", "registers")
+
+    def __init__(self, precision: int = 12, registers: Optional[bytes] = None):
+        self.precision = precision
+        size = 1 << precision
+        if registers is not None and len(registers) != size:
+            raise ValueError(f"Expected {size} registers, got {len(registers)}")
+        self.registers = bytearray(registers) if registers is not None else bytearray(size)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "HyperLogLog":
+        return cls(int(len(data)).bit_length() - 1, bytes(data))
+
+    def to_bytes(self) -> bytes:
+        return bytes(self.registers)
+
+    def add(self, value) -> bool:
+        """Add a value; returns True when the sketch changed"""
+        digest = hashlib.blake2b(str(value).encode(), digest_size=8).digest()
+        x = int.from_bytes(digest, "big")
+        bits = 64 - self.precision
+        index = x >> bits
+        rank = bits - (x & ((1 << bits) - 1)).bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+            return True
+        return False
+
+    def merge(self, other: "HyperLogLog") -> bool:
+        """Union another sketch into this one; returns True when the sketch changed"""
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge sketches of different precision")
+        changed = False
+        registers = self.registers
+        for i, rank in enumerate(other.registers):
+            if rank > registers[i]:
+                registers[i] = rank
+                changed = True
+        return changed
+
+    def count(self) -> int:
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / sum(2.0 ** -r for r in self.registers)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * m and zeros:
+            # Linear counting is more accurate for small cardinalities
+            estimate = m * math.log(m / zeros)
+        return int(round(estimate))
+
+    def __len__(self) -> int:
+        return self.count()
+
+class _Sketch:
+    __slots__ = ("hll", "version", "dirty")
+
+    def __init__(self, hll: HyperLogLog, version: Optional[int] = None):
+        self.hll = hll
+        self.version = version  # None until the stored copy has been read
+        self.dirty = False
+
+class DistinctCounters:
+    """Named distinct counters, bucketed by day, ISO week, month and all time.
+
+    Each bucket is one {_id, registers, version} document. Values are added to
+    sketches held in memory and flush() merges them into the stored copies with a
+    version check, so several bot processes can share a counter. A flush only
+    writes buckets whose registers actually grew.
+    """
+
+    periods = ("all", "day", "week", "month")
+    retention = {"day": timedelta(days=60), "week": timedelta(weeks=26)}
+
+    def __init__(self, db, collection: str = "distinct_counters", precision: int = 12):
+        self.db = db
+        self.collection_name = collection
+        self.precision = precision
+        self._sketches: Dict[str, _Sketch] = {}
+
+    @property
+    def collection(self):
+        return self.db[self.collection_name]
+
+    async def ensure_indexes(self):
+        await self.collection.create_index("expires_at", expireAfterSeconds=0)
+
+    @staticmethod
+    def bucket(period: str, when: Optional[datetime] = None) -> str:
+        when = when or datetime.now(timezone.utc)
+        if period == "day":
+            return f"d{when:%Y-%m-%d}"
+        if period == "week":
+            year, week, _ = when.isocalendar()
+            return f"w{year}-{week:02d}"
+        if period == "month":
+            return f"m{when:%Y-%m}"
+        return "all"
+
+    def key(self, name: str, period: str = "all", when: Optional[datetime] = None) -> str:
+        return f"{name}:{self.bucket(period, when)}"
+
+    def _sketch(self, key: str) -> _Sketch:
+        sketch = self._sketches.get(key)
+        if sketch is None:
+            sketch = self._sketches[key] = _Sketch(HyperLogLog(self.precision))
+        return sketch
+
+    def add(self, name: str, value, when: Optional[datetime] = None):
+        for period in self.periods:
+            sketch = self._sketch(self.key(name, period, when))
+            if sketch.hll.add(value) or sketch.version is None:
+                sketch.dirty = True
+
+    def add_sketch(self, key: str, hll: HyperLogLog):
+        """Union a whole sketch into one bucket, e.g. when migrating old data"""
+        sketch = self._sketch(key)
+        if sketch.hll.merge(hll) or sketch.version is None:
+            sketch.dirty = True
+
+    def _expires_at(self, key: str) -> Optional[datetime]:
+        bucket = key.rsplit(":", 1)[1]
+        period = {"d": "day", "w": "week"}.get(bucket[0])
+        if period:
+            return datetime.now(timezone.utc) + self.retention[period]
+        return None
+
+    async def _write(self, key: str, sketch: _Sketch, attempts: int = 5):
+        for _ in range(attempts):
+            if sketch.version is None:
+                stored = await self.collection.find_one({"_id": key})
+                if stored is None:
+                    document = {
+                        "_id": key,
+                        "registers": Binary(sketch.hll.to_bytes()),
+                        "version": 1,
+                        "updated_at": datetime.now(timezone.utc)
+                    }
+                    expires_at = self._expires_at(key)
+                    if expires_at:
+                        document["expires_at"] = expires_at
+                    try:
+                        await self.collection.insert_one(document)
+                        sketch.version = 1
+                        return
+                    except DuplicateKeyError:
+                        continue
+                sketch.version = stored["version"]
+                sketch.hll.merge(HyperLogLog.from_bytes(stored["registers"]))
+                if sketch.hll.registers == stored["registers"]:
+                    return
+
+            result = await self.collection.update_one(
+                {"_id": key, "version": sketch.version},
+                {
+                    "$set": {"registers": Binary(sketch.hll.to_bytes()), "updated_at": datetime.now(timezone.utc)},
+                    "$inc": {"version": 1}
+                }
+            )
+            if result.modified_count:
+                sketch.version += 1
+                return
+            # Another process wrote first; merge its registers and try again
+            sketch.version = None
+        raise RuntimeError(f"gave up after {attempts} conflicting writes")
+
+    async def flush(self):
+        for key, sketch in list(self._sketches.items()):
+            if not sketch.dirty:
+                continue
+            sketch.dirty = False
+            try:
+                await self._write(key, sketch)
+            except Exception as e:
+                sketch.dirty = True
+                logger.error(f"Distinct counter {key} flush failed: {e}")
+
+        # Buckets from previous days, weeks and months are never written again
+        current = {self.bucket(period) for period in self.periods}
+        for key in [k for k, s in self._sketches.items() if not s.dirty and k.rsplit(":", 1)[1] not in current]:
+            del self._sketches[key]
+
+    async def sketch(self, keys: Iterable[str]) -> HyperLogLog:
+        """Union of the stored and pending sketches for the given bucket keys"""
+        keys = list(keys)
+        merged = HyperLogLog(self.precision)
+        async for document in self.collection.find({"_id": {"$in": keys}}):
+            merged.merge(HyperLogLog.from_bytes(document["registers"]))
+        for key in keys:
+            sketch = self._sketches.get(key)
+            if sketch is not None:
+                merged.merge(sketch.hll)
+        return merged
+
+    async def count(self, name: str, period: str = "all") -> int:
+        return (await self.sketch([self.key(name, period)])).count()
+
+    async def count_union(self, names: Iterable[str], period: str = "all") -> int:
+        return (await self.sketch(self.key(name, period) for name in names)).count()
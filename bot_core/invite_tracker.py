@@ -0,0 +1,201 @@
+# bot_core/invite_tracker.py
+# Works out which invite each new member used, one worker per guild
+
+import asyncio
+import logging
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+logger = logging.getLogger('CookieBot')
+
+class InviteState:
+    """What we last knew about one invite code"""
+
+    __slots__ = ("code", "uses", "max_uses", "inviter", "expires_at")
+
+    def __init__(self, code: str, uses: int, max_uses: int, inviter, expires_at: Optional[datetime]):
+        self.code = code
+        self.uses = uses
+        self.max_uses = max_uses
+        self.inviter = inviter
+        self.expires_at = expires_at
+
+    @classmethod
+    def from_invite(cls, invite) -> "InviteState":
+        return cls(invite.code, invite.uses or 0, invite.max_uses or 0, invite.inviter, invite.expires_at)
+
+class Attribution:
+    """The invite a member most likely joined with.
+
+    confidence is 1.0 when only one invite gained uses in the batch the member
+    was resolved in, the invite's share of the new uses when several did, and
+    0.0 when no invite accounts for the join (vanity URL, widget, expired data).
+    """
+
+    __slots__ = ("member", "code", "inviter", "uses", "confidence")
+
+    def __init__(self, member, code: Optional[str] = None, inviter=None, uses: int = 0, confidence: float = 0.0):
+        self.member = member
+        self.code = code
+        self.inviter = inviter
+        self.uses = uses
+        self.confidence = confidence
+
+class GuildInviteWorker:
+    """Serializes the joins of one guild and resolves them in batches.
+
+    Joins are queued in arrival order. The worker waits coalesce_delay after the
+    first queued join, then resolves every queued join with a single invite
+    fetch, never fetching more often than min_interval. The snapshot holds the
+    uses already credited to members, so uses seen before their join event
+    arrives are credited to the next batch instead of being lost.
+    """
+
+    def __init__(self, guild, coalesce_delay: float = 0.5, min_interval: float = 1.0):
+        self.guild = guild
+        self.coalesce_delay = coalesce_delay
+        self.min_interval = min_interval
+        self.invites: Dict[str, InviteState] = {}
+        self.ready = False
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._lock = asyncio.Lock()
+        self._last_fetch = 0.0
+        self._stale = set()
+        self._task = asyncio.create_task(self._run())
+
+    async def _fetch(self) -> Dict[str, InviteState]:
+        wait = self._last_fetch + self.min_interval - asyncio.get_running_loop().time()
+        if wait > 0:
+            await asyncio.sleep(wait)
+        try:
+            invites = await self.guild.invites()
+        finally:
+            self._last_fetch = asyncio.get_running_loop().time()
+        return {invite.code: InviteState.from_invite(invite) for invite in invites}
+
+    async def refresh(self):
+        """Replace the snapshot with the current invite counts"""
+        async with self._lock:
+            self.invites = await self._fetch()
+            self._stale.clear()
+            self.ready = True
+
+    def created(self, invite):
+        if invite.code not in self.invites:
+            self.invites[invite.code] = InviteState.from_invite(invite)
+
+    def attribute(self, member) -> asyncio.Future:
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((member, future))
+        return future
+
+    def _deltas(self, current: Dict[str, InviteState]) -> Dict[str, int]:
+        now = datetime.now(timezone.utc)
+        deltas = {}
+        for code, state in current.items():
+            known = self.invites.get(code)
+            delta = state.uses - (known.uses if known else 0)
+            if delta > 0:
+                deltas[code] = delta
+        # An invite that vanished one use short of its limit was most likely used up
+        for code, known in self.invites.items():
+            if code in current or not known.max_uses or known.uses + 1 != known.max_uses:
+                continue
+            if known.expires_at and known.expires_at <= now:
+                continue
+            deltas[code] = 1
+        return deltas
+
+    def _resolve(self, members: List, current: Dict[str, InviteState]) -> List[Attribution]:
+        deltas = self._deltas(current)
+        total = sum(deltas.values())
+
+        # One slot per new use; members take them in join order
+        slots = [code for code, delta in sorted(deltas.items(), key=lambda d: -d[1]) for _ in range(delta)]
+        results = []
+        for member, code in zip(members, slots):
+            state = current.get(code) or self.invites[code]
+            confidence = 1.0 if len(deltas) == 1 else deltas[code] / total
+            results.append(Attribution(member, code, state.inviter, state.uses, round(confidence, 2)))
+            known = self.invites.get(code)
+            if known is None:
+                self.invites[code] = known = InviteState(code, 0, state.max_uses, state.inviter, state.expires_at)
+            known.uses += 1
+        results.extend(Attribution(member) for member in members[len(slots):])
+
+        # Uses nobody claimed wait one batch for their join event, then are written off
+        stale = set()
+        for code, state in current.items():
+            known = self.invites.get(code)
+            if known is not None and state.uses > known.uses and code not in self._stale:
+                known.inviter, known.max_uses, known.expires_at = state.inviter, state.max_uses, state.expires_at
+                stale.add(code)
+            else:
+                self.invites[code] = state
+        for code in [c for c in self.invites if c not in current]:
+            del self.invites[code]
+        self._stale = stale
+        return results
+
+    async def _run(self):
+        while True:
+            member, future = await self._queue.get()
+            await asyncio.sleep(self.coalesce_delay)
+            batch = [(member, future)]
+            while not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+
+            members = [m for m, _ in batch]
+            try:
+                async with self._lock:
+                    if not self.ready:
+                        # Nothing to diff against yet; this fetch becomes the baseline
+                        self.invites = await self._fetch()
+                        self.ready = True
+                        results = [Attribution(m) for m in members]
+                    else:
+                        results = self._resolve(members, await self._fetch())
+            except Exception as e:
+                logger.warning(f"Invite attribution failed in {self.guild.id}: {e}")
+                results = [Attribution(m) for m in members]
+
+            for (_, fut), result in zip(batch, results):
+                if not fut.done():
+                    fut.set_result(result)
+
+    def stop(self):
+        self._task.cancel()
+
+class InviteTracker:
+    """Invite attribution for every guild, with a worker created per guild on demand"""
+
+    def __init__(self, coalesce_delay: float = 0.5, min_interval: float = 1.0):
+        self.coalesce_delay = coalesce_delay
+        self.min_interval = min_interval
+        self._workers: Dict[int, GuildInviteWorker] = {}
+
+    def worker(self, guild) -> GuildInviteWorker:
+        worker = self._workers.get(guild.id)
+        if worker is None:
+            worker = self._workers[guild.id] = GuildInviteWorker(guild, self.coalesce_delay, self.min_interval)
+        return worker
+
+    async def refresh(self, guild):
+        await self.worker(guild).refresh()
+
+    def invite_created(self, invite):
+        if invite.guild and invite.guild.id in self._workers:
+            self._workers[invite.guild.id].created(invite)
+
+    async def attribute(self, member) -> Attribution:
+        return await self.worker(member.guild).attribute(member)
+
+    def forget(self, guild_id: int):
+        worker = self._workers.pop(guild_id, None)
+        if worker:
+            worker.stop()
+
+    def stop(self):
+        for worker in self._workers.values():
+            worker.stop()
+        self._workers.clear()
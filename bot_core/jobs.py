@@ -0,0 +1,163 @@
+# bot_core/jobs.py
+# Persistent one-shot job queue backed by the jobs collection
+
+from datetime import datetime, timezone, timedelta
+import os
+import socket
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict, Optional
+from pymongo import ASCENDING, ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+logger = logging.getLogger('CookieBot')
+
+class JobQueue:
+    """Run jobs at a due time, once, across restarts and bot processes.
+
+    Jobs are stored as {_id, kind, due_at, payload, status}. A worker claims a due
+    job by atomically flipping it from pending to running, so only one process
+    ever runs it; finished jobs are deleted. Jobs found still running after a
+    crash are marked abandoned rather than retried, so a job never runs twice.
+    """
+
+    def __init__(self, bot, poll_interval: float = 5.0, batch_size: int = 50, lease: int = 300):
+        self.bot = bot
+        self.poll_interval = poll_interval
+        self.batch_size = batch_size
+        self.lease = lease
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self._handlers: Dict[str, Callable[[dict], Awaitable[None]]] = {}
+        self._task = None
+        self._wakeup = None
+        self._next_wake = None
+
+    @property
+    def collection(self):
+        return self.bot.db.jobs
+
+    def register(self, kind: str, handler: Callable[[dict], Awaitable[None]]):
+        self._handlers[kind] = handler
+
+    async def ensure_indexes(self):
+        await self.collection.create_index([("status", ASCENDING), ("due_at", ASCENDING)])
+        # Failed and abandoned jobs are kept for a week for inspection
+        await self.collection.create_index("finished_at", expireAfterSeconds=7 * 24 * 3600)
+
+    async def enqueue(self, kind: str, due_at: datetime, payload: dict, job_id: Optional[str] = None) -> bool:
+        """Queue a job; with a job_id, queueing the same job twice is a no-op"""
+        document = {
+            "kind": kind,
+            "due_at": due_at,
+            "payload": payload,
+            "status": "pending",
+            "created_at": datetime.now(timezone.utc)
+        }
+        if job_id:
+            document["_id"] = job_id
+
+        try:
+            await self.collection.insert_one(document)
+        except DuplicateKeyError:
+            return False
+
+        if self._wakeup and (self._next_wake is None or due_at < self._next_wake):
+            self._wakeup.set()
+        return True
+
+    async def cancel(self, job_id: str):
+        await self.collection.delete_one({"_id": job_id, "status": "pending"})
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _claim(self, now: datetime) -> Optional[dict]:
+        return await self.collection.find_one_and_update(
+            {"status": "pending", "due_at": {"$lte": now}, "kind": {"$in": list(self._handlers)}},
+            {"$set": {"status": "running", "locked_by": self.worker_id, "locked_at": now}},
+            sort=[("due_at", ASCENDING)],
+            return_document=ReturnDocument.AFTER
+        )
+
+    async def _run_job(self, job: dict):
+        try:
+            await self._handlers[job["kind"]](job["payload"])
+            await self.collection.delete_one({"_id": job["_id"]})
+        except Exception as e:
+            logger.error(f"Job {job['_id']} ({job['kind']}) failed: {e}")
+            await self.collection.update_one(
+                {"_id": job["_id"]},
+                {"$set": {"status": "failed", "error": str(e)[:500], "finished_at": datetime.now(timezone.utc)}}
+            )
+
+    async def _drain(self):
+        """Claim and run every due job, a batch at a time"""
+        while True:
+            now = datetime.now(timezone.utc)
+            batch = []
+            for _ in range(self.batch_size):
+                job = await self._claim(now)
+                if not job:
+                    break
+                batch.append(job)
+
+            if batch:
+                await asyncio.gather(*(self._run_job(job) for job in batch))
+            if len(batch) < self.batch_size:
+                return
+
+    async def _expire_stale(self):
+        now = datetime.now(timezone.utc)
+        result = await self.collection.update_many(
+            {"status": "running", "locked_at": {"$lt": now - timedelta(seconds=self.lease)}},
+            {"$set": {"status": "abandoned", "finished_at": now}}
+        )
+        if result.modified_count:
+            logger.warning(f"Job queue: marked {result.modified_count} interrupted jobs as abandoned")
+
+    async def _run(self):
+        await self.bot.wait_until_ready()
+        try:
+            await self.ensure_indexes()
+            await self._expire_stale()
+        except Exception as e:
+            logger.warning(f"Job queue: startup maintenance failed: {e}")
+
+        while not self.bot.is_closed():
+            self._wakeup.clear()
+            timeout = self.poll_interval
+            try:
+                await self._drain()
+
+                # Sleep until the next job is due, polling at least every poll_interval
+                upcoming = await self.collection.find_one(
+                    {"status": "pending", "kind": {"$in": list(self._handlers)}},
+                    {"due_at": 1},
+                    sort=[("due_at", ASCENDING)]
+                )
+                if upcoming:
+                    due_at = upcoming["due_at"]
+                    if due_at.tzinfo is None:
+                        due_at = due_at.replace(tzinfo=timezone.utc)
+                    self._next_wake = due_at
+                    timeout = min(self.poll_interval, max(0, (due_at - datetime.now(timezone.utc)).total_seconds()))
+                else:
+                    self._next_wake = None
+            except Exception as e:
+                logger.error(f"Job queue error: {e}")
+
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
@@ -0,0 +1,228 @@
+# bot_core/leaderboard.py
+# In-memory top-K leaderboards kept current from the write paths
+
+import asyncio
+import logging
+from bisect import bisect_left, insort
+from typing import Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger('CookieBot')
+
+def _get_path(document: dict, path: str):
+    value = document
+    for part in path.split("."):
+        if not isinstance(value, dict):
+            return 0
+        value = value.get(part, 0)
+    return value if isinstance(value, (int, float)) else 0
+
+class Leaderboard:
+    """Exact top-K ranking of one numeric user field.
+
+    Every user not tracked is known to score at most `floor`, so the tracked
+    entries are always the true top of the board. A tracked user whose score
+    falls below the floor or to zero, or who is removed, is dropped, which can
+    leave fewer than k entries until the next reconcile refills the list from
+    Mongo.
+    """
+
+    def __init__(self, name: str, field: str, k: int = 100, slack: int = 50):
+        self.name = name
+        self.field = field
+        self.k = k
+        self.capacity = k + slack
+        self._entries: List[Tuple[float, int]] = []  # (-score, user_id), best first
+        self._scores: Dict[int, float] = {}
+        self.floor = float("-inf")
+        self.loaded = False
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def short(self) -> bool:
+        """True when fewer than k users are tracked but more may exist"""
+        return len(self._entries) < self.k and self.floor > 0
+
+    def load(self, ranked: Iterable[Tuple[int, float]]):
+        """Replace the board with (user_id, score) pairs sorted best first"""
+        self._entries = []
+        self._scores = {}
+        for user_id, score in ranked:
+            self._scores[user_id] = score
+            self._entries.append((-score, user_id))
+        self._entries.sort()
+        # A full page from Mongo means the rest score at most the last entry
+        self.floor = -self._entries[-1][0] if len(self._entries) >= self.capacity else 0
+        self.loaded = True
+
+    def update(self, user_id: int, score: float):
+        if not self.loaded:
+            return
+        old = self._scores.get(user_id)
+        if old == score:
+            return
+        self.remove(user_id)
+
+        # Like reconcile, nothing at or below zero is ranked
+        if score > 0 and (score > self.floor or (old is not None and score == self.floor)):
+            insort(self._entries, (-score, user_id))
+            self._scores[user_id] = score
+            if len(self._entries) > self.capacity:
+                dropped_score, dropped = self._entries.pop()
+                del self._scores[dropped]
+                self.floor = max(self.floor, -dropped_score)
+
+    def remove(self, user_id: int):
+        old = self._scores.pop(user_id, None)
+        if old is not None:
+            del self._entries[bisect_left(self._entries, (-old, user_id))]
+
+    def top(self, offset: int = 0, limit: int = 10) -> List[Tuple[int, float]]:
+        end = min(offset + limit, self.k)
+        return [(user_id, -score) for score, user_id in self._entries[offset:end]]
+
+    def score(self, user_id: int) -> Optional[float]:
+        return self._scores.get(user_id)
+
+    def tracked_rank(self, user_id: int) -> Optional[int]:
+        score = self._scores.get(user_id)
+        if score is None:
+            return None
+        return bisect_left(self._entries, (-score, user_id)) + 1
+
+class LeaderboardService:
+    """Points, invite, claim and game winnings leaderboards for every user.
+
+    Write paths call touch(user_id) after changing a ranked field; touched users
+    are re-read together in one query every flush_interval seconds and their new
+    scores applied to every board. Each board is reloaded from Mongo every
+    reconcile_interval seconds, or sooner when it has run short. Rank lookups
+    for users outside the top K are one count on the field's index.
+    """
+
+    fields = {
+        "points": "points",
+        "invites": "verified_invites",
+        "claims": "total_claims",
+        "slots": "game_stats.slots.profit",
+        "rob": "game_stats.rob.profit",
+        "bet": "game_stats.bet.profit",
+    }
+
+    def __init__(self, bot, k: int = 100, flush_interval: float = 2.0, reconcile_interval: float = 600.0):
+        self.bot = bot
+        self.flush_interval = flush_interval
+        self.reconcile_interval = reconcile_interval
+        self.boards: Dict[str, Leaderboard] = {name: Leaderboard(name, field, k) for name, field in self.fields.items()}
+        self._touched = set()
+        self._task = None
+
+    @property
+    def users(self):
+        return self.bot.db.users
+
+    def touch(self, *user_ids: int):
+        self._touched.update(user_ids)
+
+    def observe(self, user: dict):
+        """Apply a user document that is already known to be current"""
+        if not user or "user_id" not in user:
+            return
+        for board in self.boards.values():
+            board.update(user["user_id"], _get_path(user, board.field))
+        self._touched.discard(user["user_id"])
+
+    async def ensure_indexes(self):
+        for board in self.boards.values():
+            await self.users.create_index([(board.field, -1)])
+
+    async def reconcile(self, board: Leaderboard):
+        cursor = self.users.find(
+            {board.field: {"$gt": 0}, "blacklisted": {"$ne": True}},
+            {"user_id": 1, board.field: 1}
+        ).sort(board.field, -1).limit(board.capacity)
+        board.load([(user["user_id"], _get_path(user, board.field)) async for user in cursor])
+
+    async def flush(self):
+        if not self._touched:
+            return
+        touched, self._touched = list(self._touched), set()
+        projection = {"user_id": 1, "blacklisted": 1, **{board.field: 1 for board in self.boards.values()}}
+        found = set()
+        async for user in self.users.find({"user_id": {"$in": touched}}, projection):
+            found.add(user["user_id"])
+            if user.get("blacklisted"):
+                for board in self.boards.values():
+                    board.remove(user["user_id"])
+            else:
+                self.observe(user)
+        # Deleted users drop off every board
+        for user_id in set(touched) - found:
+            for board in self.boards.values():
+                board.remove(user_id)
+
+    async def top(self, name: str, offset: int = 0, limit: int = 10) -> List[Tuple[int, float]]:
+        board = self.boards[name]
+        if not board.loaded:
+            await self.reconcile(board)
+        return board.top(offset, limit)
+
+    async def size(self, name: str) -> int:
+        board = self.boards[name]
+        if not board.loaded:
+            await self.reconcile(board)
+        return min(len(board), board.k)
+
+    async def rank(self, name: str, user_id: int) -> Tuple[Optional[int], float]:
+        """(rank, score) of a user; rank is None for users with nothing on the board"""
+        board = self.boards[name]
+        if not board.loaded:
+            await self.reconcile(board)
+        rank = board.tracked_rank(user_id)
+        if rank is not None:
+            return rank, board.score(user_id)
+
+        user = await self.users.find_one({"user_id": user_id}, {board.field: 1, "blacklisted": 1})
+        score = _get_path(user or {}, board.field)
+        if score <= 0 or (user and user.get("blacklisted")):
+            return None, score
+        ahead = await self.users.count_documents({board.field: {"$gt": score}, "blacklisted": {"$ne": True}})
+        return ahead + 1, score
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        try:
+            await self.ensure_indexes()
+        except Exception as e:
+            logger.warning(f"Leaderboards: could not create indexes: {e}")
+
+        loop = asyncio.get_running_loop()
+        next_reconcile = 0.0
+        while True:
+            try:
+                if loop.time() >= next_reconcile:
+                    # Touches made while reloading are applied by the flush that follows
+                    for board in self.boards.values():
+                        await self.reconcile(board)
+                    next_reconcile = loop.time() + self.reconcile_interval
+                else:
+                    for board in self.boards.values():
+                        if board.short:
+                            await self.reconcile(board)
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Leaderboard refresh failed: {e}")
+            await asyncio.sleep(self.flush_interval)
@@ -1,5 +1,8 @@
 # bot_core/logger.py
 import logging
+import logging.handlers
+import atexit
+import queue
 import sys
 import discord
 import aiohttp
@@ -116,9 +119,17 @@ def setup_logging():
     file_handler.addFilter(SSLFilter())
     webhook_handler.addFilter(SSLFilter())
     
+    # File writes happen on a listener thread so a slow disk can't block the event loop
+    log_queue = queue.SimpleQueue()
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    queue_handler.setLevel(logging.WARNING)
+    listener = logging.handlers.QueueListener(log_queue, file_handler, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+    
     logging.basicConfig(
         level=logging.WARNING,
-        handlers=[file_handler, webhook_handler],
+        handlers=[queue_handler, webhook_handler],
         format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
     )
     
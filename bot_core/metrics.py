@@ -0,0 +1,433 @@
+# bot_core/metrics.py
+# In-process metrics with a Prometheus /metrics endpoint
+
+import re
+import time
+import asyncio
+import logging
+import functools
+import threading
+from bisect import bisect_left
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import aiohttp
+from aiohttp import web
+from discord.ext import tasks
+from pymongo import monitoring
+
+logger = logging.getLogger('CookieBot')
+
+def _log_linear_bounds(low: float, high: float, steps: int) -> List[float]:
+    """Bucket bounds with `steps` linear steps per power of two, like an HDR histogram"""
+    bounds = []
+    base = low
+    while base < high:
+        for step in range(steps):
+            bounds.append(round(base * (1 + step / steps), 9))
+        base *= 2
+    bounds.append(round(base, 9))
+    return bounds
+
+# 100µs to ~2 minutes with 4 buckets per doubling, about 12% relative error
+DEFAULT_BOUNDS = _log_linear_bounds(0.0001, 100.0, 4)
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(names: Sequence[str], values: Sequence, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(labels)
+        self._series: Dict[tuple, object] = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values):
+        key = tuple(str(v) for v in values)
+        series = self._series.get(key)
+        if series is None:
+            with self._lock:
+                series = self._series.setdefault(key, self._new_series())
+        return series
+
+    def _new_series(self):
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            items = sorted(self._series.items())
+        for key, series in items:
+            lines.extend(self._render_series(key, series))
+        return lines
+
+class _Value:
+    __slots__ = ("value", "_lock")
+
+    def __init__(self, lock):
+        self.value = 0.0
+        self._lock = lock
+
+    def inc(self, amount: float = 1):
+        with self._lock:
+            self.value += amount
+
+    def set(self, value: float):
+        self.value = value
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new_series(self):
+        return _Value(self._lock)
+
+    def inc(self, amount: float = 1):
+        self.labels().inc(amount)
+
+    def _render_series(self, key, series):
+        return [f"{self.name}{_format_labels(self.label_names, key)} {_format_value(series.value)}"]
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, value: float):
+        self.labels().set(value)
+
+    def clear(self):
+        with self._lock:
+            self._series.clear()
+
+class _Buckets:
+    __slots__ = ("bounds", "counts", "sum", "count", "_lock")
+
+    def __init__(self, bounds, lock):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self._lock = lock
+
+    def observe(self, value: float):
+        index = bisect_left(self.bounds, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+            self.count += 1
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Upper bound of the bucket holding the q-th observation"""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank and count:
+                return self.bounds[index] if index < len(self.bounds) else float("inf")
+        return float("inf")
+
+class Histogram(_Metric):
+    """Fixed log-linear buckets: observe() is a bisect and an increment, and
+    the relative error stays the same from sub-millisecond to minutes"""
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = (), bounds: Sequence[float] = DEFAULT_BOUNDS):
+        super().__init__(name, help, labels)
+        self.bounds = list(bounds)
+
+    def _new_series(self):
+        return _Buckets(self.bounds, self._lock)
+
+    def observe(self, value: float):
+        self.labels().observe(value)
+
+    def _render_series(self, key, series):
+        lines = []
+        cumulative = 0
+        for bound, count in zip(series.bounds, series.counts):
+            cumulative += count
+            # Empty leading buckets add nothing for Prometheus; skip them to keep scrapes small
+            if cumulative:
+                le = 'le="%s"' % bound
+                lines.append(f"{self.name}_bucket{_format_labels(self.label_names, key, le)} {cumulative}")
+        le = 'le="+Inf"'
+        lines.append(f"{self.name}_bucket{_format_labels(self.label_names, key, le)} {series.count}")
+        lines.append(f"{self.name}_sum{_format_labels(self.label_names, key)} {repr(series.sum)}")
+        lines.append(f"{self.name}_count{_format_labels(self.label_names, key)} {series.count}")
+        return lines
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Callable[[], None]] = []
+
+    def _register(self, metric):
+        existing = self._metrics.get(metric.name)
+        if existing:
+            return existing
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help: str, labels: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, help, labels))
+
+    def gauge(self, name: str, help: str, labels: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, help, labels))
+
+    def histogram(self, name: str, help: str, labels: Sequence[str] = (), bounds: Sequence[float] = DEFAULT_BOUNDS) -> Histogram:
+        return self._register(Histogram(name, help, labels, bounds))
+
+    def collector(self, callback: Callable[[], None]):
+        """Run callback before every scrape, to refresh gauges that are read rather than pushed"""
+        self._collectors.append(callback)
+
+    def render(self) -> str:
+        for callback in self._collectors:
+            try:
+                callback()
+            except Exception as e:
+                logger.warning(f"Metrics collector failed: {e}")
+        lines = []
+        for metric in self._metrics.values():
+            if metric._series:
+                lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    """Latency of every Mongo command by collection and operation.
+
+    pymongo calls listeners from the driver's threads, so this only does a
+    dict operation and a histogram increment per command.
+    """
+
+    def __init__(self, registry: MetricsRegistry):
+        self.latency = registry.histogram(
+            "cookiebot_mongo_command_seconds", "MongoDB command latency", ["collection", "operation"]
+        )
+        self.failures = registry.counter(
+            "cookiebot_mongo_command_failures_total", "MongoDB commands that failed", ["collection", "operation"]
+        )
+        self._pending: Dict[Tuple, str] = {}
+
+    @staticmethod
+    def _collection(event) -> str:
+        if event.command_name == "getMore":
+            return event.command.get("collection", "-")
+        target = event.command.get(event.command_name)
+        return target if isinstance(target, str) else "-"
+
+    def started(self, event):
+        self._pending[(event.connection_id, event.request_id)] = self._collection(event)
+
+    def succeeded(self, event):
+        collection = self._pending.pop((event.connection_id, event.request_id), "-")
+        self.latency.labels(collection, event.command_name).observe(event.duration_micros / 1e6)
+
+    def failed(self, event):
+        collection = self._pending.pop((event.connection_id, event.request_id), "-")
+        self.latency.labels(collection, event.command_name).observe(event.duration_micros / 1e6)
+        self.failures.labels(collection, event.command_name).inc()
+
+class MongoPoolMetrics(monitoring.ConnectionPoolListener):
+    """Time spent waiting for a pooled connection, and checkouts that timed out.
+
+    A checkout runs start to finish on one driver thread, so the start time
+    is kept in a thread-local.
+    """
+
+    def __init__(self, registry: MetricsRegistry):
+        self.wait = registry.histogram(
+            "cookiebot_mongo_pool_wait_seconds", "Time waiting to check a connection out of the pool"
+        ).labels()
+        self.checkout_failures = registry.counter(
+            "cookiebot_mongo_pool_checkout_failures_total", "Connection checkouts that failed", ["reason"]
+        )
+        self.connections = registry.gauge("cookiebot_mongo_pool_connections", "Open pooled connections").labels()
+        self.in_use = registry.gauge("cookiebot_mongo_pool_in_use", "Connections checked out").labels()
+        self._local = threading.local()
+        self._last_warning = 0.0
+
+    def connection_check_out_started(self, event):
+        self._local.started = time.perf_counter()
+
+    def connection_checked_out(self, event):
+        started = getattr(self._local, "started", None)
+        if started is not None:
+            self.wait.observe(time.perf_counter() - started)
+            self._local.started = None
+        self.in_use.inc()
+
+    def connection_check_out_failed(self, event):
+        self._local.started = None
+        self.checkout_failures.labels(event.reason).inc()
+        if event.reason == "timeout" and time.monotonic() - self._last_warning > 60:
+            self._last_warning = time.monotonic()
+            logger.warning("Mongo pool wait queue timed out; consider raising MONGO_MAX_POOL_SIZE "
+                           "(see setup/benchmark_mongo_pool.py)")
+
+    def connection_checked_in(self, event):
+        self.in_use.inc(-1)
+
+    def connection_created(self, event):
+        self.connections.inc()
+
+    def connection_closed(self, event):
+        self.connections.inc(-1)
+
+    def connection_ready(self, event):
+        pass
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+_SNOWFLAKE = re.compile(r"^\d{15,21}$")
+
+def discord_route(path: str) -> str:
+    """Collapse IDs, tokens and emoji out of a REST path so routes group together"""
+    parts = path.split("/")
+    if len(parts) > 2 and parts[1] == "api" and parts[2].startswith("v"):
+        parts = [""] + parts[3:]
+    for index, part in enumerate(parts):
+        if _SNOWFLAKE.match(part):
+            parts[index] = "{id}"
+        elif index and parts[index - 1] == "reactions":
+            parts[index] = "{emoji}"
+        elif len(part) >= 32:
+            parts[index] = "{token}"
+    return "/".join(parts)
+
+class BotMetrics:
+    """The bot's metrics registry and the hooks that feed it.
+
+    Mongo latency comes from a pymongo CommandListener and pool wait times
+    from a ConnectionPoolListener, REST latency from an
+    aiohttp trace on discord.py's HTTP session, and every tasks.loop on the
+    bot and its cogs is timed by wrapping the loop's coroutine. The registry
+    is served in Prometheus text format on a local port.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: Optional[int] = 9108):
+        self.host = host
+        self.port = port
+        self.registry = MetricsRegistry()
+        self.mongo_listener = MongoCommandMetrics(self.registry)
+        self.pool_listener = MongoPoolMetrics(self.registry)
+        self.commands = self.registry.histogram(
+            "cookiebot_command_seconds", "Time from invocation to command completion", ["command", "kind", "outcome"]
+        )
+        self.rest = self.registry.histogram(
+            "cookiebot_discord_rest_seconds", "Discord REST request latency", ["method", "route"]
+        )
+        self.rest_responses = self.registry.counter(
+            "cookiebot_discord_rest_responses_total", "Discord REST responses by status", ["method", "route", "status"]
+        )
+        self.loops = self.registry.histogram(
+            "cookiebot_task_loop_seconds", "Duration of one tasks.loop iteration", ["loop"]
+        )
+        self.loop_failures = self.registry.counter(
+            "cookiebot_task_loop_failures_total", "tasks.loop iterations that raised", ["loop"]
+        )
+        self._runner = None
+
+    def command_finished(self, command: str, kind: str, started_at, outcome: str = "ok"):
+        """Record a command from its Discord timestamp (interaction or message creation)"""
+        elapsed = time.time() - started_at.timestamp()
+        self.commands.labels(command, kind, outcome).observe(max(elapsed, 0.0))
+
+    def discord_trace(self) -> aiohttp.TraceConfig:
+        trace = aiohttp.TraceConfig()
+
+        async def on_request_start(session, context, params):
+            context.started = time.perf_counter()
+
+        async def on_request_end(session, context, params):
+            route = discord_route(params.url.path)
+            self.rest.labels(params.method, route).observe(time.perf_counter() - context.started)
+            self.rest_responses.labels(params.method, route, params.response.status).inc()
+
+        async def on_request_exception(session, context, params):
+            route = discord_route(params.url.path)
+            self.rest.labels(params.method, route).observe(time.perf_counter() - context.started)
+            self.rest_responses.labels(params.method, route, type(params.exception).__name__).inc()
+
+        trace.on_request_start.append(on_request_start)
+        trace.on_request_end.append(on_request_end)
+        trace.on_request_exception.append(on_request_exception)
+        return trace
+
+    def instrument_loops(self, owner, prefix: Optional[str] = None):
+        """Time every tasks.loop defined on owner's class"""
+        prefix = prefix or type(owner).__name__
+        for name in dir(type(owner)):
+            if not isinstance(getattr(type(owner), name, None), tasks.Loop):
+                continue
+            loop = getattr(owner, name)
+            if getattr(loop.coro, "__metrics_timed__", False):
+                continue
+            loop.coro = self._timed(loop.coro, f"{prefix}.{name}")
+
+    def _timed(self, coro, label: str):
+        duration = self.loops.labels(label)
+        failures = self.loop_failures.labels(label)
+
+        @functools.wraps(coro)
+        async def timed(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return await coro(*args, **kwargs)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                failures.inc()
+                raise
+            finally:
+                duration.observe(time.perf_counter() - started)
+
+        timed.__metrics_timed__ = True
+        return timed
+
+    async def _handle(self, request):
+        return web.Response(body=self.registry.render().encode(),
+                            headers={"Content-Type": "text/plain; version=0.0.4; charset=utf-8"})
+
+    async def start(self):
+        if not self.port:
+            return
+        app = web.Application()
+        app.router.add_get("/metrics", self._handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        try:
+            await web.TCPSite(self._runner, self.host, self.port).start()
+            logger.info(f"Metrics on http://{self.host}:{self.port}/metrics")
+        except OSError as e:
+            logger.warning(f"Metrics: could not listen on {self.host}:{self.port}: {e}")
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def stop(self):
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
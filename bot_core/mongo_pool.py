@@ -0,0 +1,74 @@
+# bot_core/mongo_pool.py
+# Mongo connection pool settings by profile, with per-setting environment overrides
+
+import os
+import sys
+import logging
+from typing import Optional
+
+logger = logging.getLogger('CookieBot')
+
+# Environment variable for each pool option
+ENV_OVERRIDES = {
+    "maxPoolSize": "MONGO_MAX_POOL_SIZE",
+    "minPoolSize": "MONGO_MIN_POOL_SIZE",
+    "maxIdleTimeMS": "MONGO_MAX_IDLE_TIME_MS",
+    "waitQueueTimeoutMS": "MONGO_WAIT_QUEUE_TIMEOUT_MS",
+    "maxConnecting": "MONGO_MAX_CONNECTING"
+}
+
+class PoolProfile:
+    """Connection pool options for the motor client.
+
+    Every interaction needs a pooled connection for each query it makes. When
+    a burst outnumbers maxPoolSize, the extra operations wait in the queue
+    and fail after waitQueueTimeoutMS. The windows profile keeps the small
+    pool that was needed for stability there. Elsewhere the pool can be
+    sized to the bot's concurrency; use setup/benchmark_mongo_pool.py to
+    pick the numbers.
+    """
+
+    def __init__(self, name: str, maxPoolSize: int, minPoolSize: int, maxIdleTimeMS: int,
+                 waitQueueTimeoutMS: int, maxConnecting: int):
+        self.name = name
+        self.options = {
+            "maxPoolSize": maxPoolSize,
+            "minPoolSize": minPoolSize,
+            "maxIdleTimeMS": maxIdleTimeMS,
+            "waitQueueTimeoutMS": waitQueueTimeoutMS,
+            "maxConnecting": maxConnecting
+        }
+
+    @classmethod
+    def get(cls, name: Optional[str] = None) -> "PoolProfile":
+        """The named profile, MONGO_POOL_PROFILE, or the platform default, with env overrides applied"""
+        name = (name or os.getenv("MONGO_POOL_PROFILE") or ("windows" if sys.platform == "win32" else "default")).lower()
+        if name not in PROFILES:
+            raise ValueError(f"Unknown Mongo pool profile {name!r}; expected one of {', '.join(PROFILES)}")
+        base = PROFILES[name]
+        profile = cls(name, **base.options)
+        for option, variable in ENV_OVERRIDES.items():
+            value = os.getenv(variable)
+            if value:
+                profile.options[option] = int(value)
+        if profile.options["minPoolSize"] > profile.options["maxPoolSize"]:
+            profile.options["minPoolSize"] = profile.options["maxPoolSize"]
+        return profile
+
+    def client_options(self) -> dict:
+        """Pool keyword arguments for AsyncIOMotorClient"""
+        return dict(self.options)
+
+    def describe(self) -> str:
+        o = self.options
+        return (f"{self.name} (pool {o['minPoolSize']}-{o['maxPoolSize']}, "
+                f"wait {o['waitQueueTimeoutMS']}ms, idle {o['maxIdleTimeMS']}ms, connecting {o['maxConnecting']})")
+
+PROFILES = {
+    "windows": PoolProfile("windows", maxPoolSize=5, minPoolSize=1, maxIdleTimeMS=10000,
+                           waitQueueTimeoutMS=2500, maxConnecting=2),
+    "default": PoolProfile("default", maxPoolSize=50, minPoolSize=5, maxIdleTimeMS=60000,
+                           waitQueueTimeoutMS=10000, maxConnecting=4),
+    "burst": PoolProfile("burst", maxPoolSize=100, minPoolSize=10, maxIdleTimeMS=300000,
+                         waitQueueTimeoutMS=15000, maxConnecting=8)
+}
@@ -0,0 +1,148 @@
+# bot_core/rollups.py
+# Minute/hour/day event counts for analytics, queryable over any time window
+
+import logging
+from collections import Counter
+from datetime import datetime, timezone, timedelta
+from typing import Dict, Optional, Tuple
+from pymongo import ASCENDING, InsertOne, UpdateOne
+from pymongo.errors import CollectionInvalid, OperationFailure
+
+logger = logging.getLogger('CookieBot')
+
+class RollupStore:
+    """Event counts bucketed at minute, hour and day resolution.
+
+    Every event is counted in all three resolutions at once; minute buckets are
+    kept for two days and hour buckets for ninety, while day buckets are kept
+    forever, so old data is compacted down to the coarser levels. Each
+    resolution is a Mongo time-series collection where the server supports it,
+    otherwise a plain collection of upserted counters with a TTL index.
+    Documents look like {ts, meta: {kind, name}, count}.
+    """
+
+    resolutions = {
+        "minute": (timedelta(minutes=1), timedelta(days=2)),
+        "hour": (timedelta(hours=1), timedelta(days=90)),
+        "day": (timedelta(days=1), None),
+    }
+
+    def __init__(self, db, prefix: str = "analytics_rollup"):
+        self.db = db
+        self.prefix = prefix
+        self._pending: Counter = Counter()
+        self._timeseries: Dict[str, bool] = {}
+
+    def collection(self, resolution: str):
+        return self.db[f"{self.prefix}_{resolution}"]
+
+    async def ensure_collections(self):
+        existing = {
+            info["name"]: info.get("type")
+            async for info in await self.db.list_collections(filter={"name": {"$regex": f"^{self.prefix}_"}})
+        }
+        for resolution, (size, retention) in self.resolutions.items():
+            name = f"{self.prefix}_{resolution}"
+            if name not in existing:
+                options = {"timeseries": {"timeField": "ts", "metaField": "meta",
+                                          "granularity": "minutes" if resolution == "minute" else "hours"}}
+                if retention:
+                    options["expireAfterSeconds"] = int(retention.total_seconds())
+                try:
+                    await self.db.create_collection(name, **options)
+                    existing[name] = "timeseries"
+                except CollectionInvalid:
+                    existing[name] = None
+                except OperationFailure as e:
+                    logger.info(f"Rollups: time-series collections unavailable ({e}), using {name} as a plain collection")
+                    existing[name] = "collection"
+
+            self._timeseries[resolution] = existing[name] == "timeseries"
+            collection = self.collection(resolution)
+            await collection.create_index([("meta.kind", ASCENDING), ("ts", ASCENDING)])
+            if not self._timeseries[resolution] and retention:
+                await collection.create_index("ts", expireAfterSeconds=int(retention.total_seconds()))
+
+    @staticmethod
+    def floor(when: datetime, size: timedelta) -> datetime:
+        seconds = int(size.total_seconds())
+        timestamp = int(when.timestamp())
+        return datetime.fromtimestamp(timestamp - timestamp % seconds, timezone.utc)
+
+    def record(self, kind: str, name: str, count: int = 1, when: Optional[datetime] = None):
+        when = when or datetime.now(timezone.utc)
+        for resolution, (size, _) in self.resolutions.items():
+            self._pending[(resolution, kind, name, self.floor(when, size))] += count
+
+    def take_pending(self) -> Counter:
+        pending, self._pending = self._pending, Counter()
+        return pending
+
+    async def write(self, pending: Counter):
+        """Write counts with one unordered bulk_write per resolution"""
+        operations = {}
+        for (resolution, kind, name, ts), count in pending.items():
+            meta = {"kind": kind, "name": name}
+            if self._timeseries.get(resolution):
+                operation = InsertOne({"ts": ts, "meta": meta, "count": count})
+            else:
+                operation = UpdateOne(
+                    {"_id": f"{kind}:{name}:{ts:%Y%m%d%H%M}"},
+                    {"$inc": {"count": count}, "$setOnInsert": {"ts": ts, "meta": meta}},
+                    upsert=True
+                )
+            operations.setdefault(resolution, []).append(operation)
+
+        for resolution, batch in operations.items():
+            await self.collection(resolution).bulk_write(batch, ordered=False)
+
+    async def flush(self):
+        pending = self.take_pending()
+        if not pending:
+            return
+        try:
+            await self.write(pending)
+        except Exception as e:
+            # Keep the counts for the next flush rather than losing them
+            self._pending.update(pending)
+            logger.error(f"Rollup flush failed: {e}")
+
+    def _resolution_for(self, start: datetime) -> str:
+        age = datetime.now(timezone.utc) - start
+        for resolution, (size, retention) in self.resolutions.items():
+            if retention is None or age < retention - size:
+                return resolution
+        return "day"
+
+    async def totals(self, kind: str, start: datetime, end: Optional[datetime] = None,
+                     split: Optional[datetime] = None) -> Dict[str, Tuple[int, int]]:
+        """Counts per name between start and end in one aggregation.
+
+        With split, each name maps to (count before split, count from split on),
+        which lets a window be compared to the one before it; otherwise the
+        first value is always 0.
+        """
+        end = end or datetime.now(timezone.utc)
+        resolution = self._resolution_for(start)
+        size = self.resolutions[resolution][0]
+        split = split or start
+        pipeline = [
+            {"$match": {"meta.kind": kind, "ts": {"$gte": self.floor(start, size), "$lt": end}}},
+            {"$group": {
+                "_id": "$meta.name",
+                "before": {"$sum": {"$cond": [{"$lt": ["$ts", self.floor(split, size)]}, "$count", 0]}},
+                "after": {"$sum": {"$cond": [{"$lt": ["$ts", self.floor(split, size)]}, 0, "$count"]}}
+            }}
+        ]
+        results = await self.collection(resolution).aggregate(pipeline).to_list(None)
+
+        counts = {r["_id"]: (r["before"], r["after"]) for r in results}
+        # Counts not flushed yet
+        for (pending_resolution, pending_kind, name, ts), count in self._pending.items():
+            if pending_resolution == resolution and pending_kind == kind and self.floor(start, size) <= ts < end:
+                before, after = counts.get(name, (0, 0))
+                counts[name] = (before + count, after) if ts < self.floor(split, size) else (before, after + count)
+        return counts
+
+    async def window(self, kind: str, start: datetime, end: Optional[datetime] = None) -> Dict[str, int]:
+        return {name: after for name, (_, after) in (await self.totals(kind, start, end)).items()}
@@ -0,0 +1,101 @@
+# bot_core/scheduler.py
+# In-process deadline scheduler: one timer for any number of keyed jobs
+
+import time
+import heapq
+import asyncio
+import logging
+import itertools
+from datetime import datetime
+from typing import Any, Callable, Dict, Hashable, Optional
+
+logger = logging.getLogger('CookieBot')
+
+class DeadlineScheduler:
+    """Run callbacks at given times using a heap and a single sleeping task.
+
+    Jobs are keyed, so scheduling a key again replaces its previous job. Each job
+    runs as its own task, so a slow callback never delays the ones after it.
+    Jobs live in memory only; owners persist whatever they need to reschedule
+    after a restart.
+    """
+
+    def __init__(self):
+        self._heap = []
+        self._jobs: Dict[Hashable, tuple] = {}
+        self._seq = itertools.count()
+        self._wakeup = None
+        self._task = None
+        self._running = set()
+
+    def schedule(self, key: Hashable, when: datetime, callback: Callable, *args: Any):
+        due = when.timestamp()
+        seq = next(self._seq)
+        self._jobs[key] = (due, seq, callback, args)
+        heapq.heappush(self._heap, (due, seq, key))
+
+        # Replaced and cancelled jobs stay in the heap until popped; compact when they pile up
+        if len(self._heap) > 2 * len(self._jobs) + 64:
+            self._heap = [(job[0], job[1], k) for k, job in self._jobs.items()]
+            heapq.heapify(self._heap)
+
+        if self._wakeup and self._heap[0][1] == seq:
+            self._wakeup.set()
+
+    def cancel(self, key: Hashable):
+        self._jobs.pop(key, None)
+
+    def due(self, key: Hashable) -> Optional[float]:
+        job = self._jobs.get(key)
+        return job[0] if job else None
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._jobs
+
+    def __len__(self) -> int:
+        return len(self._jobs)
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        for task in list(self._running):
+            task.cancel()
+
+    async def _run(self):
+        while True:
+            self._wakeup.clear()
+            now = time.time()
+
+            while self._heap and self._heap[0][0] <= now:
+                due, seq, key = heapq.heappop(self._heap)
+                job = self._jobs.get(key)
+                if not job or job[1] != seq:
+                    continue
+                del self._jobs[key]
+                task = asyncio.create_task(self._fire(key, job[2], job[3]))
+                self._running.add(task)
+                task.add_done_callback(self._running.discard)
+
+            timeout = max(0, self._heap[0][0] - time.time()) if self._heap else None
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _fire(self, key: Hashable, callback: Callable, args: tuple):
+        try:
+            await callback(*args)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Scheduled job {key!r} failed: {e}")
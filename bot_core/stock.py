@@ -0,0 +1,230 @@
+# bot_core/stock.py
+# In-memory index of the cookie files in each stock directory
+
+import os
+import time
+import random
+import asyncio
+import logging
+from typing import Dict, List, Optional
+
+logger = logging.getLogger('CookieBot')
+
+class DirectoryStock:
+    """Files of one directory with O(1) count, random pick, add and remove"""
+
+    __slots__ = ("files", "positions", "mtime")
+
+    def __init__(self, files: List[str] = None, mtime: int = None):
+        self.files = list(files or [])
+        self.positions = {name: i for i, name in enumerate(self.files)}
+        self.mtime = mtime
+
+    def add(self, name: str):
+        if name not in self.positions:
+            self.positions[name] = len(self.files)
+            self.files.append(name)
+
+    def discard(self, name: str):
+        index = self.positions.pop(name, None)
+        if index is None:
+            return
+        # Swap with the last entry so removal stays O(1)
+        last = self.files.pop()
+        if index < len(self.files):
+            self.files[index] = last
+            self.positions[last] = index
+
+    def pick(self) -> Optional[str]:
+        if not self.files:
+            return None
+        return random.choice(self.files)
+
+class Reservation:
+    """A cookie file moved out of its stock directory until it is delivered or returned"""
+
+    __slots__ = ("directory", "name", "path", "done")
+
+    def __init__(self, directory: str, name: str, path: str):
+        self.directory = directory
+        self.name = name
+        self.path = path
+        self.done = False
+
+class StockIndex:
+    """Shared view of the stock directories, kept current by watching directory mtimes.
+
+    Adding or removing a file changes the mtime of its directory, so each poll is
+    one stat per directory; a directory is only rescanned when that changes.
+    """
+
+    claimed_dir = "claimed"
+    delivered_dir = "delivered"
+
+    def __init__(self, bot, poll_interval: float = 2.0, extension: str = ".txt", lease_timeout: int = 600):
+        self.bot = bot
+        self.poll_interval = poll_interval
+        self.extension = extension
+        self.lease_timeout = lease_timeout  # Reservations older than this are returned to stock
+        self._directories: Dict[str, DirectoryStock] = {}
+        self._watch_task = None
+
+    @staticmethod
+    def _key(directory: str) -> str:
+        return os.path.abspath(directory)
+
+    def _stat_mtime(self, directory: str) -> Optional[int]:
+        try:
+            return os.stat(directory).st_mtime_ns
+        except OSError:
+            return None
+
+    def _scan(self, directory: str) -> DirectoryStock:
+        # Read the mtime first so a change during the scan is picked up by the next poll
+        mtime = self._stat_mtime(directory)
+        if mtime is None:
+            return DirectoryStock(mtime=None)
+        try:
+            with os.scandir(directory) as entries:
+                files = [e.name for e in entries if e.name.endswith(self.extension) and e.is_file()]
+        except OSError as e:
+            logger.warning(f"Stock index: could not scan {directory}: {e}")
+            files = []
+        return DirectoryStock(files, mtime)
+
+    def _get(self, directory: str) -> DirectoryStock:
+        key = self._key(directory)
+        stock = self._directories.get(key)
+        if stock is None:
+            # First use of a directory scans it inline; warm() does this off the loop
+            stock = self._scan(key)
+            self._directories[key] = stock
+        return stock
+
+    def count(self, directory: str) -> int:
+        return len(self._get(directory).files)
+
+    def files(self, directory: str) -> List[str]:
+        return list(self._get(directory).files)
+
+    def pick(self, directory: str) -> Optional[str]:
+        """Return a random file name from the directory, or None when it is empty"""
+        return self._get(directory).pick()
+
+    def add(self, directory: str, name: str):
+        if name.endswith(self.extension):
+            self._get(directory).add(name)
+
+    def discard(self, directory: str, name: str):
+        self._get(directory).discard(name)
+
+    def forget(self, directory: str):
+        self._directories.pop(self._key(directory), None)
+
+    async def refresh(self, directory: str) -> int:
+        key = self._key(directory)
+        self._directories[key] = await asyncio.to_thread(self._scan, key)
+        return len(self._directories[key].files)
+
+    async def warm(self, directories):
+        """Index directories in a worker thread before they are first needed"""
+        for directory in set(d for d in directories if d):
+            await asyncio.to_thread(self._recover, self._key(directory))
+            if self._key(directory) not in self._directories:
+                await self.refresh(directory)
+
+    def _move(self, source: str, target_dir: str, name: str) -> Optional[str]:
+        os.makedirs(target_dir, exist_ok=True)
+        target = os.path.join(target_dir, name)
+        try:
+            os.rename(source, target)
+        except FileNotFoundError:
+            return None
+        return target
+
+    async def reserve(self, directory: str, attempts: int = 5) -> Optional[Reservation]:
+        """Take a random file out of stock so no other claim can receive it.
+
+        The file is renamed into the claimed/ folder of its directory. Rename is atomic,
+        so when several claims (or processes sharing the disk) pick the same file only
+        one of them wins and the others try another file.
+        """
+        key = self._key(directory)
+        stock = self._get(key)
+        claimed_dir = os.path.join(key, self.claimed_dir)
+
+        for _ in range(attempts):
+            name = stock.pick()
+            if name is None:
+                return None
+            # Drop it before the rename so concurrent claims in this process skip it
+            stock.discard(name)
+            path = await asyncio.to_thread(self._move, os.path.join(key, name), claimed_dir, name)
+            if path:
+                return Reservation(key, name, path)
+        return None
+
+    async def commit(self, reservation: Reservation):
+        """Mark a reserved file as delivered"""
+        if reservation.done:
+            return
+        reservation.done = True
+        try:
+            await asyncio.to_thread(
+                self._move, reservation.path,
+                os.path.join(reservation.directory, self.delivered_dir), reservation.name
+            )
+        except OSError as e:
+            logger.warning(f"Stock index: could not archive {reservation.path}: {e}")
+
+    async def release(self, reservation: Reservation):
+        """Put a reserved file back into stock after a failed delivery"""
+        if reservation.done:
+            return
+        reservation.done = True
+        try:
+            path = await asyncio.to_thread(self._move, reservation.path, reservation.directory, reservation.name)
+            if path:
+                self.add(reservation.directory, reservation.name)
+        except OSError as e:
+            logger.warning(f"Stock index: could not return {reservation.path}: {e}")
+
+    def _recover(self, directory: str):
+        """Return reservations abandoned by a crashed process to stock"""
+        claimed_dir = os.path.join(directory, self.claimed_dir)
+        if not os.path.isdir(claimed_dir):
+            return
+
+        # Renames update ctime, so it tells how long a file has been reserved
+        cutoff = time.time() - self.lease_timeout
+        with os.scandir(claimed_dir) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_file() and entry.stat().st_ctime < cutoff:
+                        os.rename(entry.path, os.path.join(directory, entry.name))
+                        logger.info(f"Stock index: returned abandoned reservation {entry.path}")
+                except OSError:
+                    continue
+
+    def start(self):
+        if self._watch_task is None or self._watch_task.done():
+            self._watch_task = asyncio.create_task(self._watch())
+
+    async def stop(self):
+        if self._watch_task:
+            self._watch_task.cancel()
+            try:
+                await self._watch_task
+            except asyncio.CancelledError:
+                pass
+            self._watch_task = None
+
+    async def _watch(self):
+        while not self.bot.is_closed():
+            await asyncio.sleep(self.poll_interval)
+            try:
+                for key, stock in list(self._directories.items()):
+                    if self._stat_mtime(key) != stock.mtime:
+                        self._directories[key] = await asyncio.to_thread(self._scan, key)
+            except Exception as e:
+                logger.warning(f"Stock index poll failed: {e}")
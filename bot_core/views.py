@@ -4,7 +4,6 @@
 
 import discord
 from datetime import datetime, timezone
-import psutil
 import platform
 
 class BotControlView(discord.ui.View):
@@ -24,18 +23,16 @@ class BotControlView(discord.ui.View):
         
     @discord.ui.button(label="System Status", style=discord.ButtonStyle.primary, emoji="📊")
     async def system_status(self, interaction: discord.Interaction, button: discord.ui.Button):
-        cpu_percent = psutil.cpu_percent(interval=1)
-        memory = psutil.virtual_memory()
-        disk = psutil.disk_usage('/')
+        system = self.bot.system.snapshot()
         
         embed = discord.Embed(
             title="🖥️ System Status",
             color=discord.Color.blue(),
             timestamp=datetime.now(timezone.utc)
         )
-        embed.add_field(name="CPU Usage", value=f"{cpu_percent}%", inline=True)
-        embed.add_field(name="RAM Usage", value=f"{memory.percent}%", inline=True)
-        embed.add_field(name="Disk Usage", value=f"{disk.percent}%", inline=True)
+        embed.add_field(name="CPU Usage", value=f"{system['cpu_percent']}%", inline=True)
+        embed.add_field(name="RAM Usage", value=f"{system['memory_percent']}%", inline=True)
+        embed.add_field(name="Disk Usage", value=f"{system['disk_percent']}%", inline=True)
         embed.add_field(name="Python Version", value=platform.python_version(), inline=True)
         embed.add_field(name="Discord.py", value=discord.__version__, inline=True)
         embed.add_field(name="Platform", value=platform.system(), inline=True)
@@ -92,14 +89,15 @@ class BotControlView(discord.ui.View):
         return " ".join(parts)
     
     def create_status_embed(self):
-        status_emoji = "🟢" if self.bot.ws else "🔴"
+        online = not self.bot.is_closed()
+        status_emoji = "🟢" if online else "🔴"
         embed = discord.Embed(
             title=f"{status_emoji} Cookie Bot Status",
             description="Bot is fully operational and ready to serve cookies!",
-            color=discord.Color.green() if self.bot.ws else discord.Color.red(),
+            color=discord.Color.green() if online else discord.Color.red(),
             timestamp=datetime.now(timezone.utc)
         )
-        embed.add_field(name="Status", value="Online" if self.bot.ws else "Offline", inline=True)
+        embed.add_field(name="Status", value="Online" if online else "Offline", inline=True)
         embed.add_field(name="Uptime", value=self.get_uptime(), inline=True)
         embed.add_field(name="Version", value="v2.0.0", inline=True)
         embed.set_footer(text="Cookie Bot Premium", icon_url=self.bot.user.avatar.url if self.bot.user else None)
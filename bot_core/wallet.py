@@ -0,0 +1,353 @@
+# bot_core/wallet.py
+# Atomic balance changes for points and trust score
+
+import uuid
+import asyncio
+import logging
+from datetime import datetime, timezone, timedelta
+from typing import Dict, Optional, Tuple, Union
+from pymongo import ASCENDING, ReturnDocument
+
+logger = logging.getLogger('CookieBot')
+
+Amount = Union[int, float, Dict[str, Union[int, float]]]
+
+class _Declined(Exception):
+    """Aborts a transfer transaction whose debit or credit matched no user"""
+
+class Wallet:
+    """Every balance change is one conditional update on the user document.
+
+    debit() only applies while the balance covers the amount, so concurrent
+    games can never spend the same points twice or push a balance negative.
+    transfer() moves points between two users in a transaction when the
+    deployment supports them (replica set or mongos) and as a resumable
+    two-phase write otherwise. Escrow holds move a stake from the balance into
+    escrow.<id> on the same document; settle() pays out of it, release()
+    refunds it. Holds left behind by a crash are refunded after hold_ttl.
+    """
+
+    defaults = {"points": 0, "trust_score": 50}
+    limits = {"trust_score": (0, 100)}
+
+    def __init__(self, bot, hold_ttl: int = 3600, sweep_interval: float = 60.0):
+        self.bot = bot
+        self.hold_ttl = hold_ttl
+        self.sweep_interval = sweep_interval
+        self._transactions = None
+        self._task = None
+
+    @property
+    def users(self):
+        return self.bot.db.users
+
+    @property
+    def transfers(self):
+        return self.bot.db.wallet_transfers
+
+    @property
+    def escrows(self):
+        return self.bot.db.wallet_escrows
+
+    @staticmethod
+    def _amounts(amount: Amount, currency: str) -> Dict[str, float]:
+        return dict(amount) if isinstance(amount, dict) else {currency: amount}
+
+    @staticmethod
+    def _merge(update: Optional[dict], inc: Dict[str, float], **operators) -> dict:
+        merged = {op: dict(fields) for op, fields in (update or {}).items()}
+        merged.setdefault("$inc", {}).update(inc)
+        for op, fields in operators.items():
+            merged.setdefault(f"${op}", {}).update(fields)
+        return merged
+
+    def _balance(self, currency: str, delta) -> dict:
+        """Aggregation expression for currency + delta, kept within its limits"""
+        value = {"$add": [{"$ifNull": [f"${currency}", self.defaults.get(currency, 0)]}, delta]}
+        if currency in self.limits:
+            low, high = self.limits[currency]
+            value = {"$max": [low, {"$min": [high, value]}]}
+        return value
+
+    @staticmethod
+    def _stage(update: Optional[dict]) -> dict:
+        """Translate a $inc/$set/$max/$min update into one pipeline $set stage"""
+        stage = {}
+        for op, fields in (update or {}).items():
+            for field, value in fields.items():
+                if op == "$inc":
+                    stage[field] = {"$add": [{"$ifNull": [f"${field}", 0]}, value]}
+                elif op == "$set":
+                    stage[field] = {"$literal": value}
+                elif op in ("$max", "$min"):
+                    stage[field] = {op: [f"${field}", value]}
+                else:
+                    raise ValueError(f"Unsupported wallet update operator {op}")
+        return stage
+
+    def _seen(self, *users: Optional[dict]):
+        leaderboards = getattr(self.bot, "leaderboards", None)
+        if not leaderboards:
+            return
+        for user in users:
+            if not user:
+                continue
+            if user.get("blacklisted"):
+                leaderboards.touch(user["user_id"])
+            else:
+                leaderboards.observe(user)
+
+    async def debit(self, user_id: int, amount: Amount, currency: str = "points",
+                    update: Optional[dict] = None) -> Optional[dict]:
+        """Take amount if the balance covers it; returns the updated user or None.
+
+        amount may map several currencies to amounts, which are all taken or
+        none are. update is applied in the same write.
+        """
+        amounts = self._amounts(amount, currency)
+        query = {"user_id": user_id, **{field: {"$gte": value} for field, value in amounts.items()}}
+        user = await self.users.find_one_and_update(
+            query,
+            self._merge(update, {field: -value for field, value in amounts.items()}),
+            return_document=ReturnDocument.AFTER
+        )
+        self._seen(user)
+        return user
+
+    async def credit(self, user_id: int, amount: Amount, currency: str = "points",
+                     update: Optional[dict] = None, upsert: bool = False) -> Optional[dict]:
+        """Add amount unconditionally; returns the updated user.
+
+        Bounded currencies such as trust score are clamped to their limits, so
+        a negative amount is a safe penalty for them.
+        """
+        amounts = self._amounts(amount, currency)
+        stage = self._stage(update)
+        stage.update({field: self._balance(field, value) for field, value in amounts.items()})
+        user = await self.users.find_one_and_update(
+            {"user_id": user_id},
+            [{"$set": stage}],
+            upsert=upsert,
+            return_document=ReturnDocument.AFTER
+        )
+        self._seen(user)
+        return user
+
+    async def supports_transactions(self) -> bool:
+        if self._transactions is None:
+            try:
+                hello = await self.bot.mongo_client.admin.command("hello")
+                self._transactions = "setName" in hello or hello.get("msg") == "isdbgrid"
+            except Exception as e:
+                logger.warning(f"Wallet: could not detect transaction support: {e}")
+                self._transactions = False
+        return self._transactions
+
+    async def transfer(self, from_id: int, to_id: int, amount: float, currency: str = "points",
+                       from_update: Optional[dict] = None, to_update: Optional[dict] = None
+                       ) -> Optional[Tuple[Optional[dict], Optional[dict]]]:
+        """Move amount from one user to another if the sender can cover it.
+
+        Returns the (sender, recipient) documents after the move, or None when
+        the sender is short or either user does not exist.
+        """
+        if from_id == to_id:
+            raise ValueError("Cannot transfer to the same user")
+        if currency in self.limits:
+            raise ValueError(f"{currency} is bounded and cannot be transferred")
+
+        if await self.supports_transactions():
+            result = await self._transfer_transaction(from_id, to_id, amount, currency, from_update, to_update)
+        else:
+            transfer = {
+                "_id": uuid.uuid4().hex,
+                "from_id": from_id,
+                "to_id": to_id,
+                "amount": amount,
+                "currency": currency,
+                # Stored as (operator, fields) pairs; $-prefixed keys are not valid field names
+                "from_update": list((from_update or {}).items()),
+                "to_update": list((to_update or {}).items()),
+                "state": "pending",
+                "created_at": datetime.now(timezone.utc)
+            }
+            await self.transfers.insert_one(transfer)
+            result = await self._transfer_two_phase(transfer)
+
+        if result:
+            self._seen(*result)
+        return result
+
+    async def _transfer_transaction(self, from_id, to_id, amount, currency, from_update, to_update):
+        async def move(session):
+            sender = await self.users.find_one_and_update(
+                {"user_id": from_id, currency: {"$gte": amount}},
+                self._merge(from_update, {currency: -amount}),
+                return_document=ReturnDocument.AFTER,
+                session=session
+            )
+            if sender is None:
+                raise _Declined()
+            recipient = await self.users.find_one_and_update(
+                {"user_id": to_id},
+                self._merge(to_update, {currency: amount}),
+                return_document=ReturnDocument.AFTER,
+                session=session
+            )
+            if recipient is None:
+                raise _Declined()
+            return sender, recipient
+
+        async with await self.bot.mongo_client.start_session() as session:
+            try:
+                return await session.with_transaction(move)
+            except _Declined:
+                return None
+
+    async def _transfer_two_phase(self, transfer: dict):
+        """Apply or resume a transfer; every step is safe to repeat.
+
+        Each side records the transfer id in pending_transfers as part of its
+        balance update, which is what makes a repeated step a no-op.
+        """
+        transfer_id = transfer["_id"]
+        currency, amount = transfer["currency"], transfer["amount"]
+        sender = recipient = None
+
+        if transfer["state"] == "pending":
+            sender = await self.users.find_one_and_update(
+                {"user_id": transfer["from_id"], currency: {"$gte": amount}, "pending_transfers": {"$ne": transfer_id}},
+                self._merge(dict(transfer.get("from_update") or []), {currency: -amount}, push={"pending_transfers": transfer_id}),
+                return_document=ReturnDocument.AFTER
+            )
+            if sender is None and not await self.users.find_one({"user_id": transfer["from_id"], "pending_transfers": transfer_id}):
+                await self._finish_transfer(transfer_id, "cancelled")
+                return None
+
+            recipient = await self.users.find_one_and_update(
+                {"user_id": transfer["to_id"], "pending_transfers": {"$ne": transfer_id}},
+                self._merge(dict(transfer.get("to_update") or []), {currency: amount}, push={"pending_transfers": transfer_id}),
+                return_document=ReturnDocument.AFTER
+            )
+            if recipient is None and not await self.users.find_one({"user_id": transfer["to_id"], "pending_transfers": transfer_id}):
+                # Recipient does not exist; give the sender their points back
+                await self.users.update_one(
+                    {"user_id": transfer["from_id"], "pending_transfers": transfer_id},
+                    {"$inc": {currency: amount}, "$pull": {"pending_transfers": transfer_id}}
+                )
+                await self._finish_transfer(transfer_id, "cancelled")
+                return None
+
+            await self.transfers.update_one({"_id": transfer_id}, {"$set": {"state": "applied"}})
+
+        await self.users.update_many(
+            {"user_id": {"$in": [transfer["from_id"], transfer["to_id"]]}},
+            {"$pull": {"pending_transfers": transfer_id}}
+        )
+        await self._finish_transfer(transfer_id, "done")
+        return sender, recipient
+
+    async def _finish_transfer(self, transfer_id: str, state: str):
+        await self.transfers.update_one(
+            {"_id": transfer_id},
+            {"$set": {"state": state, "finished_at": datetime.now(timezone.utc)}}
+        )
+
+    async def hold(self, escrow_id: str, user_id: int, amount: float, currency: str = "points",
+                   update: Optional[dict] = None) -> Optional[dict]:
+        """Move amount from the balance into escrow escrow_id; None if short"""
+        now = datetime.now(timezone.utc)
+        await self.escrows.update_one(
+            {"_id": escrow_id},
+            {
+                "$setOnInsert": {"currency": currency, "created_at": now, "expires_at": now + timedelta(seconds=self.hold_ttl)},
+                "$addToSet": {"holders": user_id}
+            },
+            upsert=True
+        )
+        return await self.debit(user_id, amount, currency, self._merge(update, {f"escrow.{escrow_id}": amount}))
+
+    async def settle(self, escrow_id: str, payouts: Optional[Dict[int, float]] = None,
+                     updates: Optional[Dict[int, dict]] = None) -> Dict[int, dict]:
+        """Close an escrow, paying payouts[user_id] to holders; other stakes are forfeited.
+
+        Only users still holding a stake are paid, so settling twice pays once.
+        Returns the updated documents of the users that were paid.
+        """
+        return await self._close(escrow_id, payouts or {}, updates or {}, refund=False)
+
+    async def release(self, escrow_id: str) -> Dict[int, dict]:
+        """Close an escrow and give every holder their stake back"""
+        return await self._close(escrow_id, {}, {}, refund=True)
+
+    async def _close(self, escrow_id: str, payouts: Dict[int, float], updates: Dict[int, dict], refund: bool):
+        escrow = await self.escrows.find_one({"_id": escrow_id})
+        if not escrow:
+            return {}
+        currency, held = escrow["currency"], f"escrow.{escrow_id}"
+
+        paid = {}
+        for user_id in escrow.get("holders", []):
+            stage = self._stage(updates.get(user_id))
+            if refund:
+                stage[currency] = self._balance(currency, {"$ifNull": [f"${held}", 0]})
+            elif payouts.get(user_id):
+                stage[currency] = self._balance(currency, payouts[user_id])
+            pipeline = ([{"$set": stage}] if stage else []) + [{"$unset": held}]
+            user = await self.users.find_one_and_update(
+                {"user_id": user_id, held: {"$exists": True}},
+                pipeline,
+                return_document=ReturnDocument.AFTER
+            )
+            if user:
+                paid[user_id] = user
+                self._seen(user)
+
+        await self.escrows.delete_one({"_id": escrow_id})
+        return paid
+
+    async def ensure_indexes(self):
+        await self.transfers.create_index([("state", ASCENDING), ("created_at", ASCENDING)])
+        await self.transfers.create_index("finished_at", expireAfterSeconds=7 * 24 * 3600)
+        await self.escrows.create_index("expires_at")
+
+    async def recover(self, stale_after: int = 60):
+        """Finish interrupted two-phase transfers and refund expired holds"""
+        now = datetime.now(timezone.utc)
+        stale = self.transfers.find({
+            "state": {"$in": ["pending", "applied"]},
+            "created_at": {"$lte": now - timedelta(seconds=stale_after)}
+        })
+        async for transfer in stale:
+            await self._transfer_two_phase(transfer)
+            logger.info(f"Wallet: resumed transfer {transfer['_id']}")
+
+        async for escrow in self.escrows.find({"expires_at": {"$lte": now}}, {"_id": 1}):
+            refunded = await self.release(escrow["_id"])
+            logger.info(f"Wallet: refunded {len(refunded)} expired holds in {escrow['_id']}")
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        try:
+            await self.ensure_indexes()
+        except Exception as e:
+            logger.warning(f"Wallet: could not create indexes: {e}")
+
+        while True:
+            try:
+                await self.recover()
+            except Exception as e:
+                logger.error(f"Wallet recovery failed: {e}")
+            await asyncio.sleep(self.sweep_interval)
@@ -0,0 +1,171 @@
+# bot_core/watchdog.py
+# Event loop lag watchdog and a system sampler that runs off the loop
+
+import os
+import sys
+import time
+import asyncio
+import logging
+import threading
+import traceback
+from typing import Optional
+
+import psutil
+
+logger = logging.getLogger('CookieBot')
+
+class SystemSampler:
+    """Samples CPU, memory and disk on a background thread.
+
+    psutil.cpu_percent(interval=1) sleeps for the interval, which on the
+    event loop stalls every shard and interaction for that long. The thread
+    takes the blocking samples; callers read the latest snapshot.
+    """
+
+    def __init__(self, interval: float = 5.0, disk_path: str = '/'):
+        self.interval = interval
+        self.disk_path = disk_path
+        self._process = psutil.Process()
+        self._snapshot = {}
+        self._stop = threading.Event()
+        self._thread = None
+
+    def snapshot(self) -> dict:
+        if not self._snapshot:
+            # Not sampled yet; these reads don't block
+            return {
+                "cpu_percent": 0.0,
+                "memory_percent": psutil.virtual_memory().percent,
+                "disk_percent": psutil.disk_usage(self.disk_path).percent,
+                "process_rss": self._process.memory_info().rss,
+                "sampled_at": None
+            }
+        return self._snapshot
+
+    def _sample(self):
+        self._snapshot = {
+            # Blocks this thread for the interval and averages over it
+            "cpu_percent": psutil.cpu_percent(interval=self.interval),
+            "memory_percent": psutil.virtual_memory().percent,
+            "disk_percent": psutil.disk_usage(self.disk_path).percent,
+            "process_rss": self._process.memory_info().rss,
+            "sampled_at": time.time()
+        }
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self._sample()
+            except Exception as e:
+                logger.warning(f"System sampler failed: {e}")
+                self._stop.wait(self.interval)
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="cookiebot-system-sampler", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+class LoopWatchdog:
+    """Measures event loop lag and catches the code that blocks it.
+
+    A task on the loop wakes every `interval` and records how late it woke.
+    A thread watches that heartbeat; when it goes quiet for longer than
+    `threshold`, the thread grabs the loop thread's current stack, which is
+    the callback doing the blocking. The stall is logged with that stack
+    once the loop gets going again.
+
+    With debug set (LOOP_DEBUG=1), asyncio's debug mode is also turned on so
+    it logs every callback slower than the threshold, at some cost to speed.
+    """
+
+    def __init__(self, metrics=None, threshold: float = 0.25, interval: float = 0.1, debug: bool = False):
+        self.threshold = threshold
+        self.interval = interval
+        self.debug = debug
+        self.max_lag = 0.0
+        self.stalls = 0
+        self._beat = time.monotonic()
+        self._stack: Optional[str] = None
+        self._loop_thread_id = None
+        self._task = None
+        self._thread = None
+        self._stop = threading.Event()
+        self._lag_metric = self._stall_metric = None
+        if metrics:
+            self._lag_metric = metrics.registry.histogram(
+                "cookiebot_event_loop_lag_seconds", "How late the watchdog's timer fired"
+            ).labels()
+            self._stall_metric = metrics.registry.counter(
+                "cookiebot_event_loop_stalls_total", "Times the event loop was blocked past the threshold"
+            ).labels()
+
+    @classmethod
+    def from_env(cls, metrics=None) -> "LoopWatchdog":
+        return cls(
+            metrics,
+            threshold=float(os.getenv("LOOP_LAG_THRESHOLD", "0.25")),
+            debug=os.getenv("LOOP_DEBUG", "").lower() in ("1", "true", "yes")
+        )
+
+    def start(self):
+        loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        if self.debug:
+            loop.set_debug(True)
+            loop.slow_callback_duration = self.threshold
+            logging.getLogger('asyncio').setLevel(logging.WARNING)
+            logger.warning(f"asyncio debug mode on; callbacks over {self.threshold * 1000:.0f}ms are logged")
+
+        self._beat = time.monotonic()
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._tick())
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._watch, name="cookiebot-loop-watchdog", daemon=True)
+            self._thread.start()
+
+    async def stop(self):
+        self._stop.set()
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _tick(self):
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            lag = max(now - expected, 0.0)
+            self._beat = now
+            self.max_lag = max(self.max_lag, lag)
+            if self._lag_metric:
+                self._lag_metric.observe(lag)
+
+            if lag >= self.threshold:
+                self.stalls += 1
+                if self._stall_metric:
+                    self._stall_metric.inc()
+                stack, self._stack = self._stack, None
+                logger.warning(
+                    f"Event loop blocked for {lag * 1000:.0f}ms"
+                    + (f"; blocking code:\n{stack}" if stack else "")
+                )
+
+    def _watch(self):
+        reported_beat = None
+        while not self._stop.wait(self.threshold / 2):
+            beat = self._beat
+            if beat == reported_beat or time.monotonic() - beat < self.threshold + self.interval:
+                continue
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is not None:
+                self._stack = "".join(traceback.format_stack(frame, limit=15))
+            reported_beat = beat
@@ -38,7 +38,7 @@ class AdminCog(commands.Cog):
         self.db = bot.db
 
     async def is_owner(self, user_id: int) -> bool:
-        config = await self.db.config.find_one({"_id": "bot_config"})
+        config = await self.bot.config_cache.get_config()
         return user_id == config.get("owner_id")
     
     async def log_action(self, guild_id: int, message: str, color: discord.Color = discord.Color.blue()):
@@ -61,7 +61,6 @@ class AdminCog(commands.Cog):
                 "last_active": datetime.now(timezone.utc),
                 "daily_claimed": None,
                 "invite_count": 0,
-                "invited_users": [],
                 "pending_invites": 0,
                 "verified_invites": 0,
                 "fake_invites": 0,
@@ -114,7 +113,7 @@ class AdminCog(commands.Cog):
             if hasattr(ctx, 'interaction') and ctx.interaction:
                 await ctx.interaction.response.defer(ephemeral=True)
             
-            server = await self.db.servers.find_one({"server_id": ctx.guild.id})
+            server = await self.bot.config_cache.get_server(ctx.guild.id)
             
             if not server:
                 await ctx.send("❌ Server not configured!", ephemeral=True)
@@ -138,6 +137,9 @@ class AdminCog(commands.Cog):
                 await ctx.send(embed=embed, ephemeral=True)
                 return
             
+            # Member counts below need the full member list
+            await self.bot.ensure_chunked(ctx.guild)
+            
             # Create paginated embeds for all roles
             embeds = []
             
@@ -296,7 +298,7 @@ class AdminCog(commands.Cog):
             if hasattr(ctx, 'interaction') and ctx.interaction:
                 await ctx.interaction.response.defer(ephemeral=True)
             
-            server = await self.db.servers.find_one({"server_id": ctx.guild.id})
+            server = await self.bot.config_cache.get_server(ctx.guild.id)
             
             if not server or not server.get("role_based"):
                 await ctx.send("❌ Role system not enabled!", ephemeral=True)
@@ -318,6 +320,8 @@ class AdminCog(commands.Cog):
                 await ctx.send(embed=embed, ephemeral=True)
                 return
             
+            await self.bot.ensure_chunked(ctx.guild)
+            
             # Create detailed embed
             embed = discord.Embed(
                 title=f"{role_config.get('emoji', '🎭')} {role.name} - Detailed Benefits",
@@ -365,7 +369,7 @@ class AdminCog(commands.Cog):
             cookie_access = role_config.get("cookie_access", {})
             if cookie_access:
                 comparison = []
-                config = await self.db.config.find_one({"_id": "bot_config"})
+                config = await self.bot.config_cache.get_config()
                 default_cookies = config.get("default_cookies", {})
                 
                 for cookie_type, access in cookie_access.items():
@@ -411,36 +415,29 @@ class AdminCog(commands.Cog):
                 await ctx.send(embed=embed, ephemeral=True)
                 return
             
-            user_data = await self.get_or_create_user(user.id, str(user))
-            current_points = user_data.get("points", 0)
+            await self.get_or_create_user(user.id, str(user))
+            last_active = {"$set": {"last_active": datetime.now(timezone.utc)}}
             
             if points > 0:
-                await self.db.users.update_one(
-                    {"user_id": user.id},
-                    {
-                        "$inc": {
-                            "points": points,
-                            "total_earned": points
-                        },
-                        "$set": {"last_active": datetime.now(timezone.utc)}
-                    }
+                user_data = await self.bot.wallet.credit(
+                    user.id, points,
+                    update={"$inc": {"total_earned": points}, **last_active}
                 )
                 action = "Added"
                 emoji = "➕"
                 color = discord.Color.green()
             else:
-                await self.db.users.update_one(
-                    {"user_id": user.id},
-                    {
-                        "$inc": {"points": points},
-                        "$set": {"last_active": datetime.now(timezone.utc)}
-                    }
-                )
+                user_data = await self.bot.wallet.debit(user.id, -points, update=last_active)
+                if not user_data:
+                    balance = (await self.db.users.find_one({"user_id": user.id}, {"points": 1}) or {}).get("points", 0)
+                    await ctx.send(f"❌ {user.mention} only has **{balance:,}** points!", ephemeral=True)
+                    return
                 action = "Removed"
                 emoji = "➖"
                 color = discord.Color.red()
             
-            new_balance = current_points + points
+            new_balance = user_data.get("points", 0)
+            current_points = new_balance - points
             
             embed = discord.Embed(
                 title=f"{emoji} Points {action}!",
@@ -490,7 +487,7 @@ class AdminCog(commands.Cog):
                 await ctx.send(embed=embed, ephemeral=True)
                 return
             
-            server = await self.db.servers.find_one({"server_id": ctx.guild.id})
+            server = await self.bot.config_cache.get_server(ctx.guild.id)
             role_info = "Default"
             
             if server and server.get("role_based"):
@@ -573,10 +570,12 @@ class AdminCog(commands.Cog):
                 {
                     "$set": {
                         "maintenance_mode": mode,
-                        "maintenance_started": datetime.now(timezone.utc) if mode else None
+                        "maintenance_started": datetime.now(timezone.utc) if mode else None,
+                        "last_updated": datetime.now(timezone.utc)
                     }
                 }
             )
+            self.bot.config_cache.invalidate_config()
             
             if mode:
                 embed = discord.Embed(
@@ -634,7 +633,7 @@ class AdminCog(commands.Cog):
                 await ctx.send("❌ I cannot blacklist myself!", ephemeral=True)
                 return
             
-            server = await self.db.servers.find_one({"server_id": ctx.guild.id})
+            server = await self.bot.config_cache.get_server(ctx.guild.id)
             if server:
                 settings = server.get("settings", {})
                 max_blacklist_days = settings.get("max_blacklist_days", 365)
@@ -661,6 +660,7 @@ class AdminCog(commands.Cog):
                 },
                 upsert=True
             )
+            self.bot.leaderboards.touch(user.id)
             
             embed = discord.Embed(
                 title="🚫 User Blacklisted",
@@ -750,6 +750,7 @@ class AdminCog(commands.Cog):
                     }
                 }
             )
+            self.bot.leaderboards.touch(user.id)
             
             embed = discord.Embed(
                 title="✅ User Unblacklisted",
@@ -765,7 +766,7 @@ class AdminCog(commands.Cog):
             await ctx.send(embed=embed)
             
             # Remove blacklist role if exists - FIXED: Define server variable first
-            server = await self.db.servers.find_one({"server_id": ctx.guild.id})
+            server = await self.bot.config_cache.get_server(ctx.guild.id)
             if server and server.get("roles"):
                 for role_id, role_config in server["roles"].items():
                     if isinstance(role_config, dict) and role_config.get("name") == "blacklist":
@@ -929,6 +930,56 @@ class AdminCog(commands.Cog):
             print(f"Error in stats: {traceback.format_exc()}")
             await ctx.send("❌ An error occurred while fetching statistics!", ephemeral=True)
 
+    @commands.hybrid_command(name="clusters", description="View the health of every bot cluster")
+    async def clusters(self, ctx):
+        try:
+            if not await self.is_owner(ctx.author.id):
+                embed = discord.Embed(
+                    title="🔒 Access Denied",
+                    description="This command is restricted to the bot owner only!",
+                    color=discord.Color.red()
+                )
+                await ctx.send(embed=embed, ephemeral=True)
+                return
+            
+            await self.bot.cluster.report()
+            clusters = await self.bot.cluster.summary()
+            
+            embed = discord.Embed(
+                title="🧩 Cluster Health",
+                description=f"**{len(clusters)}** cluster(s) • this command ran on cluster **{self.bot.cluster.cluster_id}**",
+                color=discord.Color.red() if any(c["stale"] or not c.get("ready") for c in clusters) else discord.Color.green(),
+                timestamp=datetime.now(timezone.utc)
+            )
+            for cluster in clusters[:25]:
+                shards = cluster.get("shards", [])
+                latencies = [s["latency_ms"] for s in shards if s.get("latency_ms") is not None]
+                closed = sum(1 for s in shards if s.get("closed"))
+                shard_ids = cluster.get("shard_ids") or []
+                status = "💀 Stale" if cluster["stale"] else ("🟢 Ready" if cluster.get("ready") else "🟡 Starting")
+                embed.add_field(
+                    name=f"Cluster {cluster['_id']} • {status}",
+                    value=(
+                        f"Shards: **{shard_ids[0]}-{shard_ids[-1]}**" if shard_ids else "Shards: **-**"
+                    ) + (
+                        f" ({closed} down)\n" if closed else "\n"
+                    ) + (
+                        f"Guilds: **{cluster.get('guilds', 0):,}** • Users: **{cluster.get('users', 0):,}**\n"
+                        f"Latency: **{round(sum(latencies) / len(latencies)) if latencies else '-'}ms** • "
+                        f"Memory: **{cluster.get('memory_mb', 0)} MB**\n"
+                        f"Host: `{cluster.get('host', '?')}` • PID: `{cluster.get('pid', '?')}`"
+                    ),
+                    inline=True
+                )
+            
+            total_shards = clusters[0].get("shard_count") if clusters else self.bot.shard_count
+            embed.set_footer(text=f"{total_shards} shards total • heartbeats every {int(self.bot.cluster.report_interval)}s")
+            await ctx.send(embed=embed)
+            
+        except Exception as e:
+            print(f"Error in clusters: {traceback.format_exc()}")
+            await ctx.send("❌ An error occurred while fetching cluster health!", ephemeral=True)
+
     @commands.hybrid_command(name="broadcast", description="Send an announcement to all servers")
     @app_commands.describe(message="The message to broadcast")
     async def broadcast(self, ctx, *, message: str):
@@ -988,9 +1039,6 @@ class AdminCog(commands.Cog):
             # Start broadcast
             await confirm_msg.edit(content="📡 Broadcasting...", embed=None, view=None)
             
-            success = 0
-            failed = 0
-            
             broadcast_embed = discord.Embed(
                 title="📢 Announcement from Cookie Bot",
                 description=message,
@@ -1000,32 +1048,56 @@ class AdminCog(commands.Cog):
             broadcast_embed.set_footer(text="Cookie Bot Official Announcement", icon_url=self.bot.user.avatar.url)
             broadcast_embed.set_author(name=ctx.author.name, icon_url=ctx.author.avatar.url)
             
-            for guild in self.bot.guilds:
-                try:
-                    server = await self.db.servers.find_one({"server_id": guild.id})
-                    sent = False
-                    
-                    # Try announcement channel first
-                    if server and server.get("channels", {}).get("announcement"):
-                        channel = self.bot.get_channel(server["channels"]["announcement"])
-                        if channel and channel.permissions_for(guild.me).send_messages:
-                            await channel.send(embed=broadcast_embed)
-                            success += 1
-                            sent = True
-                            continue
-                    
-                    # Try other channels
-                    if not sent:
-                        for channel in guild.text_channels:
-                            if channel.permissions_for(guild.me).send_messages:
-                                await channel.send(embed=broadcast_embed)
-                                success += 1
-                                break
-                        else:
-                            failed += 1
-                except Exception as e:
-                    print(f"Failed to send to {guild.name}: {e}")
-                    failed += 1
+            # Every server config in one query instead of one lookup per guild
+            guilds = {guild.id: guild for guild in self.bot.guilds}
+            names = {guild.id: guild.name for guild in self.bot.guilds}
+            announcement_channels = {
+                server["server_id"]: server.get("channels", {}).get("announcement")
+                async for server in self.db.servers.find(
+                    {"server_id": {"$in": list(guilds)}},
+                    {"server_id": 1, "channels.announcement": 1}
+                )
+            }
+            
+            targets = []
+            unreachable = 0
+            for guild_id, guild in guilds.items():
+                channel = self.bot.get_channel(announcement_channels.get(guild_id) or 0)
+                if not channel or not channel.permissions_for(guild.me).send_messages:
+                    channel = next((c for c in guild.text_channels if c.permissions_for(guild.me).send_messages), None)
+                if channel:
+                    targets.append((guild_id, channel))
+                else:
+                    unreachable += 1
+            
+            # Guilds on other clusters aren't cached here; reach their announcement channels over REST
+            if self.bot.cluster.clustered:
+                async for server in self.db.servers.find(
+                    {"server_id": {"$nin": list(guilds)}, "enabled": True, "channels.announcement": {"$ne": None}},
+                    {"server_id": 1, "server_name": 1, "channels.announcement": 1}
+                ):
+                    if self.bot.cluster.owns_guild(server["server_id"]):
+                        continue
+                    names[server["server_id"]] = server.get("server_name", "Unknown")
+                    targets.append((server["server_id"], self.bot.get_partial_messageable(server["channels"]["announcement"])))
+            
+            async def show_progress(result):
+                await self.bot.edits.edit(
+                    confirm_msg,
+                    content=f"📡 Broadcasting... **{result.done}/{result.total}** "
+                            f"(✅ {result.sent} • ❌ {len(result.failed)} • 🔁 {result.retries} retries)"
+                )
+            
+            result = await self.bot.fanout.run(
+                targets,
+                lambda channel: channel.send(embed=broadcast_embed),
+                progress=show_progress
+            )
+            for guild_id, error in result.failed.items():
+                print(f"Failed to send to {names[guild_id]}: {error}")
+            
+            success = result.sent
+            failed = len(result.failed) + unreachable
             
             # Final report
             result_embed = discord.Embed(
@@ -1035,9 +1107,10 @@ class AdminCog(commands.Cog):
             )
             result_embed.add_field(name="✅ Success", value=f"**{success}** servers", inline=True)
             result_embed.add_field(name="❌ Failed", value=f"**{failed}** servers", inline=True)
-            result_embed.add_field(name="📊 Success Rate", value=f"**{success/(success+failed)*100:.1f}%**", inline=True)
+            result_embed.add_field(name="📊 Success Rate", value=f"**{success/max(success+failed, 1)*100:.1f}%**", inline=True)
+            result_embed.set_footer(text=f"Sent in {result.elapsed:.1f}s • {result.retries} retries")
             
-            await confirm_msg.edit(content=None, embed=result_embed)
+            await self.bot.edits.edit(confirm_msg, content=None, embed=result_embed)
             
         except Exception as e:
             print(f"Error in broadcast: {traceback.format_exc()}")
@@ -1060,13 +1133,13 @@ class AdminCog(commands.Cog):
                 await ctx.send(embed=embed, ephemeral=True)
                 return
             
-            server = await self.db.servers.find_one({"server_id": ctx.guild.id})
+            server = await self.bot.config_cache.get_server(ctx.guild.id)
             if not server:
                 await ctx.send("❌ Server not configured! Run /setup first.", ephemeral=True)
                 return
             
             # Get default role template
-            config = await self.db.config.find_one({"_id": "bot_config"})
+            config = await self.bot.config_cache.get_config()
             default_roles = config.get("default_roles", {})
             
             # Try to match with a default role type
@@ -1102,10 +1175,12 @@ class AdminCog(commands.Cog):
                 {
                     "$set": {
                         f"roles.{role.id}": role_config,
-                        "role_based": True
+                        "role_based": True,
+                        "last_updated": datetime.now(timezone.utc)
                     }
                 }
             )
+            self.bot.config_cache.invalidate_server(ctx.guild.id)
             
             embed = discord.Embed(
                 title="🎭 Role Configured",
@@ -1134,6 +1209,76 @@ class AdminCog(commands.Cog):
             print(f"Error in setrole: {e}")
             await ctx.send("❌ An error occurred!", ephemeral=True)
     
+    @commands.hybrid_command(name="claimmode", description="Choose how cookie claims are displayed")
+    @app_commands.describe(mode="Animated progress steps or a single fast response")
+    @app_commands.choices(
+        mode=[
+            app_commands.Choice(name="Animated", value="animated"),
+            app_commands.Choice(name="Fast", value="fast")
+        ]
+    )
+    async def claimmode(self, ctx, mode: str):
+        try:
+            if not await self.is_owner(ctx.author.id):
+                embed = discord.Embed(
+                    title="🔒 Access Denied",
+                    description="This command is restricted to the bot owner only!",
+                    color=discord.Color.red()
+                )
+                await ctx.send(embed=embed, ephemeral=True)
+                return
+            
+            mode = mode.lower()
+            if mode not in ("animated", "fast"):
+                await ctx.send("❌ Mode must be `animated` or `fast`!", ephemeral=True)
+                return
+            
+            server = await self.bot.config_cache.get_server(ctx.guild.id)
+            if not server:
+                await ctx.send("❌ Server not configured! Run /setup first.", ephemeral=True)
+                return
+            
+            await self.db.servers.update_one(
+                {"server_id": ctx.guild.id},
+                {
+                    "$set": {
+                        "settings.claim_ui_mode": mode,
+                        "last_updated": datetime.now(timezone.utc)
+                    }
+                }
+            )
+            self.bot.config_cache.invalidate_server(ctx.guild.id)
+            
+            embed = discord.Embed(
+                title="⚙️ Claim Mode Updated",
+                description=f"Cookie claims now use **{mode}** mode.",
+                color=discord.Color.green()
+            )
+            if mode == "fast":
+                embed.add_field(
+                    name="Fast",
+                    value="Claims reply once with the result; progress is only shown for slow claims.",
+                    inline=False
+                )
+            else:
+                embed.add_field(
+                    name="Animated",
+                    value="Claims show each progress step before the result.",
+                    inline=False
+                )
+            
+            await ctx.send(embed=embed)
+            
+            await self.log_action(
+                ctx.guild.id,
+                f"⚙️ {ctx.author.mention} set claim mode to **{mode}**",
+                discord.Color.blue()
+            )
+            
+        except Exception as e:
+            print(f"Error in claimmode: {e}")
+            await ctx.send("❌ An error occurred!", ephemeral=True)
+    
     def get_uptime(self):
         delta = datetime.now(timezone.utc) - self.bot.start_time
         hours, remainder = divmod(int(delta.total_seconds()), 3600)
@@ -7,34 +7,96 @@ from discord.ext import commands, tasks
 from datetime import datetime, timedelta, timezone
 import asyncio
 from collections import defaultdict
+from pymongo import InsertOne, UpdateOne
+from bot_core.batch_writer import BatchWriter
+from bot_core.hll import DistinctCounters, HyperLogLog
+from bot_core.rollups import RollupStore
 
 class AnalyticsCog(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         self.db = bot.db
+        self.distinct = DistinctCounters(bot.db)
+        self.rollups = RollupStore(bot.db)
+        # Events are written by a background task, never on the command path
+        self.writer = BatchWriter("Analytics writer", self.write_events, batch_size=200, max_delay=5.0, max_queue=10000)
         self.update_analytics.start()
-        self.command_cache = defaultdict(int)
-        self.user_cache = set()
-        self._command_batch = []
-        self._max_batch_size = 25  # CHANGED FROM 50
-        self._batch_timeout = 5  # NEW
-        self._last_batch_time = datetime.now(timezone.utc)  # NEW
-        self.batch_processor.start()  # NEW
+        self.batch_processor.start()
         
+    async def cog_load(self):
+        self.writer.start()
+        try:
+            await self.distinct.ensure_indexes()
+            await self.migrate_distinct_arrays()
+            await self.rollups.ensure_collections()
+            await self.drop_period_counters()
+        except Exception as e:
+            print(f"Error migrating analytics counters: {e}")
+
     async def cog_unload(self):
         self.update_analytics.cancel()
-        self.batch_processor.cancel()  # NEW
-        await self.flush_cache()
-        await self.flush_command_batch()
+        self.batch_processor.cancel()
+        await self.writer.stop()
+        await self.distinct.flush()
+        await self.rollups.flush()
+    
+    async def drop_period_counters(self):
+        """Remove the today/this_week/this_month counters replaced by rollups"""
+        fields = ("today", "this_week", "this_month")
+        for doc_id, group in [("command_usage", "commands"), ("cookie_extractions", "cookies")]:
+            document = await self.db.analytics.find_one({"_id": doc_id})
+            if not document:
+                continue
+            unset = {f"total_{field}": "" for field in fields if f"total_{field}" in document}
+            for name, data in (document.get(group) or {}).items():
+                unset.update({f"{group}.{name}.{field}": "" for field in fields if field in data})
+            if unset:
+                await self.db.analytics.update_one({"_id": doc_id}, {"$unset": unset})
+    
+    async def migrate_distinct_arrays(self):
+        """Fold the old $addToSet arrays into distinct counters, then drop them"""
+        def fold(key, values):
+            if values:
+                sketch = HyperLogLog(self.distinct.precision)
+                for value in values:
+                    sketch.add(value)
+                self.distinct.add_sketch(key, sketch)
+
+        unset = {}
+        active = await self.db.analytics.find_one({"_id": "active_users"})
+        if active:
+            for field, period in [("all_time_users", "all"), ("daily_active_users", "day"),
+                                  ("weekly_active_users", "week"), ("monthly_active_users", "month")]:
+                if field in active:
+                    fold(self.distinct.key("active_users", period), active[field])
+                    unset[field] = ""
+            if "user_details" in active:
+                unset["user_details"] = ""
+            if unset:
+                await self.distinct.flush()
+                await self.db.analytics.update_one({"_id": "active_users"}, {"$unset": unset})
+
+        for doc_id, group, fields in [("command_usage", "commands", {"unique_users": "command_users", "guilds": "command_guilds"}),
+                                      ("cookie_extractions", "cookies", {"unique_users": "cookie_users", "files": "cookie_files"})]:
+            document = await self.db.analytics.find_one({"_id": doc_id})
+            unset = {}
+            for name, data in ((document or {}).get(group) or {}).items():
+                for field, counter in fields.items():
+                    if field in data:
+                        fold(self.distinct.key(f"{counter}:{name}"), data[field])
+                        unset[f"{group}.{name}.{field}"] = ""
+            if unset:
+                await self.distinct.flush()
+                await self.db.analytics.update_one({"_id": doc_id}, {"$unset": unset})
+        
+        rt = await self.db.analytics.find_one({"_id": "real_time_stats"}, {"active_users": 1})
+        if rt and "active_users" in rt:
+            await self.db.analytics.update_one({"_id": "real_time_stats"}, {"$unset": {"active_users": ""}})
         
     @tasks.loop(seconds=5)
     async def batch_processor(self):
-        if self._command_batch and (
-            len(self._command_batch) >= self._max_batch_size or
-            (datetime.now(timezone.utc) - self._last_batch_time).total_seconds() > self._batch_timeout
-        ):
-            await self.flush_command_batch()
-            self._last_batch_time = datetime.now(timezone.utc)
+        await self.distinct.flush()
+        await self.rollups.flush()
 
     @batch_processor.before_loop
     async def before_batch_processor(self):
@@ -46,146 +108,76 @@ class AnalyticsCog(commands.Cog):
             await cookie_cog.log_action(guild_id, message, color)
     
     async def is_owner(self, user_id: int) -> bool:
-        config = await self.db.config.find_one({"_id": "bot_config"})
+        config = await self.bot.config_cache.get_config()
         return user_id == config.get("owner_id")
     
     async def track_command(self, command_name: str, user_id: int, guild_id: int):
-        # Add to local cache for quick stats
-        self.command_cache[command_name] += 1
-        self.user_cache.add(user_id)
-        
-        # Batch database updates for better performance
-        self._command_batch.append({
+        self.distinct.add(f"command_users:{command_name}", user_id)
+        self.distinct.add(f"command_guilds:{command_name}", guild_id)
+        self.rollups.record("command", command_name)
+        self.writer.submit({
+            "type": "command",
             "command": command_name,
             "user_id": user_id,
             "guild_id": guild_id,
             "timestamp": datetime.now(timezone.utc)
         })
-        
-        if len(self._command_batch) >= self._max_batch_size:
-            await self.flush_command_batch()
-    
-    async def flush_command_batch(self):
-        if not self._command_batch:
-            return
-            
-        try:
-            # Group by command for bulk updates
-            command_groups = defaultdict(list)
-            for item in self._command_batch:
-                command_groups[item["command"]].append(item)
-            
-            # Bulk update for each command
-            for command_name, items in command_groups.items():
-                user_ids = list(set(item["user_id"] for item in items))
-                guild_ids = list(set(item["guild_id"] for item in items))
-                count = len(items)
-                
-                await self.db.analytics.update_one(
-                    {"_id": "command_usage"},
-                    {
-                        "$inc": {
-                            f"commands.{command_name}.total": count,
-                            f"commands.{command_name}.today": count,
-                            f"commands.{command_name}.this_week": count,
-                            f"commands.{command_name}.this_month": count
-                        },
-                        "$addToSet": {
-                            f"commands.{command_name}.unique_users": {"$each": user_ids},
-                            f"commands.{command_name}.guilds": {"$each": guild_ids}
-                        }
-                    },
-                    upsert=True
-                )
-            
-            # Insert analytics entries
-            if self._command_batch:
-                await self.db.analytics.insert_many(
-                    [
-                        {
-                            "type": "command_usage",
-                            "command": item["command"],
-                            "user_id": item["user_id"],
-                            "guild_id": item["guild_id"],
-                            "timestamp": item["timestamp"]
-                        }
-                        for item in self._command_batch
-                    ]
-                )
-            
-            self._command_batch.clear()
-            
-        except Exception as e:
-            print(f"Error flushing command batch: {e}")
     
     async def track_cookie_extraction(self, cookie_type: str, user_id: int, file_name: str):
-        await self.db.analytics.update_one(
-            {"_id": "cookie_extractions"},
-            {
-                "$inc": {
-                    f"cookies.{cookie_type}.total": 1,
-                    f"cookies.{cookie_type}.today": 1,
-                    f"cookies.{cookie_type}.this_week": 1,
-                    f"cookies.{cookie_type}.this_month": 1,
-                    "total_all_time": 1,
-                    "total_today": 1,
-                    "total_this_week": 1,
-                    "total_this_month": 1
-                },
-                "$addToSet": {
-                    f"cookies.{cookie_type}.unique_users": user_id,
-                    f"cookies.{cookie_type}.files": file_name
-                },
-                "$set": {
-                    "last_updated": datetime.now(timezone.utc)
-                }
-            },
-            upsert=True
-        )
-    
-    async def track_active_user(self, user_id: int, username: str):
-        await self.db.analytics.update_one(
-            {"_id": "active_users"},
-            {
-                "$addToSet": {
-                    "all_time_users": user_id,
-                    "daily_active_users": user_id,
-                    "weekly_active_users": user_id,
-                    "monthly_active_users": user_id
-                },
-                "$set": {
-                    f"user_details.{user_id}": {
-                        "username": username,
-                        "last_seen": datetime.now(timezone.utc)
-                    }
-                }
-            },
-            upsert=True
-        )
+        self.distinct.add(f"cookie_users:{cookie_type}", user_id)
+        self.distinct.add(f"cookie_files:{cookie_type}", file_name)
+        self.rollups.record("cookie", cookie_type)
+        self.writer.submit({
+            "type": "cookie",
+            "cookie_type": cookie_type,
+            "timestamp": datetime.now(timezone.utc)
+        })
     
-    async def flush_cache(self):
-        if self.command_cache:
-            for command, count in self.command_cache.items():
-                await self.db.analytics.update_one(
-                    {"_id": "real_time_stats"},
-                    {"$inc": {f"commands.{command}": count}},
-                    upsert=True
-                )
-            self.command_cache.clear()
-        
-        if self.user_cache:
-            await self.db.analytics.update_one(
-                {"_id": "real_time_stats"},
-                {"$addToSet": {"active_users": {"$each": list(self.user_cache)}}},
+    async def write_events(self, events):
+        """Write a batch of events: counters are summed first, then one unordered bulk_write"""
+        command_inc = defaultdict(int)
+        realtime_inc = defaultdict(int)
+        cookie_inc = defaultdict(int)
+        inserts = []
+        
+        for event in events:
+            if event["type"] == "command":
+                command_inc[f"commands.{event['command']}.total"] += 1
+                realtime_inc[f"commands.{event['command']}"] += 1
+                inserts.append(InsertOne({
+                    "type": "command_usage",
+                    "command": event["command"],
+                    "user_id": event["user_id"],
+                    "guild_id": event["guild_id"],
+                    "timestamp": event["timestamp"]
+                }))
+            elif event["type"] == "cookie":
+                cookie_inc[f"cookies.{event['cookie_type']}.total"] += 1
+                cookie_inc["total_all_time"] += 1
+        
+        operations = []
+        if command_inc:
+            operations.append(UpdateOne({"_id": "command_usage"}, {"$inc": dict(command_inc)}, upsert=True))
+            operations.append(UpdateOne({"_id": "real_time_stats"}, {"$inc": dict(realtime_inc)}, upsert=True))
+        if cookie_inc:
+            operations.append(UpdateOne(
+                {"_id": "cookie_extractions"},
+                {"$inc": dict(cookie_inc), "$set": {"last_updated": datetime.now(timezone.utc)}},
                 upsert=True
-            )
-            self.user_cache.clear()
+            ))
+        operations.extend(inserts)
+        
+        if operations:
+            await self.db.analytics.bulk_write(operations, ordered=False)
+    
+    async def track_active_user(self, user_id: int, username: str):
+        # Usernames and last activity already live on the user document
+        self.distinct.add("active_users", user_id)
     
     @tasks.loop(minutes=5)
     async def update_analytics(self):
         try:
-            await self.flush_cache()
-            await self.flush_command_batch()
+            await self.writer.flush()
             
             analytics_data = await self.db.analytics.find_one({"_id": "bot_analytics"})
             if not analytics_data:
@@ -225,95 +217,19 @@ class AnalyticsCog(commands.Cog):
                 },
                 upsert=True
             )
-            
-            now = datetime.now(timezone.utc)
-            day_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
-            week_start = now - timedelta(days=now.weekday())
-            month_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-            
-            if now.hour == 0 and now.minute < 5:
-                await self.reset_daily_stats()
-            
-            if now.weekday() == 0 and now.hour == 0 and now.minute < 5:
-                await self.reset_weekly_stats()
-            
-            if now.day == 1 and now.hour == 0 and now.minute < 5:
-                await self.reset_monthly_stats()
                 
         except Exception as e:
             print(f"Error in analytics update: {e}")
     
-    async def reset_daily_stats(self):
-        await self.db.analytics.update_one(
-            {"_id": "command_usage"},
-            {"$set": {f"commands.{cmd}.today": 0 for cmd in ["cookie", "daily", "points", "help", "stock", "feedback", "invites", "status"]}},
-            upsert=True
-        )
-        
-        await self.db.analytics.update_one(
-            {"_id": "cookie_extractions"},
-            {
-                "$set": {
-                    "total_today": 0,
-                    **{f"cookies.{cookie}.today": 0 for cookie in ["netflix", "spotify", "prime", "jiohotstar", "tradingview", "chatgpt", "claude", "peacock", "crunchyroll", "canalplus"]}
-                }
-            },
-            upsert=True
-        )
-        
-        await self.db.analytics.update_one(
-            {"_id": "active_users"},
-            {"$set": {"daily_active_users": []}},
-            upsert=True
-        )
-    
-    async def reset_weekly_stats(self):
-        await self.db.analytics.update_one(
-            {"_id": "command_usage"},
-            {"$set": {f"commands.{cmd}.this_week": 0 for cmd in ["cookie", "daily", "points", "help", "stock", "feedback", "invites", "status"]}},
-            upsert=True
-        )
-        
-        await self.db.analytics.update_one(
-            {"_id": "cookie_extractions"},
-            {
-                "$set": {
-                    "total_this_week": 0,
-                    **{f"cookies.{cookie}.this_week": 0 for cookie in ["netflix", "spotify", "prime", "jiohotstar", "tradingview", "chatgpt", "claude", "peacock", "crunchyroll", "canalplus"]}
-                }
-            },
-            upsert=True
-        )
-        
-        await self.db.analytics.update_one(
-            {"_id": "active_users"},
-            {"$set": {"weekly_active_users": []}},
-            upsert=True
-        )
-    
-    async def reset_monthly_stats(self):
-        await self.db.analytics.update_one(
-            {"_id": "command_usage"},
-            {"$set": {f"commands.{cmd}.this_month": 0 for cmd in ["cookie", "daily", "points", "help", "stock", "feedback", "invites", "status"]}},
-            upsert=True
-        )
-        
-        await self.db.analytics.update_one(
-            {"_id": "cookie_extractions"},
-            {
-                "$set": {
-                    "total_this_month": 0,
-                    **{f"cookies.{cookie}.this_month": 0 for cookie in ["netflix", "spotify", "prime", "jiohotstar", "tradingview", "chatgpt", "claude", "peacock", "crunchyroll", "canalplus"]}
-                }
-            },
-            upsert=True
-        )
-        
-        await self.db.analytics.update_one(
-            {"_id": "active_users"},
-            {"$set": {"monthly_active_users": []}},
-            upsert=True
-        )
+    @staticmethod
+    def period_start(period: str) -> datetime:
+        """Start of the current calendar day, week (Monday) or month in UTC"""
+        day_start = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+        if period == "week":
+            return day_start - timedelta(days=day_start.weekday())
+        if period == "month":
+            return day_start.replace(day=1)
+        return day_start
     
     @commands.Cog.listener()
     async def on_command_completion(self, ctx):
@@ -332,11 +248,10 @@ class AnalyticsCog(commands.Cog):
         await ctx.defer()
         
         # Flush pending data before showing analytics
-        await self.flush_cache()
-        await self.flush_command_batch()
+        await self.writer.flush()
+        await self.distinct.flush()
         
         analytics = await self.db.analytics.find_one({"_id": "bot_analytics"})
-        active_users = await self.db.analytics.find_one({"_id": "active_users"})
         command_usage = await self.db.analytics.find_one({"_id": "command_usage"})
         cookie_extractions = await self.db.analytics.find_one({"_id": "cookie_extractions"})
         
@@ -356,11 +271,11 @@ class AnalyticsCog(commands.Cog):
                 inline=False
             )
         
-        if active_users:
-            all_time = len(active_users.get("all_time_users", []))
-            daily = len(active_users.get("daily_active_users", []))
-            weekly = len(active_users.get("weekly_active_users", []))
-            monthly = len(active_users.get("monthly_active_users", []))
+        all_time = await self.distinct.count("active_users")
+        if all_time:
+            daily = await self.distinct.count("active_users", "day")
+            weekly = await self.distinct.count("active_users", "week")
+            monthly = await self.distinct.count("active_users", "month")
             
             embed.add_field(
                 name="👥 Active Users",
@@ -372,12 +287,16 @@ class AnalyticsCog(commands.Cog):
             )
         
         if cookie_extractions:
+            today, week, month = [
+                sum((await self.rollups.window("cookie", self.period_start(period))).values())
+                for period in ("day", "week", "month")
+            ]
             embed.add_field(
                 name="🍪 Cookie Extractions",
                 value=f"**All Time:** {cookie_extractions.get('total_all_time', 0):,}\n"
-                      f"**Today:** {cookie_extractions.get('total_today', 0):,}\n"
-                      f"**This Week:** {cookie_extractions.get('total_this_week', 0):,}\n"
-                      f"**This Month:** {cookie_extractions.get('total_this_month', 0):,}",
+                      f"**Today:** {today:,}\n"
+                      f"**This Week:** {week:,}\n"
+                      f"**This Month:** {month:,}",
                 inline=True
             )
         
@@ -397,6 +316,26 @@ class AnalyticsCog(commands.Cog):
                     inline=False
                 )
         
+        writer = self.writer.stats()
+        embed.add_field(
+            name="🧮 Analytics Writer",
+            value=f"**Queue:** {writer['queue_depth']} (peak {writer['peak_depth']})\n"
+                  f"**Flush:** {writer['avg_latency_ms']}ms avg, {writer['max_latency_ms']}ms max\n"
+                  f"**Batches:** {writer['batches']:,} (last {writer['last_batch_size']})\n"
+                  f"**Dropped/Failed:** {writer['dropped']:,}/{writer['failed']:,}",
+            inline=False
+        )
+        
+        edits = self.bot.edits.stats()
+        embed.add_field(
+            name="✏️ Message Edits",
+            value=f"**Sent:** {edits['sent']:,} of {edits['requested']:,} requested\n"
+                  f"**Saved:** {edits['saved']:,} superseded edits skipped\n"
+                  f"**Waiting:** {edits['waiting']} in {edits['channels']} channel(s)\n"
+                  f"**Failed:** {edits['failed']:,}",
+            inline=False
+        )
+        
         await ctx.send(embed=embed)
     
     @commands.hybrid_command(name="cookiestats", description="View detailed cookie statistics (Owner only)")
@@ -416,11 +355,13 @@ class AnalyticsCog(commands.Cog):
         )
         
         if cookie_data and cookie_data.get("cookies"):
+            # Split at midnight so one aggregation gives both the week and today
+            weekly = await self.rollups.totals("cookie", self.period_start("week"), split=self.period_start("day"))
             for cookie_type, data in cookie_data["cookies"].items():
                 total = data.get("total", 0)
-                today = data.get("today", 0)
-                week = data.get("this_week", 0)
-                unique_users = len(data.get("unique_users", []))
+                earlier, today = weekly.get(cookie_type, (0, 0))
+                week = earlier + today
+                unique_users = await self.distinct.count(f"cookie_users:{cookie_type}")
                 
                 embed.add_field(
                     name=f"🍪 {cookie_type.title()}",
@@ -484,11 +425,11 @@ class AnalyticsCog(commands.Cog):
                 inline=True
             )
         
-        top_users = await self.db.users.find().sort("total_claims", -1).limit(5).to_list(5)
+        top_users = await self.bot.leaderboards.top("claims", 0, 5)
         if top_users:
             user_text = []
-            for i, user in enumerate(top_users, 1):
-                user_text.append(f"{i}. <@{user['user_id']}>: **{user.get('total_claims', 0)}** claims")
+            for i, (user_id, claims) in enumerate(top_users, 1):
+                user_text.append(f"{i}. <@{user_id}>: **{int(claims)}** claims")
             embed.add_field(
                 name="🏆 Top Cookie Claimers",
                 value="\n".join(user_text),
@@ -540,15 +481,15 @@ class AnalyticsCog(commands.Cog):
         
         command_data = await self.db.analytics.find_one({"_id": "command_usage"})
         if command_data and command_data.get("commands"):
-            total_guilds = set()
-            for cmd_data in command_data["commands"].values():
-                guilds = cmd_data.get("guilds", [])
-                total_guilds.update(guilds)
+            # Union of the per-command guild sketches
+            total_guilds = await self.distinct.count_union(
+                f"command_guilds:{cmd}" for cmd in command_data["commands"]
+            )
             
             embed.add_field(
                 name="💬 Activity",
-                value=f"**Active Servers:** {len(total_guilds)}\n"
-                      f"**Inactive:** {active_in_bot - len(total_guilds)}",
+                value=f"**Active Servers:** {total_guilds}\n"
+                      f"**Inactive:** {max(0, active_in_bot - total_guilds)}",
                 inline=True
             )
         
@@ -562,58 +503,59 @@ class AnalyticsCog(commands.Cog):
         
         await ctx.defer()
         
-        valid_periods = ["day", "week", "month"]
-        if period not in valid_periods:
-            await ctx.send(f"❌ Invalid period! Use: {', '.join(valid_periods)}", ephemeral=True)
+        windows = {"hour": timedelta(hours=1), "day": timedelta(days=1),
+                   "week": timedelta(weeks=1), "month": timedelta(days=30)}
+        if period not in windows:
+            await ctx.send(f"❌ Invalid period! Use: {', '.join(windows)}", ephemeral=True)
             return
         
-        command_data = await self.db.analytics.find_one({"_id": "command_usage"})
-        cookie_data = await self.db.analytics.find_one({"_id": "cookie_extractions"})
+        # Compare the last period with the one before it
+        now = datetime.now(timezone.utc)
+        split = now - windows[period]
+        start = split - windows[period]
         
         embed = discord.Embed(
             title=f"📈 {period.title()} Trends",
+            description=f"Last {period} compared with the {period} before",
             color=discord.Color.teal(),
-            timestamp=datetime.now(timezone.utc)
+            timestamp=now
         )
         
-        period_key = {"day": "today", "week": "this_week", "month": "this_month"}[period]
-        
-        if command_data and command_data.get("commands"):
-            cmd_trends = []
-            for cmd, data in command_data["commands"].items():
-                count = data.get(period_key, 0)
-                if count > 0:
-                    cmd_trends.append((cmd, count))
-            
-            cmd_trends.sort(key=lambda x: x[1], reverse=True)
-            if cmd_trends:
-                trend_text = "\n".join([f"**{cmd}:** {count}" for cmd, count in cmd_trends[:5]])
-                embed.add_field(
-                    name=f"🎯 Top Commands ({period})",
-                    value=trend_text,
-                    inline=False
-                )
+        def trend_lines(totals):
+            rows = sorted(((name, after, before) for name, (before, after) in totals.items() if after > 0),
+                          key=lambda x: x[1], reverse=True)
+            lines = []
+            for name, count, previous in rows[:5]:
+                if previous:
+                    change = f"{(count - previous) / previous * 100:+.0f}%"
+                else:
+                    change = "new"
+                lines.append(f"**{name}:** {count} ({change})")
+            return lines
+        
+        command_totals = await self.rollups.totals("command", start, now, split=split)
+        cookie_totals = await self.rollups.totals("cookie", start, now, split=split)
+        
+        cmd_lines = trend_lines(command_totals)
+        if cmd_lines:
+            embed.add_field(
+                name=f"🎯 Top Commands ({period})",
+                value="\n".join(cmd_lines),
+                inline=False
+            )
         
-        if cookie_data and cookie_data.get("cookies"):
-            cookie_trends = []
-            for cookie, data in cookie_data["cookies"].items():
-                count = data.get(period_key, 0)
-                if count > 0:
-                    cookie_trends.append((cookie, count))
-            
-            cookie_trends.sort(key=lambda x: x[1], reverse=True)
-            if cookie_trends:
-                cookie_text = "\n".join([f"**{cookie}:** {count}" for cookie, count in cookie_trends[:5]])
-                embed.add_field(
-                    name=f"🍪 Top Cookies ({period})",
-                    value=cookie_text,
-                    inline=False
-                )
+        cookie_lines = trend_lines(cookie_totals)
+        if cookie_lines:
+            embed.add_field(
+                name=f"🍪 Top Cookies ({period})",
+                value="\n".join(cookie_lines),
+                inline=False
+            )
         
         embed.add_field(
             name="📊 Total Activity",
-            value=f"**Commands:** {sum(c[1] for c in cmd_trends) if 'cmd_trends' in locals() else 0}\n"
-                  f"**Cookies:** {cookie_data.get(f'total_{period_key}', 0) if cookie_data else 0}",
+            value=f"**Commands:** {sum(after for _, after in command_totals.values())}\n"
+                  f"**Cookies:** {sum(after for _, after in cookie_totals.values())}",
             inline=False
         )
         
@@ -2,13 +2,13 @@ import discord
 from discord.ext import commands, tasks
 from discord import app_commands
 import os
-import random
-from datetime import datetime, timedelta, timezone, time
+from datetime import datetime, timedelta, timezone
 import traceback
 from typing import List, Dict, Optional
 import asyncio
 import aiofiles
 import json
+from pymongo import ReturnDocument
 
 class CookieView(discord.ui.View):
     def __init__(self, cog, user_id):
@@ -35,7 +35,7 @@ class CookieView(discord.ui.View):
         return True
 
 class CookieSelectMenu(discord.ui.Select):
-    def __init__(self, server_data, user_data, member, costs_dict, access_dict, daily_limits):
+    def __init__(self, server_data, user_data, member, costs_dict, access_dict, daily_limits, stock_index):
         self.server_data = server_data
         self.user_data = user_data
         self.member = member
@@ -49,7 +49,7 @@ class CookieSelectMenu(discord.ui.Select):
                 cost = self.costs_dict.get(cookie_type, config["cost"])
                 can_afford = user_data["points"] >= cost
                 
-                daily_claimed = user_data.get("daily_claims", {}).get(cookie_type, {}).get("count", 0)
+                daily_claimed = CookieCog.claims_today(user_data, cookie_type)
                 daily_limit = self.daily_limits.get(cookie_type, -1)
                 limit_reached = daily_limit != -1 and daily_claimed >= daily_limit
                 
@@ -60,11 +60,7 @@ class CookieSelectMenu(discord.ui.Select):
                     emoji = "🟢" if can_afford else "🔴"
                     status = f"{cost} points | Stock: "
                     
-                    directory = config["directory"]
-                    stock = 0
-                    if os.path.exists(directory):
-                        stock = len([f for f in os.listdir(directory) if f.endswith('.txt')])
-                    status += str(stock)
+                    status += str(stock_index.count(config["directory"]))
                 
                 options.append(
                     discord.SelectOption(
@@ -126,14 +122,57 @@ class CookieProgressEmbed:
         embed.set_footer(text=f"Step {step+1}/{total}")
         return embed
 
+class ClaimProgress:
+    """Claim progress display for the server's claim_ui_mode.
+
+    "animated" shows every step with a short pause. "fast" sends only the final
+    message, unless the claim is slow enough that a progress message is useful.
+    """
+    
+    def __init__(self, interaction: discord.Interaction, mode: str = "animated", slow_after: float = 2.0):
+        self.interaction = interaction
+        self.animated = mode != "fast"
+        self.slow_after = slow_after
+        self.started = asyncio.get_running_loop().time()
+        self.message = None
+    
+    async def start(self):
+        if self.animated:
+            self.message = await self.interaction.followup.send(
+                embed=CookieProgressEmbed.create_claim_progress(0),
+                ephemeral=True
+            )
+    
+    async def step(self, step: int):
+        if self.animated:
+            await asyncio.sleep(0.5)
+        elif not self.message:
+            if asyncio.get_running_loop().time() - self.started < self.slow_after:
+                return
+            self.message = await self.interaction.followup.send(
+                embed=CookieProgressEmbed.create_claim_progress(step),
+                ephemeral=True
+            )
+            return
+        await self.message.edit(embed=CookieProgressEmbed.create_claim_progress(step))
+    
+    async def show(self, embed: discord.Embed, view: discord.ui.View = None):
+        if self.message:
+            if view:
+                await self.message.edit(embed=embed, view=view)
+            else:
+                await self.message.edit(embed=embed)
+        elif view:
+            self.message = await self.interaction.followup.send(embed=embed, view=view, ephemeral=True)
+        else:
+            self.message = await self.interaction.followup.send(embed=embed, ephemeral=True)
+
 class CookieCog(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         self.db = bot.db
         self.clear_role_cache.start()
-        self.reset_daily_claims.start()
         self.active_claims = {}
-        self.cooldown_cache = {}
         self.role_cache = {}
         self.access_cache = {}
         
@@ -159,7 +198,6 @@ class CookieCog(commands.Cog):
                 "total_claims": 0,
                 "blacklisted": False,
                 "blacklist_expires": None,
-                "invited_users": [],
                 "pending_invites": 0,
                 "verified_invites": 0,
                 "fake_invites": 0,
@@ -184,13 +222,16 @@ class CookieCog(commands.Cog):
     
     async def log_action(self, guild_id: int, message: str, color: discord.Color = discord.Color.blue()):
         try:
-            server = await self.db.servers.find_one({"server_id": guild_id})
+            server = await self.bot.config_cache.get_server(guild_id)
             if not server:
                 return
                 
             log_channel_id = server["channels"].get("log")
             if log_channel_id:
                 channel = self.bot.get_channel(log_channel_id)
+                if not channel and not self.bot.cluster.owns_guild(guild_id):
+                    # Another cluster caches that guild; post through the REST API instead
+                    channel = self.bot.get_partial_messageable(log_channel_id)
                 if channel:
                     embed = discord.Embed(
                         description=message,
@@ -200,10 +241,12 @@ class CookieCog(commands.Cog):
                     embed.set_author(name="Cookie System", icon_url=self.bot.user.avatar.url)
                     await channel.send(embed=embed)
             
-            config = await self.db.config.find_one({"_id": "bot_config"})
+            config = await self.bot.config_cache.get_config()
             main_server_id = config.get("main_server_id")
             if config and config.get("main_log_channel") and guild_id != main_server_id:
                 main_log = self.bot.get_channel(config["main_log_channel"])
+                if not main_log and self.bot.cluster.clustered:
+                    main_log = self.bot.get_partial_messageable(config["main_log_channel"])
                 if main_log:
                     guild = self.bot.get_guild(guild_id)
                     embed = discord.Embed(
@@ -215,7 +258,8 @@ class CookieCog(commands.Cog):
         except Exception as e:
             print(f"Error logging action: {e}")
     
-    async def update_statistics(self, cookie_type: str, user_id: int):
+    async def update_statistics(self, cookie_type: str):
+        # The per-user favorite cookie is maintained by claim_cookie
         try:
             await self.db.statistics.update_one(
                 {"_id": "global_stats"},
@@ -227,23 +271,12 @@ class CookieCog(commands.Cog):
                     }
                 }
             )
-            
-            user_claims = await self.db.users.find_one(
-                {"user_id": user_id},
-                {f"cookie_claims.{cookie_type}": 1}
-            )
-            
-            if user_claims and user_claims.get("cookie_claims", {}).get(cookie_type, 0) > 5:
-                await self.db.users.update_one(
-                    {"user_id": user_id},
-                    {"$set": {"statistics.favorite_cookie": cookie_type}}
-                )
         except Exception as e:
             print(f"Error updating statistics: {e}")
     
     async def check_maintenance(self, ctx) -> bool:
         try:
-            config = await self.bot.db.config.find_one({"_id": "bot_config"})
+            config = await self.bot.config_cache.get_config()
             if not config:
                 return True  # Allow if no config found
                 
@@ -283,14 +316,6 @@ class CookieCog(commands.Cog):
     
     def clear_user_cache(self, user_id: int):
         keys_to_remove = []
-        
-        for key in list(self.cooldown_cache.keys()):
-            if key.startswith(f"{user_id}:"):
-                keys_to_remove.append(key)
-        for key in keys_to_remove:
-            self.cooldown_cache.pop(key, None)
-        
-        keys_to_remove = []
         for key in list(self.role_cache.keys()):
             if key.startswith(f"{user_id}:"):
                 keys_to_remove.append(key)
@@ -319,7 +344,7 @@ class CookieCog(commands.Cog):
         best_config = {}
         highest_priority = -1
         
-        server = await self.db.servers.find_one({"server_id": member.guild.id})
+        server = await self.bot.config_cache.get_server(member.guild.id)
         if not server or not server.get("roles"):
             return {}
         
@@ -355,6 +380,20 @@ class CookieCog(commands.Cog):
             "daily_limit": cookie_access.get("daily_limit", -1)
         }
     
+    @staticmethod
+    def claims_today(user_data: Dict, cookie_type: str) -> int:
+        """Claims of a cookie type made today (UTC).
+
+        daily_claims.<type> is {"date": "YYYY-MM-DD", "count": n}; a counter from an
+        earlier day reads as zero, so there is nothing to reset at midnight.
+        """
+        entry = (user_data or {}).get("daily_claims", {}).get(cookie_type) or {}
+        day = entry.get("date")
+        if day is None and isinstance(entry.get("last_claim"), datetime):
+            # Counters written before dates were stored
+            day = entry["last_claim"].strftime("%Y-%m-%d")
+        return entry.get("count", 0) if day == datetime.now(timezone.utc).strftime("%Y-%m-%d") else 0
+    
     async def check_daily_limit(self, user_id: int, cookie_type: str, limit: int) -> tuple[bool, int]:
         if limit == -1:
             return True, 0
@@ -362,136 +401,189 @@ class CookieCog(commands.Cog):
         user = await self.db.users.find_one({"user_id": user_id})
         if not user:
             return True, 0
-            
-        daily_claims = user.get("daily_claims", {}).get(cookie_type, {})
-        
-        last_claim = daily_claims.get("last_claim")
-        if last_claim:
-            if isinstance(last_claim, str):
-                last_claim = datetime.fromisoformat(last_claim.replace('Z', '+00:00'))
-            if last_claim.tzinfo is None:
-                last_claim = last_claim.replace(tzinfo=timezone.utc)
-                
-            now = datetime.now(timezone.utc)
-            if last_claim.date() < now.date():
-                return True, 0
         
-        current_count = daily_claims.get("count", 0)
+        current_count = self.claims_today(user, cookie_type)
         return current_count < limit, current_count
     
-    async def update_daily_claim(self, user_id: int, cookie_type: str):
+    async def claim_cookie(self, member: discord.Member, cookie_type: str, cost: int, cooldown_hours: float,
+                           daily_limit: int, selected_file: str, role_config: Dict, feedback_deadline: datetime) -> Optional[Dict]:
+        """Check and charge a claim in a single conditional update.
+
+        Returns the updated user document, or None if the user is missing, blacklisted,
+        on cooldown, over their daily limit or can't afford the cookie.
+        """
         now = datetime.now(timezone.utc)
+        today = now.strftime("%Y-%m-%d")
+        daily_path = f"daily_claims.{cookie_type}"
         
-        user = await self.db.users.find_one({"user_id": user_id})
-        daily_claims = user.get("daily_claims", {}).get(cookie_type, {})
+        conditions = [
+            {"$or": [{"blacklisted": {"$ne": True}}, {"blacklist_expires": {"$lte": now}}]},
+            {"$or": [
+                {"last_claim.type": {"$ne": cookie_type}},
+                {"last_claim.date": {"$lte": now - timedelta(hours=cooldown_hours)}}
+            ]}
+        ]
+        if daily_limit != -1:
+            # The counter only counts while its date is today
+            conditions.append({"$or": [
+                {f"{daily_path}.count": {"$not": {"$gte": daily_limit}}},
+                {f"{daily_path}.date": {"$exists": True, "$ne": today}},
+                {f"{daily_path}.date": {"$exists": False},
+                 f"{daily_path}.last_claim": {"$lt": now.replace(hour=0, minute=0, second=0, microsecond=0)}}
+            ]})
         
-        last_claim = daily_claims.get("last_claim")
-        if last_claim:
-            if isinstance(last_claim, str):
-                last_claim = datetime.fromisoformat(last_claim.replace('Z', '+00:00'))
-            if last_claim.tzinfo is None:
-                last_claim = last_claim.replace(tzinfo=timezone.utc)
-                
-            if last_claim.date() < now.date():
-                count = 1
-            else:
-                count = daily_claims.get("count", 0) + 1
-        else:
-            count = 1
+        claimed_day = {"$ifNull": [f"${daily_path}.date",
+                                   {"$dateToString": {"format": "%Y-%m-%d", "date": f"${daily_path}.last_claim"}}]}
+        claimed_count = {"$add": [{"$ifNull": [f"${daily_path}.count", 0]}, 1]}
+        cookie_count = {"$add": [{"$ifNull": [f"$cookie_claims.{cookie_type}", 0]}, 1]}
+        
+        pipeline = [{
+            "$set": {
+                "points": {"$subtract": ["$points", cost]},
+                "total_spent": {"$add": [{"$ifNull": ["$total_spent", 0]}, cost]},
+                "weekly_claims": {"$add": [{"$ifNull": ["$weekly_claims", 0]}, 1]},
+                "total_claims": {"$add": [{"$ifNull": ["$total_claims", 0]}, 1]},
+                f"cookie_claims.{cookie_type}": cookie_count,
+                daily_path: {
+                    "date": today,
+                    "count": {"$cond": [{"$eq": [claimed_day, today]}, claimed_count, 1]}
+                },
+                "statistics.favorite_cookie": {
+                    "$cond": [{"$gt": [cookie_count, 5]}, cookie_type, {"$ifNull": ["$statistics.favorite_cookie", None]}]
+                },
+                "last_active": now,
+                # Kept so a failed delivery can be rolled back by refund_claim
+                "previous_claim": {"$ifNull": ["$last_claim", None]},
+                "last_claim": {"$literal": {
+                    "date": now,
+                    "type": cookie_type,
+                    "file": selected_file,
+                    "server_id": member.guild.id,
+                    "feedback_deadline": feedback_deadline,
+                    "feedback_given": False,
+                    "cost_paid": cost,
+                    "cooldown_applied": cooldown_hours,
+                    "role_benefits_applied": role_config.get("name") if role_config else None
+                }}
+            }
+        }]
+        
+        user_data = await self.db.users.find_one_and_update(
+            {"user_id": member.id, "points": {"$gte": cost}, "$and": conditions},
+            pipeline,
+            return_document=ReturnDocument.AFTER
+        )
+        if user_data:
+            self.bot.leaderboards.observe(user_data)
+        return user_data
+    
+    async def refund_claim(self, user_data: Dict):
+        """Undo a claim made by claim_cookie when the cookie couldn't be delivered"""
+        claim = user_data["last_claim"]
+        cookie_type = claim["type"]
+        cost = claim["cost_paid"]
+        daily_path = f"daily_claims.{cookie_type}"
         
         await self.db.users.update_one(
-            {"user_id": user_id},
-            {
+            {"user_id": user_data["user_id"], "last_claim.date": claim["date"]},
+            [{
                 "$set": {
-                    f"daily_claims.{cookie_type}": {
-                        "count": count,
-                        "last_claim": now
-                    }
+                    "points": {"$add": ["$points", cost]},
+                    "total_spent": {"$subtract": ["$total_spent", cost]},
+                    "weekly_claims": {"$subtract": ["$weekly_claims", 1]},
+                    "total_claims": {"$subtract": ["$total_claims", 1]},
+                    f"cookie_claims.{cookie_type}": {"$subtract": [f"$cookie_claims.{cookie_type}", 1]},
+                    f"{daily_path}.count": {"$subtract": [f"${daily_path}.count", 1]},
+                    "last_claim": "$previous_claim"
                 }
-            }
+            }]
+        )
+        self.bot.leaderboards.touch(user_data["user_id"])
+    
+    def claim_rejection_embed(self, user_data: Dict, cookie_type: str, cost: int, cooldown_hours: float, daily_limit: int) -> discord.Embed:
+        """Explain why claim_cookie refused a claim"""
+        now = datetime.now(timezone.utc)
+        
+        expires = user_data.get("blacklist_expires")
+        if expires and expires.tzinfo is None:
+            expires = expires.replace(tzinfo=timezone.utc)
+        if user_data.get("blacklisted") and (not expires or expires > now):
+            embed = discord.Embed(
+                title="🚫 You're Blacklisted",
+                description="You cannot claim cookies until your blacklist expires.",
+                color=discord.Color.red()
+            )
+            if expires:
+                embed.add_field(name="Expires", value=f"<t:{int(expires.timestamp())}:R>", inline=False)
+            return embed
+        
+        if daily_limit != -1:
+            claimed_today = self.claims_today(user_data, cookie_type)
+            if claimed_today >= daily_limit:
+                embed = discord.Embed(
+                    title="🚫 Daily Limit Reached",
+                    description=f"You've reached your daily limit for **{cookie_type}** cookies!",
+                    color=discord.Color.red()
+                )
+                embed.add_field(name="Your Limit", value=f"{daily_limit} per day", inline=True)
+                embed.add_field(name="Claimed Today", value=str(claimed_today), inline=True)
+                embed.add_field(name="Reset Time", value="Midnight UTC", inline=True)
+                embed.set_footer(text="Get a better role for higher limits!")
+                return embed
+        
+        last_claim = user_data.get("last_claim")
+        if isinstance(last_claim, dict) and last_claim.get("type") == cookie_type and last_claim.get("date"):
+            claim_date = last_claim["date"]
+            if claim_date.tzinfo is None:
+                claim_date = claim_date.replace(tzinfo=timezone.utc)
+            
+            time_passed = now - claim_date
+            if time_passed < timedelta(hours=cooldown_hours):
+                remaining = timedelta(hours=cooldown_hours) - time_passed
+                hours = int(remaining.total_seconds() // 3600)
+                minutes = int((remaining.total_seconds() % 3600) // 60)
+                
+                embed = discord.Embed(
+                    title="⏰ Cooldown Active",
+                    description=f"You need to wait before claiming another **{cookie_type}** cookie!",
+                    color=discord.Color.red()
+                )
+                embed.add_field(name="Time Remaining", value=f"**{hours}h {minutes}m**", inline=False)
+                embed.add_field(name="Your Cooldown", value=f"**{cooldown_hours}** hours", inline=True)
+                embed.set_footer(text="Try a different cookie type or get a better role!")
+                return embed
+        
+        points = user_data.get("points", 0)
+        if points < cost:
+            embed = discord.Embed(
+                title="❌ Insufficient Points",
+                description=f"You need **{cost}** points to claim a **{cookie_type}** cookie!",
+                color=discord.Color.red()
+            )
+            embed.add_field(name="Your Balance", value=f"**{points}** points", inline=True)
+            embed.add_field(name="Required", value=f"**{cost}** points", inline=True)
+            embed.add_field(name="Need More", value=f"**{cost - points}** points", inline=True)
+            embed.set_footer(text="Use /daily or invite friends to earn points!")
+            return embed
+        
+        # The document changed between the claim and this read, e.g. a parallel claim
+        return discord.Embed(
+            title="⏳ Claim Not Processed",
+            description="Your account was updated while claiming. Please try again!",
+            color=discord.Color.orange()
         )
     
     @tasks.loop(minutes=5)
     async def clear_role_cache(self):
-        self.cooldown_cache.clear()
         self.role_cache.clear()
         self.access_cache.clear()
     
-    @tasks.loop(time=time(hour=0, minute=0, tzinfo=timezone.utc))
-    async def reset_daily_claims(self):
-        try:
-            print("🔄 Resetting daily cookie claims...")
-            
-            now = datetime.now(timezone.utc)
-            reset_date = now.replace(hour=0, minute=0, second=0, microsecond=0)
-            
-            users_to_reset = await self.db.users.count_documents({
-                "daily_claims": {"$exists": True, "$ne": {}}
-            })
-            
-            if users_to_reset > 0:
-                result = await self.db.users.update_many(
-                    {"daily_claims": {"$exists": True, "$ne": {}}},
-                    {
-                        "$set": {"daily_claims": {}},
-                        "$push": {
-                            "claim_history": {
-                                "date": reset_date,
-                                "action": "daily_reset",
-                                "timestamp": now
-                            }
-                        }
-                    }
-                )
-                
-                print(f"✅ Reset daily claims for {result.modified_count} users")
-                
-                await self.db.analytics.insert_one({
-                    "type": "daily_reset",
-                    "timestamp": now,
-                    "users_reset": result.modified_count,
-                    "reset_date": reset_date
-                })
-                
-                config = await self.db.config.find_one({"_id": "bot_config"})
-                if config and config.get("main_log_channel"):
-                    channel = self.bot.get_channel(config["main_log_channel"])
-                    if channel:
-                        embed = discord.Embed(
-                            title="🔄 Daily Claims Reset",
-                            description=f"Reset daily cookie claims for **{result.modified_count}** users",
-                            color=discord.Color.blue(),
-                            timestamp=now
-                        )
-                        embed.add_field(name="Reset Time", value=f"<t:{int(now.timestamp())}:F>", inline=True)
-                        embed.add_field(name="Next Reset", value=f"<t:{int((now + timedelta(days=1)).timestamp())}:R>", inline=True)
-                        await channel.send(embed=embed)
-            else:
-                print("✅ No users needed daily claim reset")
-                
-        except Exception as e:
-            print(f"❌ Error in daily claims reset: {e}")
-            import traceback
-            traceback.print_exc()
-    
     @clear_role_cache.before_loop
     async def before_clear_role_cache(self):
         await self.bot.wait_until_ready()
         
-    @reset_daily_claims.before_loop
-    async def before_reset_daily_claims(self):
-        await self.bot.wait_until_ready()
-        
-        now = datetime.now(timezone.utc)
-        next_midnight = (now + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
-        seconds_until_midnight = (next_midnight - now).total_seconds()
-        
-        print(f"⏰ Daily reset task will start in {seconds_until_midnight/3600:.2f} hours (at midnight UTC)")
-        
-        await asyncio.sleep(seconds_until_midnight)
-    
     async def cookie_autocomplete(self, interaction: discord.Interaction, current: str) -> List[app_commands.Choice[str]]:
-        server = await self.db.servers.find_one({"server_id": interaction.guild_id})
+        server = await self.bot.config_cache.get_server(interaction.guild_id)
         if not server:
             return []
         
@@ -525,21 +617,18 @@ class CookieCog(commands.Cog):
         return choices[:25]
     
     async def process_cookie_claim(self, interaction: discord.Interaction, cookie_type: str):
+        reservation = None
         try:
             if interaction.user.id in self.active_claims:
                 await interaction.followup.send("⏳ Please wait for your current claim to complete!", ephemeral=True)
                 del self.active_claims[interaction.user.id]
                 return
             
-            self.active_claims[interaction.user.id] = True
-            
-            progress_msg = await interaction.followup.send(
-                embed=CookieProgressEmbed.create_claim_progress(0),
-                ephemeral=True
-            )
+            self.active_claims[interaction.user.id] = datetime.now(timezone.utc)
             
-            server = await self.db.servers.find_one({"server_id": interaction.guild_id})
-            user_data = await self.get_or_create_user(interaction.user.id, str(interaction.user))
+            server = await self.bot.config_cache.get_server(interaction.guild_id)
+            progress = ClaimProgress(interaction, server.get("settings", {}).get("claim_ui_mode", "animated"))
+            await progress.start()
             
             access = await self.get_user_cookie_access(interaction.user, server, cookie_type)
             
@@ -554,94 +643,14 @@ class CookieCog(commands.Cog):
                     value="Get a higher role or ask an admin to configure your role's access.",
                     inline=False
                 )
-                await progress_msg.edit(embed=embed)
+                await progress.show(embed)
                 del self.active_claims[interaction.user.id]
                 return
             
             daily_limit = access.get("daily_limit", -1)
-            can_claim, claimed_today = await self.check_daily_limit(interaction.user.id, cookie_type, daily_limit)
-            
-            if not can_claim:
-                embed = discord.Embed(
-                    title="🚫 Daily Limit Reached",
-                    description=f"You've reached your daily limit for **{cookie_type}** cookies!",
-                    color=discord.Color.red()
-                )
-                embed.add_field(name="Your Limit", value=f"{daily_limit} per day", inline=True)
-                embed.add_field(name="Claimed Today", value=str(claimed_today), inline=True)
-                embed.add_field(name="Reset Time", value="Midnight UTC", inline=True)
-                embed.set_footer(text="Get a better role for higher limits!")
-                
-                await progress_msg.edit(embed=embed)
-                del self.active_claims[interaction.user.id]
-                return
-            
-            await asyncio.sleep(0.5)
-            await progress_msg.edit(embed=CookieProgressEmbed.create_claim_progress(1))
-            
             cooldown_hours = access.get("cooldown", server["cookies"][cookie_type]["cooldown"])
-            
-            if user_data.get("last_claim"):
-                last_claim = user_data["last_claim"]
-                
-                # Handle both old format (datetime) and new format (dict)
-                if isinstance(last_claim, datetime):
-                    # Old format - convert to new format
-                    claim_date = last_claim
-                    claim_type = None
-                elif isinstance(last_claim, dict):
-                    # New format
-                    claim_date = last_claim.get("date")
-                    claim_type = last_claim.get("type")
-                else:
-                    # Unknown format - skip cooldown check
-                    claim_date = None
-                    claim_type = None
-                
-                # Check cooldown if we have valid data
-                if claim_date and claim_type == cookie_type:
-                    if claim_date.tzinfo is None:
-                        claim_date = claim_date.replace(tzinfo=timezone.utc)
-                    
-                    time_passed = datetime.now(timezone.utc) - claim_date
-                    if time_passed < timedelta(hours=cooldown_hours):
-                        remaining = timedelta(hours=cooldown_hours) - time_passed
-                        hours = int(remaining.total_seconds() // 3600)
-                        minutes = int((remaining.total_seconds() % 3600) // 60)
-                        
-                        embed = discord.Embed(
-                            title="⏰ Cooldown Active",
-                            description=f"You need to wait before claiming another **{cookie_type}** cookie!",
-                            color=discord.Color.red()
-                        )
-                        embed.add_field(name="Time Remaining", value=f"**{hours}h {minutes}m**", inline=False)
-                        embed.add_field(name="Your Cooldown", value=f"**{cooldown_hours}** hours", inline=True)
-                        embed.set_footer(text="Try a different cookie type or get a better role!")
-                        
-                        await progress_msg.edit(embed=embed)
-                        del self.active_claims[interaction.user.id]
-                        return
-            
-            await asyncio.sleep(0.5)
-            await progress_msg.edit(embed=CookieProgressEmbed.create_claim_progress(2))
-            
             cost = access.get("cost", server["cookies"][cookie_type]["cost"])
             
-            if user_data["points"] < cost:
-                embed = discord.Embed(
-                    title="❌ Insufficient Points",
-                    description=f"You need **{cost}** points to claim a **{cookie_type}** cookie!",
-                    color=discord.Color.red()
-                )
-                embed.add_field(name="Your Balance", value=f"**{user_data['points']}** points", inline=True)
-                embed.add_field(name="Required", value=f"**{cost}** points", inline=True)
-                embed.add_field(name="Need More", value=f"**{cost - user_data['points']}** points", inline=True)
-                embed.set_footer(text="Use /daily or invite friends to earn points!")
-                
-                await progress_msg.edit(embed=embed)
-                del self.active_claims[interaction.user.id]
-                return
-            
             directory = server["cookies"][cookie_type]["directory"]
             if not os.path.exists(directory):
                 embed = discord.Embed(
@@ -649,27 +658,49 @@ class CookieCog(commands.Cog):
                     description="Cookie directory not found! Please contact an administrator.",
                     color=discord.Color.red()
                 )
-                await progress_msg.edit(embed=embed)
+                await progress.show(embed)
                 del self.active_claims[interaction.user.id]
                 return
             
-            files = [f for f in os.listdir(directory) if f.endswith('.txt')]
-            if not files:
+            # The file is moved out of stock until it is delivered, so no one else can get it
+            reservation = await self.bot.stock_index.reserve(directory)
+            if not reservation:
                 embed = discord.Embed(
                     title="📦 Out of Stock",
                     description=f"No **{cookie_type}** cookies available!\nPlease try again later or choose a different type.",
                     color=discord.Color.red()
                 )
-                await progress_msg.edit(embed=embed)
+                await progress.show(embed)
+                del self.active_claims[interaction.user.id]
+                return
+            
+            selected_file = reservation.name
+            file_path = reservation.path
+            
+            role_config = await self.get_user_role_config(interaction.user, server)
+            config = await self.bot.config_cache.get_config()
+            feedback_deadline = datetime.now(timezone.utc) + timedelta(minutes=config.get("feedback_minutes", 15))
+            
+            user_data = await self.claim_cookie(
+                interaction.user, cookie_type, cost, cooldown_hours, daily_limit,
+                selected_file, role_config, feedback_deadline
+            )
+            
+            if not user_data:
+                # Only rejected claims pay for a second read, to explain the rejection
+                user_data = await self.get_or_create_user(interaction.user.id, str(interaction.user))
+                embed = self.claim_rejection_embed(user_data, cookie_type, cost, cooldown_hours, daily_limit)
+                await self.bot.stock_index.release(reservation)
+                await progress.show(embed)
                 del self.active_claims[interaction.user.id]
                 return
             
-            selected_file = random.choice(files)
-            file_path = os.path.join(directory, selected_file)
+            claimed_today = user_data.get("daily_claims", {}).get(cookie_type, {}).get("count", 1)
+            
+            await progress.step(1)
+            await progress.step(2)
             
             try:
-                await self.update_daily_claim(interaction.user.id, cookie_type)
-                
                 embed = discord.Embed(
                     title=f"🍪 {cookie_type.upper()} Cookie Delivery",
                     description=f"Your fresh **{cookie_type}** cookie is ready!",
@@ -677,13 +708,13 @@ class CookieCog(commands.Cog):
                 )
                 embed.add_field(name="📁 File", value=f"`{selected_file}`", inline=True)
                 embed.add_field(name="💰 Cost", value=f"{cost} points", inline=True)
-                embed.add_field(name="📊 Balance", value=f"{user_data['points'] - cost} points", inline=True)
+                embed.add_field(name="📊 Balance", value=f"{user_data['points']} points", inline=True)
                 embed.add_field(name="⏰ Your Cooldown", value=f"{cooldown_hours} hours", inline=True)
                 
                 if daily_limit != -1:
                     embed.add_field(
                         name="📅 Daily Claims",
-                        value=f"{claimed_today + 1}/{daily_limit}",
+                        value=f"{claimed_today}/{daily_limit}",
                         inline=True
                     )
                 
@@ -693,67 +724,62 @@ class CookieCog(commands.Cog):
                     inline=False
                 )
                 
-                role_config = await self.get_user_role_config(interaction.user, server)
                 if role_config and role_config.get("name"):
                     embed.set_footer(text=f"Claimed with {role_config['name']} benefits! 🍪")
                 else:
                     embed.set_footer(text="Enjoy your cookie! 🍪")
                 
-                dm_message = await interaction.user.send(
-                    embed=embed,
-                    file=discord.File(file_path)
-                )
+                try:
+                    dm_message = await interaction.user.send(
+                        embed=embed,
+                        file=discord.File(file_path)
+                    )
+                except Exception:
+                    await self.refund_claim(user_data)
+                    await self.bot.stock_index.release(reservation)
+                    raise
                 
-                config = await self.db.config.find_one({"_id": "bot_config"})
-                feedback_deadline = datetime.now(timezone.utc) + timedelta(minutes=config.get("feedback_minutes", 15))
+                await self.bot.stock_index.commit(reservation)
                 
-                await self.db.users.update_one(
-                    {"user_id": interaction.user.id},
-                    {
-                        "$set": {
-                            "points": user_data["points"] - cost,
-                            "last_claim": {
-                                "date": datetime.now(timezone.utc),
-                                "type": cookie_type,
-                                "file": selected_file,
-                                "server_id": interaction.guild_id,
-                                "feedback_deadline": feedback_deadline,
-                                "feedback_given": False,
-                                "cost_paid": cost,
-                                "cooldown_applied": cooldown_hours,
-                                "role_benefits_applied": role_config.get("name") if role_config else None
-                            }
-                        },
-                        "$inc": {
-                            "total_spent": cost,
-                            f"cookie_claims.{cookie_type}": 1,
-                            "weekly_claims": 1,
-                            "total_claims": 1
-                        }
-                    }
-                )
+                # Claim history lives in cookie_logs (TTL-indexed) rather than on the user
+                await self.db.cookie_logs.insert_one({
+                    "user_id": interaction.user.id,
+                    "server_id": interaction.guild.id,
+                    "cookie_type": cookie_type,
+                    "file": selected_file,
+                    "cost": cost,
+                    "day": user_data["daily_claims"][cookie_type]["date"],
+                    "timestamp": user_data["last_claim"]["date"]
+                })
+                
+                feedback_cog = self.bot.get_cog("FeedbackCog")
+                if feedback_cog:
+                    # Other clusters' claims reach the DM cluster's heap through its periodic resync
+                    if self.bot.cluster.handles_dms:
+                        feedback_cog.schedule_deadline(interaction.user.id, user_data["last_claim"])
+                    await feedback_cog.schedule_reminders(interaction.user.id, user_data["last_claim"])
                 
-                await self.update_statistics(cookie_type, interaction.user.id)
+                await self.update_statistics(cookie_type)
                 
                 analytics_cog = self.bot.get_cog("AnalyticsCog")
                 if analytics_cog:
                     await analytics_cog.track_cookie_extraction(cookie_type, interaction.user.id, selected_file)
                     await analytics_cog.track_active_user(interaction.user.id, str(interaction.user))
                 
-                await asyncio.sleep(0.5)
+                await progress.step(3)
                 success_embed = discord.Embed(
                     title="✅ Cookie Delivered!",
                     description=f"Your **{cookie_type}** cookie has been sent to your DMs!",
                     color=discord.Color.green()
                 )
                 success_embed.add_field(name="💰 Transaction", value=f"-{cost} points", inline=True)
-                success_embed.add_field(name="📊 New Balance", value=f"{user_data['points'] - cost} points", inline=True)
+                success_embed.add_field(name="📊 New Balance", value=f"{user_data['points']} points", inline=True)
                 success_embed.add_field(name="⏰ Cooldown", value=f"{cooldown_hours} hours", inline=True)
                 
                 if daily_limit != -1:
                     success_embed.add_field(
                         name="📅 Daily Status",
-                        value=f"Claims today: {claimed_today + 1}/{daily_limit}",
+                        value=f"Claims today: {claimed_today}/{daily_limit}",
                         inline=True
                     )
                 
@@ -798,7 +824,7 @@ class CookieCog(commands.Cog):
                 view.add_item(button1)
                 view.add_item(button2)
                 
-                await progress_msg.edit(embed=success_embed, view=view)
+                await progress.show(success_embed, view)
                 
                 await self.log_action(
                     interaction.guild_id,
@@ -817,7 +843,7 @@ class CookieCog(commands.Cog):
                     value="• Enable DMs from server members\n• Unblock the bot\n• Check privacy settings",
                     inline=False
                 )
-                await progress_msg.edit(embed=error_embed)
+                await progress.show(error_embed)
             
             del self.active_claims[interaction.user.id]
             
@@ -825,6 +851,8 @@ class CookieCog(commands.Cog):
             print(f"Error in process_cookie_claim: {traceback.format_exc()}")
             if interaction.user.id in self.active_claims:
                 del self.active_claims[interaction.user.id]
+            if reservation:
+                await self.bot.stock_index.release(reservation)
             
             error_embed = discord.Embed(
                 title="❌ Error",
@@ -845,7 +873,7 @@ class CookieCog(commands.Cog):
             if not await self.check_maintenance(ctx):
                 return
             
-            server = await self.db.servers.find_one({"server_id": ctx.guild.id})
+            server = await self.bot.config_cache.get_server(ctx.guild.id)
             if not server:
                 embed = discord.Embed(
                     title="❌ Server Not Configured",
@@ -945,7 +973,7 @@ class CookieCog(commands.Cog):
             embed.set_footer(text="Select a cookie type below • Daily limits apply per cookie type")
             
             view = CookieView(self, ctx.author.id)
-            select_menu = CookieSelectMenu(server, user_data, ctx.author, costs_dict, access_dict, daily_limits)
+            select_menu = CookieSelectMenu(server, user_data, ctx.author, costs_dict, access_dict, daily_limits, self.bot.stock_index)
             view.add_item(select_menu)
             
             response = await ctx.send(embed=embed, view=view, ephemeral=True)
@@ -972,7 +1000,7 @@ class CookieCog(commands.Cog):
             if interaction and not interaction.response.is_done():
                 await interaction.response.defer(ephemeral=True)
             
-            server = await self.db.servers.find_one({"server_id": ctx.guild.id})
+            server = await self.bot.config_cache.get_server(ctx.guild.id)
             if not server:
                 await ctx.send("❌ Server not configured!", ephemeral=True)
                 return
@@ -1017,8 +1045,7 @@ class CookieCog(commands.Cog):
                 can_claim, claimed_today = await self.check_daily_limit(ctx.author.id, type, daily_limit)
                 
                 if os.path.exists(directory):
-                    files = [f for f in os.listdir(directory) if f.endswith('.txt')]
-                    count = len(files)
+                    count = self.bot.stock_index.count(directory)
                     
                     if count > 20:
                         status = "✅ Well Stocked"
@@ -1073,8 +1100,7 @@ class CookieCog(commands.Cog):
                     directory = cookie_config["directory"]
                     
                     if os.path.exists(directory):
-                        files = [f for f in os.listdir(directory) if f.endswith('.txt')]
-                        count = len(files)
+                        count = self.bot.stock_index.count(directory)
                         total_stock += count
                         
                         cost = access.get("cost", cookie_config["cost"])
@@ -1155,7 +1181,7 @@ class CookieCog(commands.Cog):
                 color=discord.Color.green()
             )
             
-            server = await self.db.servers.find_one({"server_id": ctx.guild.id})
+            server = await self.bot.config_cache.get_server(ctx.guild.id)
             if server and server.get("role_based"):
                 role_config = await self.get_user_role_config(ctx.author, server)
                 
@@ -1213,7 +1239,7 @@ class CookieCog(commands.Cog):
             removed_roles = set(before.roles) - set(after.roles)
             
             if added_roles or removed_roles:
-                server = await self.db.servers.find_one({"server_id": after.guild.id})
+                server = await self.bot.config_cache.get_server(after.guild.id)
                 if server and server.get("role_based"):
                     for role in added_roles:
                         if str(role.id) in server.get("roles", {}):
@@ -1267,7 +1293,7 @@ class CookieCog(commands.Cog):
 
     async def is_owner(self, user_id: int) -> bool:
         """Check if a user is the bot owner"""
-        config = await self.db.config.find_one({"_id": "bot_config"})
+        config = await self.bot.config_cache.get_config()
         return config and config.get("owner_id") == user_id
 
 async def setup(bot):
@@ -15,7 +15,6 @@ class DirectoryCog(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         self.db = bot.db
-        self.stock_cache = {}
         self.last_report_hash = None  # Track last report to detect changes
         self.check_directories.start()
         self.update_stock_cache.start()
@@ -26,7 +25,7 @@ class DirectoryCog(commands.Cog):
             await cookie_cog.log_action(guild_id, message, color)
     
     async def is_owner(self, user_id: int) -> bool:
-        config = await self.db.config.find_one({"_id": "bot_config"})
+        config = await self.bot.config_cache.get_config()
         return user_id == config.get("owner_id")
     
     async def get_user_role_config(self, member: discord.Member, server: dict) -> dict:
@@ -48,24 +47,22 @@ class DirectoryCog(commands.Cog):
     
     @tasks.loop(minutes=5)
     async def update_stock_cache(self):
-        """Update stock cache every 5 minutes for better performance"""
+        """Make sure every configured directory is tracked by the stock index"""
         try:
-            self.stock_cache = {}
+            directories = []
             
             # Get bot config for default directories
-            config = await self.db.config.find_one({"_id": "bot_config"})
+            config = await self.bot.config_cache.get_config()
             if config and config.get("default_cookies"):
                 for cookie_type, cookie_config in config["default_cookies"].items():
-                    directory = cookie_config.get("directory")
-                    if directory and os.path.exists(directory):
-                        self.stock_cache[directory] = len([f for f in os.listdir(directory) if f.endswith('.txt')])
+                    directories.append(cookie_config.get("directory"))
             
             # Update server-specific directories
-            async for server in self.db.servers.find({"enabled": True}):
+            async for server in self.db.servers.find({"enabled": True}, {"cookies": 1}):
                 for cookie_type, config in server.get("cookies", {}).items():
-                    directory = config.get("directory")
-                    if directory and os.path.exists(directory) and directory not in self.stock_cache:
-                        self.stock_cache[directory] = len([f for f in os.listdir(directory) if f.endswith('.txt')])
+                    directories.append(config.get("directory"))
+            
+            await self.bot.stock_index.warm(directories)
                         
         except Exception as e:
             print(f"Error updating stock cache: {e}")
@@ -73,7 +70,7 @@ class DirectoryCog(commands.Cog):
     @tasks.loop(hours=1)
     async def check_directories(self):
         try:
-            config = await self.db.config.find_one({"_id": "bot_config"})
+            config = await self.bot.config_cache.get_config()
             if not config:
                 return
                 
@@ -97,7 +94,7 @@ class DirectoryCog(commands.Cog):
                         report_data["missing_dirs"].append(f"{cookie_type} - {directory}")
                         Path(directory).mkdir(parents=True, exist_ok=True)
                     else:
-                        files_count = self.stock_cache.get(directory, len([f for f in os.listdir(directory) if f.endswith('.txt')]))
+                        files_count = self.bot.stock_index.count(directory)
                         
                         if files_count == 0:
                             report_data["critical_stock"].append(f"{cookie_type} - EMPTY")
@@ -122,7 +119,7 @@ class DirectoryCog(commands.Cog):
                         report_data["missing_dirs"].append(f"{server_name}: {cookie_type} - {directory}")
                         Path(directory).mkdir(parents=True, exist_ok=True)
                     else:
-                        files_count = self.stock_cache.get(directory, len([f for f in os.listdir(directory) if f.endswith('.txt')]))
+                        files_count = self.bot.stock_index.count(directory)
                         
                         if files_count == 0:
                             report_data["critical_stock"].append(f"{server_name}: {cookie_type} - EMPTY")
@@ -264,7 +261,7 @@ class DirectoryCog(commands.Cog):
         total_stock = 0
         
         # Check default directories first
-        config = await self.db.config.find_one({"_id": "bot_config"})
+        config = await self.bot.config_cache.get_config()
         if config and config.get("default_cookies"):
             default_status = []
             for cookie_type, cookie_config in config["default_cookies"].items():
@@ -278,11 +275,7 @@ class DirectoryCog(commands.Cog):
                     default_status.append(f"❌ {cookie_type}: Missing")
                     all_good = False
                 else:
-                    files_count = self.stock_cache.get(directory)
-                    if files_count is None:
-                        files = [f for f in os.listdir(directory) if f.endswith('.txt')]
-                        files_count = len(files)
-                        self.stock_cache[directory] = files_count
+                    files_count = self.bot.stock_index.count(directory)
                     
                     total_stock += files_count
                     
@@ -318,11 +311,7 @@ class DirectoryCog(commands.Cog):
                     server_status.append(f"❌ {cookie_type}: Missing")
                     all_good = False
                 else:
-                    files_count = self.stock_cache.get(directory)
-                    if files_count is None:
-                        files = [f for f in os.listdir(directory) if f.endswith('.txt')]
-                        files_count = len(files)
-                        self.stock_cache[directory] = files_count
+                    files_count = self.bot.stock_index.count(directory)
                     
                     total_stock += files_count
                     
@@ -374,7 +363,7 @@ class DirectoryCog(commands.Cog):
         failed = 0
         
         # Create default directories
-        config = await self.db.config.find_one({"_id": "bot_config"})
+        config = await self.bot.config_cache.get_config()
         if config and config.get("default_cookies"):
             for cookie_type, cookie_config in config["default_cookies"].items():
                 directory = cookie_config.get("directory")
@@ -478,7 +467,7 @@ Category: {cookie_config.get('category', 'general')}
             await ctx.send("❌ Invalid server ID!", ephemeral=True)
             return
         
-        server = await self.db.servers.find_one({"server_id": server_id})
+        server = await self.bot.config_cache.get_server(server_id)
         if not server:
             await ctx.send("❌ Server not found!", ephemeral=True)
             return
@@ -493,8 +482,12 @@ Category: {cookie_config.get('category', 'general')}
         
         await self.db.servers.update_one(
             {"server_id": server_id},
-            {"$set": {f"cookies.{cookie_type}.directory": directory}}
+            {"$set": {
+                f"cookies.{cookie_type}.directory": directory,
+                "last_updated": datetime.now(timezone.utc)
+            }}
         )
+        self.bot.config_cache.invalidate_server(server_id)
         
         if not os.path.exists(directory):
             try:
@@ -503,10 +496,8 @@ Category: {cookie_config.get('category', 'general')}
             except:
                 status = "⚠️ Could not create"
         else:
-            files = len([f for f in os.listdir(directory) if f.endswith('.txt')])
+            files = await self.bot.stock_index.refresh(directory)
             status = f"✅ Exists ({files} files)"
-            # Update cache
-            self.stock_cache[directory] = files
         
         embed = discord.Embed(
             title="📁 Directory Updated",
@@ -531,7 +522,7 @@ Category: {cookie_config.get('category', 'general')}
         dir_info = {}
         
         # Get default directories
-        config = await self.db.config.find_one({"_id": "bot_config"})
+        config = await self.bot.config_cache.get_config()
         if config and config.get("default_cookies"):
             for cookie_type, cookie_config in config["default_cookies"].items():
                 directory = cookie_config.get("directory")
@@ -559,7 +550,7 @@ Category: {cookie_config.get('category', 'general')}
         
         for directory in sorted(all_dirs)[:20]:
             exists = os.path.exists(directory)
-            files = self.stock_cache.get(directory, len([f for f in os.listdir(directory) if f.endswith('.txt')]) if exists else 0)
+            files = self.bot.stock_index.count(directory) if exists else 0
             
             value = f"{'✅' if exists else '❌'} Files: **{files}**\nUsed by: {', '.join(dir_info[directory][:3])}"
             if len(dir_info[directory]) > 3:
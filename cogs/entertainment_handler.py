@@ -91,11 +91,17 @@ class EntertainmentHandler(commands.Cog):
     
     @commands.command(name="sync")
     @commands.is_owner()
-    async def sync_commands(self, ctx):
+    async def sync_commands(self, ctx, scope: str = "global"):
+        """!sync [global|guild|force] - guild syncs to this server only, force ignores the stored hash"""
         msg = await ctx.send("🔄 Syncing...")
         try:
-            synced = await self.bot.tree.sync()
-            await msg.edit(content=f"✅ Synced {len(synced)} commands")
+            guild = ctx.guild if scope == "guild" else None
+            synced, count = await self.bot.command_sync.sync(guild, force=scope == "force")
+            where = f"to {ctx.guild.name}" if guild else "globally"
+            if synced:
+                await msg.edit(content=f"✅ Synced {count} commands {where}")
+            else:
+                await msg.edit(content=f"✅ {count} commands unchanged {where}, nothing to sync (use `!sync force` to override)")
         except Exception as e:
             await msg.edit(content=f"❌ Failed: {str(e)[:100]}")
 
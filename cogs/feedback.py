@@ -4,7 +4,6 @@ from discord import app_commands
 from datetime import datetime, timedelta, timezone
 import traceback
 from typing import Optional
-import asyncio
 import random
 
 class QuickFeedbackView(discord.ui.View):
@@ -110,16 +109,21 @@ class FeedbackModal(discord.ui.Modal):
             )
 
 class FeedbackCog(commands.Cog):
+    GRACE_PERIOD = timedelta(minutes=2)
+    LAST_CHANCE_WINDOW = timedelta(seconds=30)
+    REMINDER_MINUTES = (10, 5)
+    
     def __init__(self, bot):
         self.bot = bot
         self.db = bot.db
-        self.check_feedback_deadlines.start()
-        self.send_feedback_reminders.start()
+        # Reminder and deadline DMs, and the buttons on them, belong to the cluster owning shard 0
+        if self.bot.cluster.handles_dms:
+            self.resync_feedback_deadlines.start()
+            self.bot.jobs.register("feedback_reminder", self.run_feedback_reminder)
         self.FeedbackModal = FeedbackModal
         
     async def cog_unload(self):
-        self.check_feedback_deadlines.cancel()
-        self.send_feedback_reminders.cancel()
+        self.resync_feedback_deadlines.cancel()
         
     async def log_action(self, guild_id: int, message: str, color: discord.Color = discord.Color.blue()):
         cookie_cog = self.bot.get_cog("CookieCog")
@@ -133,7 +137,7 @@ class FeedbackCog(commands.Cog):
         best_config = {}
         highest_priority = -1
         
-        server = await self.db.servers.find_one({"server_id": member.guild.id})
+        server = await self.bot.config_cache.get_server(member.guild.id)
         if not server or not server.get("roles"):
             return {}
         
@@ -182,10 +186,11 @@ class FeedbackCog(commands.Cog):
                 return
             
             # Process the feedback
-            server = await self.db.servers.find_one({"server_id": last_claim.get("server_id")})
+            server = await self.bot.config_cache.get_server(last_claim.get("server_id"))
             role_config = {}
             if server:
-                member = self.bot.get_guild(server["server_id"]).get_member(interaction.user.id)
+                guild = self.bot.get_guild(server["server_id"])
+                member = await self.bot.get_or_fetch_member(guild, interaction.user.id) if guild else None
                 if member:
                     role_config = await self.get_user_role_config(member, server)
             
@@ -195,7 +200,7 @@ class FeedbackCog(commands.Cog):
             # Perfect rating bonus
             perfect_bonus = 0
             if rating == 5:
-                config = await self.db.config.find_one({"_id": "bot_config"})
+                config = await self.bot.config_cache.get_config()
                 perfect_bonus = config.get("point_rates", {}).get("perfect_rating_bonus", 1) if config else 1
             
             # Update user data
@@ -216,6 +221,7 @@ class FeedbackCog(commands.Cog):
                     }
                 }
             )
+            self.bot.leaderboards.touch(interaction.user.id)
             
             # Create response
             stars = "⭐" * rating
@@ -315,14 +321,14 @@ class FeedbackCog(commands.Cog):
                 return
             
             # Process NEW feedback
-            server = await self.db.servers.find_one({"server_id": interaction.guild_id})
+            server = await self.bot.config_cache.get_server(interaction.guild_id)
             role_config = await self.get_user_role_config(interaction.user, server) if server else {}
             
             trust_multiplier = role_config.get("trust_multiplier", 1.0) if role_config else 1.0
             trust_gain = 0.25 * trust_multiplier
             
             # Perfect rating bonus
-            config = await self.db.config.find_one({"_id": "bot_config"})
+            config = await self.bot.config_cache.get_config()
             perfect_bonus = 0
             if rating == 5 and config:
                 perfect_bonus = config.get("point_rates", {}).get("perfect_rating_bonus", 1)
@@ -349,6 +355,7 @@ class FeedbackCog(commands.Cog):
                 {"user_id": interaction.user.id},
                 update_data
             )
+            self.bot.leaderboards.touch(interaction.user.id)
             
             # Create encouraging response
             stars = "⭐" * rating
@@ -412,55 +419,38 @@ class FeedbackCog(commands.Cog):
             print(f"Error in feedback submission: {traceback.format_exc()}")
             await interaction.followup.send("❌ Error submitting feedback!", ephemeral=True)
     
-    @tasks.loop(minutes=5)
-    async def send_feedback_reminders(self):
-        """Send friendly reminders 10 and 5 minutes before deadline"""
-        try:
-            now = datetime.now(timezone.utc)
-            
-            # 10-minute reminder
-            ten_min_window = now + timedelta(minutes=10)
-            cursor_10 = self.db.users.find({
-                "last_claim.feedback_given": False,
-                "last_claim.feedback_deadline": {
-                    "$gt": ten_min_window - timedelta(seconds=30),
-                    "$lt": ten_min_window + timedelta(seconds=30)
-                },
-                "last_claim.reminder_10_sent": {"$ne": True}
-            })
-            
-            async for user in cursor_10:
-                asyncio.create_task(self.send_reminder(user, 10))
-                await self.db.users.update_one(
-                    {"user_id": user["user_id"]},
-                    {"$set": {"last_claim.reminder_10_sent": True}}
-                )
-            
-            # 5-minute urgent reminder
-            five_min_window = now + timedelta(minutes=5)
-            cursor_5 = self.db.users.find({
-                "last_claim.feedback_given": False,
-                "last_claim.feedback_deadline": {
-                    "$gt": five_min_window - timedelta(seconds=30),
-                    "$lt": five_min_window + timedelta(seconds=30)
-                },
-                "last_claim.reminder_5_sent": {"$ne": True}
-            })
-            
-            async for user in cursor_5:
-                asyncio.create_task(self.send_reminder(user, 5))
-                await self.db.users.update_one(
-                    {"user_id": user["user_id"]},
-                    {"$set": {"last_claim.reminder_5_sent": True}}
-                )
-                
-        except Exception as e:
-            print(f"Error in reminder system: {e}")
+    async def schedule_reminders(self, user_id: int, last_claim: dict):
+        """Queue the 10 and 5 minute reminders for a new claim"""
+        deadline = self._as_utc(last_claim["feedback_deadline"])
+        claim_date = last_claim["date"]
+        claim_key = int(self._as_utc(claim_date).timestamp() * 1000)
+        now = datetime.now(timezone.utc)
+        
+        for minutes_left in self.REMINDER_MINUTES:
+            due_at = deadline - timedelta(minutes=minutes_left)
+            if due_at <= now:
+                continue
+            await self.bot.jobs.enqueue(
+                "feedback_reminder",
+                due_at,
+                {"user_id": user_id, "claim_date": claim_date, "minutes_left": minutes_left},
+                job_id=f"feedback_reminder:{user_id}:{claim_key}:{minutes_left}"
+            )
+    
+    async def run_feedback_reminder(self, payload: dict):
+        # Skip claims that were refunded, replaced or already completed
+        user = await self.db.users.find_one({
+            "user_id": payload["user_id"],
+            "last_claim.date": payload["claim_date"],
+            "last_claim.feedback_given": False
+        })
+        if user:
+            await self.send_reminder(user, payload["minutes_left"])
     
     async def send_reminder(self, user_data: dict, minutes_left: int):
         """Send a friendly reminder with quick action buttons"""
         try:
-            discord_user = self.bot.get_user(user_data["user_id"])
+            discord_user = await self.bot.get_or_fetch_user(user_data["user_id"])
             if not discord_user:
                 return
             
@@ -530,99 +520,150 @@ class FeedbackCog(commands.Cog):
         except Exception as e:
             print(f"Error sending reminder: {e}")
     
-    @tasks.loop(minutes=1)
-    async def check_feedback_deadlines(self):
-        """Check for missed deadlines with 2-minute grace period"""
+    @staticmethod
+    def _as_utc(value: datetime) -> datetime:
+        if value.tzinfo is None:
+            return value.replace(tzinfo=timezone.utc)
+        return value
+    
+    @staticmethod
+    def _pending_feedback(user_id: int, claim_date: datetime) -> dict:
+        """Filter matching a claim that is still waiting for any feedback"""
+        return {
+            "user_id": user_id,
+            "last_claim.date": claim_date,
+            "last_claim.feedback_given": False,
+            "last_claim.text_feedback_given": {"$ne": True},
+            "last_claim.screenshot": {"$ne": True},
+            "blacklisted": {"$ne": True}
+        }
+    
+    def schedule_deadline(self, user_id: int, last_claim: dict):
+        """Schedule the next deadline step for a claim awaiting feedback.
+        
+        The step is derived from the claim itself (last_chance_sent is stored on it),
+        so rescheduling after a restart resumes where it left off.
+        """
+        if not last_claim.get("feedback_deadline") or not last_claim.get("date"):
+            return
+        
+        if last_claim.get("last_chance_sent"):
+            when = self._as_utc(last_claim["last_chance_sent"]) + self.LAST_CHANCE_WINDOW
+            callback = self.enforce_feedback_deadline
+        else:
+            # 2-minute grace period - be lenient!
+            when = self._as_utc(last_claim["feedback_deadline"]) + self.GRACE_PERIOD
+            callback = self.send_last_chance
+        
+        self.bot.scheduler.schedule(("feedback", user_id), when, callback, user_id, last_claim["date"])
+    
+    @tasks.loop(minutes=15)
+    async def resync_feedback_deadlines(self):
+        """Load pending deadlines from the database, including claims made by other processes"""
         try:
-            now = datetime.now(timezone.utc)
-            
-            # Add 2-minute grace period - be lenient!
-            grace_period_ago = now - timedelta(minutes=2)
-            
-            # Find users who haven't given feedback
-            cursor = self.db.users.find({
-                "last_claim.feedback_given": False,
-                "last_claim.feedback_deadline": {"$lt": grace_period_ago},
-                "last_claim.text_feedback_given": {"$ne": True},
-                "last_claim.screenshot": {"$ne": True},
-                "blacklisted": False
-            })
+            cursor = self.db.users.find(
+                {
+                    "last_claim.feedback_given": False,
+                    "last_claim.feedback_deadline": {"$exists": True},
+                    "last_claim.text_feedback_given": {"$ne": True},
+                    "last_claim.screenshot": {"$ne": True},
+                    "blacklisted": {"$ne": True}
+                },
+                {"user_id": 1, "last_claim": 1}
+            )
             
             async for user in cursor:
-                # Give one last chance
-                discord_user = self.bot.get_user(user["user_id"])
-                if discord_user:
-                    try:
-                        # Send last chance message with quick buttons
-                        embed = discord.Embed(
-                            title="⚠️ LAST CHANCE - Feedback Overdue!",
-                            description=(
-                                f"Your {user['last_claim']['type']} cookie feedback is overdue!\n\n"
-                                f"**Click any button NOW to avoid blacklist!**"
-                            ),
-                            color=discord.Color.red()
-                        )
-                        view = QuickFeedbackView(user['last_claim']['type'], user["user_id"], self)
-                        message = await discord_user.send(embed=embed, view=view)
-                        
-                        # Wait 30 seconds for response
-                        await asyncio.sleep(30)
-                        
-                        # Check again if feedback was given
-                        updated_user = await self.db.users.find_one({"user_id": user["user_id"]})
-                        if updated_user["last_claim"].get("text_feedback_given") or updated_user["last_claim"].get("screenshot"):
-                            # They responded! Don't blacklist
-                            continue
-                            
-                    except:
-                        pass
+                self.schedule_deadline(user["user_id"], user["last_claim"])
                 
-                # If still no feedback after grace period and last chance, then blacklist
-                last_claim = user.get("last_claim")
-                if last_claim:
-                    server = await self.db.servers.find_one({"server_id": last_claim.get("server_id")})
-                    blacklist_duration = 30
-                    if server:
-                        blacklist_duration = server.get("settings", {}).get("feedback_blacklist_days", 30)
-                    
-                    await self.db.users.update_one(
-                        {"user_id": user["user_id"]},
-                        {
-                            "$set": {
-                                "blacklisted": True,
-                                "blacklist_expires": now + timedelta(days=blacklist_duration),
-                                "blacklist_reason": "No feedback provided (after grace period)",
-                                "statistics.feedback_streak": 0,
-                                "trust_score": max(0, user.get("trust_score", 50) - 5)
-                            }
-                        }
-                    )
-                    
-                    if discord_user:
-                        try:
-                            embed = discord.Embed(
-                                title="😔 Blacklisted - No Feedback",
-                                description=(
-                                    f"You didn't provide feedback for your {last_claim['type']} cookie.\n\n"
-                                    f"**Duration:** {blacklist_duration} days\n"
-                                    f"**Expires:** <t:{int((now + timedelta(days=blacklist_duration)).timestamp())}:R>\n\n"
-                                    f"💡 **Tip:** Next time, just click one button for instant feedback!"
-                                ),
-                                color=discord.Color.red()
-                            )
-                            await discord_user.send(embed=embed)
-                        except:
-                            pass
-                    
-                    if last_claim.get("server_id"):
-                        await self.log_action(
-                            last_claim["server_id"],
-                            f"🚫 <@{user['user_id']}> blacklisted for {blacklist_duration} days (no feedback after grace period)",
-                            discord.Color.red()
-                        )
-                        
         except Exception as e:
-            print(f"Error in deadline check: {e}")
+            print(f"Error loading feedback deadlines: {e}")
+    
+    async def send_last_chance(self, user_id: int, claim_date: datetime):
+        """Give one last chance once the grace period has passed"""
+        now = datetime.now(timezone.utc)
+        
+        user = await self.db.users.find_one_and_update(
+            {**self._pending_feedback(user_id, claim_date), "last_claim.last_chance_sent": {"$exists": False}},
+            {"$set": {"last_claim.last_chance_sent": now}}
+        )
+        if not user:
+            return
+        
+        discord_user = await self.bot.get_or_fetch_user(user_id)
+        if discord_user:
+            try:
+                # Send last chance message with quick buttons
+                embed = discord.Embed(
+                    title="⚠️ LAST CHANCE - Feedback Overdue!",
+                    description=(
+                        f"Your {user['last_claim']['type']} cookie feedback is overdue!\n\n"
+                        f"**Click any button NOW to avoid blacklist!**"
+                    ),
+                    color=discord.Color.red()
+                )
+                view = QuickFeedbackView(user['last_claim']['type'], user_id, self)
+                await discord_user.send(embed=embed, view=view)
+            except:
+                pass
+        
+        self.bot.scheduler.schedule(
+            ("feedback", user_id), now + self.LAST_CHANCE_WINDOW,
+            self.enforce_feedback_deadline, user_id, claim_date
+        )
+    
+    async def enforce_feedback_deadline(self, user_id: int, claim_date: datetime):
+        """Blacklist a user who still hasn't given feedback after the last chance"""
+        pending = self._pending_feedback(user_id, claim_date)
+        user = await self.db.users.find_one(pending)
+        if not user:
+            return
+        
+        now = datetime.now(timezone.utc)
+        last_claim = user["last_claim"]
+        server = await self.bot.config_cache.get_server(last_claim.get("server_id"))
+        blacklist_duration = 30
+        if server:
+            blacklist_duration = server.get("settings", {}).get("feedback_blacklist_days", 30)
+        
+        # The pending filter makes this a no-op if feedback arrived since the read
+        result = await self.db.users.update_one(
+            pending,
+            {
+                "$set": {
+                    "blacklisted": True,
+                    "blacklist_expires": now + timedelta(days=blacklist_duration),
+                    "blacklist_reason": "No feedback provided (after grace period)",
+                    "statistics.feedback_streak": 0,
+                    "trust_score": max(0, user.get("trust_score", 50) - 5)
+                }
+            }
+        )
+        if not result.modified_count:
+            return
+        
+        discord_user = await self.bot.get_or_fetch_user(user_id)
+        if discord_user:
+            try:
+                embed = discord.Embed(
+                    title="😔 Blacklisted - No Feedback",
+                    description=(
+                        f"You didn't provide feedback for your {last_claim['type']} cookie.\n\n"
+                        f"**Duration:** {blacklist_duration} days\n"
+                        f"**Expires:** <t:{int((now + timedelta(days=blacklist_duration)).timestamp())}:R>\n\n"
+                        f"💡 **Tip:** Next time, just click one button for instant feedback!"
+                    ),
+                    color=discord.Color.red()
+                )
+                await discord_user.send(embed=embed)
+            except:
+                pass
+        
+        if last_claim.get("server_id"):
+            await self.log_action(
+                last_claim["server_id"],
+                f"🚫 <@{user_id}> blacklisted for {blacklist_duration} days (no feedback after grace period)",
+                discord.Color.red()
+            )
     
     @commands.Cog.listener()
     async def on_message(self, message):
@@ -632,7 +673,7 @@ class FeedbackCog(commands.Cog):
             
         if message.attachments and message.channel.type == discord.ChannelType.text:
             try:
-                server = await self.db.servers.find_one({"server_id": message.guild.id})
+                server = await self.bot.config_cache.get_server(message.guild.id)
                 if server and message.channel.id == server["channels"].get("feedback"):
                     user_data = await self.db.users.find_one({"user_id": message.author.id})
                     if user_data and user_data.get("last_claim"):
@@ -657,7 +698,7 @@ class FeedbackCog(commands.Cog):
                             role_config = await self.get_user_role_config(message.author, server)
                             trust_multiplier = role_config.get("trust_multiplier", 1.0) if role_config else 1.0
                             
-                            config = await self.db.config.find_one({"_id": "bot_config"})
+                            config = await self.bot.config_cache.get_config()
                             feedback_bonus = config.get("point_rates", {}).get("feedback_bonus", 1) if config else 1
                             
                             screenshot_trust = 0.25 * trust_multiplier
@@ -695,6 +736,7 @@ class FeedbackCog(commands.Cog):
                                 {"user_id": message.author.id},
                                 update_data
                             )
+                            self.bot.leaderboards.touch(message.author.id)
                             
                             # Send encouraging response
                             if has_text_feedback:
@@ -773,7 +815,7 @@ class FeedbackCog(commands.Cog):
             if hasattr(ctx, 'interaction') and ctx.interaction:
                 await ctx.interaction.response.defer(ephemeral=True)
             
-            server = await self.db.servers.find_one({"server_id": ctx.guild.id})
+            server = await self.bot.config_cache.get_server(ctx.guild.id)
             if not server:
                 await ctx.send("❌ Server not configured!", ephemeral=True)
                 return
@@ -857,12 +899,8 @@ class FeedbackCog(commands.Cog):
             print(f"Error in feedback command: {traceback.format_exc()}")
             await ctx.send("❌ An error occurred!", ephemeral=True)
     
-    @send_feedback_reminders.before_loop
-    async def before_send_reminders(self):
-        await self.bot.wait_until_ready()
-    
-    @check_feedback_deadlines.before_loop
-    async def before_check_deadlines(self):
+    @resync_feedback_deadlines.before_loop
+    async def before_resync_deadlines(self):
         await self.bot.wait_until_ready()
 
 async def setup(bot):
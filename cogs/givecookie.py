@@ -6,7 +6,6 @@ import discord
 from discord.ext import commands
 from discord import app_commands
 import os
-import random
 from datetime import datetime, timezone
 import traceback
 from typing import List
@@ -23,17 +22,14 @@ class GiveCookieCog(commands.Cog):
     async def cookie_autocomplete(self, interaction: discord.Interaction, current: str) -> List[app_commands.Choice[str]]:
         """Autocomplete for cookie types"""
         # Get cookie configs from database
-        config = await self.db.config.find_one({"_id": "bot_config"})
+        config = await self.bot.config_cache.get_config()
         if not config or "default_cookies" not in config:
             return []
         
         choices = []
         for cookie_type, cookie_config in config["default_cookies"].items():
             if cookie_type.lower().startswith(current.lower()):
-                directory = cookie_config["directory"]
-                stock = 0
-                if os.path.exists(directory):
-                    stock = len([f for f in os.listdir(directory) if f.endswith('.txt')])
+                stock = self.bot.stock_index.count(cookie_config["directory"])
                 
                 emoji = cookie_config.get("emoji", "🍪")
                 status = f"Stock: {stock}" if stock > 0 else "Out of Stock"
@@ -52,6 +48,7 @@ class GiveCookieCog(commands.Cog):
     )
     @app_commands.autocomplete(type=cookie_autocomplete)
     async def givecookie(self, ctx, user: discord.User, type: str):
+        reservation = None
         try:
             # Check if user is THE bot owner (not server owner)
             if ctx.author.id != self.owner_id:
@@ -69,7 +66,7 @@ class GiveCookieCog(commands.Cog):
                 await ctx.interaction.response.defer(ephemeral=True)
             
             # Get cookie directories from database
-            config = await self.db.config.find_one({"_id": "bot_config"})
+            config = await self.bot.config_cache.get_config()
             if not config or "default_cookies" not in config:
                 await ctx.send("❌ Cookie configuration not found!", ephemeral=True)
                 return
@@ -87,14 +84,13 @@ class GiveCookieCog(commands.Cog):
                 await ctx.send(f"❌ Directory for **{cookie_type}** not found!", ephemeral=True)
                 return
             
-            files = [f for f in os.listdir(directory) if f.endswith('.txt')]
-            if not files:
+            # Reserve a random file so a concurrent claim can't receive the same one
+            reservation = await self.bot.stock_index.reserve(directory)
+            if not reservation:
                 await ctx.send(f"❌ No **{cookie_type}** cookies available!", ephemeral=True)
                 return
-            
-            # Select random file
-            selected_file = random.choice(files)
-            file_path = os.path.join(directory, selected_file)
+            selected_file = reservation.name
+            file_path = reservation.path
             
             # Prepare the cookie embed for DM
             cookie_embed = discord.Embed(
@@ -119,6 +115,7 @@ class GiveCookieCog(commands.Cog):
             # Try to send the cookie via DM
             try:
                 await user.send(embed=cookie_embed, file=discord.File(file_path))
+                await self.bot.stock_index.commit(reservation)
                 
                 # Success response
                 success_embed = discord.Embed(
@@ -139,6 +136,7 @@ class GiveCookieCog(commands.Cog):
                     
             except discord.Forbidden:
                 # DM failed
+                await self.bot.stock_index.release(reservation)
                 error_embed = discord.Embed(
                     title="❌ DM Delivery Failed",
                     description=f"Could not send DM to {user.mention}!",
@@ -157,6 +155,8 @@ class GiveCookieCog(commands.Cog):
                     
         except Exception as e:
             print(f"Error in givecookie command: {traceback.format_exc()}")
+            if reservation:
+                await self.bot.stock_index.release(reservation)
             error_embed = discord.Embed(
                 title="❌ Error",
                 description=f"An error occurred: {str(e)}",
@@ -6,8 +6,10 @@ import discord
 from discord.ext import commands, tasks
 from discord import app_commands
 import asyncio
-from datetime import datetime, timedelta, timezone
+from datetime import datetime, timezone
 from typing import Optional, Dict, List
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+from bot_core.invite_tracker import InviteTracker
 
 class InviteLeaderboardView(discord.ui.View):
     def __init__(self, cog, guild_id: int):
@@ -16,19 +18,16 @@ class InviteLeaderboardView(discord.ui.View):
         self.guild_id = guild_id
         self.current_page = 0
         self.items_per_page = 10
-        
-    async def get_leaderboard_data(self):
-        users = await self.cog.db.users.find(
-            {"verified_invites": {"$gt": 0}}
-        ).sort("verified_invites", -1).limit(50).to_list(None)
-        return users
+        self.max_entries = 50
+    
+    async def get_page_count(self):
+        total = min(await self.cog.bot.leaderboards.size("invites"), self.max_entries)
+        return max(1, (total - 1) // self.items_per_page + 1)
     
     async def create_embed(self):
-        users = await self.get_leaderboard_data()
-        
-        total_pages = (len(users) - 1) // self.items_per_page + 1
+        total_pages = await self.get_page_count()
         start = self.current_page * self.items_per_page
-        end = start + self.items_per_page
+        users = await self.cog.bot.leaderboards.top("invites", start, self.items_per_page)
         
         embed = discord.Embed(
             title="👥 Invite Leaderboard",
@@ -38,12 +37,9 @@ class InviteLeaderboardView(discord.ui.View):
         )
         
         leaderboard_text = ""
-        for idx, user_data in enumerate(users[start:end], start=start+1):
-            user = self.cog.bot.get_user(user_data["user_id"])
-            username = user.name if user else user_data.get("username", "Unknown")
-            total = user_data.get("invite_count", 0)
-            verified = user_data.get("verified_invites", 0)
-            unique = user_data.get("unique_invites", 0)
+        for idx, (user_id, verified) in enumerate(users, start=start+1):
+            user = self.cog.bot.get_user(user_id)
+            username = user.name if user else f"<@{user_id}>"
             
             medal = ""
             if idx == 1:
@@ -53,7 +49,7 @@ class InviteLeaderboardView(discord.ui.View):
             elif idx == 3:
                 medal = "🥉"
             
-            leaderboard_text += f"{medal} **{idx}.** {username} - **{verified}** verified ({unique} unique)\n"
+            leaderboard_text += f"{medal} **{idx}.** {username} - **{int(verified)}** verified\n"
         
         embed.description = leaderboard_text or "No verified invites recorded yet!"
         embed.set_footer(text=f"Page {self.current_page + 1}/{total_pages} • Only showing verified invites")
@@ -67,69 +63,111 @@ class InviteLeaderboardView(discord.ui.View):
     
     @discord.ui.button(emoji="➡️", style=discord.ButtonStyle.gray)
     async def next_page(self, interaction: discord.Interaction, button: discord.ui.Button):
-        users = await self.get_leaderboard_data()
-        max_pages = (len(users) - 1) // self.items_per_page
-        self.current_page = min(max_pages, self.current_page + 1)
+        self.current_page = min(await self.get_page_count() - 1, self.current_page + 1)
         await interaction.response.edit_message(embed=await self.create_embed(), view=self)
 
 class InviteCog(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         self.db = bot.db
-        self.invites = {}
+        # Joins are attributed by a per-guild worker that batches invite fetches
+        self.tracker = InviteTracker()
+        self._invites_cached = False
         self.invite_cache_update.start()
         self.pending_rewards = {}
-        self.tracked_members = {}
-        self.cleanup_tracked_members.start()
-        self.cleanup_old_invites.start()
-        
-    async def cog_unload(self):
-        self.invite_cache_update.cancel()
-        self.cleanup_tracked_members.cancel()
-        self.cleanup_old_invites.cancel()
         
-    @tasks.loop(hours=24)
-    async def cleanup_old_invites(self):
-        """Clean up old unverified invites older than 30 days"""
+    async def cog_load(self):
         try:
-            cutoff = datetime.now(timezone.utc) - timedelta(days=30)
-            
-            # Remove old unverified invites from user data
-            result = await self.db.users.update_many(
-                {},
-                {
-                    "$pull": {
-                        "invited_users": {
-                            "verified": False,
-                            "joined_at": {"$lt": cutoff}
-                        }
-                    }
-                }
-            )
-            
-            if result.modified_count > 0:
-                print(f"🧹 Cleaned up old unverified invites from {result.modified_count} users")
-                
+            await self.ensure_invite_indexes()
+            await self.migrate_invited_users()
         except Exception as e:
-            print(f"Error in cleanup_old_invites: {e}")
+            print(f"Error preparing invites collection: {e}")
+        
+    async def cog_unload(self):
+        self.invite_cache_update.cancel()
+        self.tracker.stop()
     
-    @cleanup_old_invites.before_loop
-    async def before_cleanup_old_invites(self):
-        await self.bot.wait_until_ready()
+    async def ensure_invite_indexes(self):
+        """One document per inviter/invitee pair; a rejoin with the same inviter is a duplicate"""
+        await self.db.invites.create_index([("inviter_id", 1), ("invitee_id", 1)], unique=True)
+        await self.db.invites.create_index("invitee_id")
+        await self.db.invites.create_index([("inviter_id", 1), ("verified", 1)])
+        # Pairs are kept forever for duplicate detection; an earlier TTL index let them expire
+        indexes = await self.db.invites.index_information()
+        if "expireAfterSeconds" in indexes.get("joined_at_1", {}):
+            await self.db.invites.drop_index("joined_at_1")
+        await self.db.invites.create_index("joined_at")
+    
+    async def migrate_invited_users(self):
+        """Move invited_users/invited_user_ids arrays off user documents into the invites collection"""
+        migrated = 0
+        async for user in self.db.users.find(
+            {"$or": [{"invited_users": {"$exists": True}}, {"invited_user_ids": {"$exists": True}}]},
+            {"user_id": 1, "invited_users": 1, "invited_user_ids": 1}
+        ):
+            documents = {}
+            for invited in user.get("invited_users") or []:
+                documents.setdefault(invited["user_id"], {
+                    "inviter_id": user["user_id"],
+                    "invitee_id": invited["user_id"],
+                    "guild_id": None,
+                    "username": invited.get("username"),
+                    "invite_code": invited.get("invite_code"),
+                    "joined_at": invited.get("joined_at"),
+                    "verified": bool(invited.get("verified")),
+                    "active": True,
+                    "first_time": invited.get("first_time", True),
+                    "role_benefits_at_time": invited.get("role_benefits_at_time")
+                })
+            # IDs without an entry belong to members who already left; kept for duplicate detection
+            for invitee_id in user.get("invited_user_ids") or []:
+                documents.setdefault(invitee_id, {
+                    "inviter_id": user["user_id"],
+                    "invitee_id": invitee_id,
+                    "guild_id": None,
+                    "verified": False,
+                    "active": False,
+                    "first_time": True
+                })
+            
+            if documents:
+                try:
+                    await self.db.invites.insert_many(list(documents.values()), ordered=False)
+                except BulkWriteError:
+                    pass  # Already migrated pairs
+            await self.db.users.update_one(
+                {"_id": user["_id"]},
+                {"$unset": {"invited_users": "", "invited_user_ids": ""}}
+            )
+            migrated += 1
         
-    @tasks.loop(hours=6)
-    async def cleanup_tracked_members(self):
-        cutoff = datetime.now(timezone.utc) - timedelta(days=1)
-        to_remove = []
-        for member_id, data in self.tracked_members.items():
-            if data["joined_at"] < cutoff:
-                to_remove.append(member_id)
-        for member_id in to_remove:
-            del self.tracked_members[member_id]
-
-    @cleanup_tracked_members.before_loop
-    async def before_cleanup_tracked_members(self):
-        await self.bot.wait_until_ready()
+        if migrated:
+            print(f"📨 Moved invite history of {migrated} users to the invites collection")
+    
+    async def recount_invites(self, inviter_id: int) -> dict:
+        """Rebuild an inviter's counters from the invites collection"""
+        counts = {"invite_count": 0, "pending_invites": 0, "verified_invites": 0, "unique_invites": 0}
+        pipeline = [
+            {"$match": {"inviter_id": inviter_id}},
+            {"$group": {
+                "_id": None,
+                "total": {"$sum": 1},
+                "pending": {"$sum": {"$cond": [{"$and": ["$active", {"$not": ["$verified"]}]}, 1, 0]}},
+                "verified": {"$sum": {"$cond": [{"$and": ["$active", "$verified"]}, 1, 0]}},
+                "unique": {"$sum": {"$cond": [{"$and": ["$active", "$verified", {"$ne": ["$first_time", False]}]}, 1, 0]}}
+            }}
+        ]
+        result = await self.db.invites.aggregate(pipeline).to_list(1)
+        if result:
+            counts = {
+                "invite_count": result[0]["total"],
+                "pending_invites": result[0]["pending"],
+                "verified_invites": result[0]["verified"],
+                "unique_invites": result[0]["unique"]
+            }
+        await self.db.users.update_one({"user_id": inviter_id}, {"$set": counts})
+        self.bot.leaderboards.touch(inviter_id)
+        return counts
         
     async def log_action(self, guild_id: int, message: str, color: discord.Color = discord.Color.blue()):
         cookie_cog = self.bot.get_cog("CookieCog")
@@ -151,8 +189,6 @@ class InviteCog(commands.Cog):
                 "last_active": datetime.now(timezone.utc),
                 "daily_claimed": None,
                 "invite_count": 0,
-                "invited_users": [],
-                "invited_user_ids": [],  # Track unique user IDs invited
                 "pending_invites": 0,
                 "verified_invites": 0,
                 "unique_invites": 0,  # Track unique verified invites
@@ -180,8 +216,6 @@ class InviteCog(commands.Cog):
         else:
             # Ensure new fields exist
             updates = {}
-            if "invited_user_ids" not in user:
-                updates["invited_user_ids"] = []
             if "unique_invites" not in user:
                 updates["unique_invites"] = 0
             if "duplicate_invites" not in user:
@@ -216,7 +250,7 @@ class InviteCog(commands.Cog):
     async def invite_cache_update(self):
         for guild in self.bot.guilds:
             try:
-                self.invites[guild.id] = await guild.invites()
+                await self.tracker.refresh(guild)
             except:
                 pass
     
@@ -226,33 +260,32 @@ class InviteCog(commands.Cog):
     
     @commands.Cog.listener()
     async def on_ready(self):
+        # Snapshots survive reconnects; joins and new invites keep them current from here on
+        if self._invites_cached:
+            return
+        self._invites_cached = True
         await asyncio.sleep(2)
         for guild in self.bot.guilds:
             try:
-                self.invites[guild.id] = await guild.invites()
+                await self.tracker.refresh(guild)
             except Exception as e:
                 print(f"Failed to cache invites for {guild.name}: {e}")
     
     @commands.Cog.listener()
     async def on_guild_join(self, guild):
         try:
-            self.invites[guild.id] = await guild.invites()
+            await self.tracker.refresh(guild)
         except discord.Forbidden:
             pass
     
     @commands.Cog.listener()
-    async def on_invite_create(self, invite):
-        try:
-            self.invites[invite.guild.id] = await invite.guild.invites()
-        except:
-            pass
+    async def on_guild_remove(self, guild):
+        self.tracker.forget(guild.id)
     
     @commands.Cog.listener()
-    async def on_invite_delete(self, invite):
-        try:
-            self.invites[invite.guild.id] = await invite.guild.invites()
-        except:
-            pass
+    async def on_invite_create(self, invite):
+        # New invites start at zero uses, so no fetch is needed
+        self.tracker.invite_created(invite)
     
     @commands.Cog.listener()
     async def on_member_join(self, member):
@@ -263,30 +296,42 @@ class InviteCog(commands.Cog):
             guild = member.guild
             
             # Check if server has invite tracking enabled
-            server = await self.db.servers.find_one({"server_id": guild.id})
+            server = await self.bot.config_cache.get_server(guild.id)
             if server and not server.get("settings", {}).get("invite_tracking", True):
                 return
             
-            if guild.id not in self.invites:
-                self.invites[guild.id] = await guild.invites()
-                return
-            
-            old_invites = self.invites[guild.id]
-            new_invites = await guild.invites()
-            self.invites[guild.id] = new_invites
+            used_invite = await self.tracker.attribute(member)
+            if used_invite.inviter and used_invite.confidence < 1.0:
+                print(f"Invite attribution for {member.id} in {guild.id}: {used_invite.code} "
+                      f"(confidence {used_invite.confidence:.0%})")
             
-            used_invite = None
-            for invite in old_invites:
-                matching = next((i for i in new_invites if i.code == invite.code), None)
-                if matching and matching.uses > invite.uses:
-                    used_invite = matching
-                    break
-            
-            if used_invite and used_invite.inviter:
+            if used_invite.inviter:
                 inviter_data = await self.get_or_create_user(used_invite.inviter.id, str(used_invite.inviter))
                 
-                # Check if this user was already invited by this inviter (duplicate)
-                already_invited = member.id in inviter_data.get("invited_user_ids", [])
+                # Get inviter's role benefits
+                inviter_member = await self.bot.get_or_fetch_member(guild, used_invite.inviter.id)
+                role_config = {}
+                if inviter_member and server and server.get("role_based"):
+                    role_config = await self.get_user_role_config(inviter_member, server)
+                
+                # The unique (inviter_id, invitee_id) index rejects a rejoin with the same inviter
+                try:
+                    await self.db.invites.insert_one({
+                        "inviter_id": used_invite.inviter.id,
+                        "invitee_id": member.id,
+                        "guild_id": guild.id,
+                        "username": str(member),
+                        "invite_code": used_invite.code,
+                        "attribution_confidence": used_invite.confidence,
+                        "joined_at": datetime.now(timezone.utc),
+                        "verified": False,
+                        "active": True,
+                        "first_time": True,
+                        "role_benefits_at_time": role_config.get("name") if role_config else None
+                    })
+                    already_invited = False
+                except DuplicateKeyError:
+                    already_invited = True
                 
                 if already_invited:
                     # This is a duplicate - user rejoined
@@ -331,38 +376,14 @@ class InviteCog(commands.Cog):
                     return  # Don't process further for duplicates
                 
                 # This is a new unique invite
-                # Get inviter's role benefits
-                inviter_member = guild.get_member(used_invite.inviter.id)
-                role_config = {}
-                if inviter_member and server and server.get("role_based"):
-                    role_config = await self.get_user_role_config(inviter_member, server)
-                
                 await self.db.users.update_one(
                     {"user_id": used_invite.inviter.id},
                     {
                         "$inc": {"invite_count": 1, "pending_invites": 1},
-                        "$push": {
-                            "invited_users": {
-                                "user_id": member.id,
-                                "username": str(member),
-                                "joined_at": datetime.now(timezone.utc),
-                                "verified": False,
-                                "invite_code": used_invite.code,
-                                "role_benefits_at_time": role_config.get("name") if role_config else None,
-                                "first_time": True  # Mark as first time invite
-                            },
-                            "invited_user_ids": member.id  # Add to unique user IDs list
-                        },
                         "$set": {"last_active": datetime.now(timezone.utc)}
                     }
                 )
                 
-                self.tracked_members[member.id] = {
-                    "inviter_id": used_invite.inviter.id,
-                    "joined_at": datetime.now(timezone.utc),
-                    "guild_id": guild.id
-                }
-                
                 embed = discord.Embed(
                     title="👋 New Member Joined!",
                     description=f"{member.mention} joined using an invite (First time)",
@@ -371,7 +392,9 @@ class InviteCog(commands.Cog):
                 )
                 embed.add_field(name="Invited By", value=used_invite.inviter.mention, inline=True)
                 embed.add_field(name="Invite Code", value=f"`{used_invite.code}`", inline=True)
-                embed.add_field(name="Total Uses", value=f"**{matching.uses}**", inline=True)
+                embed.add_field(name="Total Uses", value=f"**{used_invite.uses}**", inline=True)
+                if used_invite.confidence < 1.0:
+                    embed.add_field(name="Attribution", value=f"{used_invite.confidence:.0%} confidence", inline=True)
                 
                 if role_config:
                     embed.add_field(
@@ -402,7 +425,8 @@ class InviteCog(commands.Cog):
                     )
                     dm_embed.add_field(name="Invite Code", value=f"`{used_invite.code}`", inline=True)
                     dm_embed.add_field(name="Total Invites", value=f"**{inviter_data.get('invite_count', 0) + 1}**", inline=True)
-                    dm_embed.add_field(name="Unique Invites", value=f"**{len(inviter_data.get('invited_user_ids', [])) + 1}**", inline=True)
+                    unique_users = await self.db.invites.count_documents({"inviter_id": used_invite.inviter.id})
+                    dm_embed.add_field(name="Unique Invites", value=f"**{unique_users}**", inline=True)
                     
                     # Get verification role info
                     verified_role_id = server.get("verified_role_id") if server else None
@@ -433,7 +457,7 @@ class InviteCog(commands.Cog):
                 return
             
             # Get server configuration
-            server = await self.db.servers.find_one({"server_id": after.guild.id})
+            server = await self.bot.config_cache.get_server(after.guild.id)
             if not server:
                 return
             
@@ -448,24 +472,25 @@ class InviteCog(commands.Cog):
             has_role = verified_role in after.roles
             
             if not had_role and has_role:
-                config = await self.db.config.find_one({"_id": "bot_config"})
+                config = await self.bot.config_cache.get_config()
                 base_invite_points = config.get("point_rates", {}).get("invite", 2)
                 
-                member_data = self.tracked_members.get(after.id)
-                if member_data:
-                    inviter_id = member_data["inviter_id"]
-                    
-                    # Check if already verified (prevent duplicate rewards)
-                    inviter_data = await self.db.users.find_one({"user_id": inviter_id})
-                    if inviter_data:
-                        # Check if this specific user is already verified
-                        for invited in inviter_data.get("invited_users", []):
-                            if invited["user_id"] == after.id and invited.get("verified"):
-                                # Already verified, don't give points again
-                                return
+                # Flipping verified in the same update that finds the invite means a
+                # member can only ever earn their inviter one reward
+                invited = await self.db.invites.find_one_and_update(
+                    {
+                        "invitee_id": after.id,
+                        "guild_id": {"$in": [after.guild.id, None]},
+                        "active": True,
+                        "verified": False
+                    },
+                    {"$set": {"verified": True, "verified_at": datetime.now(timezone.utc)}}
+                )
+                if invited:
+                    inviter_id = invited["inviter_id"]
                     
                     # Get inviter's role config for bonus
-                    inviter = after.guild.get_member(inviter_id)
+                    inviter = await self.bot.get_or_fetch_member(after.guild, inviter_id)
                     bonus_points = 0
                     role_name = None
                     
@@ -477,24 +502,19 @@ class InviteCog(commands.Cog):
                             role_name = role_config.get("name")
                     
                     total_points = base_invite_points + bonus_points
+                    is_unique = invited.get("first_time", True)
                     
-                    # Update with verification and increment unique invites
-                    await self.db.users.update_one(
-                        {
-                            "user_id": inviter_id,
-                            "invited_users.user_id": after.id
-                        },
-                        {
-                            "$set": {"invited_users.$.verified": True},
-                            "$inc": {
-                                "pending_invites": -1,
-                                "verified_invites": 1,
-                                "unique_invites": 1,  # Increment unique invites
-                                "points": total_points,
-                                "total_earned": total_points
-                            }
-                        }
-                    )
+                    increments = {
+                        "pending_invites": -1,
+                        "verified_invites": 1,
+                        "points": total_points,
+                        "total_earned": total_points
+                    }
+                    if is_unique:
+                        increments["unique_invites"] = 1
+                    
+                    await self.db.users.update_one({"user_id": inviter_id}, {"$inc": increments})
+                    self.bot.leaderboards.touch(inviter_id)
                     
                     if inviter:
                         embed = discord.Embed(
@@ -515,7 +535,8 @@ class InviteCog(commands.Cog):
                         embed.add_field(name="Member", value=after.name, inline=True)
                         embed.set_thumbnail(url=after.display_avatar.url)
                         
-                        log_message = f"✅ {inviter.mention} received **{total_points}** points for inviting {after.mention} (Verified - Unique)"
+                        log_message = f"✅ {inviter.mention} received **{total_points}** points for inviting {after.mention} (Verified"
+                        log_message += " - Unique)" if is_unique else ")"
                         if role_name:
                             log_message += f" [Role: {role_name}]"
                         
@@ -529,65 +550,6 @@ class InviteCog(commands.Cog):
                             await inviter.send(embed=embed)
                         except:
                             pass
-                    
-                    del self.tracked_members[after.id]
-                else:
-                    # Check database for pending verification
-                    user_data = await self.db.users.find_one({"invited_users.user_id": after.id})
-                    if user_data:
-                        for invited in user_data.get("invited_users", []):
-                            if invited["user_id"] == after.id and not invited.get("verified"):
-                                # Get inviter's current role config
-                                inviter = after.guild.get_member(user_data["user_id"])
-                                bonus_points = 0
-                                role_name = None
-                                
-                                if inviter and server.get("role_based"):
-                                    role_config = await self.get_user_role_config(inviter, server)
-                                    if role_config:
-                                        invite_bonus = role_config.get("invite_bonus", 0)
-                                        bonus_points = invite_bonus
-                                        role_name = role_config.get("name")
-                                
-                                total_points = base_invite_points + bonus_points
-                                
-                                # Check if this is first time verification for this user
-                                is_unique = invited.get("first_time", True)
-                                
-                                update_data = {
-                                    "$set": {"invited_users.$.verified": True},
-                                    "$inc": {
-                                        "pending_invites": -1,
-                                        "verified_invites": 1,
-                                        "points": total_points,
-                                        "total_earned": total_points
-                                    }
-                                }
-                                
-                                if is_unique:
-                                    update_data["$inc"]["unique_invites"] = 1
-                                
-                                await self.db.users.update_one(
-                                    {
-                                        "user_id": user_data["user_id"],
-                                        "invited_users.user_id": after.id
-                                    },
-                                    update_data
-                                )
-                                
-                                if inviter:
-                                    log_message = f"✅ {inviter.mention} received **{total_points}** points for inviting {after.mention} (Verified - Database Recovery)"
-                                    if is_unique:
-                                        log_message += " [Unique]"
-                                    if role_name:
-                                        log_message += f" [Role: {role_name}]"
-                                    
-                                    asyncio.create_task(self.log_action(
-                                        after.guild.id,
-                                        log_message,
-                                        discord.Color.green()
-                                    ))
-                                break
                 
                 if after.id in self.pending_rewards:
                     for inviter_id in list(self.pending_rewards.keys()):
@@ -601,7 +563,9 @@ class InviteCog(commands.Cog):
             print(f"Error in member update: {traceback.format_exc()}")
     
     @commands.Cog.listener()
-    async def on_member_remove(self, member):
+    async def on_raw_member_remove(self, payload):
+        # The raw event also fires for members that were never cached
+        member = payload.user
         try:
             if member.bot:
                 return
@@ -609,57 +573,48 @@ class InviteCog(commands.Cog):
             # Get current time with timezone
             current_time = datetime.now(timezone.utc)
             
-            # Clean up tracked members
-            if member.id in self.tracked_members:
-                del self.tracked_members[member.id]
-            
-            # Find user who invited this member
-            user_data = await self.db.users.find_one({"invited_users.user_id": member.id})
-            if user_data:
-                for invited in user_data.get("invited_users", []):
-                    if invited["user_id"] == member.id:
-                        # Ensure joined_at is timezone-aware
-                        joined_at = invited.get("joined_at", current_time)
-                        if isinstance(joined_at, datetime) and joined_at.tzinfo is None:
-                            joined_at = joined_at.replace(tzinfo=timezone.utc)
-                        
-                        # Calculate duration
-                        duration = current_time - joined_at
-                        
-                        if invited.get("verified"):
-                            await self.db.users.update_one(
-                                {"user_id": user_data["user_id"]},
-                                {
-                                    "$inc": {"verified_invites": -1, "unique_invites": -1},
-                                    "$pull": {"invited_users": {"user_id": member.id}}
-                                }
-                            )
-                        else:
-                            await self.db.users.update_one(
-                                {"user_id": user_data["user_id"]},
-                                {
-                                    "$inc": {"pending_invites": -1, "fake_invites": 1},
-                                    "$pull": {"invited_users": {"user_id": member.id}}
-                                }
-                            )
-                        
-                        inviter = self.bot.get_user(user_data["user_id"])
-                        if inviter:
-                            embed = discord.Embed(
-                                title="👋 Invited Member Left",
-                                description=f"{member.name} left the server",
-                                color=discord.Color.orange(),
-                                timestamp=current_time
-                            )
-                            embed.add_field(name="Status", value="Not Verified" if not invited.get("verified") else "Was Verified", inline=True)
-                            embed.add_field(name="Stayed For", value=f"{duration.days} days", inline=True)
-                            
-                            asyncio.create_task(self.log_action(
-                                member.guild.id,
-                                f"👋 {member.mention} left (Invited by {inviter.mention})",
-                                discord.Color.orange()
-                            ))
-                        break
+            # Keep the pair so a rejoin with the same inviter is still a duplicate, minus the details
+            invited = await self.db.invites.find_one_and_update(
+                {"invitee_id": member.id, "guild_id": {"$in": [payload.guild_id, None]}, "active": True},
+                {
+                    "$set": {"active": False, "left_at": current_time},
+                    "$unset": {"username": "", "invite_code": "", "attribution_confidence": "", "role_benefits_at_time": ""}
+                }
+            )
+            if invited:
+                # Ensure joined_at is timezone-aware
+                joined_at = invited.get("joined_at") or current_time
+                if isinstance(joined_at, datetime) and joined_at.tzinfo is None:
+                    joined_at = joined_at.replace(tzinfo=timezone.utc)
+                
+                # Calculate duration
+                duration = current_time - joined_at
+                
+                if invited.get("verified"):
+                    increments = {"verified_invites": -1}
+                    if invited.get("first_time", True):
+                        increments["unique_invites"] = -1
+                else:
+                    increments = {"pending_invites": -1, "fake_invites": 1}
+                await self.db.users.update_one({"user_id": invited["inviter_id"]}, {"$inc": increments})
+                self.bot.leaderboards.touch(invited["inviter_id"])
+                
+                inviter = await self.bot.get_or_fetch_user(invited["inviter_id"])
+                if inviter:
+                    embed = discord.Embed(
+                        title="👋 Invited Member Left",
+                        description=f"{member.name} left the server",
+                        color=discord.Color.orange(),
+                        timestamp=current_time
+                    )
+                    embed.add_field(name="Status", value="Not Verified" if not invited.get("verified") else "Was Verified", inline=True)
+                    embed.add_field(name="Stayed For", value=f"{duration.days} days", inline=True)
+                    
+                    asyncio.create_task(self.log_action(
+                        payload.guild_id,
+                        f"👋 {member.mention} left (Invited by {inviter.mention})",
+                        discord.Color.orange()
+                    ))
                         
         except Exception as e:
             print(f"Error in member remove: {type(e).__name__}: {e}")
@@ -677,11 +632,11 @@ class InviteCog(commands.Cog):
             
             user_data = await self.db.users.find_one({"user_id": user.id})
             
-            config = await self.db.config.find_one({"_id": "bot_config"})
+            config = await self.bot.config_cache.get_config()
             base_invite_points = config.get("point_rates", {}).get("invite", 2)
             
             # Get user's role benefits
-            server = await self.db.servers.find_one({"server_id": ctx.guild.id})
+            server = await self.bot.config_cache.get_server(ctx.guild.id)
             role_config = {}
             bonus_points = 0
             role_name = None
@@ -750,13 +705,15 @@ class InviteCog(commands.Cog):
                             inline=False
                         )
                 
-                recent_invites = user_data.get("invited_users", [])[-5:]
+                recent_invites = await self.db.invites.find(
+                    {"inviter_id": user.id, "active": True}
+                ).sort("joined_at", -1).limit(5).to_list(5)
                 if recent_invites:
                     recent_text = []
-                    for inv in reversed(recent_invites):
+                    for inv in recent_invites:
                         status = "✅" if inv.get("verified") else "⏳"
                         first_time = " 🆕" if inv.get("first_time", True) else " 🔄"
-                        recent_text.append(f"{status} {inv['username']}{first_time}")
+                        recent_text.append(f"{status} {inv.get('username') or inv['invitee_id']}{first_time}")
                     
                     embed.add_field(
                         name="📋 Recent Invites",
@@ -829,12 +786,12 @@ class InviteCog(commands.Cog):
             )
             
             # Get user's role benefits
-            server = await self.db.servers.find_one({"server_id": ctx.guild.id})
+            server = await self.bot.config_cache.get_server(ctx.guild.id)
             role_config = {}
             if server and server.get("role_based"):
                 role_config = await self.get_user_role_config(ctx.author, server)
             
-            config = await self.db.config.find_one({"_id": "bot_config"})
+            config = await self.bot.config_cache.get_config()
             base_points = config.get("point_rates", {}).get("invite", 2)
             bonus_points = role_config.get("invite_bonus", 0) if role_config else 0
             total_points = base_points + bonus_points
@@ -890,6 +847,7 @@ class InviteCog(commands.Cog):
         try:
             await ctx.defer()
             
+            await self.db.invites.delete_many({"inviter_id": user.id})
             await self.db.users.update_one(
                 {"user_id": user.id},
                 {
@@ -899,12 +857,11 @@ class InviteCog(commands.Cog):
                         "verified_invites": 0,
                         "unique_invites": 0,
                         "duplicate_invites": 0,
-                        "fake_invites": 0,
-                        "invited_users": [],
-                        "invited_user_ids": []
+                        "fake_invites": 0
                     }
                 }
             )
+            self.bot.leaderboards.touch(user.id)
             
             embed = discord.Embed(
                 title="🔄 Invites Reset",
@@ -932,45 +889,13 @@ class InviteCog(commands.Cog):
         try:
             await ctx.defer()
             
-            fixed = 0
+            await self.migrate_invited_users()
             
-            # Fix missing fields for all users
-            async for user in self.db.users.find():
-                updates = {}
-                
-                if "invited_user_ids" not in user:
-                    # Build invited_user_ids from invited_users
-                    user_ids = []
-                    for invited in user.get("invited_users", []):
-                        if invited["user_id"] not in user_ids:
-                            user_ids.append(invited["user_id"])
-                    updates["invited_user_ids"] = user_ids
-                
-                if "unique_invites" not in user:
-                    # Count unique verified invites
-                    unique_verified = 0
-                    seen_ids = []
-                    for invited in user.get("invited_users", []):
-                        if invited.get("verified") and invited["user_id"] not in seen_ids:
-                            unique_verified += 1
-                            seen_ids.append(invited["user_id"])
-                    updates["unique_invites"] = unique_verified
-                
-                if "duplicate_invites" not in user:
-                    updates["duplicate_invites"] = 0
-                
-                # Mark all existing invites as first_time
-                if user.get("invited_users"):
-                    for i, invited in enumerate(user["invited_users"]):
-                        if "first_time" not in invited:
-                            updates[f"invited_users.{i}.first_time"] = True
-                
-                if updates:
-                    await self.db.users.update_one(
-                        {"_id": user["_id"]},
-                        {"$set": updates}
-                    )
-                    fixed += 1
+            # Counters are rebuilt from the invites collection
+            fixed = 0
+            for inviter_id in await self.db.invites.distinct("inviter_id"):
+                await self.recount_invites(inviter_id)
+                fixed += 1
             
             embed = discord.Embed(
                 title="✅ Invite Data Fixed",
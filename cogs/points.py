@@ -7,6 +7,67 @@ import traceback
 from typing import Optional
 import asyncio
 
+LEADERBOARDS = {
+    "points": ("💰 Points Leaderboard", "points"),
+    "invites": ("👥 Invite Leaderboard", "verified invites"),
+    "claims": ("🍪 Cookie Claims Leaderboard", "claims"),
+    "slots": ("🎰 Slots Winnings Leaderboard", "points won"),
+    "rob": ("🦹 Rob Winnings Leaderboard", "points stolen"),
+    "bet": ("🎲 Bet Winnings Leaderboard", "points won"),
+}
+
+class LeaderboardView(discord.ui.View):
+    """Pages through the in-memory board, so page buttons never touch the database"""
+    
+    def __init__(self, bot, board: str, viewer_id: int):
+        super().__init__(timeout=120)
+        self.bot = bot
+        self.board = board
+        self.viewer_id = viewer_id
+        self.current_page = 0
+        self.items_per_page = 10
+        
+    async def create_embed(self):
+        title, unit = LEADERBOARDS[self.board]
+        leaderboards = self.bot.leaderboards
+        total = await leaderboards.size(self.board)
+        total_pages = max(1, (total - 1) // self.items_per_page + 1)
+        self.current_page = min(self.current_page, total_pages - 1)
+        start = self.current_page * self.items_per_page
+        
+        lines = []
+        for idx, (user_id, score) in enumerate(await leaderboards.top(self.board, start, self.items_per_page), start=start + 1):
+            medal = {1: "🥇", 2: "🥈", 3: "🥉"}.get(idx, "")
+            user = self.bot.get_user(user_id)
+            name = user.name if user else f"<@{user_id}>"
+            lines.append(f"{medal} **{idx}.** {name} - **{int(score):,}** {unit}")
+        
+        embed = discord.Embed(
+            title=title,
+            description="\n".join(lines) or "Nobody is on this leaderboard yet!",
+            color=discord.Color.gold(),
+            timestamp=datetime.now(timezone.utc)
+        )
+        
+        rank, score = await leaderboards.rank(self.board, self.viewer_id)
+        embed.add_field(
+            name="📍 Your Rank",
+            value=f"**#{rank:,}** with **{int(score):,}** {unit}" if rank else "Not ranked yet",
+            inline=False
+        )
+        embed.set_footer(text=f"Page {self.current_page + 1}/{total_pages}")
+        return embed
+    
+    @discord.ui.button(emoji="⬅️", style=discord.ButtonStyle.gray)
+    async def previous_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        self.current_page = max(0, self.current_page - 1)
+        await interaction.response.edit_message(embed=await self.create_embed(), view=self)
+    
+    @discord.ui.button(emoji="➡️", style=discord.ButtonStyle.gray)
+    async def next_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        self.current_page += 1
+        await interaction.response.edit_message(embed=await self.create_embed(), view=self)
+
 class PointsCog(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
@@ -66,8 +127,8 @@ class PointsCog(commands.Cog):
         best_config = {}
         highest_priority = -1
         
-        # Get fresh server data to ensure we have latest role configs
-        server = await self.db.servers.find_one({"server_id": member.guild.id})
+        # Server docs are cached and invalidated on change, so role configs stay current
+        server = await self.bot.config_cache.get_server(member.guild.id)
         if not server or not server.get("roles"):
             return {}
         
@@ -91,7 +152,7 @@ class PointsCog(commands.Cog):
                 # For slash commands, defer the interaction response
                 await ctx.interaction.response.defer(ephemeral=True)
             
-            server = await self.db.servers.find_one({"server_id": ctx.guild.id})
+            server = await self.bot.config_cache.get_server(ctx.guild.id)
             if not server or not server.get("enabled"):
                 embed = discord.Embed(
                     title="❌ Bot Disabled",
@@ -144,7 +205,7 @@ class PointsCog(commands.Cog):
                         await ctx.send(embed=embed, ephemeral=True)
                     return
             
-            config = await self.db.config.find_one({"_id": "bot_config"})
+            config = await self.bot.config_cache.get_config()
             base_daily_points = config["point_rates"]["daily"]
             
             # Get role bonus
@@ -181,6 +242,7 @@ class PointsCog(commands.Cog):
                     }
                 }
             )
+            self.bot.leaderboards.touch(ctx.author.id)
             
             new_points = user_data["points"] + total_daily_points
             
@@ -246,7 +308,7 @@ class PointsCog(commands.Cog):
             user_data = await self.get_or_create_user(target.id, str(target))
             
             # Get server and role information
-            server = await self.db.servers.find_one({"server_id": ctx.guild.id})
+            server = await self.bot.config_cache.get_server(ctx.guild.id)
             role_config = None
             if server and server.get("role_based"):
                 role_config = await self.get_user_role_config(target, server)
@@ -357,6 +419,28 @@ class PointsCog(commands.Cog):
             else:
                 await ctx.send("❌ An error occurred!", ephemeral=True)
     
+    @commands.hybrid_command(name="leaderboard", description="View the top users")
+    @app_commands.describe(board="Which leaderboard to show")
+    @app_commands.choices(board=[
+        app_commands.Choice(name="Points", value="points"),
+        app_commands.Choice(name="Invites", value="invites"),
+        app_commands.Choice(name="Cookie Claims", value="claims"),
+        app_commands.Choice(name="Slots Winnings", value="slots"),
+        app_commands.Choice(name="Rob Winnings", value="rob"),
+        app_commands.Choice(name="Bet Winnings", value="bet")
+    ])
+    async def leaderboard(self, ctx, board: str = "points"):
+        try:
+            if board not in LEADERBOARDS:
+                await ctx.send(f"❌ Unknown leaderboard! Choose from: {', '.join(LEADERBOARDS)}", ephemeral=True)
+                return
+            
+            view = LeaderboardView(self.bot, board, ctx.author.id)
+            await ctx.send(embed=await view.create_embed(), view=view)
+        except Exception as e:
+            print(f"Error in leaderboard command: {e}")
+            await ctx.send("❌ An error occurred!", ephemeral=True)
+    
     @commands.hybrid_command(name="getpoints", description="Ways to earn points")
     async def getpoints(self, ctx):
         try:
@@ -365,8 +449,8 @@ class PointsCog(commands.Cog):
             if is_interaction:
                 await ctx.interaction.response.defer(ephemeral=True)
             
-            config = await self.db.config.find_one({"_id": "bot_config"})
-            server = await self.db.servers.find_one({"server_id": ctx.guild.id})
+            config = await self.bot.config_cache.get_config()
+            server = await self.bot.config_cache.get_server(ctx.guild.id)
             
             embed = discord.Embed(
                 title="💰 How to Earn Points",
@@ -484,7 +568,7 @@ class PointsCog(commands.Cog):
                     await ctx.send(embed=embed, ephemeral=True)
                 return
             
-            server = await self.db.servers.find_one({"server_id": ctx.guild.id})
+            server = await self.bot.config_cache.get_server(ctx.guild.id)
             role_config = None
             if server and server.get("role_based"):
                 role_config = await self.get_user_role_config(user, server)
@@ -549,10 +633,14 @@ class PointsCog(commands.Cog):
             embed.add_field(name="📉 Total Spent", value=f"**{user_data.get('total_spent', 0):,}**", inline=True)
             
             # Daily claims breakdown
-            if user_data.get("daily_claims"):
+            cookie_cog = self.bot.get_cog("CookieCog")
+            if user_data.get("daily_claims") and cookie_cog:
                 daily_text = []
-                for cookie_type, claim_data in list(user_data["daily_claims"].items())[:3]:
-                    count = claim_data.get("count", 0)
+                # Counters from earlier days are stale, not reset
+                todays_claims = [(cookie_type, cookie_cog.claims_today(user_data, cookie_type))
+                                 for cookie_type in user_data["daily_claims"]]
+                todays_claims = [(cookie_type, count) for cookie_type, count in todays_claims if count]
+                for cookie_type, count in todays_claims[:3]:
                     daily_text.append(f"**{cookie_type}**: {count} today")
                 
                 if daily_text:
@@ -608,8 +696,8 @@ class PointsCog(commands.Cog):
             if is_interaction:
                 await ctx.interaction.response.defer(ephemeral=True)
             
-            config = await self.db.config.find_one({"_id": "bot_config"})
-            server = await self.db.servers.find_one({"server_id": ctx.guild.id})
+            config = await self.bot.config_cache.get_config()
+            server = await self.bot.config_cache.get_server(ctx.guild.id)
             
             embed = discord.Embed(
                 title="🍪 Cookie Bot Help",
@@ -625,6 +713,7 @@ class PointsCog(commands.Cog):
                     "`/cookie <type>` - Claim a cookie (role-based access)\n"
                     "`/daily` - Get daily points + role bonus\n"
                     "`/points` - Check your balance\n"
+                    "`/leaderboard [board]` - View the top users\n"
                     "`/status [@user]` - Check detailed status\n"
                     "`/stock [type]` - Check cookie stock\n"
                     "`/getpoints` - How to earn points\n"
@@ -3,6 +3,7 @@ from discord.ext import commands, tasks
 from discord import app_commands
 import random
 import asyncio
+import uuid
 from datetime import datetime, timedelta, timezone
 from typing import Dict, List, Optional
 import math
@@ -180,6 +181,8 @@ class BetGame:
         self.host_id = host.id
         self.mode = mode
         self.currency = currency
+        self.field = "points" if currency == "points" else "trust_score"
+        self.escrow_id = f"bet_{uuid.uuid4().hex}"
         self.channel = None
         self.message = None
         self.view = None
@@ -203,26 +206,12 @@ class BetGame:
         if self.phase != "joining":
             return
             
-        user_data = await self.cog.get_user_data(interaction.user.id)
+        await self.cog.get_user_data(interaction.user.id)
         amount = self.initial_bet
         
-        if self.currency == "points":
-            if user_data["points"] < amount:
-                await interaction.response.send_message(f"❌ You need {amount} points!", ephemeral=True)
-                return
-            await self.cog.db.users.update_one(
-                {"user_id": interaction.user.id},
-                {"$inc": {"points": -amount}}
-            )
-        else:
-            if user_data.get("trust_score", 50) < amount:
-                await interaction.response.send_message(f"❌ You need {amount} trust!", ephemeral=True)
-                return
-            current_trust = user_data.get("trust_score", 50)
-            await self.cog.db.users.update_one(
-                {"user_id": interaction.user.id},
-                {"$set": {"trust_score": current_trust - amount}}
-            )
+        if not await self.cog.bot.wallet.hold(self.escrow_id, interaction.user.id, amount, self.field):
+            await interaction.response.send_message(f"❌ You need {amount} {self.currency}!", ephemeral=True)
+            return
         
         self.players[interaction.user.id] = {"user": interaction.user, "bet": amount}
         
@@ -248,31 +237,15 @@ class BetGame:
         
         user_data = await self.cog.get_user_data(interaction.user.id)
         
-        server = await self.cog.db.servers.find_one({"server_id": interaction.guild_id})
+        server = await self.cog.bot.config_cache.get_server(interaction.guild_id)
         role_config = await self.cog.get_user_role_config(interaction.user, server) if server else {}
         
         bet_profit_multiplier = role_config.get("game_benefits", {}).get("bet_profit_multiplier", 1.0) if role_config else 1.0
         
-        if self.currency == "points":
-            if user_data["points"] < amount:
-                await interaction.response.send_message(f"❌ You need {amount} points! You have: {user_data['points']}", ephemeral=True)
-                return
-        else:
-            if user_data.get("trust_score", 50) < amount:
-                await interaction.response.send_message(f"❌ You need {amount} trust! You have: {user_data.get('trust_score', 50)}", ephemeral=True)
-                return
-        
-        if self.currency == "points":
-            await self.cog.db.users.update_one(
-                {"user_id": interaction.user.id},
-                {"$inc": {"points": -amount}}
-            )
-        else:
-            current_trust = user_data.get("trust_score", 50)
-            await self.cog.db.users.update_one(
-                {"user_id": interaction.user.id},
-                {"$set": {"trust_score": current_trust - amount}}
-            )
+        if not await self.cog.bot.wallet.hold(self.escrow_id, interaction.user.id, amount, self.field):
+            balance = user_data.get(self.field, self.cog.bot.wallet.defaults[self.field])
+            await interaction.response.send_message(f"❌ You need {amount} {self.currency}! You have: {balance}", ephemeral=True)
+            return
         
         self.players[interaction.user.id] = {
             "user": interaction.user, 
@@ -300,25 +273,9 @@ class BetGame:
         if len(self.players) >= self.max_players:
             return False
         
-        user_data = await self.cog.get_user_data(user.id)
-        if self.currency == "points":
-            if user_data["points"] < amount:
-                return False
-        else:
-            if user_data.get("trust_score", 50) < amount:
-                return False
-        
-        if self.currency == "points":
-            await self.cog.db.users.update_one(
-                {"user_id": user.id},
-                {"$inc": {"points": -amount}}
-            )
-        else:
-            current_trust = user_data.get("trust_score", 50)
-            await self.cog.db.users.update_one(
-                {"user_id": user.id},
-                {"$set": {"trust_score": current_trust - amount}}
-            )
+        await self.cog.get_user_data(user.id)
+        if not await self.cog.bot.wallet.hold(self.escrow_id, user.id, amount, self.field):
+            return False
         
         self.players[user.id] = {"user": user, "bet": amount}
         
@@ -412,30 +369,11 @@ class BetGame:
             actual_profit = base_profit * profit_multiplier
             total_win = winner_data["bet"] + actual_profit
             
-            if self.currency == "points":
-                await self.cog.db.users.update_one(
-                    {"user_id": winner},
-                    {
-                        "$inc": {
-                            "points": int(total_win),
-                            "game_stats.bet.won": 1,
-                            "game_stats.bet.profit": int(actual_profit)
-                        }
-                    }
-                )
-            else:
-                user_data = await self.cog.get_user_data(winner)
-                new_trust = user_data.get("trust_score", 50) + total_win
-                await self.cog.db.users.update_one(
-                    {"user_id": winner},
-                    {
-                        "$set": {"trust_score": min(100, new_trust)},
-                        "$inc": {
-                            "game_stats.bet.won": 1,
-                            "game_stats.bet.profit": int(actual_profit)
-                        }
-                    }
-                )
+            await self.cog.bot.wallet.settle(
+                self.escrow_id,
+                payouts={winner: int(total_win)},
+                updates={winner: {"$inc": {"game_stats.bet.won": 1, "game_stats.bet.profit": int(actual_profit)}}}
+            )
             
             winner_text = f"{winner_data['user'].mention} guessed correctly!\n"
             winner_text += f"Bet: {winner_data['bet']} → Won: {int(total_win)} (+{int(actual_profit)})"
@@ -457,19 +395,7 @@ class BetGame:
         elif winner and self.mode == "group":
             winner_data = self.players[winner]
             consolation = int(winner_data["bet"] * 0.5)
-            
-            if self.currency == "points":
-                await self.cog.db.users.update_one(
-                    {"user_id": winner},
-                    {"$inc": {"points": consolation}}
-                )
-            else:
-                user_data = await self.cog.get_user_data(winner)
-                new_trust = user_data.get("trust_score", 50) + consolation
-                await self.cog.db.users.update_one(
-                    {"user_id": winner},
-                    {"$set": {"trust_score": min(100, new_trust)}}
-                )
+            await self.cog.bot.wallet.settle(self.escrow_id, payouts={winner: consolation})
             
             embed.add_field(
                 name="🥈 Closest Guess",
@@ -481,19 +407,7 @@ class BetGame:
         elif winner and self.mode == "solo" and closest_diff <= 2:
             player_data = self.players[self.host_id]
             consolation = int(player_data["bet"] * 0.15)
-            
-            if self.currency == "points":
-                await self.cog.db.users.update_one(
-                    {"user_id": self.host_id},
-                    {"$inc": {"points": consolation}}
-                )
-            else:
-                user_data = await self.cog.get_user_data(self.host_id)
-                new_trust = user_data.get("trust_score", 50) + consolation
-                await self.cog.db.users.update_one(
-                    {"user_id": self.host_id},
-                    {"$set": {"trust_score": min(100, new_trust)}}
-                )
+            await self.cog.bot.wallet.settle(self.escrow_id, payouts={self.host_id: consolation})
             
             embed.add_field(
                 name="😅 Close Guess!",
@@ -502,6 +416,7 @@ class BetGame:
                 inline=False
             )
         else:
+            await self.cog.bot.wallet.settle(self.escrow_id)
             embed.add_field(
                 name="😢 No Winners",
                 value="Nobody guessed correctly or submitted a guess!",
@@ -532,7 +447,7 @@ class BetGame:
         for item in self.view.children:
             item.disabled = True
         
-        await self.message.edit(embed=embed, view=self.view)
+        await self.cog.bot.edits.edit(self.message, embed=embed, view=self.view)
         
         if self.channel.id in self.cog.active_games:
             del self.cog.active_games[self.channel.id]
@@ -546,19 +461,7 @@ class BetGame:
         if self.timer_task:
             self.timer_task.cancel()
         
-        for user_id, player_data in self.players.items():
-            if self.currency == "points":
-                await self.cog.db.users.update_one(
-                    {"user_id": user_id},
-                    {"$inc": {"points": player_data["bet"]}}
-                )
-            else:
-                user_data = await self.cog.get_user_data(user_id)
-                new_trust = user_data.get("trust_score", 50) + player_data["bet"]
-                await self.cog.db.users.update_one(
-                    {"user_id": user_id},
-                    {"$set": {"trust_score": min(100, new_trust)}}
-                )
+        await self.cog.bot.wallet.release(self.escrow_id)
         
         embed = discord.Embed(
             title="❌ Bet Cancelled",
@@ -569,7 +472,7 @@ class BetGame:
         for item in self.view.children:
             item.disabled = True
         
-        await self.message.edit(embed=embed, view=self.view)
+        await self.cog.bot.edits.edit(self.message, embed=embed, view=self.view)
         
         if self.channel.id in self.cog.active_games:
             del self.cog.active_games[self.channel.id]
@@ -628,10 +531,8 @@ class BetGame:
             total_pool = sum(p["bet"] for p in self.players.values())
             embed.add_field(name="💰 Pool", value=str(total_pool), inline=True)
         
-        try:
-            await self.message.edit(embed=embed, view=self.view)
-        except:
-            pass
+        # Queued rather than awaited: joins and timer changes in quick succession collapse into one edit
+        self.cog.bot.edits.edit(self.message, embed=embed, view=self.view)
 
 class BetCog(commands.Cog):
     def __init__(self, bot):
@@ -663,8 +564,8 @@ class BetCog(commands.Cog):
         best_config = {}
         highest_priority = -1
         
-        # Get fresh server data to ensure we have latest role configs
-        server = await self.db.servers.find_one({"server_id": member.guild.id})
+        # Server docs are cached and invalidated on change, so role configs stay current
+        server = await self.bot.config_cache.get_server(member.guild.id)
         if not server or not server.get("roles"):
             return {}
         
@@ -739,7 +640,7 @@ class BetCog(commands.Cog):
         game = BetGame(self, ctx.author, mode, currency, amount)
         game.channel = ctx.channel
         
-        server = await self.db.servers.find_one({"server_id": ctx.guild.id})
+        server = await self.bot.config_cache.get_server(ctx.guild.id)
         role_config = await self.get_user_role_config(ctx.author, server) if server else {}
         
         if mode == "solo":
@@ -6,6 +6,8 @@ import asyncio
 from datetime import datetime, timedelta, timezone
 from typing import Optional
 
+GAMBLE_COOLDOWN = 7 * 24 * 3600
+
 class BetAmountModal(discord.ui.Modal):
     def __init__(self, gamble_cog, user_id: int):
         super().__init__(title="Enter Gamble Amount")
@@ -67,9 +69,11 @@ class GambleCog(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         self.db = bot.db
+        self.cooldowns = bot.cooldowns
         self.cleanup_roles.start()
         
     async def cog_load(self):
+        await self.seed_cooldowns()
         print("🎮 GambleCog loaded")
         
     async def cog_unload(self):
@@ -81,7 +85,7 @@ class GambleCog(commands.Cog):
             async for gamble_data in self.db.divine_gambles.find({"status": "blessed", "role_expires": {"$lt": datetime.now(timezone.utc)}}):
                 guild = self.bot.get_guild(gamble_data["guild_id"])
                 if guild:
-                    member = guild.get_member(gamble_data["user_id"])
+                    member = await self.bot.get_or_fetch_member(guild, gamble_data["user_id"])
                     divine_role = discord.utils.get(guild.roles, name="Divine Chosen")
                     if member and divine_role and divine_role in member.roles:
                         await member.remove_roles(divine_role)
@@ -117,8 +121,8 @@ class GambleCog(commands.Cog):
         best_config = {}
         highest_priority = -1
         
-        # Get fresh server data to ensure we have latest role configs
-        server = await self.db.servers.find_one({"server_id": member.guild.id})
+        # Server docs are cached and invalidated on change, so role configs stay current
+        server = await self.bot.config_cache.get_server(member.guild.id)
         if not server or not server.get("roles"):
             return {}
         
@@ -137,35 +141,32 @@ class GambleCog(commands.Cog):
             await cookie_cog.log_action(guild_id, message, color)
             
     async def count_active_invites(self, user_id: int) -> int:
-        user_data = await self.db.users.find_one({"user_id": user_id})
-        if not user_data:
-            return 0
-            
-        active_count = 0
-        for invited_user in user_data.get("invited_users", []):
-            if invited_user.get("verified", False):
-                active_count += 1
-                
-        return active_count
+        return await self.db.invites.count_documents({"inviter_id": user_id, "verified": True, "active": True})
         
+    async def seed_cooldowns(self):
+        """Carry cooldowns of gambles made before they lived in the cooldown store"""
+        since = datetime.now(timezone.utc) - timedelta(seconds=GAMBLE_COOLDOWN)
+        try:
+            async for recent in self.db.divine_gambles.aggregate([
+                {"$match": {"timestamp": {"$gt": since}}},
+                {"$group": {"_id": "$user_id", "last": {"$max": "$timestamp"}}}
+            ]):
+                last = recent["last"]
+                if last.tzinfo is None:
+                    last = last.replace(tzinfo=timezone.utc)
+                remaining = (last - since).total_seconds()
+                await self.cooldowns.acquire(f"divine_gamble:{recent['_id']}", remaining)
+        except Exception as e:
+            print(f"Error seeding gamble cooldowns: {e}")
+    
     async def check_cooldown(self, user_id: int) -> tuple[bool, Optional[datetime]]:
-        last_gamble = await self.db.divine_gambles.find_one(
-            {"user_id": user_id},
-            sort=[("timestamp", -1)]
-        )
-        
-        if not last_gamble:
-            return True, None
-            
-        cooldown_end = last_gamble["timestamp"] + timedelta(days=7)
-        if datetime.now(timezone.utc) < cooldown_end:
-            return False, cooldown_end
-            
-        return True, None
+        cooldown_end = await self.cooldowns.remaining(f"divine_gamble:{user_id}")
+        return cooldown_end is None, cooldown_end
         
     async def remove_divine_role_from_current(self, guild: discord.Guild):
         divine_role = discord.utils.get(guild.roles, name="Divine Chosen")
         if divine_role:
+            await self.bot.ensure_chunked(guild)
             for member in divine_role.members:
                 await member.remove_roles(divine_role)
                 await self.db.divine_gambles.update_many(
@@ -177,7 +178,7 @@ class GambleCog(commands.Cog):
         divine_role = None
         cursed_role = None
         
-        server_data = await self.db.servers.find_one({"server_id": guild.id})
+        server_data = await self.bot.config_cache.get_server(guild.id)
         
         if server_data and server_data.get("gamble_roles"):
             divine_role_id = server_data["gamble_roles"].get("divine_chosen_id")
@@ -215,11 +216,13 @@ class GambleCog(commands.Cog):
             {
                 "$set": {
                     "gamble_roles.divine_chosen_id": divine_role.id,
-                    "gamble_roles.cursed_gambler_id": cursed_role.id
+                    "gamble_roles.cursed_gambler_id": cursed_role.id,
+                    "last_updated": datetime.now(timezone.utc)
                 }
             },
             upsert=True
         )
+        self.bot.config_cache.invalidate_server(guild.id)
         
         return divine_role, cursed_role
         
@@ -237,16 +240,20 @@ class GambleCog(commands.Cog):
             await interaction.response.send_message(f"❌ You need 10 points! You have: {current_points}", ephemeral=True)
             return
         
-        await self.db.users.update_one(
-            {"user_id": interaction.user.id},
-            {
-                "$inc": {
-                    "points": -10,
-                    "trust_score": -amount,
-                    "game_stats.gamble.attempts": 1
-                }
-            }
+        acquired, cooldown_end = await self.cooldowns.acquire(f"divine_gamble:{interaction.user.id}", GAMBLE_COOLDOWN)
+        if not acquired:
+            await interaction.response.send_message(f"❌ You can gamble again <t:{int(cooldown_end.timestamp())}:R>!", ephemeral=True)
+            return
+        
+        charged = await self.bot.wallet.debit(
+            interaction.user.id,
+            {"points": 10, "trust_score": amount},
+            update={"$inc": {"game_stats.gamble.attempts": 1}}
         )
+        if not charged:
+            await self.cooldowns.reset(f"divine_gamble:{interaction.user.id}")
+            await interaction.response.send_message("❌ Your balance changed, you no longer have enough trust and points!", ephemeral=True)
+            return
         
         loading_embed = discord.Embed(
             title="🎲 The dice of fate are rolling...",
@@ -264,19 +271,18 @@ class GambleCog(commands.Cog):
         if blessed:
             await self.remove_divine_role_from_current(interaction.guild)
             
-            server = await self.db.servers.find_one({"server_id": interaction.guild.id})
+            server = await self.bot.config_cache.get_server(interaction.guild.id)
             role_config = await self.get_user_role_config(interaction.user, server) if server else {}
             
             trust_multiplier = role_config.get("trust_multiplier", 1.0) if role_config else 1.0
             trust_return = int((amount * 3) * trust_multiplier)
             points_return = int(130 * trust_multiplier)
             
-            await self.db.users.update_one(
-                {"user_id": interaction.user.id},
-                {
+            await self.bot.wallet.credit(
+                interaction.user.id,
+                {"points": points_return, "trust_score": trust_return},
+                update={
                     "$inc": {
-                        "points": points_return,
-                        "trust_score": trust_return,
                         "total_earned": points_return,
                         "game_stats.gamble.wins": 1
                     }
@@ -499,7 +505,7 @@ class GambleCog(commands.Cog):
             inline=True
         )
         
-        server = await self.db.servers.find_one({"server_id": ctx.guild.id})
+        server = await self.bot.config_cache.get_server(ctx.guild.id)
         role_config = await self.get_user_role_config(ctx.author, server) if server else {}
         
         if role_config and role_config.get("trust_multiplier", 1.0) > 1.0:
@@ -1,11 +1,13 @@
 import discord
-from discord.ext import commands, tasks
+from discord.ext import commands
 from discord import app_commands
 import random
 import asyncio
 from datetime import datetime, timedelta, timezone
 from typing import Optional, Dict
 import re
+from pymongo import UpdateOne, DeleteOne
+from bot_core.batch_writer import BatchWriter
 
 class TimeExtendModal(discord.ui.Modal, title="Extend Giveaway Time"):
     time_input = discord.ui.TextInput(
@@ -15,13 +17,13 @@ class TimeExtendModal(discord.ui.Modal, title="Extend Giveaway Time"):
         max_length=10
     )
     
-    def __init__(self, cog, giveaway_id):
+    def __init__(self, cog, message_id: int):
         super().__init__()
         self.cog = cog
-        self.giveaway_id = giveaway_id
+        self.message_id = message_id
         
     async def on_submit(self, interaction: discord.Interaction):
-        giveaway = self.cog.active_giveaways.get(self.giveaway_id)
+        giveaway = self.cog.active_giveaways.get(self.message_id)
         if not giveaway:
             await interaction.response.send_message("❌ Giveaway not found!", ephemeral=True)
             return
@@ -38,19 +40,13 @@ class TimeExtendModal(discord.ui.Modal, title="Extend Giveaway Time"):
             await interaction.response.send_message("❌ Invalid time format! Use: 30s, 5m, 1h, 2d", ephemeral=True)
             return
             
-        old_time = giveaway["end_time"]
-        giveaway["end_time"] += additional_time
+        await self.cog.set_end_time(self.message_id, giveaway["end_time"] + additional_time)
         
         # Update the embed with new timestamp
         channel = self.cog.bot.get_channel(giveaway["channel_id"])
         if channel:
             try:
-                message = await channel.fetch_message(giveaway["message_id"])
-                embed = message.embeds[0]
-                # Update both the timestamp and the field
-                embed.timestamp = giveaway["end_time"]
-                embed.set_field_at(0, name="⏰ Ends", value=f"<t:{int(giveaway['end_time'].timestamp())}:R>", inline=True)
-                await message.edit(embed=embed)
+                self.cog.refresh_message(giveaway)
                 
                 await interaction.response.send_message(
                     f"✅ **Giveaway Extended!**\n"
@@ -71,56 +67,57 @@ class TimeExtendModal(discord.ui.Modal, title="Extend Giveaway Time"):
                 await interaction.response.send_message(f"❌ Failed to update: {e}", ephemeral=True)
 
 class GiveawayView(discord.ui.View):
-    def __init__(self, cog, giveaway_id: str):
+    """Persistent buttons shared by every giveaway message; the message id picks the giveaway"""
+    
+    def __init__(self, cog):
         super().__init__(timeout=None)
         self.cog = cog
-        self.giveaway_id = giveaway_id
         
-    @discord.ui.button(label="End Early", style=discord.ButtonStyle.danger, emoji="⏹️", row=0)
+    @discord.ui.button(label="End Early", style=discord.ButtonStyle.danger, emoji="⏹️", row=0, custom_id="giveaway:end")
     async def end_early(self, interaction: discord.Interaction, button: discord.ui.Button):
         # Owner only
         if not await self.cog.is_owner(interaction.user.id):
             await interaction.response.send_message("❌ Only the bot owner can end giveaways!", ephemeral=True)
             return
             
-        giveaway = self.cog.active_giveaways.get(self.giveaway_id)
+        giveaway = self.cog.active_giveaways.get(interaction.message.id)
         if not giveaway:
             await interaction.response.send_message("❌ Giveaway not found!", ephemeral=True)
             return
             
         await interaction.response.defer()
-        await self.cog.end_giveaway(self.giveaway_id, manual=True)
+        await self.cog.end_giveaway(interaction.message.id, manual=True)
         
-    @discord.ui.button(label="Add Time", style=discord.ButtonStyle.primary, emoji="⏰", row=0)
+    @discord.ui.button(label="Add Time", style=discord.ButtonStyle.primary, emoji="⏰", row=0, custom_id="giveaway:extend")
     async def add_time(self, interaction: discord.Interaction, button: discord.ui.Button):
         # Owner only
         if not await self.cog.is_owner(interaction.user.id):
             await interaction.response.send_message("❌ Only the bot owner can extend giveaways!", ephemeral=True)
             return
             
-        giveaway = self.cog.active_giveaways.get(self.giveaway_id)
+        giveaway = self.cog.active_giveaways.get(interaction.message.id)
         if not giveaway:
             await interaction.response.send_message("❌ Giveaway not found!", ephemeral=True)
             return
             
-        modal = TimeExtendModal(self.cog, self.giveaway_id)
+        modal = TimeExtendModal(self.cog, interaction.message.id)
         await interaction.response.send_modal(modal)
         
-    @discord.ui.button(label="Participants", style=discord.ButtonStyle.secondary, emoji="👥", row=1)
+    @discord.ui.button(label="Participants", style=discord.ButtonStyle.secondary, emoji="👥", row=1, custom_id="giveaway:participants")
     async def show_participants(self, interaction: discord.Interaction, button: discord.ui.Button):
         # Anyone can view
-        giveaway = self.cog.active_giveaways.get(self.giveaway_id)
+        giveaway = self.cog.active_giveaways.get(interaction.message.id)
         if not giveaway:
             await interaction.response.send_message("❌ Giveaway not found!", ephemeral=True)
             return
             
-        entries = giveaway.get("entries", [])
+        entries = giveaway["entries"]
         if not entries:
             await interaction.response.send_message("📭 **No participants yet!**\nBe the first to enter!", ephemeral=True)
             return
             
         participant_list = []
-        for i, user_id in enumerate(entries[:25], 1):
+        for i, user_id in enumerate(list(entries)[:25], 1):
             user = self.cog.bot.get_user(user_id)
             if user:
                 participant_list.append(f"`{i:02d}.` {user.mention}")
@@ -134,10 +131,10 @@ class GiveawayView(discord.ui.View):
         
         await interaction.response.send_message(embed=embed, ephemeral=True)
         
-    @discord.ui.button(label="Info", style=discord.ButtonStyle.success, emoji="ℹ️", row=1)
+    @discord.ui.button(label="Info", style=discord.ButtonStyle.success, emoji="ℹ️", row=1, custom_id="giveaway:info")
     async def show_info(self, interaction: discord.Interaction, button: discord.ui.Button):
         # Anyone can view
-        giveaway = self.cog.active_giveaways.get(self.giveaway_id)
+        giveaway = self.cog.active_giveaways.get(interaction.message.id)
         if not giveaway:
             await interaction.response.send_message("❌ Giveaway not found!", ephemeral=True)
             return
@@ -151,7 +148,7 @@ class GiveawayView(discord.ui.View):
         )
         embed.add_field(name="🎁 Prize", value=f"{giveaway['prize']} points", inline=True)
         embed.add_field(name="🎯 Host", value=host.mention if host else "Unknown", inline=True)
-        embed.add_field(name="👥 Entries", value=str(len(giveaway.get("entries", []))), inline=True)
+        embed.add_field(name="👥 Entries", value=str(len(giveaway["entries"])), inline=True)
         embed.add_field(name="⏰ Time Left", value=f"{int(time_left.total_seconds() / 60)} minutes", inline=True)
         embed.add_field(name="🏆 Winners", value=str(giveaway.get("winners", 1)), inline=True)
         embed.add_field(name="📅 Started", value=f"<t:{int(giveaway['created_at'].timestamp())}:R>", inline=True)
@@ -162,14 +159,100 @@ class GiveawayCog(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         self.db = bot.db
-        self.active_giveaways = {}
-        self.check_giveaways.start()
+        # message_id -> giveaway, with entries held as a set of user ids
+        self.active_giveaways: Dict[int, dict] = {}
+        self.entry_writer = BatchWriter("Giveaway entries", self.write_entries, batch_size=500, max_delay=2.0)
         
     async def cog_load(self):
+        self.bot.add_view(GiveawayView(self))
+        self.entry_writer.start()
+        try:
+            await self.ensure_giveaway_indexes()
+            await self.restore_giveaways()
+        except Exception as e:
+            print(f"Error restoring giveaways: {e}")
         print("🎮 GiveawayCog loaded")
         
     async def cog_unload(self):
-        self.check_giveaways.cancel()
+        # Buffered entrants are written first, while the Mongo client is still open
+        await self.entry_writer.stop()
+        for message_id in self.active_giveaways:
+            self.bot.scheduler.cancel(("giveaway", message_id))
+        
+    async def ensure_giveaway_indexes(self):
+        await self.db.giveaways.create_index("message_id", unique=True)
+        await self.db.giveaways.create_index([("status", 1), ("end_time", 1)])
+        await self.db.giveaway_entries.create_index([("message_id", 1), ("user_id", 1)], unique=True)
+        
+    async def restore_giveaways(self):
+        """Reload running giveaways and their entries, and reschedule their endings"""
+        async for giveaway in self.db.giveaways.find({"status": "active"}):
+            # Reactions for a giveaway only reach the cluster running its guild's shard
+            if not self.bot.cluster.owns_guild(giveaway.get("guild_id")):
+                continue
+            entries = await self.db.giveaway_entries.distinct("user_id", {"message_id": giveaway["message_id"]})
+            self.track_giveaway(giveaway, set(entries))
+        if self.active_giveaways:
+            print(f"🎁 Restored {len(self.active_giveaways)} active giveaway(s)")
+            
+    def track_giveaway(self, giveaway: dict, entries: set):
+        for field in ("end_time", "created_at"):
+            if giveaway[field].tzinfo is None:
+                giveaway[field] = giveaway[field].replace(tzinfo=timezone.utc)
+        giveaway["entries"] = entries
+        self.active_giveaways[giveaway["message_id"]] = giveaway
+        self.bot.scheduler.schedule(("giveaway", giveaway["message_id"]), giveaway["end_time"], self.end_giveaway, giveaway["message_id"])
+        
+    def build_embed(self, giveaway: dict, entries: int) -> discord.Embed:
+        winners = giveaway["winners"]
+        embed = discord.Embed(
+            title="🎁 POINTS GIVEAWAY!",
+            description=f"## Prize: {giveaway['prize']} points{' each' if winners > 1 else ''}\n"
+                       f"## Winners: {winners} {'winners' if winners > 1 else 'winner'}\n\n"
+                       f"React with {giveaway['emoji']} to enter!",
+            color=discord.Color.blue(),
+            timestamp=giveaway["end_time"]
+        )
+        embed.add_field(name="⏰ Ends", value=f"<t:{int(giveaway['end_time'].timestamp())}:R>", inline=True)
+        embed.add_field(name="👥 Entries", value=str(entries), inline=True)
+        embed.add_field(name="🏆 Winners", value=str(winners), inline=True)
+        host = giveaway.get("host_name") or self.bot.get_user(giveaway["host_id"])
+        embed.set_footer(text=f"Hosted by {host} • React to enter!")
+        return embed
+        
+    def refresh_message(self, giveaway: dict) -> asyncio.Future:
+        """Queue an edit showing the current entry count; bursts of reactions collapse into one edit"""
+        message = self.bot.edits.partial(giveaway["channel_id"], giveaway["message_id"])
+        return self.bot.edits.edit(message, embed=self.build_embed(giveaway, len(giveaway["entries"])))
+        
+    async def set_end_time(self, message_id: int, end_time: datetime):
+        giveaway = self.active_giveaways[message_id]
+        giveaway["end_time"] = end_time
+        await self.db.giveaways.update_one({"message_id": message_id}, {"$set": {"end_time": end_time}})
+        self.bot.scheduler.schedule(("giveaway", message_id), end_time, self.end_giveaway, message_id)
+        
+    async def write_entries(self, batch):
+        """Apply queued joins and leaves; only the last change per user counts"""
+        latest = {}
+        for message_id, user_id, entered, when in batch:
+            latest[(message_id, user_id)] = (entered, when)
+            
+        operations = []
+        for (message_id, user_id), (entered, when) in latest.items():
+            key = {"message_id": message_id, "user_id": user_id}
+            if entered:
+                operations.append(UpdateOne(key, {"$setOnInsert": {"entered_at": when}}, upsert=True))
+            else:
+                operations.append(DeleteOne(key))
+        await self.db.giveaway_entries.bulk_write(operations, ordered=False)
+        
+        counts = [
+            UpdateOne({"message_id": message_id}, {"$set": {"entry_count": len(self.active_giveaways[message_id]["entries"])}})
+            for message_id in {message_id for message_id, _ in latest}
+            if message_id in self.active_giveaways
+        ]
+        if counts:
+            await self.db.giveaways.bulk_write(counts, ordered=False)
         
     async def log_action(self, guild_id: int, message: str, color: discord.Color = discord.Color.blue()):
         cookie_cog = self.bot.get_cog("CookieCog")
@@ -177,205 +260,189 @@ class GiveawayCog(commands.Cog):
             await cookie_cog.log_action(guild_id, message, color)
             
     async def is_owner(self, user_id: int) -> bool:
-        config = await self.db.config.find_one({"_id": "bot_config"})
+        config = await self.bot.config_cache.get_config()
         return user_id == config.get("owner_id")
         
-    @tasks.loop(seconds=30)
-    async def check_giveaways(self):
-        now = datetime.now(timezone.utc)
-        to_end = []
-        
-        for giveaway_id, giveaway in self.active_giveaways.items():
-            if giveaway["end_time"] and now >= giveaway["end_time"]:
-                to_end.append(giveaway_id)
-                
-        for giveaway_id in to_end:
-            await self.end_giveaway(giveaway_id)
-            
-    @check_giveaways.before_loop
-    async def before_check_giveaways(self):
-        await self.bot.wait_until_ready()
-        
     @commands.Cog.listener()
     async def on_raw_reaction_add(self, payload):
         """Handle reaction adds for giveaway entries"""
-        if payload.user_id == self.bot.user.id:
+        giveaway = self.active_giveaways.get(payload.message_id)
+        if not giveaway or str(payload.emoji) != giveaway["emoji"] or payload.user_id == self.bot.user.id:
             return
             
-        # Check all active giveaways
-        for gid, giveaway in self.active_giveaways.items():
-            if giveaway["message_id"] == payload.message_id and str(payload.emoji) == giveaway["emoji"]:
-                # Found matching giveaway
-                channel = self.bot.get_channel(payload.channel_id)
-                user = self.bot.get_user(payload.user_id)
-                
-                if not channel or not user:
-                    return
-                
-                # Check if user is blacklisted
-                user_data = await self.db.users.find_one({"user_id": payload.user_id})
-                if user_data and user_data.get("blacklisted"):
-                    try:
-                        message = await channel.fetch_message(payload.message_id)
-                        await message.remove_reaction(payload.emoji, user)
-                        await user.send("❌ You are blacklisted and cannot enter giveaways!")
-                    except:
-                        pass
-                    return
+        channel = self.bot.get_channel(payload.channel_id)
+        # Guild reactions carry the member, so entries don't depend on the member cache
+        user = payload.member or self.bot.get_user(payload.user_id)
+        
+        if not channel or not user:
+            return
+        
+        # Check if user is blacklisted
+        user_data = await self.db.users.find_one({"user_id": payload.user_id}, {"blacklisted": 1})
+        if user_data and user_data.get("blacklisted"):
+            try:
+                await channel.get_partial_message(payload.message_id).remove_reaction(payload.emoji, user)
+                await user.send("❌ You are blacklisted and cannot enter giveaways!")
+            except:
+                pass
+            return
+        
+        if payload.user_id not in giveaway["entries"]:
+            giveaway["entries"].add(payload.user_id)
+            self.entry_writer.submit((payload.message_id, payload.user_id, True, datetime.now(timezone.utc)))
+            
+            self.refresh_message(giveaway)
+            try:
+                # Send confirmation message
+                confirm_embed = discord.Embed(
+                    title="✅ Entry Confirmed!",
+                    description=f"{user.mention} entered the giveaway for **{giveaway['prize']}** points!",
+                    color=discord.Color.green()
+                )
+                confirm_embed.add_field(name="📊 Entry #", value=str(len(giveaway['entries'])), inline=True)
+                confirm_embed.add_field(name="⏰ Ends", value=f"<t:{int(giveaway['end_time'].timestamp())}:R>", inline=True)
+                confirm_embed.set_footer(text="Good luck! 🍀")
                 
-                if payload.user_id not in giveaway["entries"]:
-                    giveaway["entries"].append(payload.user_id)
-                    
-                    # Update embed
-                    try:
-                        message = await channel.fetch_message(payload.message_id)
-                        embed = message.embeds[0]
-                        embed.set_field_at(1, name="👥 Entries", value=str(len(giveaway["entries"])), inline=True)
-                        await message.edit(embed=embed)
-                        
-                        # Send confirmation message
-                        confirm_embed = discord.Embed(
-                            title="✅ Entry Confirmed!",
-                            description=f"{user.mention} entered the giveaway for **{giveaway['prize']}** points!",
-                            color=discord.Color.green()
-                        )
-                        confirm_embed.add_field(name="📊 Entry #", value=str(len(giveaway['entries'])), inline=True)
-                        confirm_embed.add_field(name="⏰ Ends", value=f"<t:{int(giveaway['end_time'].timestamp())}:R>", inline=True)
-                        confirm_embed.set_footer(text="Good luck! 🍀")
-                        
-                        await channel.send(
-                            embed=confirm_embed,
-                            delete_after=5
-                        )
-                    except Exception as e:
-                        print(f"Error updating giveaway: {e}")
-                else:
-                    # Already entered
-                    try:
-                        await channel.send(
-                            f"❗ {user.mention} is already in the giveaway!",
-                            delete_after=3
-                        )
-                    except:
-                        pass
-                break
+                await channel.send(
+                    embed=confirm_embed,
+                    delete_after=5
+                )
+            except Exception as e:
+                print(f"Error confirming giveaway entry: {e}")
+        else:
+            # Already entered
+            try:
+                await channel.send(
+                    f"❗ {user.mention} is already in the giveaway!",
+                    delete_after=3
+                )
+            except:
+                pass
                     
     @commands.Cog.listener()
     async def on_raw_reaction_remove(self, payload):
         """Handle reaction removes for giveaway entries"""
-        for gid, giveaway in self.active_giveaways.items():
-            if giveaway["message_id"] == payload.message_id and str(payload.emoji) == giveaway["emoji"]:
-                if payload.user_id in giveaway["entries"]:
-                    giveaway["entries"].remove(payload.user_id)
-                    
-                    # Update embed
-                    channel = self.bot.get_channel(payload.channel_id)
-                    if channel:
-                        try:
-                            message = await channel.fetch_message(payload.message_id)
-                            embed = message.embeds[0]
-                            embed.set_field_at(1, name="👥 Entries", value=str(len(giveaway["entries"])), inline=True)
-                            await message.edit(embed=embed)
-                            
-                            user = self.bot.get_user(payload.user_id)
-                            if user:
-                                await channel.send(
-                                    f"👋 {user.mention} left the giveaway!",
-                                    delete_after=3
-                                )
-                        except Exception as e:
-                            print(f"Error updating embed: {e}")
-                break
-            
-    async def end_giveaway(self, giveaway_id: str, manual: bool = False):
-        giveaway = self.active_giveaways.get(giveaway_id)
-        if not giveaway:
+        giveaway = self.active_giveaways.get(payload.message_id)
+        if not giveaway or str(payload.emoji) != giveaway["emoji"] or payload.user_id not in giveaway["entries"]:
             return
             
-        channel = self.bot.get_channel(giveaway["channel_id"])
-        if not channel:
-            del self.active_giveaways[giveaway_id]
-            return
+        giveaway["entries"].discard(payload.user_id)
+        self.entry_writer.submit((payload.message_id, payload.user_id, False, datetime.now(timezone.utc)))
+        
+        self.refresh_message(giveaway)
+        channel = self.bot.get_channel(payload.channel_id)
+        if channel:
+            try:
+                # Removals carry no member, and the user may not be cached
+                await channel.send(
+                    f"👋 <@{payload.user_id}> left the giveaway!",
+                    delete_after=3
+                )
+            except Exception as e:
+                print(f"Error announcing giveaway leave: {e}")
             
-        try:
-            message = await channel.fetch_message(giveaway["message_id"])
-        except:
-            del self.active_giveaways[giveaway_id]
+    async def end_giveaway(self, message_id: int, manual: bool = False):
+        giveaway = self.active_giveaways.pop(message_id, None)
+        if not giveaway:
             return
-            
-        entries = giveaway.get("entries", [])
+        self.bot.scheduler.cancel(("giveaway", message_id))
+        await self.bot.wait_until_ready()
+        
+        # Write out queued entries first so the stored entries match the draw
+        await self.entry_writer.flush()
+        entries = list(giveaway["entries"])
+        
+        # Only one process gets to end a giveaway
+        result = await self.db.giveaways.update_one(
+            {"message_id": message_id, "status": "active"},
+            {"$set": {"status": "ended", "ended_at": datetime.now(timezone.utc), "entry_count": len(entries)}}
+        )
+        if not result.modified_count:
+            return
+        await self.db.giveaway_entries.delete_many({"message_id": message_id})
+        
+        # Winners are drawn and paid before anything touches the channel, which
+        # may be deleted or not cached yet; the giveaway can't be ended twice
         num_winners = giveaway.get("winners", 1)
+        selected = random.sample(entries, min(num_winners, len(entries)))
+        if selected:
+            await self.db.giveaways.update_one({"message_id": message_id}, {"$set": {"winner_ids": selected}})
+        for winner_id in selected:
+            await self.bot.wallet.credit(
+                winner_id,
+                giveaway["prize"],
+                update={"$set": {"last_active": datetime.now(timezone.utc)}},
+                upsert=True
+            )
         
-        if entries:
-            # Pick winners
-            winners = []
-            winner_mentions = []
-            
-            num_to_pick = min(num_winners, len(entries))
-            selected = random.sample(entries, num_to_pick)
+        guild = self.bot.get_guild(giveaway.get("guild_id") or 0)
+        channel = self.bot.get_channel(giveaway["channel_id"]) or self.bot.get_partial_messageable(
+            giveaway["channel_id"], guild_id=giveaway.get("guild_id")
+        )
+        message = channel.get_partial_message(message_id)
+        
+        try:
+            await self.announce_winners(giveaway, guild, channel, message, entries, selected)
+        except discord.HTTPException as e:
+            print(f"Could not announce giveaway {message_id} results: {e}")
+    
+    async def announce_winners(self, giveaway: dict, guild, channel, message, entries: list, selected: list):
+        guild_name = guild.name if guild else "the server"
+        if selected:
+            winner_mentions = [f"<@{winner_id}>" for winner_id in selected]
             
             for winner_id in selected:
-                winner = self.bot.get_user(winner_id)
-                if winner:
-                    winners.append(winner)
-                    winner_mentions.append(winner.mention)
-                    
-                    # Award points
-                    await self.db.users.update_one(
-                        {"user_id": winner_id},
-                        {
-                            "$inc": {"points": giveaway["prize"]},
-                            "$set": {"last_active": datetime.now(timezone.utc)}
-                        },
-                        upsert=True
+                winner = await self.bot.get_or_fetch_user(winner_id)
+                if not winner:
+                    continue
+                # DM winner
+                try:
+                    dm_embed = discord.Embed(
+                        title="🎉 CONGRATULATIONS! YOU WON!",
+                        description=f"You won **{giveaway['prize']}** points in {guild_name}!",
+                        color=discord.Color.gold()
                     )
-                    
-                    # DM winner
-                    try:
-                        dm_embed = discord.Embed(
-                            title="🎉 CONGRATULATIONS! YOU WON!",
-                            description=f"You won **{giveaway['prize']}** points in {channel.guild.name}!",
-                            color=discord.Color.gold()
-                        )
-                        dm_embed.add_field(name="💰 Prize", value=f"{giveaway['prize']} points", inline=True)
-                        dm_embed.add_field(name="📍 Server", value=channel.guild.name, inline=True)
-                        dm_embed.set_thumbnail(url=channel.guild.icon.url if channel.guild.icon else None)
-                        dm_embed.set_footer(text="The points have been added to your account!")
-                        await winner.send(embed=dm_embed)
-                    except:
-                        pass
+                    dm_embed.add_field(name="💰 Prize", value=f"{giveaway['prize']} points", inline=True)
+                    dm_embed.add_field(name="📍 Server", value=guild_name, inline=True)
+                    dm_embed.set_thumbnail(url=guild.icon.url if guild and guild.icon else None)
+                    dm_embed.set_footer(text="The points have been added to your account!")
+                    await winner.send(embed=dm_embed)
+                except:
+                    pass
             
-            if winners:
-                # Update original message
-                embed = discord.Embed(
-                    title="🎉 GIVEAWAY ENDED!",
-                    description=f"**Winner{'s' if len(winners) > 1 else ''}:** {', '.join(winner_mentions)}\n"
-                               f"**Prize:** {giveaway['prize']} points{' each' if len(winners) > 1 else ''}",
-                    color=discord.Color.gold(),
-                    timestamp=datetime.now(timezone.utc)
-                )
-                embed.add_field(name="👥 Total Entries", value=str(len(entries)), inline=True)
-                embed.add_field(name="🎁 Prize Claimed", value="✅", inline=True)
-                embed.add_field(name="🏆 Winners", value=str(len(winners)), inline=True)
-                embed.set_footer(text=f"Hosted by {self.bot.get_user(giveaway['host_id'])}")
-                
-                await message.edit(embed=embed, view=None)
-                
-                # Send celebration message
-                celebrate_embed = discord.Embed(
-                    title="🎊 CONGRATULATIONS TO THE WINNER" + ("S" if len(winners) > 1 else "") + "!",
-                    description=f"## {', '.join(winner_mentions)}\n\n"
-                               f"You {'have each' if len(winners) > 1 else 'have'} won **{giveaway['prize']}** points! 🎉",
-                    color=discord.Color.gold()
-                )
-                celebrate_embed.set_image(url="https://media.giphy.com/media/g9582DNuQppxC/giphy.gif")
-                await channel.send(embed=celebrate_embed)
-                
+            # Update original message
+            embed = discord.Embed(
+                title="🎉 GIVEAWAY ENDED!",
+                description=f"**Winner{'s' if len(selected) > 1 else ''}:** {', '.join(winner_mentions)}\n"
+                           f"**Prize:** {giveaway['prize']} points{' each' if len(selected) > 1 else ''}",
+                color=discord.Color.gold(),
+                timestamp=datetime.now(timezone.utc)
+            )
+            embed.add_field(name="👥 Total Entries", value=str(len(entries)), inline=True)
+            embed.add_field(name="🎁 Prize Claimed", value="✅", inline=True)
+            embed.add_field(name="🏆 Winners", value=str(len(selected)), inline=True)
+            host = giveaway.get("host_name") or self.bot.get_user(giveaway["host_id"])
+            embed.set_footer(text=f"Hosted by {host}")
+            
+            # Logged first so a deleted channel doesn't hide who was paid
+            if giveaway.get("guild_id"):
                 await self.log_action(
-                    channel.guild.id,
+                    giveaway["guild_id"],
                     f"🎁 Giveaway ended! {', '.join(winner_mentions)} won **{giveaway['prize']}** points",
                     discord.Color.gold()
                 )
+            
+            await self.bot.edits.edit(message, embed=embed, view=None)
+            
+            # Send celebration message
+            celebrate_embed = discord.Embed(
+                title="🎊 CONGRATULATIONS TO THE WINNER" + ("S" if len(selected) > 1 else "") + "!",
+                description=f"## {', '.join(winner_mentions)}\n\n"
+                           f"You {'have each' if len(selected) > 1 else 'have'} won **{giveaway['prize']}** points! 🎉",
+                color=discord.Color.gold()
+            )
+            celebrate_embed.set_image(url="https://media.giphy.com/media/g9582DNuQppxC/giphy.gif")
+            await channel.send(embed=celebrate_embed)
         else:
             embed = discord.Embed(
                 title="😢 GIVEAWAY ENDED",
@@ -385,10 +452,8 @@ class GiveawayCog(commands.Cog):
             )
             embed.set_footer(text="Better luck next time!")
             
-            await message.edit(embed=embed, view=None)
+            await self.bot.edits.edit(message, embed=embed, view=None)
             await channel.send("💔 **No one entered the giveaway!** The prize goes unclaimed...")
-        
-        del self.active_giveaways[giveaway_id]
     
     @commands.hybrid_group(name="pgiveaway", description="Points giveaway system")
     async def pgiveaway(self, ctx):
@@ -424,45 +489,30 @@ class GiveawayCog(commands.Cog):
             await ctx.send("❌ Invalid duration! Use format like: 5m, 1h, 1d", ephemeral=True)
             return
             
-        emoji = "🎉"
-        
-        # Create embed
-        embed = discord.Embed(
-            title="🎁 POINTS GIVEAWAY!",
-            description=f"## Prize: {points} points{' each' if winners > 1 else ''}\n"
-                       f"## Winners: {winners} {'winners' if winners > 1 else 'winner'}\n\n"
-                       f"React with {emoji} to enter!",
-            color=discord.Color.blue(),
-            timestamp=end_time
-        )
-        embed.add_field(name="⏰ Ends", value=f"<t:{int(end_time.timestamp())}:R>", inline=True)
-        embed.add_field(name="👥 Entries", value="0", inline=True)
-        embed.add_field(name="🏆 Winners", value=str(winners), inline=True)
-        embed.set_footer(text=f"Hosted by {ctx.author} • React to enter!")
-        
-        # Create view
-        giveaway_id = f"{ctx.guild.id}_{ctx.channel.id}_{int(datetime.now().timestamp())}"
-        view = GiveawayView(self, giveaway_id)
-        
-        # Send message
-        await ctx.defer()
-        message = await ctx.send(embed=embed, view=view)
-        await message.add_reaction(emoji)
-        
         # Store giveaway data
-        self.active_giveaways[giveaway_id] = {
+        giveaway = {
             "guild_id": ctx.guild.id,
             "channel_id": ctx.channel.id,
-            "message_id": message.id,
             "host_id": ctx.author.id,
+            "host_name": str(ctx.author),
             "prize": points,
             "winners": winners,
-            "emoji": emoji,
+            "emoji": "🎉",
             "end_time": end_time,
-            "entries": [],
+            "entry_count": 0,
+            "status": "active",
             "created_at": datetime.now(timezone.utc)
         }
         
+        # Send message
+        await ctx.defer()
+        message = await ctx.send(embed=self.build_embed(giveaway, 0), view=GiveawayView(self))
+        await message.add_reaction(giveaway["emoji"])
+        giveaway["message_id"] = message.id
+        
+        await self.db.giveaways.insert_one(giveaway)
+        self.track_giveaway(giveaway, set())
+        
         # Send confirmation
         start_embed = discord.Embed(
             title="🎉 Giveaway Started!",
@@ -512,7 +562,7 @@ class GiveawayCog(commands.Cog):
                     name=f"{i}. {channel.guild.name} - #{channel.name}",
                     value=f"💰 **Prize:** {giveaway['prize']} points\n"
                           f"🏆 **Winners:** {giveaway.get('winners', 1)}\n"
-                          f"👥 **Entries:** {len(giveaway.get('entries', []))}\n"
+                          f"👥 **Entries:** {len(giveaway['entries'])}\n"
                           f"⏰ **Ends in:** {minutes} minutes",
                     inline=False
                 )
@@ -1,11 +1,15 @@
 import discord
-from discord.ext import commands, tasks
+from discord.ext import commands
 from discord import app_commands
 import random
 import asyncio
-from datetime import datetime, timedelta, timezone
+from datetime import datetime, timezone
 from typing import Optional
 
+ROB_GAP = 3 * 3600
+ROB_WINDOW = 24 * 3600
+ROB_LIMIT = 2
+
 class RobView(discord.ui.View):
     def __init__(self, robber, victim, success_chance):
         super().__init__(timeout=30)
@@ -41,32 +45,11 @@ class RobCog(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         self.db = bot.db
-        self.rob_cooldowns = {}
-        self.cleanup_cooldowns.start()
+        self.cooldowns = bot.cooldowns
         
     async def cog_load(self):
         print("🎮 RobCog loaded")
         
-    async def cog_unload(self):
-        self.cleanup_cooldowns.cancel()
-        self.rob_cooldowns.clear()
-        
-    @tasks.loop(hours=1)
-    async def cleanup_cooldowns(self):
-        now = datetime.now(timezone.utc)
-        to_remove = []
-        
-        for key, data in self.rob_cooldowns.items():
-            if now - data["last_reset"] > timedelta(hours=24):
-                to_remove.append(key)
-                
-        for key in to_remove:
-            del self.rob_cooldowns[key]
-            
-    @cleanup_cooldowns.before_loop
-    async def before_cleanup(self):
-        await self.bot.wait_until_ready()
-        
     async def get_user_data(self, user_id: int):
         user = await self.db.users.find_one({"user_id": user_id})
         if not user:
@@ -82,7 +65,6 @@ class RobCog(commands.Cog):
                 "last_active": datetime.now(timezone.utc),
                 "daily_claimed": None,
                 "invite_count": 0,
-                "invited_users": [],
                 "pending_invites": 0,
                 "verified_invites": 0,
                 "fake_invites": 0,
@@ -132,8 +114,8 @@ class RobCog(commands.Cog):
         best_config = {}
         highest_priority = -1
         
-        # Get fresh server data to ensure we have latest role configs
-        server = await self.db.servers.find_one({"server_id": member.guild.id})
+        # Server docs are cached and invalidated on change, so role configs stay current
+        server = await self.bot.config_cache.get_server(member.guild.id)
         if not server or not server.get("roles"):
             return {}
         
@@ -177,61 +159,60 @@ class RobCog(commands.Cog):
             percentage = random.randint(20, 30) / 100
             return round(victim_points * percentage, 2)
     
-    async def check_cooldowns(self, user_id: int, victim_id: int) -> tuple[bool, str]:
-        now = datetime.now(timezone.utc)
-        
-        rob_key = f"rob_{user_id}"
-        if rob_key not in self.rob_cooldowns:
-            self.rob_cooldowns[rob_key] = {
-                "attempts": 0,
-                "last_attempt": now - timedelta(hours=3),
-                "last_reset": now,
-                "targets": {}
-            }
-        
-        robbed_key = f"robbed_{victim_id}"
-        if robbed_key not in self.rob_cooldowns:
-            self.rob_cooldowns[robbed_key] = {
-                "times_robbed": 0,
-                "last_robbed": now - timedelta(hours=3),
-                "last_reset": now,
-                "robbers": {}
-            }
-        
-        rob_data = self.rob_cooldowns[rob_key]
-        robbed_data = self.rob_cooldowns[robbed_key]
-        
-        if now - rob_data["last_reset"] > timedelta(hours=24):
-            rob_data["attempts"] = 0
-            rob_data["last_reset"] = now
-            rob_data["targets"] = {}
-        
-        if now - robbed_data["last_reset"] > timedelta(hours=24):
-            robbed_data["times_robbed"] = 0
-            robbed_data["last_reset"] = now
-            robbed_data["robbers"] = {}
-        
-        if rob_data["attempts"] >= 2:
+    @staticmethod
+    def _minutes_until(until: datetime) -> int:
+        return int((until - datetime.now(timezone.utc)).total_seconds() / 60)
+    
+    async def check_limits(self, user_id: int, victim_id: int) -> tuple[bool, str]:
+        attempts, _ = await self.cooldowns.count(f"rob_attempts:{user_id}", ROB_WINDOW)
+        if attempts >= ROB_LIMIT:
             return False, "You've used all your rob attempts for today!"
         
-        time_since_last = now - rob_data["last_attempt"]
-        if time_since_last < timedelta(hours=3):
-            remaining = timedelta(hours=3) - time_since_last
-            minutes = int(remaining.total_seconds() / 60)
-            return False, f"You must wait {minutes} minutes before robbing again!"
-        
-        if str(victim_id) in rob_data["targets"]:
+        if await self.cooldowns.remaining(f"rob_target:{user_id}:{victim_id}"):
             return False, "You can only rob the same person once per day!"
         
-        if robbed_data["times_robbed"] >= 2:
+        times_robbed, _ = await self.cooldowns.count(f"robbed_times:{victim_id}", ROB_WINDOW)
+        if times_robbed >= ROB_LIMIT:
             return False, "This person has been robbed too many times today!"
         
-        time_since_robbed = now - robbed_data["last_robbed"]
-        if time_since_robbed < timedelta(hours=3):
-            remaining = timedelta(hours=3) - time_since_robbed
-            minutes = int(remaining.total_seconds() / 60)
-            return False, f"This person was robbed recently! Wait {minutes} minutes."
+        return True, "OK"
+    
+    async def check_cooldowns(self, user_id: int, victim_id: int) -> tuple[bool, str]:
+        can_rob, reason = await self.check_limits(user_id, victim_id)
+        if not can_rob:
+            return False, reason
+        
+        until = await self.cooldowns.remaining(f"rob:{user_id}")
+        if until:
+            return False, f"You must wait {self._minutes_until(until)} minutes before robbing again!"
+        
+        until = await self.cooldowns.remaining(f"robbed:{victim_id}")
+        if until:
+            return False, f"This person was robbed recently! Wait {self._minutes_until(until)} minutes."
+        
+        return True, "OK"
+    
+    async def claim_cooldowns(self, robber_id: int, victim_id: int) -> tuple[bool, str]:
+        # Holding both 3 hour cooldowns means no other rob can touch these
+        # counters, so checking the daily limits and then counting is safe
+        acquired, until = await self.cooldowns.acquire(f"rob:{robber_id}", ROB_GAP)
+        if not acquired:
+            return False, f"You must wait {self._minutes_until(until)} minutes before robbing again!"
+        
+        acquired, until = await self.cooldowns.acquire(f"robbed:{victim_id}", ROB_GAP)
+        if not acquired:
+            await self.cooldowns.reset(f"rob:{robber_id}")
+            return False, f"This person was robbed recently! Wait {self._minutes_until(until)} minutes."
+        
+        can_rob, reason = await self.check_limits(robber_id, victim_id)
+        if not can_rob:
+            await self.cooldowns.reset(f"rob:{robber_id}")
+            await self.cooldowns.reset(f"robbed:{victim_id}")
+            return False, reason
         
+        await self.cooldowns.hit(f"rob_attempts:{robber_id}", ROB_LIMIT, ROB_WINDOW)
+        await self.cooldowns.hit(f"robbed_times:{victim_id}", ROB_LIMIT, ROB_WINDOW)
+        await self.cooldowns.acquire(f"rob_target:{robber_id}:{victim_id}", ROB_WINDOW)
         return True, "OK"
     
     async def execute_rob(self, robber_id: int, victim_id: int, success_chance: int, robber_name: str = None, victim_name: str = None) -> dict:
@@ -261,36 +242,20 @@ class RobCog(commands.Cog):
         
         if success:
             points_to_steal = self.calculate_points_to_steal(victim_data["points"])
-            result["points_transferred"] = points_to_steal
-            result["trust_change"] = 0.5
-            
-            # Calculate new trust score
-            new_robber_trust = min(100, robber_trust + 0.5)
-            
-            await self.db.users.update_one(
-                {"user_id": robber_id},
-                {
-                    "$set": {
-                        "trust_score": new_robber_trust
-                    },
-                    "$inc": {
-                        "points": points_to_steal,
-                        "game_stats.rob.successes": 1,
-                        "game_stats.rob.profit": points_to_steal
-                    }
-                }
+            moved = await self.bot.wallet.transfer(
+                victim_id, robber_id, points_to_steal,
+                from_update={"$inc": {"statistics.times_robbed": 1, "statistics.amount_stolen_from": points_to_steal}},
+                to_update={"$inc": {"game_stats.rob.successes": 1, "game_stats.rob.profit": points_to_steal}}
             )
+            if not moved:
+                # The victim spent their points while the rob was rolling
+                result["wasted"] = True
+                result["success"] = False
+                return result
             
-            await self.db.users.update_one(
-                {"user_id": victim_id},
-                {
-                    "$inc": {
-                        "points": -points_to_steal,
-                        "statistics.times_robbed": 1,
-                        "statistics.amount_stolen_from": points_to_steal
-                    }
-                }
-            )
+            result["points_transferred"] = points_to_steal
+            result["trust_change"] = 0.5
+            await self.bot.wallet.credit(robber_id, 0.5, "trust_score")
             
             await self.db.rob_history.insert_one({
                 "robber_id": robber_id,
@@ -303,34 +268,22 @@ class RobCog(commands.Cog):
             })
         else:
             penalty = round(robber_data["points"] * 0.3, 2)
+            moved = None
+            if penalty > 0:
+                moved = await self.bot.wallet.transfer(
+                    robber_id, victim_id, penalty,
+                    from_update={"$inc": {"game_stats.rob.attempts": 1, "game_stats.rob.profit": -penalty}}
+                )
+            if not moved:
+                # Nothing left to take (or it was spent meanwhile); only count the attempt
+                penalty = 0
+                await self.db.users.update_one(
+                    {"user_id": robber_id},
+                    {"$inc": {"game_stats.rob.attempts": 1}}
+                )
             result["points_transferred"] = penalty
             result["trust_change"] = -1
-            
-            # Calculate new trust score
-            new_robber_trust = max(0, robber_trust - 1)
-            
-            await self.db.users.update_one(
-                {"user_id": robber_id},
-                {
-                    "$set": {
-                        "trust_score": new_robber_trust
-                    },
-                    "$inc": {
-                        "points": -penalty,
-                        "game_stats.rob.attempts": 1,
-                        "game_stats.rob.profit": -penalty
-                    }
-                }
-            )
-            
-            await self.db.users.update_one(
-                {"user_id": victim_id},
-                {
-                    "$inc": {
-                        "points": penalty
-                    }
-                }
-            )
+            await self.bot.wallet.credit(robber_id, -1, "trust_score")
             
             await self.db.rob_history.insert_one({
                 "robber_id": robber_id,
@@ -354,19 +307,6 @@ class RobCog(commands.Cog):
         
         return result
     
-    async def update_cooldowns(self, robber_id: int, victim_id: int):
-        now = datetime.now(timezone.utc)
-        
-        rob_key = f"rob_{robber_id}"
-        self.rob_cooldowns[rob_key]["attempts"] += 1
-        self.rob_cooldowns[rob_key]["last_attempt"] = now
-        self.rob_cooldowns[rob_key]["targets"][str(victim_id)] = now
-        
-        robbed_key = f"robbed_{victim_id}"
-        self.rob_cooldowns[robbed_key]["times_robbed"] += 1
-        self.rob_cooldowns[robbed_key]["last_robbed"] = now
-        self.rob_cooldowns[robbed_key]["robbers"][str(robber_id)] = now
-    
     @commands.hybrid_command(name="rob", description="Attempt to rob another user's points!")
     @app_commands.describe(target="The user you want to rob")
     async def rob(self, ctx, target: discord.Member):
@@ -391,7 +331,7 @@ class RobCog(commands.Cog):
         robber_data = await self.get_user_data(ctx.author.id)
         victim_data = await self.get_user_data(target.id)
         
-        server = await self.db.servers.find_one({"server_id": ctx.guild.id})
+        server = await self.bot.config_cache.get_server(ctx.guild.id)
         role_config = await self.get_user_role_config(ctx.author, server) if server else {}
         
         rob_bonus = role_config.get("game_benefits", {}).get("rob_success_bonus", 0) if role_config else 0
@@ -461,6 +401,16 @@ class RobCog(commands.Cog):
             await msg.edit(embed=embed, view=None)
             return
         
+        can_rob, reason = await self.claim_cooldowns(ctx.author.id, target.id)
+        if not can_rob:
+            embed = discord.Embed(
+                title="❌ Cannot Rob",
+                description=reason,
+                color=discord.Color.red()
+            )
+            await msg.edit(embed=embed, view=None)
+            return
+        
         loading_embed = discord.Embed(
             title="🎲 Rolling the dice...",
             description="Attempting robbery...",
@@ -480,10 +430,10 @@ class RobCog(commands.Cog):
                 timestamp=datetime.now(timezone.utc)
             )
             embed.add_field(name="Result", value="No points gained", inline=True)
-            embed.add_field(name="Attempts Left", value=f"{2 - self.rob_cooldowns[f'rob_{ctx.author.id}']['attempts'] - 1}/2", inline=True)
+            attempts, _ = await self.cooldowns.count(f"rob_attempts:{ctx.author.id}", ROB_WINDOW)
+            embed.add_field(name="Attempts Left", value=f"{max(0, ROB_LIMIT - attempts)}/{ROB_LIMIT}", inline=True)
             embed.set_footer(text="Choose your targets more wisely!")
             
-            await self.update_cooldowns(ctx.author.id, target.id)
             await msg.edit(embed=embed)
             
             await self.log_action(
@@ -621,25 +571,13 @@ class RobCog(commands.Cog):
             except:
                 pass
         
-        await self.update_cooldowns(ctx.author.id, target.id)
         await msg.edit(embed=embed)
     
     @commands.hybrid_command(name="robstats", description="Check your rob statistics")
     async def robstats(self, ctx):
-        rob_key = f"rob_{ctx.author.id}"
-        robbed_key = f"robbed_{ctx.author.id}"
-        
-        rob_data = self.rob_cooldowns.get(rob_key, {
-            "attempts": 0,
-            "last_attempt": datetime.now(timezone.utc) - timedelta(hours=3),
-            "targets": {}
-        })
-        
-        robbed_data = self.rob_cooldowns.get(robbed_key, {
-            "times_robbed": 0,
-            "last_robbed": datetime.now(timezone.utc) - timedelta(hours=3),
-            "robbers": {}
-        })
+        attempts, _ = await self.cooldowns.count(f"rob_attempts:{ctx.author.id}", ROB_WINDOW)
+        times_robbed, _ = await self.cooldowns.count(f"robbed_times:{ctx.author.id}", ROB_WINDOW)
+        next_rob = await self.cooldowns.remaining(f"rob:{ctx.author.id}")
         
         user_data = await self.get_user_data(ctx.author.id)
         stats = user_data.get("game_stats", {}).get("rob", {})
@@ -650,8 +588,8 @@ class RobCog(commands.Cog):
             timestamp=datetime.now(timezone.utc)
         )
         
-        attempts_left = max(0, 2 - rob_data["attempts"])
-        can_be_robbed = max(0, 2 - robbed_data["times_robbed"])
+        attempts_left = max(0, ROB_LIMIT - attempts)
+        can_be_robbed = max(0, ROB_LIMIT - times_robbed)
         
         embed.add_field(
             name="🎯 Rob Attempts",
@@ -664,15 +602,12 @@ class RobCog(commands.Cog):
             inline=True
         )
         
-        if rob_data["last_attempt"]:
-            next_rob = rob_data["last_attempt"] + timedelta(hours=3)
-            if datetime.now(timezone.utc) < next_rob:
-                minutes = int((next_rob - datetime.now(timezone.utc)).total_seconds() / 60)
-                embed.add_field(
-                    name="⏰ Next Rob",
-                    value=f"Available in **{minutes}** minutes",
-                    inline=False
-                )
+        if next_rob:
+            embed.add_field(
+                name="⏰ Next Rob",
+                value=f"Available in **{self._minutes_until(next_rob)}** minutes",
+                inline=False
+            )
         
         embed.add_field(
             name="📊 Lifetime Stats",
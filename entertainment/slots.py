@@ -1,5 +1,5 @@
 import discord
-from discord.ext import commands, tasks
+from discord.ext import commands
 from discord import app_commands
 import random
 import asyncio
@@ -27,7 +27,7 @@ class SlotsCog(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         self.db = bot.db
-        self.user_cooldowns = {}
+        self.cooldowns = bot.cooldowns
         
         self.symbols = {
             "🍒": {"name": "Cherry", "payout": 1.5, "weight": 20},
@@ -40,29 +40,10 @@ class SlotsCog(commands.Cog):
         
         self.total_weight = sum(s["weight"] for s in self.symbols.values())
         self.lose_weight = 100 - self.total_weight
-        self.cleanup_cooldowns.start()
         
     async def cog_load(self):
         print("🎮 SlotsCog loaded")
         
-    async def cog_unload(self):
-        self.cleanup_cooldowns.cancel()
-        self.user_cooldowns.clear()
-
-    @tasks.loop(hours=1)
-    async def cleanup_cooldowns(self):
-        now = datetime.now(timezone.utc)
-        to_remove = []
-        for user_id, last_spin in self.user_cooldowns.items():
-            if (now - last_spin).total_seconds() > 3600:
-                to_remove.append(user_id)
-        for user_id in to_remove:
-            del self.user_cooldowns[user_id]
-
-    @cleanup_cooldowns.before_loop
-    async def before_cleanup_cooldowns(self):
-        await self.bot.wait_until_ready()
-        
     async def get_user_data(self, user_id: int):
         user = await self.db.users.find_one({"user_id": user_id})
         if not user:
@@ -112,8 +93,8 @@ class SlotsCog(commands.Cog):
         best_config = {}
         highest_priority = -1
         
-        # Get fresh server data to ensure we have latest role configs
-        server = await self.db.servers.find_one({"server_id": member.guild.id})
+        # Server docs are cached and invalidated on change, so role configs stay current
+        server = await self.bot.config_cache.get_server(member.guild.id)
         if not server or not server.get("roles"):
             return {}
         
@@ -131,13 +112,8 @@ class SlotsCog(commands.Cog):
         if cookie_cog:
             await cookie_cog.log_action(guild_id, message, color)
             
-    def check_cooldown(self, user_id: int) -> bool:
-        now = datetime.now(timezone.utc)
-        if user_id in self.user_cooldowns:
-            last_spin = self.user_cooldowns[user_id]
-            if (now - last_spin).total_seconds() < 10:
-                return False
-        return True
+    async def check_cooldown(self, user_id: int) -> bool:
+        return await self.cooldowns.remaining(f"slots:{user_id}") is None
         
     def spin_slots(self) -> Tuple[List[str], Optional[str], float]:
         roll = random.uniform(0, 100)
@@ -176,17 +152,20 @@ class SlotsCog(commands.Cog):
             color=discord.Color.yellow()
         )
         embed.add_field(name="💰 Bet", value=f"{bet} points", inline=True)
-        await message.edit(embed=embed)
+        edits = self.bot.edits
+        edits.edit(message, embed=embed.copy())
         
         reels, winning_symbol, payout = self.spin_slots()
         
+        # Frames go through the shared scheduler: under load the channel's edit
+        # budget is spent on the latest frame instead of queueing every one
         await asyncio.sleep(1)
         embed.description = f"```\n[ {reels[0]} ][ 🔄 ][ 🔄 ]\n```"
-        await message.edit(embed=embed)
+        edits.edit(message, embed=embed.copy())
         
         await asyncio.sleep(1)
         embed.description = f"```\n[ {reels[0]} ][ {reels[1]} ][ 🔄 ]\n```"
-        await message.edit(embed=embed)
+        edits.edit(message, embed=embed.copy())
         
         await asyncio.sleep(1)
         return reels, winning_symbol, payout
@@ -199,7 +178,7 @@ class SlotsCog(commands.Cog):
     @slots.command(name="play", description="Play the slot machine!")
     @app_commands.describe(bet="Amount to bet (min: 5, max: 200)")
     async def slots_play(self, ctx, bet: int):
-        if not self.check_cooldown(ctx.author.id):
+        if not await self.check_cooldown(ctx.author.id):
             await ctx.send("⏰ Please wait 10 seconds between spins!", ephemeral=True)
             return
             
@@ -209,7 +188,7 @@ class SlotsCog(commands.Cog):
             
         user_data = await self.get_user_data(ctx.author.id)
         
-        server = await self.db.servers.find_one({"server_id": ctx.guild.id})
+        server = await self.bot.config_cache.get_server(ctx.guild.id)
         role_config = await self.get_user_role_config(ctx.author, server) if server else {}
         
         max_bet_bonus = role_config.get("game_benefits", {}).get("slots_max_bet_bonus", 0) if role_config else 0
@@ -235,12 +214,16 @@ class SlotsCog(commands.Cog):
             await ctx.send(f"❌ You can only bet up to 25% of your balance ({max_bet} points)!", ephemeral=True)
             return
             
-        self.user_cooldowns[ctx.author.id] = datetime.now(timezone.utc)
+        spun, _ = await self.cooldowns.acquire(f"slots:{ctx.author.id}", 10)
+        if not spun:
+            await ctx.send("⏰ Please wait 10 seconds between spins!", ephemeral=True)
+            return
         
-        await self.db.users.update_one(
-            {"user_id": ctx.author.id},
-            {"$inc": {"points": -bet}}
-        )
+        user_data = await self.bot.wallet.debit(ctx.author.id, bet)
+        if not user_data:
+            await self.cooldowns.reset(f"slots:{ctx.author.id}")
+            await ctx.send(f"❌ You need **{bet}** points to play!", ephemeral=True)
+            return
         
         embed = discord.Embed(
             title="🎰 SLOT MACHINE",
@@ -248,7 +231,7 @@ class SlotsCog(commands.Cog):
             color=discord.Color.blue()
         )
         embed.add_field(name="💰 Bet", value=f"{bet} points", inline=True)
-        embed.add_field(name="💵 Balance", value=f"{user_data['points'] - bet} points", inline=True)
+        embed.add_field(name="💵 Balance", value=f"{user_data['points']} points", inline=True)
         
         if max_bet_bonus > 0:
             embed.add_field(name="🎭 Role Bonus", value=f"+{max_bet_bonus} max bet", inline=True)
@@ -267,36 +250,26 @@ class SlotsCog(commands.Cog):
         if winnings > 0:
             # Update user statistics
             current_streak = user_data.get("statistics", {}).get("slots_current_streak", 0) + 1
-            best_streak = user_data.get("statistics", {}).get("slots_best_streak", 0)
-            biggest_win = user_data.get("statistics", {}).get("slots_biggest_win", 0)
             
-            update_dict = {
-                "$inc": {
-                    "points": winnings,
-                    "total_earned": winnings,
-                    "statistics.slots_played": 1,
-                    "statistics.slots_won": 1,
-                    "statistics.slots_profit": profit,
-                    "game_stats.slots.played": 1,
-                    "game_stats.slots.won": 1,
-                    "game_stats.slots.profit": profit
-                },
-                "$set": {
-                    "statistics.slots_current_streak": current_streak
+            user_data = await self.bot.wallet.credit(
+                ctx.author.id,
+                winnings,
+                update={
+                    "$inc": {
+                        "total_earned": winnings,
+                        "statistics.slots_played": 1,
+                        "statistics.slots_won": 1,
+                        "statistics.slots_profit": profit,
+                        "statistics.slots_current_streak": 1,
+                        "game_stats.slots.played": 1,
+                        "game_stats.slots.won": 1,
+                        "game_stats.slots.profit": profit
+                    },
+                    "$max": {
+                        "statistics.slots_biggest_win": winnings,
+                        "statistics.slots_best_streak": current_streak
+                    }
                 }
-            }
-            
-            # Update biggest win if necessary
-            if winnings > biggest_win:
-                update_dict["$set"]["statistics.slots_biggest_win"] = winnings
-                
-            # Update best streak if necessary
-            if current_streak > best_streak:
-                update_dict["$set"]["statistics.slots_best_streak"] = current_streak
-            
-            await self.db.users.update_one(
-                {"user_id": ctx.author.id},
-                update_dict
             )
             
             symbol_name = self.symbols[winning_symbol]["name"]
@@ -309,7 +282,7 @@ class SlotsCog(commands.Cog):
             embed.add_field(name="🎯 Multiplier", value=f"{payout}x", inline=True)
             embed.add_field(name="💵 Won", value=f"**{winnings}** points", inline=True)
             embed.add_field(name="📈 Profit", value=f"+{profit} points", inline=True)
-            embed.add_field(name="💳 New Balance", value=f"{user_data['points'] - bet + winnings} points", inline=True)
+            embed.add_field(name="💳 New Balance", value=f"{user_data['points']} points", inline=True)
             embed.add_field(name="🔥 Win Streak", value=f"{current_streak}", inline=True)
             
             if payout >= 10:
@@ -350,6 +323,7 @@ class SlotsCog(commands.Cog):
                     }
                 }
             )
+            self.bot.leaderboards.touch(ctx.author.id)
             
             embed = discord.Embed(
                 title="💔 NO MATCH",
@@ -358,7 +332,7 @@ class SlotsCog(commands.Cog):
             )
             embed.add_field(name="💰 Bet", value=f"{bet} points", inline=True)
             embed.add_field(name="💸 Lost", value=f"-{bet} points", inline=True)
-            embed.add_field(name="💳 Balance", value=f"{user_data['points'] - bet} points", inline=True)
+            embed.add_field(name="💳 Balance", value=f"{user_data['points']} points", inline=True)
             
             if reels[0] == reels[1] or reels[1] == reels[2]:
                 embed.set_footer(text="So close! Two matching symbols!")
@@ -375,7 +349,7 @@ class SlotsCog(commands.Cog):
         for item in view.children:
             item.disabled = True
             
-        await message.edit(embed=embed, view=view)
+        await self.bot.edits.edit(message, embed=embed, view=view)
         
     @slots.command(name="stats", description="View your slot machine statistics")
     async def slots_stats(self, ctx):
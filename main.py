@@ -1,22 +1,36 @@
+import argparse
 import asyncio
+import multiprocessing
 import sys
+import time
 from bot_core.bot import CookieBot
+from bot_core.cluster import split_shards
+from bot_core.gateway import PROFILES
 import os
+import aiohttp
 
-async def main():
-    print("""
+BANNER = """
     ╔═══════════════════════════════════════╗
     ║      🍪 COOKIE BOT PREMIUM v2.0 🍪     ║
     ╠═══════════════════════════════════════╣
     ║  Advanced Cookie Distribution System   ║
     ║      Created with ❤️ by YourName       ║
     ╚═══════════════════════════════════════╝
-    """)
-    
-    bot = CookieBot()
-    
+    """
+
+# Discord lets a bot identify one shard every 5 seconds
+IDENTIFY_INTERVAL = 5
+# A cluster that stays up this long has its restart backoff reset
+STABLE_AFTER = 300
+
+async def main(cluster_id=0, cluster_count=1, shard_ids=None, shard_count=None, profile=None):
+    bot = CookieBot(cluster_id, cluster_count, shard_ids, shard_count, profile)
+
     try:
-        print("🚀 Starting Cookie Bot...")
+        if cluster_count > 1:
+            print(f"🚀 Starting Cookie Bot cluster {cluster_id} (shards {shard_ids[0]}-{shard_ids[-1]} of {shard_count})...")
+        else:
+            print("🚀 Starting Cookie Bot...")
         await bot.start(os.getenv("BOT_TOKEN"))
     except KeyboardInterrupt:
         print("⌨️ Received interrupt signal")
@@ -25,10 +39,103 @@ async def main():
     finally:
         await bot.close()
 
-if __name__ == "__main__":
+def run_cluster(cluster_id, cluster_count, shard_ids, shard_count, profile=None):
+    if sys.platform == 'win32':
+        asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
     try:
-        if sys.platform == 'win32':
-            asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
-        asyncio.run(main())
+        asyncio.run(main(cluster_id, cluster_count, shard_ids, shard_count, profile))
     except KeyboardInterrupt:
-        print("\n👋 Goodbye!")
\ No newline at end of file
+        pass
+
+async def recommended_shards(token):
+    """Shard count Discord recommends for this bot"""
+    async with aiohttp.ClientSession() as session:
+        async with session.get(
+            "https://discord.com/api/v10/gateway/bot",
+            headers={"Authorization": f"Bot {token}"}
+        ) as response:
+            response.raise_for_status()
+            data = await response.json()
+    return data["shards"]
+
+def supervise(cluster_count, shard_count, profile=None):
+    """Run each cluster in its own process and restart any that die"""
+    ranges = split_shards(shard_count, cluster_count)
+    context = multiprocessing.get_context("spawn")
+    processes = {}
+    started = {}
+    failures = {cluster_id: 0 for cluster_id in range(cluster_count)}
+
+    def spawn(cluster_id):
+        process = context.Process(
+            target=run_cluster,
+            args=(cluster_id, cluster_count, ranges[cluster_id], shard_count, profile),
+            name=f"cookiebot-cluster-{cluster_id}"
+        )
+        process.start()
+        processes[cluster_id] = process
+        started[cluster_id] = time.monotonic()
+        print(f"🧩 Cluster {cluster_id} started (pid {process.pid}, shards {ranges[cluster_id][0]}-{ranges[cluster_id][-1]})")
+
+    print(f"🧩 {shard_count} shards across {cluster_count} clusters")
+    try:
+        for cluster_id in range(cluster_count):
+            spawn(cluster_id)
+            # Let this cluster identify its shards before the next one starts
+            if cluster_id < cluster_count - 1:
+                time.sleep(IDENTIFY_INTERVAL * len(ranges[cluster_id]))
+
+        restart_at = {}
+        while True:
+            time.sleep(1)
+            now = time.monotonic()
+            for cluster_id, process in list(processes.items()):
+                if process.is_alive():
+                    continue
+                if cluster_id not in restart_at:
+                    if now - started[cluster_id] >= STABLE_AFTER:
+                        failures[cluster_id] = 0
+                    failures[cluster_id] += 1
+                    delay = min(IDENTIFY_INTERVAL * 2 ** failures[cluster_id], 300)
+                    print(f"💥 Cluster {cluster_id} exited with code {process.exitcode}; restarting in {delay}s")
+                    restart_at[cluster_id] = now + delay
+                elif now >= restart_at[cluster_id]:
+                    del restart_at[cluster_id]
+                    spawn(cluster_id)
+    except KeyboardInterrupt:
+        print("⌨️ Stopping clusters...")
+    finally:
+        # Clusters get the interrupt too and shut down on their own; stop any that hang
+        for process in processes.values():
+            process.join(timeout=30)
+            if process.is_alive():
+                process.terminate()
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Cookie Bot")
+    parser.add_argument("--clusters", type=int, default=int(os.getenv("CLUSTER_COUNT", "1")),
+                        help="bot processes to split the shards across")
+    parser.add_argument("--shards", type=int, default=int(os.getenv("SHARD_COUNT", "0")) or None,
+                        help="total shards (default: Discord's recommendation)")
+    parser.add_argument("--profile", choices=list(PROFILES), default=os.getenv("GATEWAY_PROFILE", "lean"),
+                        help="gateway intents and cache policy")
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    args = parse_args()
+    print(BANNER)
+
+    if args.clusters <= 1:
+        # One process running every shard
+        try:
+            run_cluster(0, 1, None, args.shards, args.profile)
+        except KeyboardInterrupt:
+            pass
+        print("\n👋 Goodbye!")
+        sys.exit(0)
+
+    shard_count = args.shards or asyncio.run(recommended_shards(os.getenv("BOT_TOKEN")))
+    if shard_count < args.clusters:
+        print(f"⚠️ Only {shard_count} shards; running {shard_count} clusters instead of {args.clusters}")
+    supervise(min(args.clusters, shard_count), shard_count, args.profile)
+    print("\n👋 Goodbye!")
@@ -0,0 +1,187 @@
+# setup/benchmark_gateway_profiles.py
+# Memory and gateway CPU report for each gateway profile. Synthetic guilds are
+# loaded into discord.py's connection state the way each profile would receive
+# them, then a minute of typical gateway traffic is replayed against it.
+#
+# Needs discord.py and psutil; no token or network access.
+# Usage: python setup/benchmark_gateway_profiles.py [--guilds 100] [--members 1000]
+#        [--profiles full lean minimal]
+
+import argparse
+import asyncio
+import gc
+import importlib.util
+import random
+import sys
+import time
+from datetime import datetime, timezone
+from multiprocessing import get_context
+from pathlib import Path
+
+import discord
+import psutil
+
+GATEWAY_MODULE = Path(__file__).resolve().parent.parent / "bot_core" / "gateway.py"
+BOT_ID = 1 << 40
+BASE_ID = 1 << 50
+
+def load_gateway_module():
+    # Load the module on its own so the benchmark doesn't import the whole bot
+    spec = importlib.util.spec_from_file_location("gateway", GATEWAY_MODULE)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def user_payload(user_id: int) -> dict:
+    return {"id": str(user_id), "username": f"user{user_id % 100000}", "discriminator": "0",
+            "global_name": None, "avatar": None, "bot": user_id == BOT_ID}
+
+def member_payload(user_id: int, roles: list, joined_at: str) -> dict:
+    return {"user": user_payload(user_id), "roles": roles, "joined_at": joined_at,
+            "nick": None, "deaf": False, "mute": False, "flags": 0}
+
+def presence_payload(guild_id: int, user_id: int, rng: random.Random) -> dict:
+    return {"user": {"id": str(user_id)}, "guild_id": str(guild_id),
+            "status": rng.choice(["online", "idle", "dnd"]),
+            "activities": [{"name": rng.choice(["Minecraft", "Spotify", "VS Code"]), "type": 0}],
+            "client_status": {"desktop": "online"}}
+
+def guild_payload(n: int, members: int, users: int, full: bool, presences: bool, rng: random.Random) -> dict:
+    """GUILD_CREATE as the profile ends up with it; chunked profiles get every member"""
+    guild_id = BASE_ID + n * 10000
+    roles = [{"id": str(guild_id), "name": "@everyone", "permissions": "0", "position": 0, "color": 0,
+              "hoist": False, "managed": False, "mentionable": False}]
+    roles += [{"id": str(guild_id + r), "name": f"role{r}", "permissions": "0", "position": r, "color": 0,
+               "hoist": False, "managed": False, "mentionable": False} for r in range(1, 11)]
+    joined_at = datetime.now(timezone.utc).isoformat()
+    member_ids = rng.sample(range(users), members)
+    listed = member_ids if full else []
+    payload = {
+        "id": str(guild_id), "name": f"Guild {n}", "owner_id": str(BASE_ID + member_ids[0]),
+        "member_count": members + 1, "large": members > 250, "features": [], "emojis": [], "stickers": [],
+        "roles": roles,
+        "channels": [{"id": str(guild_id + 100 + c), "type": 0, "name": f"channel-{c}", "position": c,
+                      "permission_overwrites": [], "nsfw": False, "parent_id": None} for c in range(10)],
+        "members": [member_payload(BOT_ID, [], joined_at)] + [
+            member_payload(BASE_ID + user_id, [str(guild_id + rng.randint(1, 10))], joined_at) for user_id in listed
+        ],
+        "voice_states": [], "threads": [], "stage_instances": []
+    }
+    if presences:
+        # About a third of members are online and sent with the guild
+        payload["presences"] = [presence_payload(guild_id, BASE_ID + user_id, rng)
+                                for user_id in listed if rng.random() < 0.33]
+    return payload
+
+def traffic(guilds: list, profile, rng: random.Random, presence_rate: float, messages_per_guild: int):
+    """One minute of events Discord would send this profile"""
+    events = []
+    joined_at = datetime.now(timezone.utc).isoformat()
+    message_id = BASE_ID * 2
+    for guild in guilds:
+        guild_id = int(guild["id"])
+        user_ids = [int(m["user"]["id"]) for m in guild["members"][1:]] or [BASE_ID + guild_id % 1000]
+        size = guild["member_count"]
+        if profile.presences:
+            for _ in range(int(size * presence_rate)):
+                events.append(("PRESENCE_UPDATE", presence_payload(guild_id, rng.choice(user_ids), rng)))
+        if profile.members:
+            for _ in range(max(1, size // 1000)):
+                member = member_payload(rng.choice(user_ids), [str(guild_id + rng.randint(1, 10))], joined_at)
+                events.append(("GUILD_MEMBER_UPDATE", {**member, "guild_id": str(guild_id)}))
+        for _ in range(messages_per_guild):
+            message_id += 1
+            author = rng.choice(user_ids)
+            events.append(("MESSAGE_CREATE", {
+                "id": str(message_id), "channel_id": guild["channels"][rng.randrange(10)]["id"],
+                "guild_id": str(guild_id), "author": user_payload(author),
+                "member": {"roles": [], "joined_at": joined_at, "deaf": False, "mute": False, "flags": 0},
+                "content": "hello cookies" if profile.message_content else "",
+                "timestamp": joined_at, "edited_timestamp": None, "tts": False, "mention_everyone": False,
+                "mentions": [], "mention_roles": [], "attachments": [], "embeds": [], "pinned": False, "type": 0
+            }))
+    rng.shuffle(events)
+    return events
+
+async def measure(name: str, guilds: int, members: int, presence_rate: float, messages_per_guild: int, seed: int) -> dict:
+    profile = load_gateway_module().PROFILES[name]
+    options = profile.client_options()
+    rng = random.Random(seed)
+    process = psutil.Process()
+
+    http = discord.http.HTTPClient(asyncio.get_running_loop())
+    state = discord.state.ConnectionState(
+        dispatch=lambda *args, **kwargs: None, handlers={}, hooks={}, http=http, **options
+    )
+    state.user = discord.ClientUser(state=state, data=user_payload(BOT_ID))
+
+    payloads = [
+        guild_payload(n, members, guilds * members // 2, options["chunk_guilds_at_startup"], profile.presences, rng)
+        for n in range(guilds)
+    ]
+    events = traffic(payloads, profile, rng, presence_rate, messages_per_guild)
+    gc.collect()
+    baseline = process.memory_info().rss
+
+    started = time.process_time()
+    for payload in payloads:
+        state._add_guild_from_data(payload)
+    load_cpu = time.process_time() - started
+    del payloads
+
+    started = time.process_time()
+    for event, data in events:
+        state.parsers[event](data)
+    traffic_cpu = time.process_time() - started
+    gc.collect()
+
+    await http.close()
+    return {
+        "profile": name,
+        "members_cached": sum(len(g.members) for g in state.guilds),
+        "users_cached": len(state._users),
+        "messages_cached": len(state._messages or []),
+        "cache_mb": (process.memory_info().rss - baseline) / 1024 / 1024,
+        "load_cpu_ms": load_cpu * 1000,
+        "events": len(events),
+        "traffic_cpu_ms": traffic_cpu * 1000
+    }
+
+def worker(args):
+    return asyncio.run(measure(*args))
+
+def main():
+    parser = argparse.ArgumentParser(description="Gateway profile memory report")
+    parser.add_argument("--guilds", type=int, default=100)
+    parser.add_argument("--members", type=int, default=1000, help="members per guild")
+    parser.add_argument("--presence-rate", type=float, default=0.05,
+                        help="presence updates per member per minute")
+    parser.add_argument("--messages", type=int, default=20, help="messages per guild per minute")
+    parser.add_argument("--profiles", nargs="+", default=["full", "lean", "minimal"])
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    print(f"🧪 {args.guilds} guilds x {args.members} members, one minute of traffic, discord.py {discord.__version__}")
+    results = []
+    # A fresh process per profile so RSS isn't shared between runs
+    context = get_context("spawn")
+    for name in args.profiles:
+        with context.Pool(1) as pool:
+            results.append(pool.apply(worker, ((name, args.guilds, args.members, args.presence_rate, args.messages, args.seed),)))
+
+    print(f"{'profile':<9}{'members':>10}{'users':>10}{'messages':>10}{'cache MB':>10}"
+          f"{'load ms':>10}{'events/min':>12}{'gateway ms/min':>16}")
+    for r in results:
+        print(f"{r['profile']:<9}{r['members_cached']:>10,}{r['users_cached']:>10,}{r['messages_cached']:>10,}"
+              f"{r['cache_mb']:>10.1f}{r['load_cpu_ms']:>10.0f}{r['events']:>12,}{r['traffic_cpu_ms']:>16.1f}")
+
+    base = next((r for r in results if r["profile"] == "full"), None)
+    if base:
+        for r in results:
+            if r is not base and r["cache_mb"] > 0 and r["traffic_cpu_ms"] > 0:
+                print(f"📉 {r['profile']}: {base['cache_mb'] / r['cache_mb']:.1f}x less cache memory, "
+                      f"{base['traffic_cpu_ms'] / r['traffic_cpu_ms']:.1f}x less gateway CPU than full")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
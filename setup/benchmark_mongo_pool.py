@@ -0,0 +1,239 @@
+# setup/benchmark_mongo_pool.py
+# Pool sizing benchmark: replays bursts of the bot's Mongo traffic (cookie
+# claims, dailies, games, leaderboard reads) at each pool size and reports
+# operation latency, time spent waiting for a connection, and wait-queue
+# timeouts, so MONGO_MAX_POOL_SIZE and friends can be picked from data.
+#
+# Needs a MongoDB server; the database given by --database is dropped afterwards.
+# Usage: python setup/benchmark_mongo_pool.py [--uri mongodb://localhost:27017]
+#        [--pool-sizes 5 10 25 50 100] [--concurrency 200] [--operations 5000]
+#        [--profile default]
+
+import argparse
+import asyncio
+import importlib.util
+import os
+import random
+import sys
+import threading
+import time
+from datetime import datetime, timezone, timedelta
+from pathlib import Path
+
+import motor.motor_asyncio
+from pymongo import ReturnDocument, monitoring
+from pymongo.errors import PyMongoError
+
+POOL_MODULE = Path(__file__).resolve().parent.parent / "bot_core" / "mongo_pool.py"
+
+# Share of each kind of operation, roughly as the bot sees them
+MIX = {"claim": 0.35, "daily": 0.15, "slots": 0.25, "rob": 0.1, "leaderboard": 0.15}
+
+def load_pool_module():
+    # Load the module on its own so the benchmark doesn't need discord.py installed
+    spec = importlib.util.spec_from_file_location("mongo_pool", POOL_MODULE)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def percentile(values, q):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+class PoolWaits(monitoring.ConnectionPoolListener):
+    """Checkout wait times; a checkout runs start to finish on one driver thread"""
+
+    def __init__(self):
+        self.waits = []
+        self.timeouts = 0
+        self.opened = 0
+        self._local = threading.local()
+
+    def connection_check_out_started(self, event):
+        self._local.started = time.perf_counter()
+
+    def connection_checked_out(self, event):
+        started = getattr(self._local, "started", None)
+        if started is not None:
+            self.waits.append(time.perf_counter() - started)
+
+    def connection_check_out_failed(self, event):
+        if event.reason == "timeout":
+            self.timeouts += 1
+
+    def connection_created(self, event):
+        self.opened += 1
+
+    def connection_checked_in(self, event): pass
+    def connection_ready(self, event): pass
+    def connection_closed(self, event): pass
+    def pool_created(self, event): pass
+    def pool_ready(self, event): pass
+    def pool_cleared(self, event): pass
+    def pool_closed(self, event): pass
+
+async def seed(db, users: int):
+    await db.users.create_index("user_id", unique=True)
+    await db.users.create_index([("points", -1)])
+    now = datetime.now(timezone.utc)
+    await db.users.insert_many([
+        {"user_id": user_id, "points": 100, "trust_score": 50, "total_earned": 100,
+         "last_daily": now - timedelta(days=2), "statistics": {}, "game_stats": {}}
+        for user_id in range(users)
+    ])
+
+async def claim(db, rng, users):
+    user_id = rng.randrange(users)
+    user = await db.users.find_one({"user_id": user_id})
+    if not user or user["points"] < 2:
+        return
+    await db.users.update_one(
+        {"user_id": user_id, "points": {"$gte": 2}},
+        {"$inc": {"points": -2, "total_claims": 1},
+         "$set": {"last_claim": {"date": datetime.now(timezone.utc), "type": "netflix", "feedback_given": False}}}
+    )
+    await db.statistics.update_one({"_id": "global_stats"}, {"$inc": {"total_claims.netflix": 1}}, upsert=True)
+    await db.analytics.insert_one({"type": "claim", "user_id": user_id, "timestamp": datetime.now(timezone.utc)})
+
+async def daily(db, rng, users):
+    now = datetime.now(timezone.utc)
+    await db.users.find_one_and_update(
+        {"user_id": rng.randrange(users), "last_daily": {"$lt": now - timedelta(hours=24)}},
+        {"$inc": {"points": 5, "total_earned": 5}, "$set": {"last_daily": now}},
+        return_document=ReturnDocument.AFTER
+    )
+
+async def slots(db, rng, users):
+    user_id = rng.randrange(users)
+    debited = await db.users.find_one_and_update(
+        {"user_id": user_id, "points": {"$gte": 5}},
+        {"$inc": {"points": -5, "game_stats.slots.played": 1}},
+        return_document=ReturnDocument.AFTER
+    )
+    if debited and rng.random() < 0.3:
+        await db.users.update_one({"user_id": user_id}, {"$inc": {"points": 12, "game_stats.slots.won": 1}})
+    await db.cooldowns.update_one(
+        {"_id": f"slots:{user_id}"}, {"$set": {"expires_at": datetime.now(timezone.utc) + timedelta(seconds=10)}}, upsert=True
+    )
+
+async def rob(db, rng, users):
+    robber, victim = rng.sample(range(users), 2)
+    await db.users.find({"user_id": {"$in": [robber, victim]}}).to_list(2)
+    taken = await db.users.find_one_and_update(
+        {"user_id": victim, "points": {"$gte": 3}}, {"$inc": {"points": -3}}
+    )
+    if taken:
+        await db.users.update_one({"user_id": robber}, {"$inc": {"points": 3}})
+    await db.rob_history.insert_one({"robber": robber, "victim": victim, "success": bool(taken),
+                                     "timestamp": datetime.now(timezone.utc)})
+
+async def leaderboard(db, rng, users):
+    await db.users.find({}, {"user_id": 1, "points": 1}).sort("points", -1).limit(10).to_list(10)
+
+OPERATIONS = {"claim": claim, "daily": daily, "slots": slots, "rob": rob, "leaderboard": leaderboard}
+
+async def run(uri: str, database: str, pool_options: dict, users: int, operations: int,
+              concurrency: int, burst: float, seed_value: int):
+    waits = PoolWaits()
+    client = motor.motor_asyncio.AsyncIOMotorClient(uri, event_listeners=[waits], **pool_options)
+    await client.drop_database(database)
+    db = client[database]
+    await seed(db, users)
+    waits.waits.clear()
+
+    rng = random.Random(seed_value)
+    kinds = rng.choices(list(MIX), weights=list(MIX.values()), k=operations)
+    latencies = {kind: [] for kind in MIX}
+    errors = 0
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def operation(kind):
+        nonlocal errors
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                await OPERATIONS[kind](db, rng, users)
+            except PyMongoError:
+                errors += 1
+                return
+            latencies[kind].append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    tasks = []
+    # Bursts: a slice of the operations arrives at once, then a short pause
+    burst_size = max(1, int(concurrency * burst))
+    for offset in range(0, operations, burst_size):
+        tasks.extend(asyncio.create_task(operation(kind)) for kind in kinds[offset:offset + burst_size])
+        await asyncio.sleep(0.05)
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - started
+
+    await client.drop_database(database)
+    client.close()
+    everything = [value for values in latencies.values() for value in values]
+    return {
+        "elapsed": elapsed,
+        "ops": len(everything),
+        "errors": errors,
+        "p50": percentile(everything, 0.50),
+        "p99": percentile(everything, 0.99),
+        "by_kind": {kind: (percentile(values, 0.50), percentile(values, 0.99)) for kind, values in latencies.items()},
+        "wait_p50": percentile(waits.waits, 0.50),
+        "wait_p99": percentile(waits.waits, 0.99),
+        "timeouts": waits.timeouts,
+        "connections": waits.opened
+    }
+
+def main():
+    pool = load_pool_module()
+    parser = argparse.ArgumentParser(description="Mongo connection pool sizing benchmark")
+    parser.add_argument("--uri", default=os.getenv("MONGODB_URI", "mongodb://localhost:27017"))
+    parser.add_argument("--database", default="cookiebot_pool_benchmark", help="scratch database, dropped afterwards")
+    parser.add_argument("--profile", choices=list(pool.PROFILES), default="default",
+                        help="profile supplying the options other than maxPoolSize")
+    parser.add_argument("--pool-sizes", type=int, nargs="+", default=[5, 10, 25, 50, 100])
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--operations", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=200, help="operations in flight at once")
+    parser.add_argument("--burst", type=float, default=1.0, help="burst size as a fraction of --concurrency")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    base = pool.PROFILES[args.profile].client_options()
+    print(f"🧪 {args.operations} operations, {args.concurrency} in flight, mix "
+          + ", ".join(f"{kind} {share:.0%}" for kind, share in MIX.items()))
+    print(f"   Other options from the {args.profile} profile: "
+          + ", ".join(f"{k}={v}" for k, v in base.items() if k != "maxPoolSize"))
+    print(f"{'pool':>6}{'ops/s':>9}{'p50 ms':>9}{'p99 ms':>9}{'wait p50':>10}{'wait p99':>10}"
+          f"{'timeouts':>10}{'errors':>8}{'conns':>7}")
+
+    results = []
+    for size in args.pool_sizes:
+        options = {**base, "maxPoolSize": size, "minPoolSize": min(base["minPoolSize"], size)}
+        r = asyncio.run(run(args.uri, args.database, options, args.users, args.operations,
+                            args.concurrency, args.burst, args.seed))
+        results.append((size, r))
+        print(f"{size:>6}{r['ops'] / r['elapsed']:>9.0f}{r['p50'] * 1000:>9.1f}{r['p99'] * 1000:>9.1f}"
+              f"{r['wait_p50'] * 1000:>10.1f}{r['wait_p99'] * 1000:>10.1f}{r['timeouts']:>10}{r['errors']:>8}"
+              f"{r['connections']:>7}")
+
+    print("\np50/p99 ms by operation:")
+    for size, r in results:
+        print(f"  pool {size:>3}: " + "  ".join(
+            f"{kind} {p50 * 1000:.1f}/{p99 * 1000:.1f}" for kind, (p50, p99) in r["by_kind"].items()
+        ))
+
+    # Smallest pool with no timeouts whose p99 is within 10% of the best
+    clean = [(size, r) for size, r in results if not r["timeouts"] and not r["errors"]]
+    if clean:
+        best = min(r["p99"] for _, r in clean)
+        size = min(size for size, r in clean if r["p99"] <= best * 1.1)
+        print(f"\n✅ Suggested MONGO_MAX_POOL_SIZE={size} for {args.concurrency} concurrent operations")
+    else:
+        print("\n❌ Every pool size timed out; raise MONGO_WAIT_QUEUE_TIMEOUT_MS or the pool sizes tried")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,94 @@
+# setup/benchmark_stock_reservation.py
+# Stress test for StockIndex reservations: concurrent claims across several processes
+# must never deliver the same cookie file twice.
+#
+# Usage: python setup/benchmark_stock_reservation.py [--claims 500] [--files 400] [--processes 4]
+
+import argparse
+import asyncio
+import importlib.util
+import os
+import random
+import shutil
+import tempfile
+import time
+from collections import Counter
+from multiprocessing import Pool
+from pathlib import Path
+
+STOCK_MODULE = Path(__file__).resolve().parent.parent / "bot_core" / "stock.py"
+
+def load_stock_module():
+    # Load the module on its own so the benchmark doesn't need discord.py installed
+    spec = importlib.util.spec_from_file_location("stock", STOCK_MODULE)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+async def run_claims(directory: str, claims: int, fail_rate: float):
+    stock = load_stock_module()
+    index = stock.StockIndex(bot=None)
+    index.count(directory)
+
+    async def claim():
+        reservation = await index.reserve(directory)
+        if not reservation:
+            return None
+        # Simulate the DM upload, sometimes failing so the file goes back to stock
+        await asyncio.sleep(random.uniform(0, 0.01))
+        if random.random() < fail_rate:
+            await index.release(reservation)
+            return None
+        await index.commit(reservation)
+        return reservation.name
+
+    results = await asyncio.gather(*(claim() for _ in range(claims)))
+    return [name for name in results if name]
+
+def worker(args):
+    directory, claims, fail_rate = args
+    return asyncio.run(run_claims(directory, claims, fail_rate))
+
+def main():
+    parser = argparse.ArgumentParser(description="Cookie file reservation stress test")
+    parser.add_argument("--claims", type=int, default=500, help="total simultaneous claims")
+    parser.add_argument("--files", type=int, default=400, help="files in the stock directory")
+    parser.add_argument("--processes", type=int, default=4, help="bot processes sharing the directory")
+    parser.add_argument("--fail-rate", type=float, default=0.05, help="fraction of deliveries that fail")
+    args = parser.parse_args()
+
+    root = tempfile.mkdtemp(prefix="cookie_stock_")
+    try:
+        directory = os.path.join(root, "netflix")
+        os.makedirs(directory)
+        for i in range(args.files):
+            with open(os.path.join(directory, f"cookie_{i:05d}.txt"), "w") as f:
+                f.write(f"cookie {i}\n")
+
+        per_process = [args.claims // args.processes] * args.processes
+        per_process[0] += args.claims - sum(per_process)
+
+        print(f"🧪 {args.claims} claims over {args.processes} processes, {args.files} files")
+        started = time.perf_counter()
+        with Pool(args.processes) as pool:
+            results = pool.map(worker, [(directory, n, args.fail_rate) for n in per_process])
+        elapsed = time.perf_counter() - started
+
+        delivered = [name for names in results for name in names]
+        duplicates = {name: n for name, n in Counter(delivered).items() if n > 1}
+        remaining = len([f for f in os.listdir(directory) if f.endswith(".txt")])
+        archived = len(os.listdir(os.path.join(directory, "delivered")))
+        stranded = len(os.listdir(os.path.join(directory, "claimed")))
+
+        print(f"⏱️  {elapsed:.2f}s ({args.claims / elapsed:.0f} claims/s)")
+        print(f"📦 Delivered: {len(delivered)}  Remaining: {remaining}  Archived: {archived}  Stranded: {stranded}")
+        print(f"🔁 Duplicate deliveries: {len(duplicates)}")
+
+        ok = not duplicates and stranded == 0 and archived == len(delivered) and remaining + archived == args.files
+        print("✅ No file was delivered twice" if ok else "❌ Reservation invariant violated")
+        return 0 if ok else 1
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,181 @@
+# setup/benchmark_wallet_concurrency.py
+# Stress test for the Wallet: concurrent debits, credits, transfers and escrow
+# bets across several processes must conserve every point and never leave a
+# balance negative. --naive runs the old read-then-$set pattern for comparison.
+#
+# Needs a MongoDB server; the database given by --database is dropped afterwards.
+# Usage: python setup/benchmark_wallet_concurrency.py [--uri mongodb://localhost:27017]
+#        [--users 20] [--operations 4000] [--processes 4] [--concurrency 50] [--naive]
+
+import argparse
+import asyncio
+import importlib.util
+import os
+import random
+import time
+from multiprocessing import Pool
+from pathlib import Path
+from types import SimpleNamespace
+
+import motor.motor_asyncio
+
+WALLET_MODULE = Path(__file__).resolve().parent.parent / "bot_core" / "wallet.py"
+START_BALANCE = 100
+
+def load_wallet_module():
+    # Load the module on its own so the benchmark doesn't need discord.py installed
+    spec = importlib.util.spec_from_file_location("wallet", WALLET_MODULE)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+class NaiveWallet:
+    """The pattern the games used before: read the balance, then $set or $inc it"""
+
+    def __init__(self, db):
+        self.users = db.users
+
+    async def debit(self, user_id, amount):
+        user = await self.users.find_one({"user_id": user_id})
+        if user["points"] < amount:
+            return None
+        await asyncio.sleep(0)
+        await self.users.update_one({"user_id": user_id}, {"$set": {"points": user["points"] - amount}})
+        return user
+
+    async def credit(self, user_id, amount):
+        user = await self.users.find_one({"user_id": user_id})
+        await self.users.update_one({"user_id": user_id}, {"$set": {"points": user["points"] + amount}})
+        return user
+
+    async def transfer(self, from_id, to_id, amount):
+        if not await self.debit(from_id, amount):
+            return None
+        await self.users.update_one({"user_id": to_id}, {"$inc": {"points": amount}})
+        return True
+
+async def run_operations(uri: str, database: str, users: int, operations: int, concurrency: int, naive: bool, seed: int):
+    client = motor.motor_asyncio.AsyncIOMotorClient(uri)
+    db = client[database]
+    bot = SimpleNamespace(db=db, mongo_client=client)
+    wallet = NaiveWallet(db) if naive else load_wallet_module().Wallet(bot)
+    rng = random.Random(seed)
+
+    # Net points created (credits, payouts, refunds) minus points destroyed (debits, stakes)
+    ledger = {"net": 0, "debits": 0, "declined": 0, "credits": 0, "transfers": 0, "bets": 0}
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def operation(n: int):
+        kind = rng.choice(["debit", "debit", "credit", "transfer", "transfer", "bet"])
+        if naive and kind == "bet":
+            kind = "debit"
+        a, b = rng.sample(range(users), 2)
+        amount = rng.randint(1, 40)
+        async with semaphore:
+            if kind == "debit":
+                if await wallet.debit(a, amount):
+                    ledger["net"] -= amount
+                    ledger["debits"] += 1
+                else:
+                    ledger["declined"] += 1
+            elif kind == "credit":
+                await wallet.credit(a, amount)
+                ledger["net"] += amount
+                ledger["credits"] += 1
+            elif kind == "transfer":
+                if await wallet.transfer(a, b, amount):
+                    ledger["transfers"] += 1
+                else:
+                    ledger["declined"] += 1
+            else:
+                escrow_id = f"bench_{seed}_{n}"
+                stakes = {}
+                for user_id in rng.sample(range(users), 3):
+                    stake = rng.randint(1, 20)
+                    if await wallet.hold(escrow_id, user_id, stake):
+                        stakes[user_id] = stake
+                        ledger["net"] -= stake
+                if rng.random() < 0.3:
+                    refunded = await wallet.release(escrow_id)
+                    ledger["net"] += sum(stakes[user_id] for user_id in refunded)
+                else:
+                    payouts = {user_id: int(stake * 1.5) for user_id, stake in stakes.items() if rng.random() < 0.4}
+                    paid = await wallet.settle(escrow_id, payouts)
+                    ledger["net"] += sum(payouts.get(user_id, 0) for user_id in paid)
+                ledger["bets"] += 1
+
+    await asyncio.gather(*(operation(n) for n in range(operations)))
+    client.close()
+    return ledger
+
+def worker(args):
+    return asyncio.run(run_operations(*args))
+
+async def prepare(uri: str, database: str, users: int):
+    client = motor.motor_asyncio.AsyncIOMotorClient(uri)
+    await client.drop_database(database)
+    await client[database].users.create_index("user_id", unique=True)
+    await client[database].users.insert_many([
+        {"user_id": user_id, "points": START_BALANCE, "trust_score": 50} for user_id in range(users)
+    ])
+    hello = await client.admin.command("hello")
+    client.close()
+    return "setName" in hello or hello.get("msg") == "isdbgrid"
+
+async def inspect(uri: str, database: str, drop: bool):
+    client = motor.motor_asyncio.AsyncIOMotorClient(uri)
+    db = client[database]
+    balances = {user["user_id"]: user for user in await db.users.find({}).to_list(None)}
+    unsettled = await db.wallet_transfers.count_documents({"state": {"$in": ["pending", "applied"]}})
+    open_escrows = await db.wallet_escrows.count_documents({})
+    if drop:
+        await client.drop_database(database)
+    client.close()
+    return balances, unsettled, open_escrows
+
+def main():
+    parser = argparse.ArgumentParser(description="Wallet consistency stress test")
+    parser.add_argument("--uri", default=os.getenv("MONGODB_URI", "mongodb://localhost:27017"))
+    parser.add_argument("--database", default="cookiebot_wallet_benchmark", help="scratch database, dropped afterwards")
+    parser.add_argument("--users", type=int, default=20, help="users sharing the balances (fewer means more contention)")
+    parser.add_argument("--operations", type=int, default=4000, help="total wallet operations")
+    parser.add_argument("--processes", type=int, default=4, help="bot processes writing at once")
+    parser.add_argument("--concurrency", type=int, default=50, help="operations in flight per process")
+    parser.add_argument("--naive", action="store_true", help="use read-then-write updates instead of the Wallet")
+    parser.add_argument("--keep", action="store_true", help="keep the scratch database for inspection")
+    args = parser.parse_args()
+
+    transactions = asyncio.run(prepare(args.uri, args.database, args.users))
+    mode = "naive read-then-write" if args.naive else ("transactions" if transactions else "two-phase transfers")
+    print(f"🧪 {args.operations} operations over {args.processes} processes, {args.users} users ({mode})")
+
+    per_process = [args.operations // args.processes] * args.processes
+    per_process[0] += args.operations - sum(per_process)
+    started = time.perf_counter()
+    with Pool(args.processes) as pool:
+        ledgers = pool.map(worker, [
+            (args.uri, args.database, args.users, n, args.concurrency, args.naive, seed)
+            for seed, n in enumerate(per_process)
+        ])
+    elapsed = time.perf_counter() - started
+
+    balances, unsettled, open_escrows = asyncio.run(inspect(args.uri, args.database, drop=not args.keep))
+    totals = {key: sum(ledger[key] for ledger in ledgers) for key in ledgers[0]}
+    expected = args.users * START_BALANCE + totals["net"]
+    actual = sum(user["points"] for user in balances.values())
+    negative = [user_id for user_id, user in balances.items() if user["points"] < 0]
+    leftovers = [user_id for user_id, user in balances.items() if user.get("escrow") or user.get("pending_transfers")]
+
+    print(f"⏱️  {elapsed:.2f}s ({args.operations / elapsed:.0f} ops/s)")
+    print(f"📊 Debits: {totals['debits']}  Credits: {totals['credits']}  Transfers: {totals['transfers']}  "
+          f"Bets: {totals['bets']}  Declined: {totals['declined']}")
+    print(f"💰 Expected total: {expected}  Actual total: {actual}  Drift: {actual - expected}")
+    print(f"🔻 Negative balances: {len(negative)}  Leftover holds/transfers: {len(leftovers)}  "
+          f"Unsettled transfers: {unsettled}  Open escrows: {open_escrows}")
+
+    ok = actual == expected and not negative and not leftovers and not unsettled and not open_escrows
+    print("✅ Every point is accounted for" if ok else "❌ Balance invariant violated")
+    return 0 if ok else 1
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -35,7 +35,9 @@ class DatabaseSetup:
             "users", "servers", "config", "statistics", 
             "feedback", "analytics", "blacklist_appeals", 
             "cookie_logs", "transactions", "warnings",
-            "game_config", "game_stats", "divine_gambles", "bet_history", "rob_history"
+            "game_config", "game_stats", "divine_gambles", "bet_history", "rob_history",
+            "jobs", "distinct_counters", "invites", "giveaways", "giveaway_entries",
+            "wallet_transfers", "wallet_escrows", "cooldowns", "clusters"
         ]
         
         for collection in required_collections:
@@ -63,12 +65,18 @@ class DatabaseSetup:
                 {'keys': [('total_claims', -1)], 'unique': False},
                 {'keys': [('blacklisted', 1)], 'unique': False},
                 {'keys': [('last_active', -1)], 'unique': False},
-                {'keys': [('invite_count', -1)], 'unique': False}
+                {'keys': [('invite_count', -1)], 'unique': False},
+                {'keys': [('verified_invites', -1)], 'unique': False},
+                {'keys': [('game_stats.slots.profit', -1)], 'unique': False},
+                {'keys': [('game_stats.rob.profit', -1)], 'unique': False},
+                {'keys': [('game_stats.bet.profit', -1)], 'unique': False},
+                {'keys': [('last_claim.feedback_given', 1), ('last_claim.feedback_deadline', 1)], 'unique': False}
             ],
             'servers': [
                 {'keys': [('server_id', 1)], 'unique': True},
                 {'keys': [('enabled', 1)], 'unique': False},
-                {'keys': [('premium_tier', 1)], 'unique': False}
+                {'keys': [('premium_tier', 1)], 'unique': False},
+                {'keys': [('last_updated', -1)], 'unique': False}
             ],
             'feedback': [
                 {'keys': [('user_id', 1)], 'unique': False},
@@ -77,6 +85,7 @@ class DatabaseSetup:
                 {'keys': [('rating', -1)], 'unique': False}
             ],
             'cookie_logs': [
+                {'keys': [('timestamp', 1)], 'unique': False, 'expire_after': 90 * 24 * 3600},
                 {'keys': [('user_id', 1, 'timestamp', -1)], 'unique': False},
                 {'keys': [('server_id', 1, 'timestamp', -1)], 'unique': False},
                 {'keys': [('cookie_type', 1, 'timestamp', -1)], 'unique': False}
@@ -89,6 +98,35 @@ class DatabaseSetup:
                 {'keys': [('timestamp', -1)], 'unique': False},
                 {'keys': [('type', 1)], 'unique': False}
             ],
+            'jobs': [
+                {'keys': [('status', 1), ('due_at', 1)], 'unique': False}
+            ],
+            'invites': [
+                {'keys': [('inviter_id', 1), ('invitee_id', 1)], 'unique': True},
+                {'keys': [('invitee_id', 1)], 'unique': False},
+                {'keys': [('inviter_id', 1), ('verified', 1)], 'unique': False},
+                {'keys': [('joined_at', 1)], 'unique': False}
+            ],
+            'giveaways': [
+                {'keys': [('message_id', 1)], 'unique': True},
+                {'keys': [('status', 1), ('end_time', 1)], 'unique': False}
+            ],
+            'giveaway_entries': [
+                {'keys': [('message_id', 1), ('user_id', 1)], 'unique': True}
+            ],
+            'wallet_transfers': [
+                {'keys': [('state', 1), ('created_at', 1)], 'unique': False},
+                {'keys': [('finished_at', 1)], 'unique': False, 'expire_after': 7 * 24 * 3600}
+            ],
+            'wallet_escrows': [
+                {'keys': [('expires_at', 1)], 'unique': False}
+            ],
+            'cooldowns': [
+                {'keys': [('expires_at', 1)], 'unique': False, 'expire_after': 0}
+            ],
+            'distinct_counters': [
+                {'keys': [('expires_at', 1)], 'unique': False, 'expire_after': 0}
+            ],
             'game_stats': [
                 {'keys': [('user_id', 1, 'game_type', 1)], 'unique': True},
                 {'keys': [('server_id', 1, 'game_type', 1)], 'unique': False}
@@ -116,10 +154,10 @@ class DatabaseSetup:
                     index_name = '_'.join([f"{k}_{v}" for k, v in index_config['keys']])
                     
                     if index_name not in existing_names:
-                        await self.db[collection].create_index(
-                            index_config['keys'],
-                            unique=index_config.get('unique', False)
-                        )
+                        options = {'unique': index_config.get('unique', False)}
+                        if 'expire_after' in index_config:
+                            options['expireAfterSeconds'] = index_config['expire_after']
+                        await self.db[collection].create_index(index_config['keys'], **options)
                         print(f"✅ Created index {index_name} on {collection}")
                     else:
                         print(f"✓ Index {index_name} exists on {collection}")
@@ -926,11 +964,6 @@ class DatabaseSetup:
                 "commands": {
                     cmd: {
                         "total": 0,
-                        "today": 0,
-                        "this_week": 0,
-                        "this_month": 0,
-                        "unique_users": [],
-                        "guilds": [],
                         "average_execution_time": 0
                     } for cmd in ["cookie", "daily", "points", "help", "stock", 
                                   "feedback", "invites", "status", "leaderboard", 
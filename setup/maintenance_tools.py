@@ -114,7 +114,7 @@ class MaintenanceTools:
             if updates:
                 await self.db.servers.update_one(
                     {"_id": server["_id"]},
-                    {"$set": updates}
+                    {"$set": {**updates, "last_updated": datetime.now(timezone.utc)}}
                 )
         
         print(f"✅ Fixed {fixed_count} role configurations")
@@ -195,18 +195,6 @@ class MaintenanceTools:
             }
         )
         
-        await self.db.analytics.update_many(
-            {},
-            {
-                "$set": {
-                    "commands.$[].this_week": 0,
-                    "cookies.$[].this_week": 0,
-                    "total_this_week": 0,
-                    "weekly_active_users": []
-                }
-            }
-        )
-        
         print("✅ Weekly stats reset completed")
     
     async def migrate_data(self):
@@ -232,8 +220,7 @@ class MaintenanceTools:
                     "favorite_cookie": None
                 }
             
-            if "invited_users" not in user:
-                updates["invited_users"] = []
+            if "pending_invites" not in user:
                 updates["pending_invites"] = 0
                 updates["verified_invites"] = 0
                 updates["fake_invites"] = 0
@@ -267,7 +254,7 @@ class MaintenanceTools:
             if updates:
                 await self.db.servers.update_one(
                     {"_id": server["_id"]},
-                    {"$set": updates}
+                    {"$set": {**updates, "last_updated": datetime.now(timezone.utc)}}
                 )
                 migrations_performed += 1
         
@@ -450,38 +437,44 @@ class MaintenanceTools:
             if updates:
                 await self.db.servers.update_one(
                     {"_id": server["_id"]},
-                    {"$set": updates}
+                    {"$set": {**updates, "last_updated": datetime.now(timezone.utc)}}
                 )
         
         print(f"✅ Synced {synced} role configurations")
     
+    @staticmethod
+    def daily_claims_day(claim_data) -> Optional[str]:
+        """Day a daily_claims counter belongs to, as CookieCog.claims_today reads it"""
+        if not isinstance(claim_data, dict):
+            return None
+        day = claim_data.get("date")
+        if day is None and isinstance(claim_data.get("last_claim"), datetime):
+            # Counters written before dates were stored
+            day = claim_data["last_claim"].strftime("%Y-%m-%d")
+        return day
+    
     async def verify_daily_limits(self):
-        """Verify and reset daily claim limits"""
+        """Drop daily claim counters from previous days.
+
+        The bot ignores counters whose date isn't today, so this only tidies documents.
+        """
         print("🔄 Verifying daily claim limits...")
         
         reset_count = 0
-        now = datetime.now(timezone.utc)
-        today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
+        today = datetime.now(timezone.utc).strftime("%Y-%m-%d")
         
-        async for user in self.db.users.find({"daily_claims": {"$exists": True}}):
-            reset_needed = False
-            
-            for cookie_type, claim_data in user.get("daily_claims", {}).items():
-                if isinstance(claim_data, dict) and "last_claim" in claim_data:
-                    last_claim = claim_data["last_claim"]
-                    if isinstance(last_claim, datetime):
-                        if last_claim < today_start:
-                            reset_needed = True
-                            break
+        async for user in self.db.users.find({"daily_claims": {"$exists": True, "$ne": {}}}):
+            stale = {
+                f"daily_claims.{cookie_type}": ""
+                for cookie_type, claim_data in user.get("daily_claims", {}).items()
+                if self.daily_claims_day(claim_data) != today
+            }
             
-            if reset_needed:
-                await self.db.users.update_one(
-                    {"_id": user["_id"]},
-                    {"$set": {"daily_claims": {}}}
-                )
+            if stale:
+                await self.db.users.update_one({"_id": user["_id"]}, {"$unset": stale})
                 reset_count += 1
         
-        print(f"✅ Reset daily limits for {reset_count} users")
+        print(f"✅ Cleared stale daily limits for {reset_count} users")
     
     async def check_directory_stock(self):
         """Check cookie directory stock levels"""
@@ -648,10 +641,10 @@ class MaintenanceTools:
             if result.deleted_count > 0:
                 print(f"  Deleted {result.deleted_count} documents from {collection}")
         
-        await self.db.analytics.update_many(
-            {},
-            {"$pull": {"commands.$[].unique_users": user_id}}
-        )
+        result = await self.db.invites.delete_many({"$or": [{"inviter_id": user_id}, {"invitee_id": user_id}]})
+        total_deleted += result.deleted_count
+        if result.deleted_count > 0:
+            print(f"  Deleted {result.deleted_count} documents from invites")
         
         print(f"✅ Deleted {total_deleted} documents for user {user_id}")
         return total_deleted
@@ -664,7 +657,8 @@ class MaintenanceTools:
         update_data = {
             "maintenance_mode": enable,
             "maintenance_message": message or "Bot is under maintenance. Please try again later.",
-            "maintenance_started": datetime.now(timezone.utc) if enable else None
+            "maintenance_started": datetime.now(timezone.utc) if enable else None,
+            "last_updated": datetime.now(timezone.utc)
         }
         
         await self.db.config.update_one(
@@ -264,7 +264,8 @@ class SetupWizardView(discord.ui.View):
             "invite_tracking": True,
             "analytics_enabled": True,
             "role_hierarchy_enabled": True,
-            "daily_claim_tracking": True
+            "daily_claim_tracking": True,
+            "claim_ui_mode": "animated"
         }
         
         embed = discord.Embed(
@@ -691,7 +692,8 @@ async def quick_setup(ctx):
             "invite_tracking": True,
             "analytics_enabled": True,
             "role_hierarchy_enabled": True,
-            "daily_claim_tracking": True
+            "daily_claim_tracking": True,
+            "claim_ui_mode": "animated"
         },
         "premium_tier": "basic",
         "created_at": datetime.now(timezone.utc),